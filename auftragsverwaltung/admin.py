@@ -9,10 +9,13 @@ from auftragsverwaltung.models import (
     Contract,
     ContractLine,
     ContractRun,
+    BillingBatch,
+    BulkPrintJob,
     TextTemplate,
     TimeEntry,
 )
 from auftragsverwaltung.services import DocumentCalculationService
+from auftragsverwaltung.services.invoice_finalization import finalize_invoices
 
 
 class SalesDocumentLineInline(admin.TabularInline):
@@ -143,48 +146,56 @@ class SalesDocumentAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ()
-    actions = ['recalculate_totals']
+    actions = ['recalculate_totals', 'finalize_selected_invoices']
     
     def recalculate_totals(self, request, queryset):
         """
         Admin action to recalculate totals for selected documents
         
-        This action calls DocumentCalculationService.recalculate() with persist=True
-        for each selected document and provides feedback on success/failure.
+        This action calls DocumentCalculationService.recalculate_many(), which
+        recalculates the documents in chunks and writes only changed totals.
         """
-        success_count = 0
-        error_count = 0
-        
-        for document in queryset:
-            try:
-                DocumentCalculationService.recalculate(document, persist=True)
-                success_count += 1
-            except Exception as e:
-                error_count += 1
-                self.message_user(
-                    request,
-                    f"Fehler beim Berechnen von {document.number}: {str(e)}",
-                    level=messages.ERROR
-                )
-        
-        # Success message
-        if success_count > 0:
+        try:
+            result = DocumentCalculationService.recalculate_many(queryset)
+        except Exception as e:
             self.message_user(
                 request,
-                f"Summen für {success_count} Dokument(e) erfolgreich neu berechnet.",
-                level=messages.SUCCESS
+                f"Fehler beim Berechnen der Summen: {str(e)}",
+                level=messages.ERROR
             )
+            return
         
-        # Summary if there were errors
-        if error_count > 0:
-            self.message_user(
-                request,
-                f"{error_count} Dokument(e) konnten nicht berechnet werden.",
-                level=messages.WARNING
-            )
+        self.message_user(
+            request,
+            f"Summen für {result.documents} Dokument(e) erfolgreich neu berechnet "
+            f"({result.documents_changed} geändert).",
+            level=messages.SUCCESS
+        )
     
     recalculate_totals.short_description = "Summen neu berechnen"
     
+    def finalize_selected_invoices(self, request, queryset):
+        """
+        Admin action to finalize the selected invoices (batch Echtdruck)
+        
+        Missing numbers are reserved as one block per number range
+        (see finalize_invoices()).
+        """
+        try:
+            results = finalize_invoices(queryset)
+        except ValueError as e:
+            self.message_user(request, f"Keine Rechnung finalisiert: {str(e)}", level=messages.ERROR)
+            return
+        
+        modified_count = sum(1 for _, was_modified in results if was_modified)
+        self.message_user(
+            request,
+            f"{modified_count} Rechnung(en) finalisiert, {len(results) - modified_count} bereits finalisiert.",
+            level=messages.SUCCESS
+        )
+    
+    finalize_selected_invoices.short_description = "Rechnungen finalisieren (Echtdruck)"
+    
     def get_readonly_fields(self, request, obj=None):
         """Make payment_term_snapshot readonly by default"""
         readonly = list(self.readonly_fields)
@@ -459,6 +470,84 @@ class ContractRunAdmin(admin.ModelAdmin):
     message_short.short_description = "Nachricht"
 
 
+@admin.register(BillingBatch)
+class BillingBatchAdmin(admin.ModelAdmin):
+    """Admin interface for BillingBatch (read-only run records)"""
+    list_display = (
+        'reference_date',
+        'status',
+        'catch_up',
+        'workers',
+        'progress',
+        'success_count',
+        'failed_count',
+        'throughput',
+        'started_at',
+        'finished_at',
+    )
+    list_filter = (
+        'status',
+        'catch_up',
+        'reference_date',
+    )
+    ordering = ('-started_at',)
+    date_hierarchy = 'started_at'
+    exclude = ('contract_ids',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def progress(self, obj):
+        """Show processed / total contracts"""
+        return f"{obj.processed_count} / {obj.contract_count}"
+    progress.short_description = "Fortschritt"
+    
+    def throughput(self, obj):
+        """Show contracts per second and milliseconds per invoice"""
+        if obj.contracts_per_second is None:
+            return ""
+        result = f"{obj.contracts_per_second:.1f} Verträge/s"
+        if obj.avg_ms_per_invoice is not None:
+            result += f", {obj.avg_ms_per_invoice:.0f} ms/Rechnung"
+        return result
+    throughput.short_description = "Durchsatz"
+
+
+@admin.register(BulkPrintJob)
+class BulkPrintJobAdmin(admin.ModelAdmin):
+    """Admin interface for BulkPrintJob (read-only job records)"""
+    list_display = (
+        'document_type',
+        'status',
+        'progress',
+        'failed_count',
+        'page_count',
+        'created_by',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = (
+        'status',
+        'document_type',
+    )
+    ordering = ('-created_at',)
+    exclude = ('document_ids',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def progress(self, obj):
+        """Show processed / total documents"""
+        return f"{obj.processed_count} / {obj.document_count}"
+    progress.short_description = "Fortschritt"
+
+
 @admin.register(TextTemplate)
 class TextTemplateAdmin(admin.ModelAdmin):
     """Admin interface for TextTemplate"""
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AuftragsverwaltungConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auftragsverwaltung'
+
+    def ready(self):
+        """
+        Called when the app is ready. Registers signal handlers.
+        """
+        # Import signals to register handlers
+        from . import signals  # noqa: F401
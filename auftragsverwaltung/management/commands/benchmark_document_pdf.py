@@ -0,0 +1,69 @@
+"""
+Management command to benchmark the PDF rendering of a sales document
+
+Usage:
+    python manage.py benchmark_document_pdf 42
+    python manage.py benchmark_document_pdf 42 --count 50
+
+Renders the document --count times without the PDF cache: first with a new
+WeasyPrintRenderer per document (new font configuration, stylesheets and
+images read and decoded again), then with the process-wide renderer pool
+that PdfRenderService uses. Prints the average render time per document.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auftragsverwaltung.models import SalesDocument
+from auftragsverwaltung.printing import SalesDocumentInvoiceContextBuilder
+from core.printing import PdfRenderService, get_static_base_url
+from core.printing.weasyprint_renderer import WeasyPrintRenderer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the PDF rendering of a sales document (new renderer vs. renderer pool)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'document_id',
+            type=int,
+            help='ID of the SalesDocument to render',
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=10,
+            help='Number of renderings per variant (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            document = SalesDocument.objects.select_related(
+                'company', 'customer', 'document_type'
+            ).get(pk=options['document_id'])
+        except SalesDocument.DoesNotExist:
+            raise CommandError(f"SalesDocument {options['document_id']} does not exist")
+        if options['count'] < 1:
+            raise CommandError('--count must be at least 1')
+
+        context_builder = SalesDocumentInvoiceContextBuilder()
+        template_name = context_builder.get_template_name(document)
+        context = context_builder.build_context(document)
+        base_url = get_static_base_url()
+
+        def measure(create_service):
+            start = time.perf_counter()
+            for _ in range(options['count']):
+                create_service().render(template_name=template_name, context=context, base_url=base_url)
+            return (time.perf_counter() - start) / options['count'] * 1000
+
+        try:
+            before = measure(lambda: PdfRenderService(renderer=WeasyPrintRenderer()))
+            after = measure(PdfRenderService)
+        except ImportError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'Document {document.number or document.pk}, {options["count"]} rendering(s) per variant:')
+        self.stdout.write(f'  New renderer per document: {before:.1f} ms/document')
+        self.stdout.write(f'  Renderer pool:             {after:.1f} ms/document')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {before / after:.2f}x'))
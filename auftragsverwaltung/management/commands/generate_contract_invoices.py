@@ -3,13 +3,25 @@ Management command to generate invoices for due contracts
 
 Usage:
     python manage.py generate_contract_invoices
+    python manage.py generate_contract_invoices --workers 4
+    python manage.py generate_contract_invoices --catch-up
+    python manage.py generate_contract_invoices --dry-run --horizon 90
 
 This command finds all active contracts with next_run_date <= today
-and generates draft invoices for them.
+and generates draft invoices for them. With --workers the contracts are
+billed in a process pool (one chunk per company, see ContractBillingService.run).
+With --catch-up all outstanding periods up to the reference date are billed
+(one invoice and ContractRun per period), not only the next one.
+Every run is recorded as a BillingBatch; if the last batch has the same
+reference date and mode and was interrupted, it is resumed from its checkpoint.
+--dry-run prints a forecast of the invoices (line count and totals per invoice,
+totals per company and customer) without writing anything; --horizon extends it to
+the periods falling due within the given number of days (BillingForecastService).
 """
 from django.core.management.base import BaseCommand
 from datetime import date
 
+from auftragsverwaltung.services.billing_forecast import BillingForecastService
 from auftragsverwaltung.services.contract_billing import ContractBillingService
 
 
@@ -27,8 +39,34 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without actually generating invoices',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes; contracts of one company are billed in order by one worker (default: 1)',
+        )
+        parser.add_argument(
+            '--catch-up',
+            action='store_true',
+            help='Bill all outstanding periods up to the reference date, not only the next one',
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=None,
+            help='Forecast the periods falling due within this many days after the reference date (implies --dry-run)',
+        )
     
     def handle(self, *args, **options):
+        workers = options['workers']
+        if workers < 1:
+            self.stderr.write(self.style.ERROR("--workers must be at least 1"))
+            return
+        horizon = options['horizon']
+        if horizon is not None and horizon < 0:
+            self.stderr.write(self.style.ERROR("--horizon must not be negative"))
+            return
+        
         # Parse date argument
         if options['date']:
             try:
@@ -41,46 +79,68 @@ class Command(BaseCommand):
             reference_date = date.today()
             self.stdout.write(f"Using today's date: {reference_date}")
         
-        # Dry-run mode
-        if options['dry_run']:
+        # Dry-run mode (forecast, no writes)
+        if options['dry_run'] or horizon is not None:
             self.stdout.write(self.style.WARNING("DRY-RUN MODE: No invoices will be generated"))
-            from auftragsverwaltung.models import Contract
-            due_contracts = Contract.objects.filter(
-                is_active=True,
-                next_run_date__lte=reference_date
-            ).select_related('company', 'customer')
-            
-            # Filter by is_contract_active()
-            due_contracts = [c for c in due_contracts if c.is_contract_active()]
-            
-            if not due_contracts:
-                self.stdout.write(self.style.SUCCESS("No contracts due for billing"))
-                return
-            
-            self.stdout.write(f"Found {len(due_contracts)} contract(s) due for billing:")
-            for contract in due_contracts:
-                self.stdout.write(f"  - {contract.name} ({contract.company.name}): next_run_date={contract.next_run_date}")
+            self._write_forecast(BillingForecastService.forecast(
+                today=reference_date, horizon_days=horizon or 0, catch_up=options['catch_up']
+            ))
             return
         
+        # Resume an interrupted batch of the same reference date and mode from its checkpoint
+        batch = ContractBillingService.unfinished_batch()
+        if batch is not None and (batch.reference_date, batch.catch_up) != (reference_date, options['catch_up']):
+            self.stdout.write(self.style.WARNING(
+                f"Billing batch #{batch.pk} ({batch.reference_date}) was interrupted; "
+                f"run with the same --date/--catch-up to resume it"
+            ))
+            batch = None
+        
         # Generate invoices
-        self.stdout.write("Generating invoices for due contracts...")
-        runs = ContractBillingService.generate_due(today=reference_date)
+        if batch is not None:
+            self.stdout.write(
+                f"Resuming billing batch #{batch.pk}: {batch.processed_count} of "
+                f"{batch.contract_count} contract(s) already processed..."
+            )
+            try:
+                report = ContractBillingService.resume(batch, workers=workers)
+            except ValueError as e:
+                self.stderr.write(self.style.ERROR(str(e)))
+                return
+        else:
+            if workers > 1:
+                self.stdout.write(f"Generating invoices for due contracts with up to {workers} workers...")
+            else:
+                self.stdout.write("Generating invoices for due contracts...")
+            report = ContractBillingService.run(
+                today=reference_date, workers=workers, catch_up=options['catch_up']
+            )
+        runs = report.runs
+        
+        for error in report.errors:
+            self.stderr.write(self.style.ERROR(f"Billing chunk failed: {error}"))
+        if report.number_gaps:
+            self.stdout.write(self.style.WARNING(
+                f"{len(report.number_gaps)} reserved number(s) could not be given back and remain "
+                f"as gap: {', '.join(report.number_gaps)}"
+            ))
         
         if not runs:
-            self.stdout.write(self.style.SUCCESS("No contracts due for billing"))
+            if not report.errors:
+                self.stdout.write(self.style.SUCCESS("No contracts due for billing"))
             return
         
         # Report results
-        success_count = sum(1 for run in runs if run.status == 'SUCCESS')
-        failed_count = sum(1 for run in runs if run.status == 'FAILED')
-        skipped_count = sum(1 for run in runs if run.status == 'SKIPPED')
-        
-        self.stdout.write(f"\nProcessed {len(runs)} contract(s):")
-        self.stdout.write(self.style.SUCCESS(f"  - Success: {success_count}"))
-        if failed_count > 0:
-            self.stdout.write(self.style.ERROR(f"  - Failed: {failed_count}"))
-        if skipped_count > 0:
-            self.stdout.write(self.style.WARNING(f"  - Skipped: {skipped_count}"))
+        if options['catch_up']:
+            contract_count = len({run.contract_id for run in runs})
+            self.stdout.write(f"\nProcessed {len(runs)} period(s) of {contract_count} contract(s):")
+        else:
+            self.stdout.write(f"\nProcessed {len(runs)} contract(s):")
+        self.stdout.write(self.style.SUCCESS(f"  - Success: {report.success_count}"))
+        if report.failed_count > 0:
+            self.stdout.write(self.style.ERROR(f"  - Failed: {report.failed_count}"))
+        if report.skipped_count > 0:
+            self.stdout.write(self.style.WARNING(f"  - Skipped: {report.skipped_count}"))
         
         # Show details
         self.stdout.write("\nDetails:")
@@ -97,3 +157,43 @@ class Command(BaseCommand):
             self.stdout.write(
                 f"  {status_style(run.status)}: {run.contract.name} ({run.run_date}) {doc_info}{message_info}"
             )
+        
+        # Throughput of the batch
+        batch = report.batch
+        if batch is not None and batch.contracts_per_second is not None:
+            per_invoice = ""
+            if batch.avg_ms_per_invoice is not None:
+                per_invoice = f", {batch.avg_ms_per_invoice:.1f} ms per invoice"
+            self.stdout.write(
+                f"\nBatch #{batch.pk} ({batch.get_status_display()}): "
+                f"{batch.contracts_per_second:.1f} contract(s)/s{per_invoice}"
+            )
+    
+    def _write_forecast(self, forecast):
+        if not forecast.invoices:
+            self.stdout.write(self.style.SUCCESS("No contracts due for billing"))
+            return
+        
+        if forecast.until > forecast.today:
+            self.stdout.write(f"Forecast of {len(forecast.invoices)} invoice(s) up to {forecast.until}:")
+        else:
+            self.stdout.write(f"Found {len(forecast.invoices)} invoice(s) due for billing:")
+        for invoice in forecast.invoices:
+            contract = invoice.contract
+            self.stdout.write(
+                f"  - {contract.name} ({contract.company.name}): next_run_date={invoice.run_date}, "
+                f"{invoice.period}, {len(invoice.lines)} line(s), "
+                f"net {invoice.total_net} / tax {invoice.total_tax} / gross {invoice.total_gross}"
+            )
+        
+        for title, groups in (("Per company", forecast.by_company()), ("Per customer", forecast.by_customer())):
+            self.stdout.write(f"\n{title}:")
+            for group in groups:
+                self.stdout.write(
+                    f"  {group.name or '-'}: {group.invoice_count} invoice(s), "
+                    f"net {group.total_net} / tax {group.total_tax} / gross {group.total_gross}"
+                )
+        
+        self.stdout.write(
+            f"\nTotal: net {forecast.total_net} / tax {forecast.total_tax} / gross {forecast.total_gross}"
+        )
@@ -0,0 +1,53 @@
+"""
+Management command to recalculate the totals of many sales documents
+
+Usage:
+    python manage.py recalculate_document_totals
+    python manage.py recalculate_document_totals --company 1 --tax-rate VAT_7
+    python manage.py recalculate_document_totals --chunk-size 2000
+
+Use after a tax rate change or a data repair, or periodically to correct drift
+of the incrementally maintained totals. The documents are recalculated
+in chunks with DocumentCalculationService.recalculate_many(); only changed
+lines and documents are written.
+"""
+from django.core.management.base import BaseCommand
+
+from auftragsverwaltung.models import SalesDocument
+from auftragsverwaltung.services.document_calculation import DocumentCalculationService
+
+
+class Command(BaseCommand):
+    help = 'Recalculate line and document totals of sales documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            help='Only documents of this Mandant (ID)',
+        )
+        parser.add_argument(
+            '--tax-rate',
+            type=str,
+            help='Only documents with lines of this tax rate (code)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DocumentCalculationService.RECALCULATE_CHUNK_SIZE,
+            help=f'Documents read and written per chunk (default: {DocumentCalculationService.RECALCULATE_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        documents = SalesDocument.objects.all()
+        if options['company']:
+            documents = documents.filter(company_id=options['company'])
+        if options['tax_rate']:
+            documents = documents.filter(lines__tax_rate__code=options['tax_rate']).distinct()
+
+        result = DocumentCalculationService.recalculate_many(documents, chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Recalculated {result.documents} document(s): '
+            f'{result.documents_changed} document(s) and {result.lines_changed} line(s) changed.'
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-16 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auftragsverwaltung', '0023_migrate_contractline_description_to_texts'),
+        ('core', '0032_add_debitor_number_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='numberrange',
+            name='numberrange_document_requires_doctype',
+        ),
+        migrations.RemoveConstraint(
+            model_name='numberrange',
+            name='numberrange_company_required_for_non_item',
+        ),
+        migrations.RemoveConstraint(
+            model_name='numberrange',
+            name='numberrange_item_no_company',
+        ),
+        migrations.AlterField(
+            model_name='numberrange',
+            name='target',
+            field=models.CharField(choices=[('DOCUMENT', 'Dokument'), ('CONTRACT', 'Vertrag'), ('ITEM', 'Artikel'), ('CUSTOMER', 'Kunde'), ('RENTAL', 'Mietvertrag')], default='DOCUMENT', help_text='Target type: DOCUMENT for SalesDocument, CONTRACT for Contract', max_length=10, verbose_name='Ziel'),
+        ),
+        migrations.AddConstraint(
+            model_name='numberrange',
+            constraint=models.UniqueConstraint(condition=models.Q(('target', 'RENTAL')), fields=('target',), name='unique_numberrange_rental_global', violation_error_message='Es kann nur einen globalen Mietvertrags-Nummernkreis geben.'),
+        ),
+        migrations.AddConstraint(
+            model_name='numberrange',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('document_type__isnull', False), ('target', 'DOCUMENT')), ('target', 'CONTRACT'), ('target', 'ITEM'), ('target', 'CUSTOMER'), ('target', 'RENTAL'), _connector='OR'), name='numberrange_document_requires_doctype', violation_error_message='Dokumenttyp ist erforderlich für DOCUMENT-Nummernkreis.'),
+        ),
+        migrations.AddConstraint(
+            model_name='numberrange',
+            constraint=models.CheckConstraint(condition=models.Q(('target', 'ITEM'), ('target', 'CUSTOMER'), ('target', 'RENTAL'), ('company__isnull', False), _connector='OR'), name='numberrange_company_required_for_non_item', violation_error_message='Mandant ist erforderlich für DOCUMENT und CONTRACT Nummernkreise.'),
+        ),
+        migrations.AddConstraint(
+            model_name='numberrange',
+            constraint=models.CheckConstraint(condition=models.Q(('company__isnull', False), ('target__in', ['ITEM', 'CUSTOMER', 'RENTAL']), _negated=True), name='numberrange_item_no_company', violation_error_message='Artikel-, Kunden- und Mietvertrags-Nummernkreise dürfen keinen Mandanten haben (global).'),
+        ),
+    ]
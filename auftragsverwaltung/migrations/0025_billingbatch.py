@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auftragsverwaltung', '0024_add_rental_numberrange_target'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillingBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference_date', models.DateField(help_text='Referenzdatum der Abrechnung', verbose_name='Stichtag')),
+                ('catch_up', models.BooleanField(default=False, help_text='Alle offenen Perioden bis zum Stichtag abrechnen', verbose_name='Nachberechnung')),
+                ('workers', models.PositiveIntegerField(default=1, help_text='Anzahl paralleler Prozesse', verbose_name='Worker')),
+                ('status', models.CharField(choices=[('RUNNING', 'Läuft'), ('FAILED', 'Abgebrochen'), ('COMPLETED', 'Abgeschlossen')], default='RUNNING', max_length=20, verbose_name='Status')),
+                ('contract_ids', models.JSONField(default=list, help_text='IDs der fälligen Verträge in Abrechnungsreihenfolge', verbose_name='Verträge')),
+                ('contract_count', models.PositiveIntegerField(default=0, verbose_name='Anzahl Verträge')),
+                ('processed_count', models.PositiveIntegerField(default=0, verbose_name='Verarbeitete Verträge')),
+                ('success_count', models.PositiveIntegerField(default=0, verbose_name='Erfolgreich')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Fehlgeschlagen')),
+                ('skipped_count', models.PositiveIntegerField(default=0, verbose_name='Übersprungen')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Gestartet am')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Beendet am')),
+                ('duration_seconds', models.FloatField(default=0, help_text='Summe der Laufzeit aller Ausführungen (ohne Unterbrechungen)', verbose_name='Laufzeit (s)')),
+            ],
+            options={
+                'verbose_name': 'Abrechnungslauf',
+                'verbose_name_plural': 'Abrechnungsläufe',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['status', '-started_at'], name='auftragsver_status_615416_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='contractrun',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='runs', to='auftragsverwaltung.billingbatch', verbose_name='Abrechnungslauf'),
+        ),
+    ]
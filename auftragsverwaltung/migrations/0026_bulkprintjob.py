@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auftragsverwaltung', '0025_billingbatch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkPrintJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_ids', models.JSONField(default=list, help_text='IDs der Dokumente in Druckreihenfolge', verbose_name='Dokumente')),
+                ('status', models.CharField(choices=[('QUEUED', 'Wartend'), ('RUNNING', 'Läuft'), ('COMPLETED', 'Abgeschlossen'), ('FAILED', 'Fehlgeschlagen')], default='QUEUED', max_length=20, verbose_name='Status')),
+                ('document_count', models.PositiveIntegerField(default=0, verbose_name='Anzahl Dokumente')),
+                ('processed_count', models.PositiveIntegerField(default=0, verbose_name='Verarbeitete Dokumente')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Fehlgeschlagen')),
+                ('page_count', models.PositiveIntegerField(default=0, verbose_name='Seiten')),
+                ('pdf_file', models.FileField(blank=True, upload_to='bulk_print/%Y/%m/%d/', verbose_name='PDF-Datei')),
+                ('error_message', models.TextField(blank=True, default='', verbose_name='Fehlermeldung')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Erstellt am')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Beendet am')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_print_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Erstellt von')),
+                ('document_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bulk_print_jobs', to='auftragsverwaltung.documenttype', verbose_name='Dokumenttyp')),
+            ],
+            options={
+                'verbose_name': 'Sammeldruck',
+                'verbose_name_plural': 'Sammeldrucke',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='auftragsver_status_2891f6_idx')],
+            },
+        ),
+    ]
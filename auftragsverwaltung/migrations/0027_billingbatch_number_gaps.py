@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auftragsverwaltung', '0026_bulkprintjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billingbatch',
+            name='number_gaps',
+            field=models.JSONField(blank=True, default=list, help_text='Reservierte Belegnummern, die nicht zurückgegeben werden konnten', verbose_name='Nummernlücken'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auftragsverwaltung', '0028_billingbatch_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkprintjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Zeitpunkt des letzten Fortschritts', verbose_name='Aktualisiert am'),
+            preserve_default=False,
+        ),
+    ]
@@ -115,12 +115,14 @@ class NumberRange(models.Model):
     - R26-00001 (Invoice from 2026)
     - A26-00001 (Quote from 2026)
     - V26-00001 (Contract from 2026)
+    - V-00001 (Mietvertrag, global, see vermietung.Vertrag)
     """
     TARGET_CHOICES = [
         ('DOCUMENT', 'Dokument'),
         ('CONTRACT', 'Vertrag'),
         ('ITEM', 'Artikel'),
         ('CUSTOMER', 'Kunde'),
+        ('RENTAL', 'Mietvertrag'),
     ]
     
     RESET_POLICY_CHOICES = [
@@ -214,23 +216,30 @@ class NumberRange(models.Model):
                 name='unique_numberrange_customer_global',
                 violation_error_message='Es kann nur einen globalen Kunden-Nummernkreis geben.'
             ),
+            # Unique constraint for RENTAL target: exactly one global Mietvertrag NumberRange
+            models.UniqueConstraint(
+                fields=['target'],
+                condition=models.Q(target='RENTAL'),
+                name='unique_numberrange_rental_global',
+                violation_error_message='Es kann nur einen globalen Mietvertrags-Nummernkreis geben.'
+            ),
             # Check constraint: DOCUMENT target requires document_type
             models.CheckConstraint(
-                check=models.Q(target='DOCUMENT', document_type__isnull=False) | models.Q(target='CONTRACT') | models.Q(target='ITEM') | models.Q(target='CUSTOMER'),
+                check=models.Q(target='DOCUMENT', document_type__isnull=False) | models.Q(target='CONTRACT') | models.Q(target='ITEM') | models.Q(target='CUSTOMER') | models.Q(target='RENTAL'),
                 name='numberrange_document_requires_doctype',
                 violation_error_message='Dokumenttyp ist erforderlich für DOCUMENT-Nummernkreis.'
             ),
             # Check constraint: DOCUMENT and CONTRACT targets require company
             models.CheckConstraint(
-                check=models.Q(target='ITEM') | models.Q(target='CUSTOMER') | models.Q(company__isnull=False),
+                check=models.Q(target='ITEM') | models.Q(target='CUSTOMER') | models.Q(target='RENTAL') | models.Q(company__isnull=False),
                 name='numberrange_company_required_for_non_item',
                 violation_error_message='Mandant ist erforderlich für DOCUMENT und CONTRACT Nummernkreise.'
             ),
-            # Check constraint: ITEM and CUSTOMER targets must not have company
+            # Check constraint: ITEM, CUSTOMER and RENTAL targets must not have company
             models.CheckConstraint(
-                check=~models.Q(target__in=['ITEM', 'CUSTOMER'], company__isnull=False),
+                check=~models.Q(target__in=['ITEM', 'CUSTOMER', 'RENTAL'], company__isnull=False),
                 name='numberrange_item_no_company',
-                violation_error_message='Artikel- und Kunden-Nummernkreise dürfen keinen Mandanten haben (global).'
+                violation_error_message='Artikel-, Kunden- und Mietvertrags-Nummernkreise dürfen keinen Mandanten haben (global).'
             )
         ]
     
@@ -239,6 +248,8 @@ class NumberRange(models.Model):
             return f"Artikel-Nummernkreis (global, {self.reset_policy})"
         if self.target == 'CUSTOMER':
             return f"Kunden-Nummernkreis (global, {self.reset_policy})"
+        if self.target == 'RENTAL':
+            return f"Mietvertrags-Nummernkreis (global, {self.reset_policy})"
         if self.target == 'CONTRACT':
             return f"{self.company.name} - Vertrag ({self.reset_policy})"
         return f"{self.company.name} - {self.document_type.name if self.document_type else 'N/A'} ({self.reset_policy})"
@@ -1251,6 +1262,131 @@ class ContractLine(models.Model):
         return f"{self.contract.name} - Pos. {self.position_no}: {self.description[:50]}"
 
 
+class BillingBatch(models.Model):
+    """
+    Billing Batch (Abrechnungslauf) - run-level record of a contract billing run
+    
+    Records the reference date, the set of due contracts (in billing order),
+    the progress and the timings of one run of the contract billing. An
+    interrupted batch is resumed from its checkpoint: contracts that already
+    have a ContractRun in the batch are not billed again.
+    
+    Scope: Global (contracts of all companies)
+    """
+    
+    # Status choices
+    STATUS_CHOICES = [
+        ('RUNNING', 'Läuft'),
+        ('FAILED', 'Abgebrochen'),
+        ('COMPLETED', 'Abgeschlossen'),
+    ]
+    
+    reference_date = models.DateField(
+        verbose_name="Stichtag",
+        help_text="Referenzdatum der Abrechnung"
+    )
+    catch_up = models.BooleanField(
+        default=False,
+        verbose_name="Nachberechnung",
+        help_text="Alle offenen Perioden bis zum Stichtag abrechnen"
+    )
+    workers = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Worker",
+        help_text="Anzahl paralleler Prozesse"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='RUNNING',
+        verbose_name="Status"
+    )
+    contract_ids = models.JSONField(
+        default=list,
+        verbose_name="Verträge",
+        help_text="IDs der fälligen Verträge in Abrechnungsreihenfolge"
+    )
+    number_gaps = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Nummernlücken",
+        help_text="Reservierte Belegnummern, die nicht zurückgegeben werden konnten"
+    )
+    
+    # Progress (checkpoint)
+    contract_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Anzahl Verträge"
+    )
+    processed_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Verarbeitete Verträge"
+    )
+    success_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Erfolgreich"
+    )
+    failed_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Fehlgeschlagen"
+    )
+    skipped_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Übersprungen"
+    )
+    
+    # Timings
+    started_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Gestartet am"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Beendet am"
+    )
+    duration_seconds = models.FloatField(
+        default=0,
+        verbose_name="Laufzeit (s)",
+        help_text="Summe der Laufzeit aller Ausführungen (ohne Unterbrechungen)"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Aktualisiert am",
+        help_text="Zeitpunkt des letzten Checkpoints"
+    )
+    
+    class Meta:
+        verbose_name = "Abrechnungslauf"
+        verbose_name_plural = "Abrechnungsläufe"
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['status', '-started_at']),
+        ]
+    
+    def __str__(self):
+        return f"Abrechnungslauf {self.reference_date} ({self.get_status_display()})"
+    
+    @property
+    def remaining_count(self):
+        """Number of contracts not processed yet"""
+        return max(self.contract_count - self.processed_count, 0)
+    
+    @property
+    def contracts_per_second(self):
+        """Throughput in processed contracts per second (None before the first checkpoint)"""
+        if not self.duration_seconds:
+            return None
+        return self.processed_count / self.duration_seconds
+    
+    @property
+    def avg_ms_per_invoice(self):
+        """Average run time per created invoice in milliseconds (None without invoices)"""
+        if not self.success_count:
+            return None
+        return self.duration_seconds * 1000 / self.success_count
+
+
 class ContractRun(models.Model):
     """
     Contract Run (Vertragsausführung) - execution history and audit trail
@@ -1284,6 +1420,14 @@ class ContractRun(models.Model):
         verbose_name="Dokument",
         help_text="Generiertes Verkaufsdokument"
     )
+    batch = models.ForeignKey(
+        BillingBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='runs',
+        verbose_name="Abrechnungslauf"
+    )
     
     # Run Fields
     run_date = models.DateField(
@@ -1574,3 +1718,123 @@ class TimeEntry(models.Model):
         if self.duration_minutes:
             return Decimal(self.duration_minutes) / Decimal(60)
         return Decimal(0)
+
+
+class BulkPrintJob(models.Model):
+    """
+    Bulk Print Job (Sammeldruck) - background rendering of many documents into one PDF
+    
+    Large selections of the document list are rendered in a background job
+    (see BulkPrintService): the documents are rendered in a process pool and
+    merged in the selected order into one PDF file. The list view polls the
+    progress and downloads the result when the job is completed.
+    
+    Scope: Per user (only the creator can poll and download a job)
+    """
+    
+    # Status choices
+    STATUS_CHOICES = [
+        ('QUEUED', 'Wartend'),
+        ('RUNNING', 'Läuft'),
+        ('COMPLETED', 'Abgeschlossen'),
+        ('FAILED', 'Fehlgeschlagen'),
+    ]
+    
+    document_type = models.ForeignKey(
+        DocumentType,
+        on_delete=models.CASCADE,
+        related_name='bulk_print_jobs',
+        verbose_name="Dokumenttyp"
+    )
+    document_ids = models.JSONField(
+        default=list,
+        verbose_name="Dokumente",
+        help_text="IDs der Dokumente in Druckreihenfolge"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='QUEUED',
+        verbose_name="Status"
+    )
+    
+    # Progress
+    document_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Anzahl Dokumente"
+    )
+    processed_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Verarbeitete Dokumente"
+    )
+    failed_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Fehlgeschlagen"
+    )
+    page_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Seiten"
+    )
+    
+    # Result
+    pdf_file = models.FileField(
+        upload_to='bulk_print/%Y/%m/%d/',
+        blank=True,
+        verbose_name="PDF-Datei"
+    )
+    error_message = models.TextField(
+        blank=True,
+        default="",
+        verbose_name="Fehlermeldung"
+    )
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bulk_print_jobs',
+        verbose_name="Erstellt von"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Erstellt am"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Beendet am"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Aktualisiert am",
+        help_text="Zeitpunkt des letzten Fortschritts"
+    )
+    
+    class Meta:
+        verbose_name = "Sammeldruck"
+        verbose_name_plural = "Sammeldrucke"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Sammeldruck {self.document_type.name} ({self.document_count} Dokumente, {self.get_status_display()})"
+    
+    @property
+    def is_finished(self):
+        """True if the job is completed or failed"""
+        return self.status in ('COMPLETED', 'FAILED')
+    
+    @property
+    def progress_percent(self):
+        """Processed documents in percent"""
+        if not self.document_count:
+            return 100 if self.is_finished else 0
+        return int(self.processed_count * 100 / self.document_count)
+    
+    @property
+    def filename(self):
+        """Download filename of the merged PDF"""
+        return f'{self.document_type.name}_Sammeldruck_{self.document_count}_Dokumente.pdf'
@@ -1,16 +1,34 @@
-from .number_range import get_next_number
-from .document_calculation import DocumentCalculationService, TotalsResult
+from .number_range import get_next_number, reserve_numbers, release_numbers, NumberBlock, DocumentNumberAllocator
+from .document_calculation import DocumentCalculationService, TotalsResult, BulkRecalculationResult
 from .item_snapshot import apply_item_snapshot
 from .tax_determination import TaxDeterminationService
 from .payment_term_text import PaymentTermTextService
-from .contract_billing import ContractBillingService
+from .contract_billing import ContractBillingService, BillingReport
+from .billing_forecast import BillingForecastService, BillingForecast, ForecastInvoice, ForecastTotals
+from .dashboard_kpis import SalesDocumentKpiService, SalesDocumentKpis
+from .invoice_archive import InvoiceArchiveService
+from .bulk_print import BulkPrintService
 
 __all__ = [
     'get_next_number',
+    'reserve_numbers',
+    'release_numbers',
+    'NumberBlock',
+    'DocumentNumberAllocator',
     'DocumentCalculationService',
     'TotalsResult',
+    'BulkRecalculationResult',
     'apply_item_snapshot',
     'TaxDeterminationService',
     'PaymentTermTextService',
     'ContractBillingService',
+    'BillingReport',
+    'BillingForecastService',
+    'BillingForecast',
+    'ForecastInvoice',
+    'ForecastTotals',
+    'SalesDocumentKpiService',
+    'SalesDocumentKpis',
+    'InvoiceArchiveService',
+    'BulkPrintService',
 ]
@@ -0,0 +1,225 @@
+"""
+Billing Forecast Service
+
+Previews what the contract billing (ContractBillingService) would invoice:
+the due contracts and, for a configurable horizon, the periods falling due
+later. Every forecast invoice carries its lines, net/tax/gross totals and the
+billing period label of the real invoice; totals are aggregated per company
+and per customer.
+
+The forecast never writes: contracts and their lines are read with two
+queries (contracts + prefetched lines) and everything else is computed in
+memory with the same line snapshot and calculation as the real billing run.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db.models import Prefetch, Q
+
+from auftragsverwaltung.models import Contract, ContractLine, SalesDocumentLine
+from auftragsverwaltung.services.contract_billing import ContractBillingService
+from auftragsverwaltung.services.document_calculation import DocumentCalculationService
+
+
+@dataclass
+class ForecastInvoice:
+    """
+    One invoice the billing run would create
+
+    Attributes:
+        contract: Contract instance (next_run_date unchanged)
+        run_date: Issue date of the invoice (the period's next_run_date)
+        period: Billing period label, as in the invoice subject
+        lines: Unsaved SalesDocumentLines with calculated line totals
+        total_net: Net total of the invoice
+        total_tax: Tax total of the invoice
+        total_gross: Gross total of the invoice
+        is_due: True if the period is due on the reference date
+    """
+    contract: Contract
+    run_date: date
+    period: str
+    lines: List[SalesDocumentLine]
+    total_net: Decimal
+    total_tax: Decimal
+    total_gross: Decimal
+    is_due: bool
+
+    @property
+    def subject(self) -> str:
+        return f"{self.contract.name} {self.period}"
+
+
+@dataclass
+class ForecastTotals:
+    """
+    Aggregated forecast of a company or customer
+
+    Attributes:
+        name: Display name of the company or customer
+        invoice_count: Number of forecast invoices
+        total_net: Sum of the net totals
+        total_tax: Sum of the tax totals
+        total_gross: Sum of the gross totals
+    """
+    name: str
+    invoice_count: int = 0
+    total_net: Decimal = Decimal('0.00')
+    total_tax: Decimal = Decimal('0.00')
+    total_gross: Decimal = Decimal('0.00')
+
+    def add(self, invoice: ForecastInvoice) -> None:
+        self.invoice_count += 1
+        self.total_net += invoice.total_net
+        self.total_tax += invoice.total_tax
+        self.total_gross += invoice.total_gross
+
+
+@dataclass
+class BillingForecast:
+    """
+    Result of a billing forecast
+
+    Attributes:
+        today: Reference date (periods up to this date are due)
+        until: Last run date included in the forecast
+        invoices: Forecast invoices ordered by run date
+    """
+    today: date
+    until: date
+    invoices: List[ForecastInvoice] = field(default_factory=list)
+
+    @property
+    def total_net(self) -> Decimal:
+        return sum((invoice.total_net for invoice in self.invoices), Decimal('0.00'))
+
+    @property
+    def total_tax(self) -> Decimal:
+        return sum((invoice.total_tax for invoice in self.invoices), Decimal('0.00'))
+
+    @property
+    def total_gross(self) -> Decimal:
+        return sum((invoice.total_gross for invoice in self.invoices), Decimal('0.00'))
+
+    def by_company(self) -> List[ForecastTotals]:
+        """Totals per company, sorted by name."""
+        return self._group(lambda contract: (contract.company_id, contract.company.name))
+
+    def by_customer(self) -> List[ForecastTotals]:
+        """Totals per customer, sorted by name."""
+        return self._group(lambda contract: (
+            contract.customer_id, contract.customer.name if contract.customer else ''
+        ))
+
+    def _group(self, key) -> List[ForecastTotals]:
+        totals: Dict[object, ForecastTotals] = {}
+        for invoice in self.invoices:
+            group_id, name = key(invoice.contract)
+            totals.setdefault(group_id, ForecastTotals(name=name)).add(invoice)
+        return sorted(totals.values(), key=lambda group: group.name)
+
+
+class BillingForecastService:
+    """
+    Service for previewing contract billing without writing anything
+    """
+
+    @classmethod
+    def forecast(
+        cls,
+        today: Optional[date] = None,
+        horizon_days: int = 0,
+        catch_up: bool = False,
+        company=None,
+    ) -> BillingForecast:
+        """
+        Forecast the invoices of the due and upcoming contract periods
+
+        Mirrors ContractBillingService: a period is billed if its run date is
+        on or before its contract's end_date. Without a horizon, the periods due
+        on the reference date are included once per contract (all of them with
+        catch_up, as in a catch-up run). With a horizon, every period with a run
+        date up to today + horizon_days is included: the daily runs within the
+        horizon bill the overdue periods one after another.
+
+        Args:
+            today: Reference date (defaults to today)
+            horizon_days: Also forecast periods falling due up to today + horizon_days
+            catch_up: Include all outstanding periods, not only the next one
+            company: Restrict to this Mandant (None = all companies)
+
+        Returns:
+            BillingForecast
+
+        Raises:
+            ValueError: If horizon_days is negative
+        """
+        if today is None:
+            today = date.today()
+        if horizon_days < 0:
+            raise ValueError('horizon_days must not be negative')
+        until = today + timedelta(days=horizon_days)
+
+        forecast = BillingForecast(today=today, until=until)
+        for contract in cls._load_contracts(today, until, company):
+            forecast.invoices.extend(cls._forecast_contract(contract, today, until, catch_up))
+
+        forecast.invoices.sort(key=lambda invoice: invoice.run_date)
+        return forecast
+
+    @staticmethod
+    def _load_contracts(today: date, until: date, company=None) -> List[Contract]:
+        contracts = Contract.objects.filter(
+            is_active=True,
+            next_run_date__lte=until,
+        ).filter(
+            Q(end_date__isnull=True) | Q(end_date__gte=today)
+        ).select_related(
+            'company', 'customer', 'document_type', 'payment_term'
+        ).prefetch_related(
+            Prefetch(
+                'lines',
+                queryset=ContractLine.objects.select_related(
+                    'item', 'tax_rate', 'unit', 'cost_type_1', 'cost_type_2'
+                ).order_by('position_no'),
+            )
+        ).order_by('next_run_date', 'pk')
+        if company is not None:
+            contracts = contracts.filter(company=company)
+        return list(contracts)
+
+    @classmethod
+    def _forecast_contract(cls, contract: Contract, today: date, until: date, catch_up: bool) -> List[ForecastInvoice]:
+        # The lines and totals are the same for every period of a contract
+        lines = ContractBillingService.build_invoice_lines(contract.lines.all())
+        totals = DocumentCalculationService.calculate_lines(lines)
+
+        invoices = []
+        next_run_date = contract.next_run_date
+        try:
+            # Step through the periods on the (never saved) instance, so the
+            # period labels come from the billing service itself
+            while contract.next_run_date <= until and (
+                contract.end_date is None or contract.next_run_date <= contract.end_date
+            ):
+                is_due = contract.next_run_date <= today
+                if is_due and invoices and not catch_up and until == today:
+                    # Without catch-up the run on the reference date bills one period
+                    contract.next_run_date = contract.advance_next_run_date()
+                    continue
+                invoices.append(ForecastInvoice(
+                    contract=contract,
+                    run_date=contract.next_run_date,
+                    period=ContractBillingService.build_billing_period(contract),
+                    lines=lines,
+                    total_net=totals.total_net,
+                    total_tax=totals.total_tax,
+                    total_gross=totals.total_gross,
+                    is_due=is_due,
+                ))
+                contract.next_run_date = contract.advance_next_run_date()
+        finally:
+            contract.next_run_date = next_run_date
+        return invoices
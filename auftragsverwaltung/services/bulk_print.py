@@ -0,0 +1,416 @@
+"""
+Bulk Print Service
+
+Renders many SalesDocuments into one merged PDF (Sammeldruck), as used by the
+bulk print of the document list.
+
+- WeasyPrint is CPU-bound and single-threaded, so the documents are rendered
+  in a process pool (one document per task); the results are merged in the
+  given order, independent of the order in which the workers finish
+- A document that fails to render is logged and left out of the merged PDF
+- At most one document per worker is rendered or waiting to be merged at a
+  time (render_iter()), so results of workers that finish early cannot pile up
+- The merge writes the pages of each rendered document to a spooled temporary
+  file as soon as it arrives (StreamingPdfMerger, merge_documents()), which is
+  streamed to the client or stored; peak memory is bounded by the largest
+  single document, not by the size of the selection
+- Small selections (up to SYNC_LIMIT documents) are rendered within the
+  request; larger ones run as BulkPrintJob in a background thread of the web
+  process, which records the progress for polling and stores the merged PDF
+  for download
+- Jobs queued or running without progress for STALE_AFTER (e.g. the web
+  process was restarted and took the thread with it) are marked as failed;
+  such a job is not revived if its thread finishes after all
+- Finished jobs and their files are removed after RETENTION
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import islice
+from typing import Callable, IO, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.files import File
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from auftragsverwaltung.models import BulkPrintJob, SalesDocument
+from auftragsverwaltung.printing import SalesDocumentInvoiceContextBuilder
+from auftragsverwaltung.services.invoice_archive import InvoiceArchiveService
+from core.printing import PdfCache, PdfRenderService, get_static_base_url
+
+
+logger = logging.getLogger(__name__)
+
+
+def _init_render_worker():
+    """Process pool initializer: set up Django and drop inherited DB connections."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _render_document_pdf(document_id: int) -> bytes:
+    """Process pool task: render one document, return the PDF bytes."""
+    try:
+        return BulkPrintService.render_document(
+            SalesDocument.objects.select_related('company', 'customer', 'document_type').get(pk=document_id)
+        )
+    finally:
+        connections.close_all()
+
+
+def _run_job_thread(job_id: int) -> None:
+    """Background thread: run a bulk print job, close the thread's DB connections."""
+    try:
+        BulkPrintService.run_job(job_id)
+    except Exception:
+        logger.exception('Bulk print job %s could not be run', job_id)
+    finally:
+        connections.close_all()
+
+
+class BulkPrintService:
+    """
+    Service for rendering and merging many sales documents into one PDF
+    """
+
+    # Selections up to this size are rendered within the request
+    SYNC_LIMIT = 10
+
+    # Maximum number of render processes (bounded by the CPU count)
+    MAX_WORKERS = 4
+
+    # Unfinished jobs without progress for this time are considered lost (thread gone with its process)
+    STALE_AFTER = timedelta(minutes=15)
+
+    # Finished jobs are deleted (with their PDF file) after this time
+    RETENTION = timedelta(days=1)
+
+    # Merged PDFs up to this size are kept in memory, larger ones on disk
+    SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+    @staticmethod
+    def render_document(document: SalesDocument, pdf_service: Optional[PdfRenderService] = None) -> bytes:
+        """
+        Render a sales document to PDF (finalized invoices: the archived PDF)
+
+        Args:
+            document: SalesDocument instance (company, customer, document_type loaded)
+            pdf_service: PdfRenderService to reuse (a new one if None)
+
+        Returns:
+            bytes: PDF content
+        """
+        report = InvoiceArchiveService.get_or_archive(document, pdf_service=pdf_service)
+        if report is not None:
+            return InvoiceArchiveService.read(report)
+
+        context_builder = SalesDocumentInvoiceContextBuilder()
+        result = (pdf_service or PdfRenderService(cache=PdfCache())).render(
+            template_name=context_builder.get_template_name(document),
+            context=context_builder.build_context(document),
+            base_url=get_static_base_url(),
+            filename=f'{document.number}.pdf'
+        )
+        return result.pdf_bytes
+
+    @classmethod
+    def default_workers(cls) -> int:
+        return max(1, min(cls.MAX_WORKERS, os.cpu_count() or 1))
+
+    @classmethod
+    def render_iter(
+        cls,
+        document_ids: List[int],
+        workers: Optional[int] = None,
+        on_progress: Optional[Callable[[bool], None]] = None,
+    ) -> Iterator[Optional[bytes]]:
+        """
+        Render documents to PDF, in a process pool if workers > 1
+
+        The PDFs are yielded in the order of document_ids as soon as they are
+        available. Documents are submitted in a sliding window of one document
+        per worker: the next one is submitted when the oldest is done, so at
+        most `workers` rendered PDFs are held back at a time.
+
+        Args:
+            document_ids: IDs of the documents
+            workers: Number of render processes (default: default_workers())
+            on_progress: Called with True/False after each rendered/failed document
+
+        Yields:
+            PDF bytes per document (None for failed documents)
+        """
+        if workers is None:
+            workers = cls.default_workers()
+        workers = min(workers, len(document_ids))
+
+        def done(index, pdf_bytes=None, error=None):
+            if error is not None:
+                logger.error(f"Error generating PDF for document {document_ids[index]}: {error}")
+            if on_progress is not None:
+                on_progress(error is None)
+            return pdf_bytes
+
+        if workers <= 1:
+            pdf_service = PdfRenderService(cache=PdfCache())
+            documents = SalesDocument.objects.select_related(
+                'company', 'customer', 'document_type'
+            ).in_bulk(document_ids)
+            for index, document_id in enumerate(document_ids):
+                try:
+                    pdf_bytes = done(index, cls.render_document(documents[document_id], pdf_service))
+                except Exception as e:
+                    pdf_bytes = done(index, error=e)
+                yield pdf_bytes
+            return
+
+        # Rendering workers must not share the parent's database connections
+        connections.close_all()
+
+        # Spawned (not forked) workers: jobs run in a thread of the web process,
+        # and forking a multi-threaded process is unsafe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_render_worker,
+        ) as executor:
+            remaining = iter(enumerate(document_ids))
+            window = deque(
+                (index, executor.submit(_render_document_pdf, document_id))
+                for index, document_id in islice(remaining, workers)
+            )
+            while window:
+                index, future = window.popleft()
+                try:
+                    pdf_bytes = done(index, future.result())
+                except Exception as e:
+                    pdf_bytes = done(index, error=e)
+                # Keep the pool busy while the consumer merges this document
+                for next_index, document_id in islice(remaining, 1):
+                    window.append((next_index, executor.submit(_render_document_pdf, document_id)))
+                yield pdf_bytes
+
+    @classmethod
+    def render_many(
+        cls,
+        document_ids: List[int],
+        workers: Optional[int] = None,
+        on_progress: Optional[Callable[[bool], None]] = None,
+    ) -> List[Optional[bytes]]:
+        """
+        Render documents to PDF (see render_iter())
+
+        Returns:
+            List of PDF bytes aligned with document_ids (None for failed documents)
+        """
+        return list(cls.render_iter(document_ids, workers=workers, on_progress=on_progress))
+
+    @staticmethod
+    def merge(pdfs: Iterable[Optional[bytes]], target) -> int:
+        """
+        Merge PDFs in the given order into a binary file object
+
+        The PDFs are read and their pages written one at a time
+        (StreamingPdfMerger), so only the current PDF is held in memory.
+
+        Args:
+            pdfs: PDF bytes (None entries are skipped), e.g. render_iter()
+            target: Writable binary file object
+
+        Returns:
+            int: Number of pages written (nothing is written for 0 pages)
+        """
+        from core.printing.merge import StreamingPdfMerger
+
+        merger = StreamingPdfMerger(target)
+        try:
+            for pdf_bytes in pdfs:
+                if pdf_bytes is not None:
+                    merger.add(pdf_bytes)
+        finally:
+            page_count = merger.close()
+        return page_count
+
+    @classmethod
+    def merge_documents(
+        cls,
+        document_ids: List[int],
+        workers: Optional[int] = None,
+        on_progress: Optional[Callable[[bool], None]] = None,
+    ) -> Tuple[IO[bytes], int]:
+        """
+        Render documents and merge them into a spooled temporary file
+
+        The file stays in memory up to SPOOL_MAX_MEMORY and is moved to disk
+        beyond that. The caller closes it (FileResponse does so after streaming).
+
+        Args:
+            document_ids: IDs of the documents in print order
+            workers: Number of render processes (default: default_workers())
+            on_progress: Called with True/False after each rendered/failed document
+
+        Returns:
+            Tuple of the file (positioned at the start) and the number of pages
+        """
+        target = tempfile.SpooledTemporaryFile(max_size=cls.SPOOL_MAX_MEMORY)
+        try:
+            page_count = cls.merge(cls.render_iter(document_ids, workers=workers, on_progress=on_progress), target)
+        except BaseException:
+            target.close()
+            raise
+        target.seek(0)
+        return target, page_count
+
+    @classmethod
+    def start_job(cls, document_type, document_ids: List[int], user=None) -> BulkPrintJob:
+        """
+        Create a bulk print job and run it in a background thread
+
+        The thread is started after the surrounding transaction commits.
+
+        Args:
+            document_type: DocumentType of the documents
+            document_ids: IDs of the documents in print order
+            user: User creating the job (the only one allowed to download it)
+
+        Returns:
+            BulkPrintJob (status QUEUED)
+        """
+        cls.cleanup()
+        job = BulkPrintJob.objects.create(
+            document_type=document_type,
+            document_ids=list(document_ids),
+            document_count=len(document_ids),
+            created_by=user if user is not None and user.is_authenticated else None,
+        )
+        transaction.on_commit(lambda: cls._launch(job))
+        return job
+
+    @classmethod
+    def _launch(cls, job: BulkPrintJob) -> None:
+        threading.Thread(
+            target=_run_job_thread, args=(job.pk,), name=f'bulk-print-{job.pk}', daemon=True
+        ).start()
+
+    @classmethod
+    def run_job(cls, job_id: int, workers: Optional[int] = None) -> BulkPrintJob:
+        """
+        Render and merge the documents of a job, store the PDF and record the progress
+
+        Args:
+            job_id: ID of the BulkPrintJob
+            workers: Number of render processes (default: default_workers())
+
+        A job that was marked as failed by fail_stale() in the meantime is
+        left failed (its PDF is discarded).
+
+        Returns:
+            BulkPrintJob (status COMPLETED or FAILED)
+        """
+        job = BulkPrintJob.objects.select_related('document_type').get(pk=job_id)
+        if not BulkPrintJob.objects.filter(pk=job.pk, status='QUEUED').update(
+            status='RUNNING', updated_at=timezone.now()
+        ):
+            job.refresh_from_db()
+            return job
+
+        def progress(success):
+            # Every document is a heartbeat for fail_stale()
+            BulkPrintJob.objects.filter(pk=job.pk).update(
+                processed_count=F('processed_count') + 1,
+                failed_count=F('failed_count') + (0 if success else 1),
+                updated_at=timezone.now(),
+            )
+
+        try:
+            target, page_count = cls.merge_documents(job.document_ids, workers=workers, on_progress=progress)
+            job.refresh_from_db()
+            with target:
+                job.page_count = page_count
+                if job.page_count:
+                    job.pdf_file.save(job.filename, File(target), save=False)
+            job.status = 'COMPLETED' if job.page_count else 'FAILED'
+            if not job.page_count:
+                job.error_message = 'Fehler beim Erstellen der PDFs.'
+        except Exception as e:
+            logger.exception('Bulk print job %s failed', job.pk)
+            job.refresh_from_db()
+            job.status = 'FAILED'
+            job.error_message = str(e)[:500]
+
+        job.finished_at = timezone.now()
+        finished = BulkPrintJob.objects.filter(pk=job.pk, status='RUNNING').update(
+            status=job.status,
+            page_count=job.page_count,
+            pdf_file=job.pdf_file.name or '',
+            error_message=job.error_message,
+            finished_at=job.finished_at,
+            updated_at=job.finished_at,
+        )
+        if not finished:
+            # Marked as failed by fail_stale() in the meantime: keep the reported result
+            logger.warning('Bulk print job %s finished after it was marked as stale', job.pk)
+            if job.pdf_file:
+                job.pdf_file.delete(save=False)
+            job.refresh_from_db()
+            return job
+        logger.info(
+            f"Bulk print job {job.pk} {job.status}: {job.processed_count - job.failed_count} of "
+            f"{job.document_count} document(s), {job.page_count} page(s)"
+        )
+        return job
+
+    @classmethod
+    def fail_stale(cls, jobs=None, now=None) -> int:
+        """
+        Mark queued or running jobs without progress for STALE_AFTER as failed
+
+        Args:
+            jobs: BulkPrintJob queryset to check (default: all jobs)
+            now: Reference time (default: now)
+
+        Returns:
+            int: Number of jobs marked as failed
+        """
+        now = now or timezone.now()
+        if jobs is None:
+            jobs = BulkPrintJob.objects.all()
+        return jobs.filter(
+            status__in=['QUEUED', 'RUNNING'],
+            updated_at__lt=now - cls.STALE_AFTER,
+        ).update(
+            status='FAILED',
+            error_message='Der Sammeldruck wurde nicht abgeschlossen (abgebrochen oder Zeitüberschreitung).',
+            finished_at=now,
+        )
+
+    @classmethod
+    def cleanup(cls, now=None) -> int:
+        """
+        Fail stale jobs (see fail_stale()) and delete finished jobs older than
+        RETENTION together with their PDF files
+
+        Returns:
+            int: Number of deleted jobs
+        """
+        now = now or timezone.now()
+        cls.fail_stale(now=now)
+        jobs = list(BulkPrintJob.objects.filter(
+            status__in=['COMPLETED', 'FAILED'],
+            created_at__lt=now - cls.RETENTION,
+        ))
+        for job in jobs:
+            if job.pdf_file:
+                job.pdf_file.delete(save=False)
+            job.delete()
+        return len(jobs)
@@ -8,19 +8,49 @@ Business Rules:
 - Finds contracts with next_run_date <= today
 - Creates SalesDocument (invoice) with unique number (via NumberRange service)
 - Status set to DRAFT (default) or SENT (if auto_finalize=True)
-- Copies ContractLine to SalesDocumentLine (snapshot)
+- Copies ContractLine to SalesDocumentLine (snapshot); totals are calculated
+  in memory, the document is inserted once and the lines with one bulk_create
 - Creates ContractRun for audit trail
 - Advances next_run_date based on interval
 - No duplicate runs per contract/day
+- Catch-up mode bills all outstanding periods up to the reference date in one
+  run (one ContractRun per period, contract lines loaded once per contract)
 - Numbers are always assigned immediately to avoid unique constraint violations
+- Numbers come from blocks reserved per company (DocumentNumberAllocator), so the
+  NumberRange row is locked once per block instead of once per invoice; blocks are
+  sized from the invoices due per number range, numbers that cannot be given back
+  are recorded as gaps on the BillingBatch
+
+Billing batches:
+- Every run is recorded as a BillingBatch (reference date, due contracts in
+  billing order, progress counters, run time) and its ContractRuns link to it
+- Progress is checkpointed every CHECKPOINT_INTERVAL contracts; an interrupted
+  batch is resumed with resume(): only contracts without a ContractRun in the
+  batch (catch-up: with outstanding periods) are billed, the due contracts are
+  not searched again
+- A batch is claimed atomically before it is resumed; RUNNING batches are only
+  resumed once they have had no checkpoint for STALE_BATCH_AFTER
+
+Parallel runs (workers > 1):
+- Due contracts are split into one chunk per company, billed in a process pool
+- Within a company, contracts are billed one after another in the same order as
+  a sequential run, so document numbers are assigned in the same sequence
 """
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import List, Tuple, Optional
-from django.db import transaction
+from django.db import connection, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 
 from auftragsverwaltung.models import (
+    BillingBatch,
     Contract,
     ContractLine,
     ContractRun,
@@ -28,10 +58,68 @@ from auftragsverwaltung.models import (
     SalesDocumentLine,
 )
 from auftragsverwaltung.services.document_calculation import DocumentCalculationService
-from auftragsverwaltung.services.number_range import get_next_number
+from auftragsverwaltung.services.number_range import DocumentNumberAllocator, get_next_number
 from core.services.activity_stream import ActivityStreamService
 
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BillingReport:
+    """
+    Result of a billing run
+
+    Attributes:
+        runs: ContractRun per processed contract (in the order of the due contracts)
+        errors: Chunks that could not be processed at all (e.g. a crashed worker)
+        workers: Number of worker processes used (1 = sequential)
+        batch: BillingBatch of the run
+        number_gaps: Reserved document numbers that could not be given back
+            (skipped in the number range, see DocumentNumberAllocator.release())
+    """
+    runs: List[ContractRun] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    workers: int = 1
+    batch: Optional[BillingBatch] = None
+    number_gaps: List[str] = field(default_factory=list)
+
+    def count(self, status: str) -> int:
+        return sum(1 for run in self.runs if run.status == status)
+
+    @property
+    def success_count(self) -> int:
+        return self.count('SUCCESS')
+
+    @property
+    def failed_count(self) -> int:
+        return self.count('FAILED')
+
+    @property
+    def skipped_count(self) -> int:
+        return self.count('SKIPPED')
+
+
+def _init_billing_worker():
+    """Process pool initializer: set up Django and drop inherited DB connections."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _bill_contracts(contract_ids: List[int], today: date, catch_up: bool = False, batch_id: Optional[int] = None) -> List[int]:
+    """Process pool task: bill contracts in the given order, return the ContractRun IDs."""
+    try:
+        return [
+            run.pk for run in ContractBillingService.process_contracts(contract_ids, today, catch_up, batch_id=batch_id)
+        ]
+    finally:
+        connections.close_all()
+
+
 class ContractBillingService:
     """
     Service for generating invoices from recurring contracts
@@ -40,13 +128,24 @@ class ContractBillingService:
     and creates draft invoices with proper snapshots and audit trails.
     """
     
+    # Maximum number of document numbers reserved at once per company
+    NUMBER_BLOCK_SIZE = 100
+    
+    # Number of contracts between two progress checkpoints of a BillingBatch
+    CHECKPOINT_INTERVAL = 50
+    
+    # A RUNNING batch without a checkpoint for this long is considered crashed
+    STALE_BATCH_AFTER = timedelta(hours=1)
+    
     @classmethod
-    def generate_due(cls, today: Optional[date] = None) -> List[ContractRun]:
+    def generate_due(cls, today: Optional[date] = None, workers: int = 1, catch_up: bool = False) -> List[ContractRun]:
         """
         Generate invoices for all contracts due for billing
         
         Args:
             today: Reference date (defaults to today)
+            workers: Number of worker processes (1 = sequential, see run())
+            catch_up: Bill all outstanding periods up to today, not only the next one
             
         Returns:
             List of ContractRun instances created
@@ -57,38 +156,394 @@ class ContractBillingService:
             >>> for run in runs:
             ...     print(f"Contract: {run.contract.name}, Status: {run.status}")
         """
+        return cls.run(today, workers=workers, catch_up=catch_up).runs
+    
+    @classmethod
+    def run(cls, today: Optional[date] = None, workers: int = 1, catch_up: bool = False) -> BillingReport:
+        """
+        Generate invoices for all due contracts and report the results
+        
+        With workers > 1 the due contracts are split into one chunk per company
+        and the chunks are billed in a process pool. Each worker opens its own
+        database connection, so the contracts must be committed (not usable
+        inside an open transaction). A single company is always billed
+        sequentially in-process, as is everything on SQLite (single writer).
+        
+        Args:
+            today: Reference date (defaults to today)
+            workers: Maximum number of worker processes
+            catch_up: Bill all outstanding periods up to today, not only the next one
+            
+        Returns:
+            BillingReport with the ContractRuns and chunk-level errors
+        """
         if today is None:
             today = date.today()
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+        
+        return cls._bill_batch(cls.start_batch(today, catch_up=catch_up, workers=workers), workers)
+    
+    @classmethod
+    def start_batch(cls, today: date, catch_up: bool = False, workers: int = 1) -> BillingBatch:
+        """
+        Record the due contracts of a billing run as a new BillingBatch
+        
+        Args:
+            today: Reference date
+            catch_up: Bill all outstanding periods up to today, not only the next one
+            workers: Number of worker processes
+            
+        Returns:
+            BillingBatch (status RUNNING, nothing billed yet)
+        """
+        contract_ids = [contract.pk for contract in cls.due_contracts(today)]
+        return BillingBatch.objects.create(
+            reference_date=today,
+            catch_up=catch_up,
+            workers=workers,
+            contract_ids=contract_ids,
+            contract_count=len(contract_ids),
+        )
+    
+    @classmethod
+    def unfinished_batch(cls) -> Optional[BillingBatch]:
+        """
+        The most recent batch, if it was interrupted and can be resumed
+        
+        A batch can be resumed if it failed, or if it is still RUNNING without
+        a checkpoint for STALE_BATCH_AFTER (its process crashed). A batch that
+        was followed by a newer batch is not returned.
+        
+        Returns:
+            BillingBatch or None
+        """
+        batch = BillingBatch.objects.order_by('-started_at', '-pk').first()
+        if batch is None or not BillingBatch.objects.filter(cls._resumable(), pk=batch.pk).exists():
+            return None
+        return batch
+    
+    @classmethod
+    def claim(cls, batch: BillingBatch) -> bool:
+        """
+        Mark a resumable batch as RUNNING (atomic, only one process wins)
+        
+        Args:
+            batch: BillingBatch to claim
+            
+        Returns:
+            True if the batch was claimed, False if it is running or completed
+        """
+        return BillingBatch.objects.filter(cls._resumable(), pk=batch.pk).update(
+            status='RUNNING', updated_at=timezone.now()
+        ) == 1
+    
+    @classmethod
+    def _resumable(cls) -> Q:
+        stale = Q(status='RUNNING', updated_at__lt=timezone.now() - cls.STALE_BATCH_AFTER)
+        return Q(status='FAILED') | stale
+    
+    @classmethod
+    def resume(cls, batch: BillingBatch, workers: Optional[int] = None) -> BillingReport:
+        """
+        Bill the contracts of a batch that have not been processed yet
+        
+        The batch is claimed first (see claim()), so a batch is never resumed
+        by two processes. The checkpoint of a batch are its ContractRuns:
+        contracts that already have a run in the batch are skipped, the others
+        are billed in the recorded order with the batch's reference date and
+        mode. In catch-up mode a contract is billed again if it still has
+        outstanding periods and its last run did not fail. The progress
+        counters are recalculated from the runs first, so a crash between an
+        invoice and the next checkpoint does not skew them.
+        
+        Args:
+            batch: BillingBatch to continue
+            workers: Maximum number of worker processes (defaults to the batch's)
+            
+        Returns:
+            BillingReport with the ContractRuns of the whole batch
+            
+        Raises:
+            ValueError: If the batch is running in another process or completed
+        """
+        if workers is None:
+            workers = batch.workers
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+        if not cls.claim(batch):
+            raise ValueError(f'Abrechnungslauf #{batch.pk} wird bereits ausgeführt oder ist abgeschlossen')
         
-        # Find all active contracts with next_run_date <= today
+        return cls._bill_batch(batch, workers)
+    
+    @classmethod
+    def _bill_batch(cls, batch: BillingBatch, workers: int) -> BillingReport:
+        today = batch.reference_date
+        previous_runs = list(batch.runs.select_related('contract', 'document').order_by('run_date', 'pk'))
+        last_runs = {run.contract_id: run for run in previous_runs}
+        
+        # Catch-up: contracts whose last period succeeded may have periods left
+        reentry_ids = set()
+        if batch.catch_up:
+            reentry_ids = {pk for pk, run in last_runs.items() if run.status != 'FAILED'}
+        contracts = Contract.objects.select_related(
+            'company', 'customer', 'document_type', 'payment_term'
+        ).in_bulk([pk for pk in batch.contract_ids if pk not in last_runs or pk in reentry_ids])
+        remaining = [
+            contracts[pk] for pk in batch.contract_ids
+            if pk in contracts and (pk not in last_runs or cls._has_outstanding_period(contracts[pk], today))
+        ]
+        cls._reset_progress(batch, previous_runs, len(set(last_runs) - {c.pk for c in remaining}))
+        chunks = cls.partition_by_company(remaining)
+        
+        started = time.monotonic()
+        report = None
+        try:
+            # SQLite allows one writer at a time, concurrent workers would fail with "database is locked"
+            if workers == 1 or len(chunks) <= 1 or connection.vendor == 'sqlite':
+                runs = [run for chunk in chunks for run in cls._bill_chunk(chunk, today, batch.catch_up, batch.pk)]
+                report = BillingReport()
+            else:
+                report = cls._run_parallel(chunks, today, min(workers, len(chunks)), batch.catch_up, batch.pk)
+                runs = report.runs
+        finally:
+            cls._finish_batch(batch, time.monotonic() - started, completed=report is not None and not report.errors)
+        
+        report.batch = batch
+        report.number_gaps = list(batch.number_gaps)
+        report.runs = cls._in_billing_order(previous_runs + runs, batch.contract_ids)
+        return report
+    
+    @staticmethod
+    def _has_outstanding_period(contract: Contract, today: date) -> bool:
+        return contract.next_run_date <= today and (
+            contract.end_date is None or contract.next_run_date <= contract.end_date
+        )
+    
+    @classmethod
+    def due_contracts(cls, today: date) -> List[Contract]:
+        """
+        Active contracts with next_run_date <= today (in billing order)
+        
+        Args:
+            today: Reference date
+            
+        Returns:
+            List of Contract instances
+        """
         due_contracts = Contract.objects.filter(
             is_active=True,
             next_run_date__lte=today
         ).select_related('company', 'customer', 'document_type', 'payment_term')
         
         # Filter by is_contract_active() (checks end_date)
-        due_contracts = [c for c in due_contracts if c.is_contract_active()]
+        return [c for c in due_contracts if c.is_contract_active()]
+    
+    @staticmethod
+    def partition_by_company(contracts: List[Contract]) -> List[List[Contract]]:
+        """
+        Split contracts into one chunk per company
+        
+        The order of the contracts within a company is preserved. Chunks are
+        sorted by size (largest first) so the pool starts the longest work first.
+        
+        Args:
+            contracts: Contracts in billing order
+            
+        Returns:
+            List of chunks (lists of contracts)
+        """
+        chunks = {}
+        for contract in contracts:
+            chunks.setdefault(contract.company_id, []).append(contract)
+        return sorted(chunks.values(), key=len, reverse=True)
+    
+    @classmethod
+    def process_contracts(cls, contract_ids: List[int], today: date, catch_up: bool = False, batch_id: Optional[int] = None) -> List[ContractRun]:
+        """
+        Bill the given contracts one after another
+        
+        Args:
+            contract_ids: Contract IDs in billing order
+            today: Reference date
+            catch_up: Bill all outstanding periods up to today, not only the next one
+            batch_id: ID of the BillingBatch the runs belong to (optional)
+            
+        Returns:
+            List of ContractRun instances
+        """
+        contracts = Contract.objects.select_related(
+            'company', 'customer', 'document_type', 'payment_term'
+        ).in_bulk(contract_ids)
+        return cls._bill_chunk([contracts[pk] for pk in contract_ids if pk in contracts], today, catch_up, batch_id)
+    
+    @classmethod
+    def _bill_chunk(cls, contracts: List[Contract], today: date, catch_up: bool, batch_id: Optional[int] = None) -> List[ContractRun]:
+        # Reserve document numbers in blocks (one NumberRange lock per block, sized
+        # from the invoices expected per number range) and give the unused ones back at the end
+        numbers = DocumentNumberAllocator(
+            block_size=cls.NUMBER_BLOCK_SIZE, expected=cls._expected_invoices(contracts, today, catch_up)
+        )
+        runs = []
+        checkpoint_runs, checkpoint_contracts = 0, 0
+        try:
+            for contract in contracts:
+                if catch_up:
+                    runs.extend(cls._process_catch_up(contract, today, numbers=numbers, batch_id=batch_id))
+                else:
+                    runs.append(cls._process_contract(contract, today, numbers=numbers, batch_id=batch_id))
+                checkpoint_contracts += 1
+                if checkpoint_contracts == cls.CHECKPOINT_INTERVAL:
+                    cls._checkpoint(batch_id, checkpoint_contracts, runs[checkpoint_runs:])
+                    checkpoint_runs, checkpoint_contracts = len(runs), 0
+            return runs
+        finally:
+            gaps = numbers.release()
+            if checkpoint_contracts or gaps:
+                cls._checkpoint(batch_id, checkpoint_contracts, runs[checkpoint_runs:], gaps)
+    
+    @staticmethod
+    def _expected_invoices(contracts: List[Contract], today: date, catch_up: bool) -> Counter:
+        # Number of invoices per number block key (company, document type, year)
+        expected = Counter()
+        for contract in contracts:
+            next_run_date = contract.next_run_date
+            try:
+                while contract.next_run_date <= today and (
+                    contract.end_date is None or contract.next_run_date <= contract.end_date
+                ):
+                    expected[DocumentNumberAllocator.key(
+                        contract.company_id, contract.document_type_id, contract.next_run_date
+                    )] += 1
+                    if not catch_up:
+                        break
+                    contract.next_run_date = contract.advance_next_run_date()
+            finally:
+                contract.next_run_date = next_run_date
+        return expected
+    
+    @staticmethod
+    def _checkpoint(batch_id: Optional[int], contract_count: int, runs: List[ContractRun], number_gaps: Optional[List[str]] = None) -> None:
+        # Atomic increments, so workers of a parallel run can report concurrently
+        if batch_id is None:
+            return
+        BillingBatch.objects.filter(pk=batch_id).update(
+            processed_count=F('processed_count') + contract_count,
+            success_count=F('success_count') + sum(1 for run in runs if run.status == 'SUCCESS'),
+            failed_count=F('failed_count') + sum(1 for run in runs if run.status == 'FAILED'),
+            skipped_count=F('skipped_count') + sum(1 for run in runs if run.status == 'SKIPPED'),
+            updated_at=timezone.now(),
+        )
+        if number_gaps:
+            # JSON list append: lock the batch row, workers may release their blocks at the same time
+            with transaction.atomic():
+                batch = BillingBatch.objects.select_for_update().only('number_gaps').get(pk=batch_id)
+                batch.number_gaps = batch.number_gaps + number_gaps
+                batch.save(update_fields=['number_gaps'])
+    
+    @staticmethod
+    def _reset_progress(batch: BillingBatch, runs: List[ContractRun], processed_count: int) -> None:
+        batch.status = 'RUNNING'
+        batch.finished_at = None
+        batch.processed_count = processed_count
+        batch.success_count = sum(1 for run in runs if run.status == 'SUCCESS')
+        batch.failed_count = sum(1 for run in runs if run.status == 'FAILED')
+        batch.skipped_count = sum(1 for run in runs if run.status == 'SKIPPED')
+        batch.save(update_fields=[
+            'status', 'finished_at', 'processed_count', 'success_count', 'failed_count', 'skipped_count',
+            'updated_at',
+        ])
+    
+    @staticmethod
+    def _finish_batch(batch: BillingBatch, elapsed: float, completed: bool) -> None:
+        BillingBatch.objects.filter(pk=batch.pk).update(
+            status='COMPLETED' if completed else 'FAILED',
+            finished_at=timezone.now(),
+            duration_seconds=F('duration_seconds') + elapsed,
+            updated_at=timezone.now(),
+        )
+        batch.refresh_from_db()
+    
+    @staticmethod
+    def _in_billing_order(runs: List[ContractRun], contract_ids: List[int]) -> List[ContractRun]:
+        # Order of the due contracts, periods of a contract oldest first
+        position = {pk: index for index, pk in enumerate(contract_ids)}
+        return sorted(runs, key=lambda run: (position.get(run.contract_id, len(position)), run.run_date))
+    
+    @classmethod
+    def _process_catch_up(cls, contract: Contract, today: date, numbers=None, batch_id: Optional[int] = None) -> List[ContractRun]:
+        """
+        Bill all outstanding periods of a contract up to the reference date
+        
+        Each period gets its own invoice and ContractRun. The contract lines are
+        loaded once and reused for every period. Stops at the first failed or
+        already billed period and at the contract's end_date.
+        
+        Args:
+            contract: Contract instance to process
+            today: Reference date
+            numbers: DocumentNumberAllocator (numbers are reserved one by one if None)
+            batch_id: ID of the BillingBatch the runs belong to (optional)
+            
+        Returns:
+            List of ContractRun instances (one per period, oldest first)
+        """
+        contract_lines = list(
+            contract.lines.select_related('item', 'tax_rate', 'unit', 'cost_type_1', 'cost_type_2').order_by('position_no')
+        )
         
-        # Process each contract
         runs = []
-        for contract in due_contracts:
-            run = cls._process_contract(contract, today)
+        while contract.next_run_date <= today and (
+            contract.end_date is None or contract.next_run_date <= contract.end_date
+        ):
+            run_date = contract.next_run_date
+            run = cls._process_contract(
+                contract, today, contract_lines=contract_lines, numbers=numbers, batch_id=batch_id
+            )
             runs.append(run)
-        
+            if run.status != 'SUCCESS' or contract.next_run_date == run_date:
+                break
         return runs
     
     @classmethod
-    def _process_contract(cls, contract: Contract, today: date) -> ContractRun:
+    def _run_parallel(cls, chunks, today: date, workers: int, catch_up: bool = False, batch_id: Optional[int] = None) -> BillingReport:
+        report = BillingReport(workers=workers)
+        
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        
+        run_ids = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_billing_worker) as executor:
+            futures = [
+                (chunk, executor.submit(_bill_contracts, [contract.pk for contract in chunk], today, catch_up, batch_id))
+                for chunk in chunks
+            ]
+            for chunk, future in futures:
+                try:
+                    run_ids.extend(future.result())
+                except Exception as e:
+                    logger.exception('Contract billing chunk of company %s failed', chunk[0].company_id)
+                    report.errors.append(f'{chunk[0].company.name}: {str(e)[:200]}')
+        
+        report.runs = list(ContractRun.objects.select_related('contract', 'document').filter(pk__in=run_ids))
+        return report
+    
+    @classmethod
+    def _process_contract(cls, contract: Contract, today: date, contract_lines=None, numbers=None, batch_id: Optional[int] = None) -> ContractRun:
         """
         Process a single contract for billing
         
         Args:
             contract: Contract instance to process
             today: Reference date
+            contract_lines: Preloaded ContractLines (loaded from the contract if None)
+            numbers: DocumentNumberAllocator (a number is reserved on its own if None)
+            batch_id: ID of the BillingBatch the run belongs to (optional)
             
         Returns:
             ContractRun instance
         """
+        numbers_mark = None
         try:
             # Check for duplicate run
             existing_run = ContractRun.objects.filter(
@@ -100,9 +555,19 @@ class ContractBillingService:
                 # Skip if already processed
                 return existing_run
             
+            # Take the number from the reserved block outside the invoice transaction,
+            # the block reservation must not be rolled back with a failed invoice
+            number = None
+            if numbers is not None:
+                numbers_mark = numbers.mark()
+                try:
+                    number = numbers.next_number(contract.company, contract.document_type, contract.next_run_date)
+                except Exception as e:
+                    raise ValueError(f'Fehler bei Nummernvergabe: {str(e)}')
+            
             # Generate invoice within transaction
             with transaction.atomic():
-                document, run = cls._generate_invoice(contract)
+                document, run = cls._generate_invoice(contract, contract_lines, number=number, batch_id=batch_id)
                 
                 # Update contract dates
                 contract.last_run_date = contract.next_run_date
@@ -129,6 +594,10 @@ class ContractBillingService:
             return run
         
         except Exception as e:
+            # The invoice was rolled back, hand its number out again
+            if numbers_mark is not None:
+                numbers.rewind(numbers_mark)
+            
             # Create failed run on error with user-friendly message
             # Avoid exposing raw database constraint errors
             error_msg = str(e)
@@ -144,6 +613,7 @@ class ContractBillingService:
             run = ContractRun.objects.create(
                 contract=contract,
                 run_date=contract.next_run_date,
+                batch_id=batch_id,
                 status='FAILED',
                 message=user_friendly_msg
             )
@@ -163,17 +633,20 @@ class ContractBillingService:
             return run
     
     @classmethod
-    def _generate_invoice(cls, contract: Contract) -> Tuple[SalesDocument, ContractRun]:
+    def _generate_invoice(cls, contract: Contract, contract_lines=None, number=None, batch_id: Optional[int] = None) -> Tuple[SalesDocument, ContractRun]:
         """
         Generate invoice from contract
         
         Args:
             contract: Contract instance
+            contract_lines: Preloaded ContractLines (loaded from the contract if None)
+            number: Document number reserved by the caller (assigned here if None)
+            batch_id: ID of the BillingBatch the run belongs to (optional)
             
         Returns:
             Tuple of (SalesDocument, ContractRun)
         """
-        billing_period = cls._build_billing_period(contract)
+        billing_period = cls.build_billing_period(contract)
 
         # Determine status based on auto_finalize flag
         if contract.auto_finalize and contract.document_type.is_invoice:
@@ -181,12 +654,25 @@ class ContractBillingService:
         else:
             status = 'DRAFT'  # Default to DRAFT
 
-        # Create SalesDocument
-        document = SalesDocument.objects.create(
+        # Assign unique document number using race-safe number range service
+        # This is done for ALL invoices (both DRAFT and SENT) to avoid duplicate key violations
+        # on the unique constraint (company_id, document_type_id, number)
+        if number is None:
+            try:
+                number = get_next_number(
+                    contract.company,
+                    contract.document_type,
+                    contract.next_run_date
+                )
+            except Exception as e:
+                # If number assignment fails, raise exception to trigger FAILED ContractRun
+                raise ValueError(f'Fehler bei Nummernvergabe: {str(e)}')
+
+        document = SalesDocument(
             company=contract.company,
             document_type=contract.document_type,
             customer=contract.customer,
-            number='',  # Will be assigned immediately below
+            number=number,
             status=status,
             issue_date=contract.next_run_date,
             payment_term=contract.payment_term,
@@ -205,13 +691,53 @@ class ContractBillingService:
             # Calculate due_date
             document.due_date = contract.payment_term.calculate_due_date(document.issue_date)
         
-        document.save(update_fields=['payment_term_snapshot', 'due_date'])
+        # Copy ContractLine -> SalesDocumentLine (in memory)
+        if contract_lines is None:
+            contract_lines = contract.lines.select_related('item', 'tax_rate', 'unit', 'cost_type_1', 'cost_type_2').order_by('position_no')
+
+        lines = cls.build_invoice_lines(contract_lines, document)
+        
+        # Calculate line and document totals before writing, so the document
+        # is inserted once and the lines with a single bulk_create
+        totals = DocumentCalculationService.calculate_lines(lines)
+        document.total_net = totals.total_net
+        document.total_tax = totals.total_tax
+        document.total_gross = totals.total_gross
         
-        # Copy ContractLine -> SalesDocumentLine
-        contract_lines = contract.lines.select_related('item', 'tax_rate', 'unit', 'cost_type_1', 'cost_type_2').order_by('position_no')
+        document.save()
+        SalesDocumentLine.objects.bulk_create(lines, batch_size=500)
 
-        for contract_line in contract_lines:
-            SalesDocumentLine.objects.create(
+        # Create ContractRun with appropriate message
+        if contract.auto_finalize:
+            message = f'Rechnung {document.number} erfolgreich finalisiert'
+        else:
+            message = f'Rechnung {document.number} (Entwurf) erfolgreich erstellt'
+
+        run = ContractRun.objects.create(
+            contract=contract,
+            run_date=contract.next_run_date,
+            document=document,
+            batch_id=batch_id,
+            status='SUCCESS',
+            message=message
+        )
+
+        return document, run
+
+    @staticmethod
+    def build_invoice_lines(contract_lines, document: Optional[SalesDocument] = None) -> List[SalesDocumentLine]:
+        """
+        Copy ContractLines to unsaved SalesDocumentLines (snapshot)
+        
+        Args:
+            contract_lines: ContractLines in position order (tax_rate loaded)
+            document: SalesDocument the lines belong to (None for previews)
+            
+        Returns:
+            List of unsaved SalesDocumentLine instances
+        """
+        return [
+            SalesDocumentLine(
                 document=document,
                 position_no=contract_line.position_no,
                 line_type='NORMAL',
@@ -229,44 +755,19 @@ class ContractBillingService:
                 kostenart1=contract_line.cost_type_1,
                 kostenart2=contract_line.cost_type_2,
             )
-        
-        # Calculate totals
-        DocumentCalculationService.recalculate(document, persist=True)
-
-        # Assign unique document number using race-safe number range service
-        # This is done for ALL invoices (both DRAFT and SENT) to avoid duplicate key violations
-        # on the unique constraint (company_id, document_type_id, number)
-        try:
-            document.number = get_next_number(
-                document.company,
-                document.document_type,
-                document.issue_date
-            )
-            document.save(update_fields=['number'])
-        except Exception as e:
-            # If number assignment fails, raise exception to trigger FAILED ContractRun
-            raise ValueError(f'Fehler bei Nummernvergabe: {str(e)}')
-
-        # Create ContractRun with appropriate message
-        if contract.auto_finalize:
-            message = f'Rechnung {document.number} erfolgreich finalisiert'
-        else:
-            message = f'Rechnung {document.number} (Entwurf) erfolgreich erstellt'
-
-        run = ContractRun.objects.create(
-            contract=contract,
-            run_date=contract.next_run_date,
-            document=document,
-            status='SUCCESS',
-            message=message
-        )
-
-        return document, run
+            for contract_line in contract_lines
+        ]
 
     @staticmethod
-    def _build_billing_period(contract: Contract) -> str:
+    def build_billing_period(contract: Contract) -> str:
         """
-        Build billing period string for the current run based on contract dates.
+        Build billing period string for the current run based on contract dates
+        
+        Args:
+            contract: Contract instance (period starts at its next_run_date)
+            
+        Returns:
+            Period as "DD.MM.YYYY - DD.MM.YYYY"
         """
         period_start = contract.next_run_date
         period_end = contract.advance_next_run_date() - timedelta(days=1)
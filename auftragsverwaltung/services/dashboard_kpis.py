@@ -0,0 +1,135 @@
+"""
+Dashboard KPI Service for Auftragsverwaltung
+
+Computes the SalesDocument KPIs of the Auftragsverwaltung dashboard
+(open documents, unpaid invoices, new documents, open amount) with a single
+conditional-aggregation query and caches the result per company.
+
+The cache is invalidated by the SalesDocument signal handlers when a document
+is created or deleted, or when its status, payment or totals change. The
+default cache is shared by all worker processes (DatabaseCache), so the
+invalidation reaches every worker.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+
+# SalesDocument fields the KPIs depend on
+KPI_FIELDS = frozenset({
+    'status', 'paid_at', 'total_gross', 'issue_date', 'document_type', 'document_type_id',
+    'company', 'company_id',
+})
+
+
+@dataclass
+class SalesDocumentKpis:
+    """
+    KPIs of the Auftragsverwaltung dashboard
+
+    Attributes:
+        open_documents: Documents in status DRAFT, SENT or APPROVED
+        unpaid_invoices: Unpaid invoices in status SENT, APPROVED or OVERDUE
+        new_documents_30d: Documents issued in the last 30 days
+        open_amount: Sum of total_gross of the unpaid invoices
+    """
+    open_documents: int
+    unpaid_invoices: int
+    new_documents_30d: int
+    open_amount: Decimal
+
+
+class SalesDocumentKpiService:
+    """
+    Service for the (cached) SalesDocument KPIs of the dashboard.
+    """
+
+    OPEN_STATUSES = ['DRAFT', 'SENT', 'APPROVED']
+    UNPAID_STATUSES = ['SENT', 'APPROVED', 'OVERDUE']
+
+    @classmethod
+    def calculate(cls, company=None, today: Optional[date] = None) -> SalesDocumentKpis:
+        """
+        Calculate the KPIs with one aggregate query.
+
+        Args:
+            company: Restrict to this Mandant (None = all companies)
+            today: Reference date (defaults to today)
+
+        Returns:
+            SalesDocumentKpis
+        """
+        from auftragsverwaltung.models import SalesDocument
+
+        if today is None:
+            today = date.today()
+
+        unpaid_invoice = Q(
+            document_type__is_invoice=True,
+            paid_at__isnull=True,
+            status__in=cls.UNPAID_STATUSES
+        )
+
+        queryset = SalesDocument.objects.all()
+        if company is not None:
+            queryset = queryset.filter(company=company)
+
+        result = queryset.aggregate(
+            open_documents=Count('id', filter=Q(status__in=cls.OPEN_STATUSES)),
+            unpaid_invoices=Count('id', filter=unpaid_invoice),
+            new_documents_30d=Count('id', filter=Q(issue_date__gte=today - timedelta(days=30))),
+            open_amount=Sum('total_gross', filter=unpaid_invoice),
+        )
+
+        return SalesDocumentKpis(
+            open_documents=result['open_documents'],
+            unpaid_invoices=result['unpaid_invoices'],
+            new_documents_30d=result['new_documents_30d'],
+            open_amount=result['open_amount'] or Decimal('0.00'),
+        )
+
+    @classmethod
+    def get(cls, company=None) -> SalesDocumentKpis:
+        """
+        Return the KPIs from the cache, calculating them on a miss.
+
+        Args:
+            company: Restrict to this Mandant (None = all companies)
+
+        Returns:
+            SalesDocumentKpis
+        """
+        key = cls._cache_key(company.pk if company is not None else None)
+        kpis = cache.get(key)
+        if kpis is None:
+            kpis = cls.calculate(company)
+            cache.set(key, kpis, getattr(settings, 'AUFTRAGSVERWALTUNG_KPI_CACHE_TIMEOUT', 300))
+        return kpis
+
+    @classmethod
+    def invalidate(cls, company_id=None):
+        """
+        Drop the cached KPIs of a company and of the all-companies view.
+
+        Drops them immediately and again after the surrounding transaction
+        commits, so KPIs computed from uncommitted data are not kept.
+
+        Args:
+            company_id: ID of the Mandant whose documents changed
+        """
+        keys = [cls._cache_key(None)]
+        if company_id is not None:
+            keys.append(cls._cache_key(company_id))
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def _cache_key(company_id):
+        # The date is part of the key because "new in the last 30 days" depends on today
+        return f'auftragsverwaltung:kpis:{company_id or "all"}:{date.today().isoformat()}'
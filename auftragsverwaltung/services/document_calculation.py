@@ -12,11 +12,26 @@ Business Rules:
   * ALTERNATIVE: included only if is_selected=True
 - Money/Tax: 2 decimal places, HALF_UP rounding
 - Calculation: line-level rounding, then sum to document totals
+
+Many documents (e.g. after a tax rate change) are recalculated with
+recalculate_many(): lines are read in chunks of documents and only changed
+lines and documents are written back with bulk_update.
+
+Single-line edits update the stored document totals incrementally
+(apply_line_delta()) instead of reloading every line; verify_totals() runs a
+full recalculation (e.g. on finalization) and corrects any drift.
 """
+import logging
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
+from itertools import groupby
 from typing import Optional
 
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class TotalsResult:
@@ -33,6 +48,21 @@ class TotalsResult:
     total_gross: Decimal
 
 
+@dataclass
+class BulkRecalculationResult:
+    """
+    Result of recalculating many documents
+    
+    Attributes:
+        documents: Number of documents recalculated
+        documents_changed: Number of documents whose totals changed
+        lines_changed: Number of lines whose totals changed
+    """
+    documents: int = 0
+    documents_changed: int = 0
+    lines_changed: int = 0
+
+
 class DocumentCalculationService:
     """
     Service for calculating document totals based on lines
@@ -45,6 +75,12 @@ class DocumentCalculationService:
     # Decimal context for rounding to 2 decimal places
     TWO_PLACES = Decimal('0.01')
     
+    # Number of documents whose lines are loaded (and written) at once by recalculate_many()
+    RECALCULATE_CHUNK_SIZE = 1000
+    
+    LINE_TOTAL_FIELDS = ['line_net', 'line_tax', 'line_gross']
+    DOCUMENT_TOTAL_FIELDS = ['total_net', 'total_tax', 'total_gross']
+    
     @classmethod
     def calculate_line_totals(cls, line) -> tuple[Decimal, Decimal, Decimal]:
         """
@@ -89,53 +125,9 @@ class DocumentCalculationService:
             >>> result = DocumentCalculationService.recalculate(doc, persist=True)
         """
         # Get all lines for the document (ordered by position_no for consistency)
-        lines = document.lines.select_related('tax_rate').order_by('position_no')
+        lines = list(document.lines.select_related('tax_rate').order_by('position_no'))
         
-        # Initialize totals
-        total_net = Decimal('0.00')
-        total_tax = Decimal('0.00')
-        total_gross = Decimal('0.00')
-        
-        # Collect lines that need to be saved if persist=True
-        lines_to_update = []
-
-        # Process each line
-        for line in lines:
-            # Apply selection logic: determine if line should be included
-            if not cls._is_line_included(line):
-                # Even excluded lines should have their totals calculated and persisted
-                # so they don't show stale 0.00 values
-                line_net, line_tax, line_gross = cls._calculate_line_totals(line)
-                line.line_net = line_net
-                line.line_tax = line_tax
-                line.line_gross = line_gross
-                if persist:
-                    lines_to_update.append(line)
-                continue
-
-            # Calculate line totals with rounding
-            line_net, line_tax, line_gross = cls._calculate_line_totals(line)
-
-            # Update line fields in memory
-            line.line_net = line_net
-            line.line_tax = line_tax
-            line.line_gross = line_gross
-
-            # Track line for batch update if persist=True
-            if persist:
-                lines_to_update.append(line)
-
-            # Accumulate to document totals (only included lines)
-            total_net += line_net
-            total_tax += line_tax
-            total_gross += line_gross
-        
-        # Create result object
-        result = TotalsResult(
-            total_net=total_net,
-            total_tax=total_tax,
-            total_gross=total_gross
-        )
+        result = cls.calculate_lines(lines)
         
         # Update document fields (in-memory)
         document.total_net = result.total_net
@@ -146,12 +138,12 @@ class DocumentCalculationService:
         if persist:
             # Bulk update all lines with their calculated totals
             # This is more efficient than saving each line individually
-            if lines_to_update:
+            if lines:
                 # Use bulk_update with update_fields for performance
                 # Import the model to get the correct class
                 from auftragsverwaltung.models import SalesDocumentLine
                 SalesDocumentLine.objects.bulk_update(
-                    lines_to_update,
+                    lines,
                     fields=['line_net', 'line_tax', 'line_gross'],
                     batch_size=100
                 )
@@ -161,6 +153,238 @@ class DocumentCalculationService:
 
         return result
     
+    @classmethod
+    def recalculate_many(cls, queryset, chunk_size: Optional[int] = None) -> BulkRecalculationResult:
+        """
+        Recalculate and persist the totals of many documents
+        
+        Documents are read in chunks ordered by ID (keyset pagination, so the
+        queryset is never loaded as a whole), the lines of a chunk
+        are read with one query (ordered by document and position) and
+        calculated with calculate_lines(), so the results are identical to
+        recalculate(). Only lines and documents whose totals changed are
+        written, with bulk_update, one transaction per chunk. Post-save signals
+        are not sent; the dashboard KPIs of affected companies are invalidated.
+        
+        Args:
+            queryset: SalesDocument queryset to recalculate
+            chunk_size: Documents per chunk (default: RECALCULATE_CHUNK_SIZE)
+            
+        Returns:
+            BulkRecalculationResult
+            
+        Example:
+            >>> from auftragsverwaltung.models import SalesDocument
+            >>> result = DocumentCalculationService.recalculate_many(
+            ...     SalesDocument.objects.filter(lines__tax_rate=tax_rate).distinct()
+            ... )
+            >>> print(f"{result.documents_changed} of {result.documents} documents changed")
+        """
+        from auftragsverwaltung.models import SalesDocumentLine
+        from auftragsverwaltung.services.dashboard_kpis import SalesDocumentKpiService
+        
+        chunk_size = max(1, chunk_size or cls.RECALCULATE_CHUNK_SIZE)
+        result = BulkRecalculationResult()
+        changed_companies = set()
+        
+        documents = queryset.order_by('pk').only('pk', 'company_id', *cls.DOCUMENT_TOTAL_FIELDS)
+        last_pk = None
+        while True:
+            chunk = list((documents if last_pk is None else documents.filter(pk__gt=last_pk))[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            
+            lines = SalesDocumentLine.objects.filter(
+                document_id__in=[document.pk for document in chunk]
+            ).select_related('tax_rate').only(
+                'pk', 'document_id', 'line_type', 'is_selected', 'quantity', 'unit_price_net',
+                'tax_rate__rate', *cls.LINE_TOTAL_FIELDS
+            ).order_by('document_id', 'position_no')
+            lines_by_document = {
+                document_id: list(document_lines)
+                for document_id, document_lines in groupby(lines, key=lambda line: line.document_id)
+            }
+            
+            changed_lines = []
+            changed_documents = []
+            for document in chunk:
+                document_lines = lines_by_document.get(document.pk, [])
+                stored = [(line.line_net, line.line_tax, line.line_gross) for line in document_lines]
+                totals = cls.calculate_lines(document_lines)
+                changed_lines.extend(
+                    line for line, old in zip(document_lines, stored)
+                    if (line.line_net, line.line_tax, line.line_gross) != old
+                )
+                
+                new_totals = (totals.total_net, totals.total_tax, totals.total_gross)
+                if (document.total_net, document.total_tax, document.total_gross) != new_totals:
+                    document.total_net, document.total_tax, document.total_gross = new_totals
+                    changed_documents.append(document)
+                    changed_companies.add(document.company_id)
+            
+            if changed_lines or changed_documents:
+                with transaction.atomic():
+                    if changed_lines:
+                        SalesDocumentLine.objects.bulk_update(
+                            changed_lines, fields=cls.LINE_TOTAL_FIELDS, batch_size=500
+                        )
+                    if changed_documents:
+                        queryset.model.objects.bulk_update(
+                            changed_documents, fields=cls.DOCUMENT_TOTAL_FIELDS, batch_size=500
+                        )
+            
+            result.documents += len(chunk)
+            result.documents_changed += len(changed_documents)
+            result.lines_changed += len(changed_lines)
+            if len(chunk) < chunk_size:
+                break
+        
+        for company_id in changed_companies:
+            SalesDocumentKpiService.invalidate(company_id)
+        return result
+    
+    @staticmethod
+    def normalize_line_amounts(line) -> None:
+        """
+        Round quantity and unit_price_net to their stored precision (HALF_UP)
+        
+        Values are stored as rounded here on every database backend, so line
+        totals calculated in memory match a later recalculation from the
+        stored line (required for the incremental totals).
+        
+        Args:
+            line: SalesDocumentLine instance (changed in memory)
+        """
+        for name in ('quantity', 'unit_price_net'):
+            value = getattr(line, name)
+            if value is not None:
+                places = Decimal(1).scaleb(-line._meta.get_field(name).decimal_places)
+                setattr(line, name, Decimal(value).quantize(places, rounding=ROUND_HALF_UP))
+    
+    @classmethod
+    def line_contribution(cls, line) -> TotalsResult:
+        """
+        Amounts a line contributes to the document totals (from its stored line totals)
+        
+        Args:
+            line: SalesDocumentLine instance (None = no line)
+            
+        Returns:
+            TotalsResult (zero if the line is excluded from the totals)
+        """
+        if line is None or not cls._is_line_included(line):
+            return TotalsResult(total_net=Decimal('0.00'), total_tax=Decimal('0.00'), total_gross=Decimal('0.00'))
+        return TotalsResult(total_net=line.line_net, total_tax=line.line_tax, total_gross=line.line_gross)
+    
+    @classmethod
+    def apply_line_delta(
+        cls,
+        document,
+        before: Optional[TotalsResult] = None,
+        after: Optional[TotalsResult] = None,
+    ) -> TotalsResult:
+        """
+        Update the stored document totals by the change of one line (incremental)
+        
+        Locks the document row, adds the difference between the line's
+        contribution after and before the change and saves the totals. The
+        other lines are not read. Call inside the transaction that writes the
+        line, so line and totals are committed together; lock the document
+        before the line there (document -> lines, as every line write does),
+        the lock taken here is then a re-acquire.
+        
+        Args:
+            document: SalesDocument instance (totals are updated in memory too)
+            before: line_contribution() before the change (None for a new line)
+            after: line_contribution() after the change (None for a deleted line)
+            
+        Returns:
+            TotalsResult with the new document totals
+        """
+        zero = cls.line_contribution(None)
+        before = before or zero
+        after = after or zero
+        
+        with transaction.atomic():
+            locked = document.__class__.objects.select_for_update().only(
+                'pk', 'company_id', *cls.DOCUMENT_TOTAL_FIELDS
+            ).get(pk=document.pk)
+            locked.total_net += after.total_net - before.total_net
+            locked.total_tax += after.total_tax - before.total_tax
+            locked.total_gross += after.total_gross - before.total_gross
+            locked.save(update_fields=cls.DOCUMENT_TOTAL_FIELDS)
+        
+        document.total_net = locked.total_net
+        document.total_tax = locked.total_tax
+        document.total_gross = locked.total_gross
+        return TotalsResult(
+            total_net=locked.total_net,
+            total_tax=locked.total_tax,
+            total_gross=locked.total_gross
+        )
+    
+    @classmethod
+    def verify_totals(cls, document) -> bool:
+        """
+        Verify incrementally maintained totals with a full recalculation
+        
+        Recalculates all lines of the document and corrects the stored line
+        and document totals if they drifted (see recalculate_many()).
+        
+        Args:
+            document: SalesDocument instance (totals are refreshed in memory on drift)
+            
+        Returns:
+            bool: True if drift was found and corrected
+        """
+        result = cls.recalculate_many(document.__class__.objects.filter(pk=document.pk))
+        if not (result.documents_changed or result.lines_changed):
+            return False
+        
+        logger.warning(
+            'Corrected drifted totals of document %s (%s line(s) changed)', document.pk, result.lines_changed
+        )
+        document.refresh_from_db(fields=cls.DOCUMENT_TOTAL_FIELDS)
+        return True
+    
+    @classmethod
+    def calculate_lines(cls, lines) -> TotalsResult:
+        """
+        Calculate line and document totals in memory (no database access)
+        
+        Sets line_net, line_tax and line_gross on every line (also on lines
+        excluded from the totals, so they don't show stale 0.00 values) and
+        sums the included lines. Used by recalculate() and for documents whose
+        lines are not saved yet (e.g. before a bulk_create).
+        
+        Args:
+            lines: Iterable of SalesDocumentLine instances (tax_rate loaded)
+            
+        Returns:
+            TotalsResult with calculated totals
+        """
+        total_net = Decimal('0.00')
+        total_tax = Decimal('0.00')
+        total_gross = Decimal('0.00')
+        
+        for line in lines:
+            # Calculate line totals with rounding and update line fields in memory
+            line.line_net, line.line_tax, line.line_gross = cls._calculate_line_totals(line)
+            
+            # Apply selection logic: accumulate only included lines
+            if not cls._is_line_included(line):
+                continue
+            total_net += line.line_net
+            total_tax += line.line_tax
+            total_gross += line.line_gross
+        
+        return TotalsResult(
+            total_net=total_net,
+            total_tax=total_tax,
+            total_gross=total_gross
+        )
+    
     @classmethod
     def _is_line_included(cls, line) -> bool:
         """
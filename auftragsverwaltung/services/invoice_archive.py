@@ -0,0 +1,143 @@
+"""
+Invoice Archive Service
+
+Stores the PDF of a finalized invoice (Echtdruck) once, as ReportDocument with
+a context snapshot and the SHA-256 of the PDF (same storage as the core
+ReportService). Every later download, email and bulk print of the invoice
+uses the archived file, so the customer always gets the byte-identical PDF.
+
+- finalize_invoice() archives the PDF right after the invoice is set to SENT
+- Invoices finalized in a batch (finalize_invoices()) or before this archive
+  existed are archived on their first access (get_or_archive())
+- Drafts and other document types are never archived
+"""
+import hashlib
+import json
+import logging
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from auftragsverwaltung.printing.context import SalesDocumentInvoiceContextBuilder
+from core.models import ReportDocument
+from core.printing.cache import PdfCache, get_stylesheet_version
+from core.printing.service import PdfRenderService
+from core.printing.utils import get_static_base_url
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceArchiveService:
+    """
+    Service for the archived PDFs of finalized invoices
+    """
+
+    REPORT_KEY = 'salesdocument.invoice.v1'
+    OBJECT_TYPE = 'salesdocument'
+
+    @staticmethod
+    def is_final(document) -> bool:
+        """True for invoices with number that are no longer drafts."""
+        return bool(document.document_type.is_invoice and document.number and document.status != 'DRAFT')
+
+    @classmethod
+    def get(cls, document) -> Optional[ReportDocument]:
+        """
+        Get the archived PDF of a document
+
+        Returns:
+            ReportDocument or None if not archived
+        """
+        return ReportDocument.objects.filter(
+            report_key=cls.REPORT_KEY,
+            object_type=cls.OBJECT_TYPE,
+            object_id=str(document.pk),
+        ).order_by('created_at').first()
+
+    @classmethod
+    def archive(cls, document, pdf_service: Optional[PdfRenderService] = None, created_by=None) -> ReportDocument:
+        """
+        Render the invoice and store the PDF (idempotent)
+
+        The PDF is rendered outside of any lock; the archive record is created
+        under a row lock of the invoice, so concurrent calls store one PDF only.
+
+        Args:
+            document: SalesDocument instance (company, customer, document_type loaded)
+            pdf_service: PdfRenderService to use (a cached one if None)
+            created_by: User who triggered the archiving (optional)
+
+        Returns:
+            ReportDocument with the archived PDF
+        """
+        report = cls.get(document)
+        if report is not None:
+            return report
+
+        context_builder = SalesDocumentInvoiceContextBuilder()
+        context = context_builder.build_context(document)
+        template_name = context_builder.get_template_name(document)
+        safe_number = ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in document.number)
+        result = (pdf_service or PdfRenderService(cache=PdfCache())).render(
+            template_name=template_name,
+            context=context,
+            base_url=get_static_base_url(),
+            filename=f'Rechnung_{safe_number}.pdf'
+        )
+
+        with transaction.atomic():
+            document.__class__.objects.select_for_update().only('pk').get(pk=document.pk)
+            report = cls.get(document)
+            if report is not None:
+                return report
+
+            report = ReportDocument(
+                report_key=cls.REPORT_KEY,
+                object_type=cls.OBJECT_TYPE,
+                object_id=str(document.pk),
+                context_json=json.loads(json.dumps(context, cls=DjangoJSONEncoder)),
+                template_version=f'{template_name}@{get_stylesheet_version()}',
+                sha256=hashlib.sha256(result.pdf_bytes).hexdigest(),
+                metadata={'number': document.number, 'filename': result.filename},
+                created_by=created_by,
+            )
+            report.pdf_file.save(result.filename, ContentFile(result.pdf_bytes), save=False)
+            report.save()
+
+        logger.info(f"Archived PDF of invoice {document.number} ({len(result.pdf_bytes)} bytes)")
+        return report
+
+    @classmethod
+    def get_or_archive(cls, document, pdf_service: Optional[PdfRenderService] = None, created_by=None) -> Optional[ReportDocument]:
+        """
+        Archived PDF of a finalized invoice, archived now if missing
+
+        Returns:
+            ReportDocument, or None if the document is not a finalized invoice
+        """
+        if not cls.is_final(document):
+            return None
+        return cls.archive(document, pdf_service=pdf_service, created_by=created_by)
+
+    @staticmethod
+    def read(report: ReportDocument) -> bytes:
+        """Content of an archived PDF."""
+        with report.pdf_file.open('rb') as pdf_file:
+            return pdf_file.read()
+
+    @staticmethod
+    def verify(report: ReportDocument) -> bool:
+        """
+        Check the archived file against its SHA-256 (read in chunks)
+
+        Returns:
+            bool: True if the file is unchanged
+        """
+        sha256 = hashlib.sha256()
+        with report.pdf_file.open('rb') as pdf_file:
+            for chunk in pdf_file.chunks():
+                sha256.update(chunk)
+        return sha256.hexdigest() == report.sha256
@@ -8,9 +8,9 @@ import logging
 from django.urls import NoReverseMatch, reverse
 from django.conf import settings
 from core.mailing.service import send_mail, MailServiceError, MailSendError
+from core.printing.cache import PdfCache
 from core.printing.service import PdfRenderService
-from core.printing.utils import get_static_base_url
-from auftragsverwaltung.printing.context import SalesDocumentInvoiceContextBuilder
+from auftragsverwaltung.services.invoice_archive import InvoiceArchiveService
 from auftragsverwaltung.services.invoice_finalization import finalize_invoice
 
 
@@ -52,8 +52,9 @@ def send_invoice_email(invoice, to_customer=True, to_internal=False, request=Non
     if not invoice.document_type.is_invoice:
         raise ValueError(f"Document type '{invoice.document_type.name}' is not an invoice")
 
-    # Finalize invoice (assign number if missing, set status to SENT)
-    invoice, was_modified = finalize_invoice(invoice)
+    # Finalize invoice (assign number if missing, set status to SENT);
+    # the PDF is archived below with this module's render service
+    invoice, was_modified = finalize_invoice(invoice, archive=False)
 
     # Build recipients list
     recipients = []
@@ -92,29 +93,13 @@ def send_invoice_email(invoice, to_customer=True, to_internal=False, request=Non
     if not recipients:
         raise InvoiceEmailError("Keine Empfänger angegeben (to_customer oder to_internal muss True sein).")
 
-    # Generate PDF
+    # Get the archived PDF of the finalized invoice (rendered and archived once)
     try:
-        context_builder = SalesDocumentInvoiceContextBuilder()
-        context = context_builder.build_context(invoice)
-        template_name = 'printing/orders/invoice.html'
-
-        pdf_service = PdfRenderService()
-
-        # Use file-based static URL so WeasyPrint can resolve print.css
-        # from the local filesystem rather than making HTTP requests.
-        # This is consistent with the document_pdf view and avoids 404 errors
-        # when the reverse proxy does not forward the correct scheme/port.
-        base_url = get_static_base_url()
-
-        result = pdf_service.render(
-            template_name=template_name,
-            context=context,
-            base_url=base_url,
-            filename=f'Rechnung_{invoice.number}.pdf'
-        )
+        pdf_service = PdfRenderService(cache=PdfCache())
+        report = InvoiceArchiveService.get_or_archive(invoice, pdf_service=pdf_service)
 
-        pdf_bytes = result.pdf_bytes
-        pdf_filename = result.filename
+        pdf_bytes = InvoiceArchiveService.read(report)
+        pdf_filename = (report.metadata or {}).get('filename') or f'Rechnung_{invoice.number}.pdf'
 
     except Exception as e:
         raise InvoiceEmailError(f"Fehler beim Erzeugen des PDF: {str(e)}")
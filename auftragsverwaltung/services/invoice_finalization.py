@@ -2,13 +2,25 @@
 Invoice Finalization Service (Echtdruck)
 
 Provides idempotent invoice finalization: assigns document number and sets status to SENT.
+finalize_invoice() archives the PDF of the finalized invoice (InvoiceArchiveService).
+finalize_invoices() finalizes many invoices at once with block-reserved numbers.
+
+Document totals are maintained incrementally while lines are edited; before an
+invoice is finalized they are verified with a full recalculation and corrected
+if they drifted.
 """
+import logging
+
 from django.db import transaction
 from django.utils import timezone
-from auftragsverwaltung.services.number_range import get_next_number
+from auftragsverwaltung.services.document_calculation import DocumentCalculationService
+from auftragsverwaltung.services.number_range import get_next_number, reserve_numbers
+
+
+logger = logging.getLogger(__name__)
 
 
-def finalize_invoice(invoice):
+def finalize_invoice(invoice, archive=True):
     """
     Finalize an invoice (Echtdruck): assign number if missing and set status to SENT.
 
@@ -16,8 +28,14 @@ def finalize_invoice(invoice):
     - If invoice already has a number, it won't be changed
     - Status is set to SENT if not already set
 
+    When the invoice is finalized, its PDF is rendered once and archived
+    (InvoiceArchiveService) after the finalization is committed. A failed
+    rendering is logged; the invoice is then archived on its first download.
+
     Args:
         invoice: SalesDocument instance (must have document_type.is_invoice=True)
+        archive: Archive the PDF when the invoice is finalized (callers that
+            archive it themselves right after pass False)
 
     Returns:
         tuple: (invoice, was_modified) - invoice instance and boolean indicating if changes were made
@@ -50,12 +68,98 @@ def finalize_invoice(invoice):
             )
             was_modified = True
 
-        # Set status to SENT if not already finalized
+        # Set status to SENT if not already finalized, with verified totals
         if invoice.status != 'SENT':
+            DocumentCalculationService.verify_totals(invoice)
             invoice.status = 'SENT'
             was_modified = True
 
         if was_modified:
             invoice.save(update_fields=['number', 'status'])
 
+    if was_modified and archive:
+        from auftragsverwaltung.services.invoice_archive import InvoiceArchiveService
+        try:
+            InvoiceArchiveService.archive(invoice)
+        except Exception:
+            logger.exception('Could not archive the PDF of invoice %s', invoice.number)
+
     return invoice, was_modified
+
+
+def finalize_invoices(invoices):
+    """
+    Finalize several invoices at once (batch Echtdruck).
+
+    Missing numbers are reserved as one contiguous block per company, document
+    type and year (one NumberRange lock per block instead of one per invoice)
+    and assigned in issue date order. The batch runs in a single transaction:
+    if it aborts, the number reservations are rolled back too and no gaps remain.
+    The PDFs are not rendered here; they are archived on their first access.
+
+    Args:
+        invoices: Iterable of SalesDocument instances (or a queryset)
+
+    Returns:
+        list: (invoice, was_modified) tuples in issue date order
+
+    Raises:
+        ValueError: If one of the documents is not an invoice (nothing is finalized)
+    """
+    from auftragsverwaltung.models import SalesDocument
+    from auftragsverwaltung.services.dashboard_kpis import SalesDocumentKpiService
+
+    pks = [invoice.pk for invoice in invoices]
+
+    with transaction.atomic():
+        # Reload with row locks to prevent race conditions
+        locked = list(
+            SalesDocument.objects.select_for_update(of=('self',)).select_related(
+                'company', 'document_type'
+            ).filter(pk__in=pks).order_by('issue_date', 'pk')
+        )
+
+        for invoice in locked:
+            if not invoice.document_type.is_invoice:
+                raise ValueError(f"Document type '{invoice.document_type.name}' is not an invoice")
+
+        # Group invoices without number by number range and year
+        groups = {}
+        for invoice in locked:
+            if not invoice.number:
+                issue_date = invoice.issue_date or timezone.now().date()
+                key = (invoice.company_id, invoice.document_type_id, issue_date.year)
+                groups.setdefault(key, []).append((invoice, issue_date))
+
+        # Assign numbers (idempotent: existing numbers are kept)
+        modified = set()
+        for group in groups.values():
+            first, issue_date = group[0]
+            block = reserve_numbers(first.company, first.document_type, len(group), issue_date)
+            for invoice, _ in group:
+                invoice.number = block.take()
+                modified.add(invoice.pk)
+
+        # Verify the totals of the invoices to finalize with a full recalculation
+        to_finalize = [invoice.pk for invoice in locked if invoice.status != 'SENT']
+        if to_finalize:
+            result = DocumentCalculationService.recalculate_many(SalesDocument.objects.filter(pk__in=to_finalize))
+            if result.documents_changed or result.lines_changed:
+                logger.warning(
+                    'Corrected drifted totals of %s invoice(s) before finalization', result.documents_changed
+                )
+
+        # Set status to SENT if not already finalized
+        for invoice in locked:
+            if invoice.status != 'SENT':
+                invoice.status = 'SENT'
+                modified.add(invoice.pk)
+
+        changed = [invoice for invoice in locked if invoice.pk in modified]
+        if changed:
+            SalesDocument.objects.bulk_update(changed, fields=['number', 'status'], batch_size=500)
+            # bulk_update sends no post_save signals
+            for company_id in {invoice.company_id for invoice in changed}:
+                SalesDocumentKpiService.invalidate(company_id)
+
+    return [(invoice, invoice.pk in modified) for invoice in locked]
@@ -2,41 +2,120 @@
 Number Range Service
 
 Provides race-safe number generation for documents and contracts with yearly reset policy.
+
+Batch numbering:
+- reserve_numbers() reserves a contiguous block of document numbers with one
+  locked round-trip on the NumberRange row
+- release_numbers() hands the unused tail of a block back if no numbers were
+  reserved after it, otherwise the unused numbers remain as a (reported) gap
+- DocumentNumberAllocator hands out numbers from such blocks for batch runs
 """
+import logging
+from dataclasses import dataclass
 from django.db import transaction
 from datetime import date
+from typing import Dict, List, Optional, Tuple
 from auftragsverwaltung.models import NumberRange
 
 
-def get_next_number(company, document_type, date_obj=None):
+logger = logging.getLogger(__name__)
+
+# Format of the global rental contract numbers (vermietung.Vertrag)
+RENTAL_CONTRACT_NUMBER_FORMAT = 'V-{seq:05d}'
+
+
+@dataclass
+class NumberBlock:
     """
-    Get next number for a document type and company.
+    Contiguous block of reserved document numbers
+
+    Attributes:
+        number_range_id: ID of the NumberRange the block was reserved from
+        format: Number format of the NumberRange
+        prefix: Prefix of the document type
+        yy: Two-digit year of the block
+        first_seq: First reserved sequence number
+        last_seq: Last reserved sequence number
+        next_seq: Next sequence number handed out by take()
+    """
+    number_range_id: int
+    format: str
+    prefix: str
+    yy: int
+    first_seq: int
+    last_seq: int
+    next_seq: int = None
+
+    def __post_init__(self):
+        if self.next_seq is None:
+            self.next_seq = self.first_seq
+
+    @property
+    def remaining(self) -> int:
+        """Number of numbers not handed out yet."""
+        return self.last_seq - self.next_seq + 1
+
+    def format_number(self, seq: int) -> str:
+        return self.format.format(prefix=self.prefix, yy=f"{self.yy:02d}", seq=seq)
+
+    def take(self) -> str:
+        """
+        Hand out the next number of the block.
+
+        Raises:
+            ValueError: If the block is exhausted
+        """
+        if self.remaining <= 0:
+            raise ValueError('Nummernblock ist aufgebraucht.')
+        number = self.format_number(self.next_seq)
+        self.next_seq += 1
+        return number
+
+    def unused_numbers(self) -> List[str]:
+        """Numbers of the block that were not handed out."""
+        return [self.format_number(seq) for seq in range(self.next_seq, self.last_seq + 1)]
+
+
+def _normalize_date(date_obj):
+    if date_obj is None:
+        date_obj = date.today()
+
+    # Extract datetime.date from datetime.datetime if needed
+    if hasattr(date_obj, 'date'):
+        date_obj = date_obj.date()
+    return date_obj
 
-    This function is atomic and race-safe using database transactions and row-level locking.
+
+def reserve_numbers(company, document_type, count, date_obj=None) -> NumberBlock:
+    """
+    Reserve a contiguous block of document numbers for a document type and company.
+
+    The NumberRange row is locked once for the whole block instead of once per
+    document. If called inside a transaction that is rolled back later, the
+    reservation is rolled back as well. A reservation committed on its own
+    should be passed to release_numbers() when the batch ends, so unused
+    numbers are not lost.
 
     Args:
         company: Mandant instance
         document_type: DocumentType instance
+        count: Number of numbers to reserve (>= 1)
         date_obj: datetime.date or datetime.datetime (defaults to today)
 
     Returns:
-        str: Formatted number string (e.g., "R26-00001")
+        NumberBlock with the reserved numbers
+
+    Raises:
+        ValueError: If count is smaller than 1
 
     Example:
-        >>> from core.models import Mandant
-        >>> from auftragsverwaltung.models import DocumentType
-        >>> from datetime import date
-        >>> company = Mandant.objects.first()
-        >>> doc_type = DocumentType.objects.get(key='invoice')
-        >>> number = get_next_number(company, doc_type, date(2026, 1, 15))
-        >>> print(number)  # "R26-00001"
+        >>> block = reserve_numbers(company, doc_type, 3, date(2026, 1, 15))
+        >>> block.take(), block.take()  # ("R26-00001", "R26-00002")
     """
-    if date_obj is None:
-        date_obj = date.today()
+    if count < 1:
+        raise ValueError('count must be at least 1')
 
-    # Extract datetime.date from datetime.datetime if needed
-    if hasattr(date_obj, 'date'):
-        date_obj = date_obj.date()
+    date_obj = _normalize_date(date_obj)
 
     # Get two-digit year
     yy = date_obj.year % 100
@@ -64,20 +143,182 @@ def get_next_number(company, document_type, date_obj=None):
             # Year has changed with NEVER policy, update year but don't reset sequence
             number_range.current_year = yy
 
-        # Increment sequence
-        number_range.current_seq += 1
+        # Reserve the block
+        first_seq = number_range.current_seq + 1
+        number_range.current_seq += count
 
         # Save the updated number range
         number_range.save()
 
-        # Generate the formatted number
-        formatted_number = number_range.format.format(
-            prefix=document_type.prefix,
-            yy=f"{yy:02d}",
-            seq=number_range.current_seq
-        )
+    return NumberBlock(
+        number_range_id=number_range.pk,
+        format=number_range.format,
+        prefix=document_type.prefix,
+        yy=yy,
+        first_seq=first_seq,
+        last_seq=number_range.current_seq,
+    )
+
+
+def release_numbers(block: NumberBlock) -> List[str]:
+    """
+    Give the unused numbers of a block back to its NumberRange.
+
+    This only works if no numbers were reserved after the block (the sequence
+    still ends at the block). Otherwise the unused numbers remain as a gap.
+
+    Args:
+        block: NumberBlock returned by reserve_numbers()
+
+    Returns:
+        list: Numbers that could not be given back (the gap, empty if none)
+    """
+    if block.remaining <= 0:
+        return []
+
+    with transaction.atomic():
+        released = NumberRange.objects.filter(
+            pk=block.number_range_id,
+            current_year=block.yy,
+            current_seq=block.last_seq,
+        ).update(current_seq=block.next_seq - 1)
+
+    if released:
+        block.last_seq = block.next_seq - 1
+        return []
+
+    gap = block.unused_numbers()
+    logger.warning('Number range %s: unused reserved numbers remain as gap: %s', block.number_range_id, ', '.join(gap))
+    return gap
+
+
+class DocumentNumberAllocator:
+    """
+    Hands out document numbers from reserved blocks for batch runs.
+
+    One block is reserved per company, document type and year, so the
+    NumberRange row is locked once per block_size documents. If the expected
+    number of documents per key is known (see key()), blocks are not larger
+    than the documents still expected for their key. Blocks must be reserved
+    outside the per-document transactions (see next_number()), and release()
+    must be called when the batch ends.
+
+    Example:
+        >>> numbers = DocumentNumberAllocator(block_size=50)
+        >>> try:
+        ...     for document in documents:
+        ...         mark = numbers.mark()
+        ...         number = numbers.next_number(document.company, document.document_type, document.issue_date)
+        ...         try:
+        ...             with transaction.atomic():
+        ...                 ...  # create the document with number
+        ...         except Exception:
+        ...             numbers.rewind(mark)  # number is handed out again
+        ... finally:
+        ...     numbers.release()
+    """
+
+    def __init__(self, block_size: int = 50, expected: Optional[Dict[Tuple[int, int, int], int]] = None):
+        self.block_size = max(1, block_size)
+        self.expected = dict(expected or {})
+        self._blocks: Dict[Tuple[int, int, int], NumberBlock] = {}
+
+    @staticmethod
+    def key(company_id: int, document_type_id: int, date_obj=None) -> Tuple[int, int, int]:
+        """
+        Block key of a document (company, document type, two-digit year).
+
+        Args:
+            company_id: Mandant ID
+            document_type_id: DocumentType ID
+            date_obj: datetime.date or datetime.datetime (defaults to today)
+
+        Returns:
+            tuple: Key as used for the expected document counts
+        """
+        return company_id, document_type_id, _normalize_date(date_obj).year % 100
+
+    def _block_size(self, key: Tuple[int, int, int]) -> int:
+        if key not in self.expected:
+            return self.block_size
+        return max(1, min(self.block_size, self.expected[key]))
+
+    def next_number(self, company, document_type, date_obj=None) -> str:
+        """
+        Next number for a document (reserves a new block when needed).
+
+        Args:
+            company: Mandant instance
+            document_type: DocumentType instance
+            date_obj: datetime.date or datetime.datetime (defaults to today)
+
+        Returns:
+            str: Formatted number string
+        """
+        date_obj = _normalize_date(date_obj)
+        key = self.key(company.pk, document_type.pk, date_obj)
+        block = self._blocks.get(key)
+        if block is None or block.remaining <= 0:
+            if block is not None:
+                release_numbers(block)
+            block = reserve_numbers(company, document_type, self._block_size(key), date_obj)
+            self._blocks[key] = block
+            if key in self.expected:
+                self.expected[key] = max(0, self.expected[key] - (block.last_seq - block.first_seq + 1))
+        return block.take()
+
+    def mark(self) -> Dict[Tuple[int, int, int], int]:
+        """Current position of all blocks (for rewind())."""
+        return {key: block.next_seq for key, block in self._blocks.items()}
+
+    def rewind(self, mark: Dict[Tuple[int, int, int], int]):
+        """
+        Hand the numbers taken since mark() out again (e.g. after a rollback).
+
+        Args:
+            mark: Value returned by mark()
+        """
+        for key, block in self._blocks.items():
+            block.next_seq = max(block.first_seq, min(mark.get(key, block.first_seq), block.next_seq))
+
+    def release(self) -> List[str]:
+        """
+        Give the unused numbers of all blocks back.
+
+        Returns:
+            list: Numbers that remain as gap (see release_numbers())
+        """
+        gaps = []
+        for block in self._blocks.values():
+            gaps.extend(release_numbers(block))
+        self._blocks.clear()
+        return gaps
 
-        return formatted_number
+
+def get_next_number(company, document_type, date_obj=None):
+    """
+    Get next number for a document type and company.
+
+    This function is atomic and race-safe using database transactions and row-level locking.
+
+    Args:
+        company: Mandant instance
+        document_type: DocumentType instance
+        date_obj: datetime.date or datetime.datetime (defaults to today)
+
+    Returns:
+        str: Formatted number string (e.g., "R26-00001")
+
+    Example:
+        >>> from core.models import Mandant
+        >>> from auftragsverwaltung.models import DocumentType
+        >>> from datetime import date
+        >>> company = Mandant.objects.first()
+        >>> doc_type = DocumentType.objects.get(key='invoice')
+        >>> number = get_next_number(company, doc_type, date(2026, 1, 15))
+        >>> print(number)  # "R26-00001"
+    """
+    return reserve_numbers(company, document_type, 1, date_obj).take()
 
 
 def get_next_contract_number(company, date_obj=None):
@@ -289,3 +530,45 @@ def get_next_customer_number(date_obj=None):
         )
 
         return formatted_number
+
+
+def get_next_rental_contract_number():
+    """
+    Get next number for a rental contract (vermietung.Vertrag, global, company-independent).
+
+    This function is atomic and race-safe: only the single RENTAL NumberRange row is
+    locked, so creating a contract is O(1) and does not lock the Vertrag table.
+    The RENTAL NumberRange is seeded from the existing contracts by a migration;
+    it is created (empty) if it is missing.
+
+    Returns:
+        str: Formatted number string (e.g., "V-00001")
+
+    Example:
+        >>> number = get_next_rental_contract_number()
+        >>> print(number)  # "V-00001"
+    """
+    with transaction.atomic():
+        # Get or create the global rental contract number range with row-level lock
+        number_range, created = NumberRange.objects.select_for_update().get_or_create(
+            target='RENTAL',
+            defaults={
+                'format': RENTAL_CONTRACT_NUMBER_FORMAT,
+                'reset_policy': 'NEVER',
+                'current_year': 0,
+                'current_seq': 0,
+            }
+        )
+
+        # Increment sequence (continuous, never reset)
+        number_range.current_seq += 1
+
+        # Save the updated number range
+        number_range.save(update_fields=['current_seq'])
+
+        # Generate the formatted number with 'V' prefix for rental contracts
+        return number_range.format.format(
+            prefix='V',
+            yy='',
+            seq=number_range.current_seq
+        )
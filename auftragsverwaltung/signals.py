@@ -0,0 +1,25 @@
+"""
+Signal handlers for SalesDocument to invalidate the cached dashboard KPIs.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import SalesDocument
+from .services.dashboard_kpis import KPI_FIELDS, SalesDocumentKpiService
+
+
+@receiver(post_save, sender=SalesDocument)
+def invalidate_kpis_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidate the KPIs when a document is created or a KPI field may have changed.
+    Saves restricted to other fields (update_fields) keep the cache.
+    """
+    if created or update_fields is None or KPI_FIELDS.intersection(update_fields):
+        SalesDocumentKpiService.invalidate(instance.company_id)
+
+
+@receiver(post_delete, sender=SalesDocument)
+def invalidate_kpis_on_delete(sender, instance, **kwargs):
+    """
+    Invalidate the KPIs when a document is deleted.
+    """
+    SalesDocumentKpiService.invalidate(instance.company_id)
@@ -98,9 +98,10 @@ class AjaxLineUpdateTestCase(TestCase):
             customer=self.customer,
             payment_term=self.payment_term,
             issue_date=date.today(),
-            total_net=Decimal('0.00'),
-            total_tax=Decimal('0.00'),
-            total_gross=Decimal('0.00')
+            # Stored totals match the test line (they are updated incrementally)
+            total_net=Decimal('100.00'),
+            total_tax=Decimal('19.00'),
+            total_gross=Decimal('119.00')
         )
         
         # Create test line
@@ -482,3 +483,204 @@ class AjaxLineUpdateTestCase(TestCase):
         self.assertEqual(response_data['line']['short_text_1'], item.short_text_1)
         self.assertEqual(response_data['line']['short_text_2'], item.short_text_2)
         self.assertEqual(response_data['line']['item_id'], item.pk)
+
+
+class IncrementalTotalsTestCase(TestCase):
+    """Test the incremental document totals of the line endpoints"""
+
+    setUp = AjaxLineUpdateTestCase.setUp
+
+    def _add_lines(self, count):
+        for position in range(2, count + 2):
+            SalesDocumentLine.objects.create(
+                document=self.document, position_no=position, line_type='NORMAL', is_selected=True,
+                description=f'Position {position}', quantity=Decimal('1.0000'), unit_price_net=Decimal('10.00'),
+                tax_rate=self.tax_rate, line_net=Decimal('10.00'), line_tax=Decimal('1.90'), line_gross=Decimal('11.90')
+            )
+        SalesDocument.objects.filter(pk=self.document.pk).update(
+            total_net=Decimal('100.00') + count * Decimal('10.00'),
+            total_tax=Decimal('19.00') + count * Decimal('1.90'),
+            total_gross=Decimal('119.00') + count * Decimal('11.90'),
+        )
+
+    def _post(self, name, data=None, **kwargs):
+        url = reverse(f'auftragsverwaltung:{name}', kwargs={'doc_key': 'invoice', 'pk': self.document.pk, **kwargs})
+        return self.client.post(url, data=json.dumps(data or {}), content_type='application/json')
+
+    def _assert_consistent(self):
+        """Stored totals equal a full recalculation"""
+        from auftragsverwaltung.services import DocumentCalculationService
+        self.document.refresh_from_db()
+        stored = (self.document.total_net, self.document.total_tax, self.document.total_gross)
+        self.assertFalse(DocumentCalculationService.verify_totals(self.document))
+        return stored
+
+    def test_add_update_delete_keep_totals_consistent(self):
+        """Adding, changing, deselecting and deleting lines update the totals by their delta"""
+        response = self._post('ajax_add_line', {
+            'short_text_1': 'Neu', 'quantity': '3', 'unit_price_net': '12.345', 'tax_rate_id': self.tax_rate.pk
+        })
+        self.assertEqual(response.json()['totals']['total_net'], '137.05')
+        new_line_id = response.json()['line_id']
+        self.assertEqual(self._assert_consistent(), (Decimal('137.05'), Decimal('26.04'), Decimal('163.09')))
+
+        self._post('ajax_update_line', {'quantity': '2,5'}, line_id=self.line.pk)
+        self.assertEqual(self._assert_consistent()[0], Decimal('287.05'))
+
+        SalesDocumentLine.objects.filter(pk=new_line_id).update(line_type='OPTIONAL', is_selected=False)
+        SalesDocument.objects.filter(pk=self.document.pk).update(
+            total_net=Decimal('250.00'), total_tax=Decimal('47.50'), total_gross=Decimal('297.50')
+        )
+        self._post('ajax_update_line', {'is_selected': True}, line_id=new_line_id)
+        self.assertEqual(self._assert_consistent()[0], Decimal('287.05'))
+
+        response = self._post('ajax_delete_line', line_id=new_line_id)
+        self.assertEqual(response.json()['totals']['total_net'], '250.00')
+        self.assertEqual(self._assert_consistent(), (Decimal('250.00'), Decimal('47.50'), Decimal('297.50')))
+
+    def test_update_does_not_read_other_lines(self):
+        """The cost of an edit is independent of the number of lines"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._add_lines(50)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._post('ajax_update_line', {'quantity': '2'}, line_id=self.line.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['totals']['total_net'], '700.00')
+        line_reads = [
+            q for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "auftragsverwaltung_salesdocumentline"' in q['sql']
+        ]
+        self.assertEqual(len(line_reads), 1)
+
+    def test_line_writes_lock_document_before_lines(self):
+        """Add, update and delete lock the document first, then the line (same order as batch writes)"""
+        from unittest import mock
+        from django.db.models import QuerySet
+
+        select_for_update = QuerySet.select_for_update
+        locked = []
+
+        def record_lock(queryset, *args, **kwargs):
+            locked.append(queryset.model.__name__)
+            return select_for_update(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=record_lock):
+            response = self._post('ajax_add_line', {
+                'short_text_1': 'Neu', 'quantity': '1', 'unit_price_net': '10', 'tax_rate_id': self.tax_rate.pk
+            })
+            self.assertEqual(locked, ['SalesDocument', 'SalesDocument'])
+
+            locked.clear()
+            self._post('ajax_update_line', {'quantity': '2'}, line_id=response.json()['line_id'])
+            self.assertEqual(locked, ['SalesDocument', 'SalesDocumentLine', 'SalesDocument'])
+
+            locked.clear()
+            self._post('ajax_delete_line', line_id=response.json()['line_id'])
+            self.assertEqual(locked, ['SalesDocument', 'SalesDocumentLine', 'SalesDocument'])
+        self._assert_consistent()
+
+    def test_finalize_corrects_drift(self):
+        """Finalization verifies the totals with a full recalculation"""
+        from auftragsverwaltung.services.invoice_finalization import finalize_invoice
+
+        SalesDocument.objects.filter(pk=self.document.pk).update(total_net=Decimal('99.99'))
+        invoice, modified = finalize_invoice(self.document)
+
+        self.assertTrue(modified)
+        self.assertEqual(invoice.total_net, Decimal('100.00'))
+        self.document.refresh_from_db()
+        self.assertEqual((self.document.status, self.document.total_net), ('SENT', Decimal('100.00')))
+
+
+class BatchLineEditTestCase(TestCase):
+    """Test the batch line endpoint (ajax_batch_lines)"""
+
+    setUp = AjaxLineUpdateTestCase.setUp
+    _add_lines = IncrementalTotalsTestCase._add_lines
+    _post = IncrementalTotalsTestCase._post
+    _assert_consistent = IncrementalTotalsTestCase._assert_consistent
+
+    def test_reorder_create_update_delete_in_one_request(self):
+        """A reorder of 200 lines with edits is one request with a constant number of queries"""
+        self._add_lines(199)
+        lines = list(self.document.lines.order_by('position_no'))
+        changes = [
+            {'action': 'update', 'id': line.pk, 'position_no': len(lines) - index}
+            for index, line in enumerate(lines[1:], start=1)
+        ]
+        changes[0]['quantity'] = '3,5'
+        changes += [
+            {'action': 'delete', 'id': self.line.pk},
+            {'action': 'create', 'short_text_1': 'Neu', 'quantity': '2', 'unit_price_net': '12.345',
+             'tax_rate_id': self.tax_rate.pk, 'position_no': 200},
+            {'action': 'create', 'short_text_1': 'Angehängt', 'tax_rate_id': self.tax_rate.pk},
+        ]
+
+        # Session, user, savepoint, document, lines, tax rates, delete, park moved lines,
+        # update (2 SQLite batches), insert, totals, KPI cache invalidation, release savepoint
+        with self.assertNumQueries(14):
+            response = self._post('ajax_batch_lines', {'changes': changes})
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+
+        # Line 2 (now 199, quantity 3.5) ... line 200 (now 1), new lines at 200 and 201
+        self.assertEqual([line['position_no'] for line in data['lines']], list(range(1, 202)))
+        self.assertEqual(data['lines'][0]['id'], lines[-1].pk)
+        self.assertEqual(data['lines'][198], {
+            'id': lines[1].pk, 'position_no': 199, 'line_net': '35.00', 'line_tax': '6.65', 'line_gross': '41.65'
+        })
+        self.assertEqual(len(data['created_ids']), 2)
+        self.assertEqual(data['lines'][199]['id'], data['created_ids'][0])
+        self.assertEqual(data['lines'][199]['line_net'], '24.70')
+        self.assertEqual(data['lines'][200]['line_net'], '0.00')
+        self.assertFalse(SalesDocumentLine.objects.filter(pk=self.line.pk).exists())
+
+        # 198 x 10.00 + 35.00 + 24.70
+        self.assertEqual(data['totals']['total_net'], '2039.70')
+        self.assertEqual(self._assert_consistent()[0], Decimal('2039.70'))
+
+    def test_invalid_change_writes_nothing(self):
+        """An invalid change rejects the whole batch"""
+        self._add_lines(2)
+
+        for changes, error in (
+            ([{'action': 'update', 'id': self.line.pk, 'quantity': 'abc'}], 'Änderung 1: Ungültige Menge.'),
+            ([{'action': 'update', 'id': self.line.pk, 'position_no': 2}],
+             'Positionsnummer 2 ist mehrfach vergeben.'),
+            ([{'action': 'delete', 'id': self.line.pk}, {'action': 'update', 'id': self.line.pk, 'discount': 5}],
+             f'Änderung 2: Position {self.line.pk} nicht gefunden oder bereits gelöscht.'),
+            ([{'action': 'create', 'short_text_1': 'Ohne Steuersatz'}],
+             'Änderung 1: Steuersatz ist für manuelle Positionen erforderlich.'),
+            ([{'action': 'move', 'id': self.line.pk}], "Änderung 1: Unbekannte Aktion: 'move'."),
+        ):
+            response = self._post('ajax_batch_lines', {'changes': changes})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'success': False, 'error': error})
+
+        self.assertEqual(self._post('ajax_batch_lines', {'changes': []}).status_code, 400)
+        self.assertEqual(self.document.lines.count(), 3)
+        self.assertEqual(self._assert_consistent()[0], Decimal('120.00'))
+
+    def test_batch_locks_only_document_and_line_rows(self):
+        """Joined rows (customer, tax rates) are not locked: PostgreSQL rejects FOR UPDATE on
+        the nullable side of an outer join, and shared tax rates would serialize unrelated edits"""
+        from unittest import mock
+        from django.db.models import QuerySet
+
+        select_for_update = QuerySet.select_for_update
+        locks = []
+
+        def record_lock(queryset, *args, **kwargs):
+            queryset = select_for_update(queryset, *args, **kwargs)
+            locks.append((queryset.model.__name__, queryset.query.select_for_update_of))
+            return queryset
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=record_lock):
+            response = self._post('ajax_batch_lines', {'changes': [
+                {'action': 'update', 'id': self.line.pk, 'quantity': '2'},
+            ]})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn(('SalesDocument', ('self',)), locks)
+        self.assertIn(('SalesDocumentLine', ('self',)), locks)
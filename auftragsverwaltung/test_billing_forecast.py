@@ -0,0 +1,154 @@
+"""
+Tests for BillingForecastService and the forecast of generate_contract_invoices --dry-run
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from auftragsverwaltung.models import Contract, ContractLine, ContractRun, NumberRange, SalesDocument
+from auftragsverwaltung.services import BillingForecastService, ContractBillingService
+from auftragsverwaltung.test_contract import ContractBillingServiceTestCase
+from core.models import Adresse, Mandant
+
+
+class BillingForecastServiceTestCase(TestCase):
+    """Test the billing forecast"""
+
+    setUp = ContractBillingServiceTestCase.setUp
+
+    def _create_contract(self, name, next_run_date=date(2026, 1, 1), interval='MONTHLY', **kwargs):
+        contract = Contract.objects.create(
+            company=kwargs.pop('company', self.company),
+            name=name,
+            customer=kwargs.pop('customer', self.customer),
+            document_type=self.doc_type,
+            payment_term=self.payment_term,
+            currency='EUR',
+            interval=interval,
+            start_date=date(2026, 1, 1),
+            next_run_date=next_run_date,
+            is_active=True,
+            **kwargs
+        )
+        for position, price in enumerate((Decimal('100.00'), Decimal('12.35')), start=1):
+            ContractLine.objects.create(
+                contract=contract,
+                position_no=position,
+                description=f"Position {position}",
+                quantity=Decimal('2.0000'),
+                unit_price_net=price,
+                tax_rate=self.tax_rate,
+            )
+        return contract
+
+    def test_forecast_matches_billing_without_writes(self):
+        """Lines, totals and period labels equal the invoice the billing run creates"""
+        self._create_contract("Monthly")
+
+        with self.assertNumQueries(2):
+            forecast = BillingForecastService.forecast(today=date(2026, 1, 1))
+        self.assertEqual(len(forecast.invoices), 1)
+        self.assertFalse(SalesDocument.objects.exists())
+        self.assertFalse(ContractRun.objects.exists())
+
+        invoice = forecast.invoices[0]
+        self.assertEqual(invoice.period, '01.01.2026 - 31.01.2026')
+        self.assertEqual(invoice.total_net, Decimal('224.70'))
+        self.assertEqual([line.line_net for line in invoice.lines], [Decimal('200.00'), Decimal('24.70')])
+
+        document = ContractBillingService.generate_due(today=date(2026, 1, 1))[0].document
+        self.assertEqual(document.subject, invoice.subject)
+        self.assertEqual(
+            (document.total_net, document.total_tax, document.total_gross),
+            (invoice.total_net, invoice.total_tax, invoice.total_gross)
+        )
+
+    def test_horizon_and_catch_up(self):
+        """All periods up to the horizon are forecast, overdue ones once without catch-up and horizon"""
+        contract = self._create_contract("Overdue", next_run_date=date(2026, 1, 1))
+        self._create_contract("Quarterly", next_run_date=date(2026, 5, 15), interval='QUARTERLY')
+        self._create_contract("Ending", next_run_date=date(2026, 4, 1), end_date=date(2098, 12, 31))
+
+        forecast = BillingForecastService.forecast(today=date(2026, 3, 15), horizon_days=92)
+        self.assertEqual(
+            [(invoice.contract.name, invoice.run_date, invoice.is_due) for invoice in forecast.invoices],
+            [
+                ("Overdue", date(2026, 1, 1), True),
+                ("Overdue", date(2026, 2, 1), True),
+                ("Overdue", date(2026, 3, 1), True),
+                ("Overdue", date(2026, 4, 1), False),
+                ("Ending", date(2026, 4, 1), False),
+                ("Overdue", date(2026, 5, 1), False),
+                ("Ending", date(2026, 5, 1), False),
+                ("Quarterly", date(2026, 5, 15), False),
+                ("Overdue", date(2026, 6, 1), False),
+                ("Ending", date(2026, 6, 1), False),
+            ]
+        )
+
+        forecast = BillingForecastService.forecast(today=date(2026, 3, 15))
+        self.assertEqual(
+            [(invoice.contract.name, invoice.run_date) for invoice in forecast.invoices],
+            [("Overdue", date(2026, 1, 1))]
+        )
+
+        forecast = BillingForecastService.forecast(today=date(2026, 3, 15), catch_up=True)
+        self.assertEqual(
+            [invoice.run_date for invoice in forecast.invoices],
+            [date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)]
+        )
+
+        # The contract instance is left untouched
+        self.assertEqual(forecast.invoices[0].contract.next_run_date, date(2026, 1, 1))
+        contract.refresh_from_db()
+        self.assertEqual(contract.next_run_date, date(2026, 1, 1))
+
+        with self.assertRaises(ValueError):
+            BillingForecastService.forecast(today=date(2026, 3, 15), horizon_days=-1)
+
+    def test_totals_per_company_and_customer(self):
+        """Totals are aggregated per company and per customer"""
+        other_company = Mandant.objects.create(name="Other Company", adresse="Street 2", plz="12345", ort="City")
+        NumberRange.objects.create(company=other_company, target='CONTRACT', reset_policy='YEARLY', format='V{yy}-{seq:05d}')
+        other_customer = Adresse.objects.create(
+            name="Another Customer", strasse="Street 3", plz="54321", ort="City", land="Germany"
+        )
+        self._create_contract("A")
+        self._create_contract("B", customer=other_customer)
+        self._create_contract("C", company=other_company, customer=other_customer)
+
+        forecast = BillingForecastService.forecast(today=date(2026, 1, 1))
+        self.assertEqual(
+            [(group.name, group.invoice_count, group.total_net) for group in forecast.by_company()],
+            [("Other Company", 1, Decimal('224.70')), ("Test Company", 2, Decimal('449.40'))]
+        )
+        self.assertEqual(
+            [(group.name, group.invoice_count) for group in forecast.by_customer()],
+            [("Another Customer", 2), ("Test Customer", 1)]
+        )
+        self.assertEqual(forecast.total_net, Decimal('674.10'))
+        self.assertEqual(forecast.total_gross, sum(group.total_gross for group in forecast.by_company()))
+
+        # Restricted to one company
+        forecast = BillingForecastService.forecast(today=date(2026, 1, 1), company=other_company)
+        self.assertEqual([invoice.contract.name for invoice in forecast.invoices], ["C"])
+
+    def test_command_dry_run_prints_forecast(self):
+        """--dry-run and --horizon print the forecast and write nothing"""
+        self._create_contract("Monthly")
+
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-15', '--dry-run', stdout=out)
+        self.assertIn('Found 1 invoice(s) due for billing', out.getvalue())
+        self.assertIn('01.01.2026 - 31.01.2026', out.getvalue())
+        self.assertIn('Total: net 224.70', out.getvalue())
+
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-15', '--horizon', '60', stdout=out)
+        self.assertIn('Forecast of 3 invoice(s) up to 2026-03-16', out.getvalue())
+        self.assertIn('Test Company: 3 invoice(s), net 674.10', out.getvalue())
+        self.assertFalse(SalesDocument.objects.exists())
+        self.assertFalse(ContractRun.objects.exists())
@@ -10,11 +10,13 @@ Tests the contract management functionality, ensuring:
 - Proper audit trail creation
 """
 from django.test import TestCase
+from django.core.management import call_command
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from decimal import Decimal
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
+from io import StringIO
 
 from auftragsverwaltung.models import (
     DocumentType,
@@ -26,6 +28,8 @@ from auftragsverwaltung.models import (
     NumberRange,
 )
 from auftragsverwaltung.services.contract_billing import ContractBillingService
+from auftragsverwaltung.services.document_calculation import DocumentCalculationService
+from auftragsverwaltung.services.number_range import DocumentNumberAllocator, get_next_number
 from core.models import Mandant, Adresse, PaymentTerm, TaxRate, Kostenart, Item, Unit
 
 
@@ -945,6 +949,499 @@ class ContractBillingServiceTestCase(TestCase):
         self.assertEqual(document.total_gross, Decimal('1350.50'))
 
 
+class ContractBillingRunTestCase(TestCase):
+    """Test chunking, catch-up and reporting of billing runs"""
+    
+    setUp = ContractBillingServiceTestCase.setUp
+    
+    def _create_contract(self, name, company=None, next_run_date=date(2026, 1, 1)):
+        contract = Contract.objects.create(
+            company=company or self.company,
+            name=name,
+            customer=self.customer,
+            document_type=self.doc_type,
+            payment_term=self.payment_term,
+            currency='EUR',
+            interval='MONTHLY',
+            start_date=date(2026, 1, 1),
+            next_run_date=next_run_date,
+            is_active=True
+        )
+        ContractLine.objects.create(
+            contract=contract,
+            position_no=1,
+            description="Monthly Service",
+            quantity=Decimal('1.0000'),
+            unit_price_net=Decimal('100.00'),
+            tax_rate=self.tax_rate,
+        )
+        return contract
+    
+    def test_invoice_queries_independent_of_line_count(self):
+        """Lines are inserted with one bulk_create and the document is written once"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        # Warm up the number range so both runs take the same path
+        self._create_contract("Warmup")
+        ContractBillingService.generate_due(today=date(2026, 1, 1))
+        
+        query_counts = []
+        for line_count in (1, 10):
+            contract = self._create_contract(f"Lines {line_count}")
+            for position in range(2, line_count + 1):
+                ContractLine.objects.create(
+                    contract=contract,
+                    position_no=position,
+                    description=f"Position {position}",
+                    quantity=Decimal('2.0000'),
+                    unit_price_net=Decimal('12.35'),
+                    tax_rate=self.tax_rate,
+                )
+            with CaptureQueriesContext(connection) as ctx:
+                runs = ContractBillingService.generate_due(today=date(2026, 1, 1))
+            self.assertEqual(runs[0].status, 'SUCCESS')
+            query_counts.append(len(ctx.captured_queries))
+            
+            document = runs[0].document
+            document.refresh_from_db()
+            self.assertEqual(document.lines.count(), line_count)
+            self.assertEqual(
+                sum(line.line_gross for line in document.lines.all()), document.total_gross
+            )
+        
+        self.assertEqual(query_counts[0], query_counts[1])
+        
+        # Totals equal a full recalculation from the stored lines
+        totals = DocumentCalculationService.recalculate(document)
+        self.assertEqual(totals.total_net, Decimal('100.00') + 9 * Decimal('24.70'))
+        self.assertEqual(totals.total_gross, document.total_gross)
+    
+    def test_catch_up_bills_all_missed_periods(self):
+        """Catch-up creates one invoice and ContractRun per outstanding period"""
+        contract = self._create_contract("Catch-up", next_run_date=date(2026, 1, 1))
+        
+        # Without catch-up only the next period is billed
+        runs = ContractBillingService.generate_due(today=date(2026, 4, 15))
+        self.assertEqual([run.run_date for run in runs], [date(2026, 1, 1)])
+        
+        runs = ContractBillingService.generate_due(today=date(2026, 4, 15), catch_up=True)
+        self.assertEqual(
+            [run.run_date for run in runs],
+            [date(2026, 2, 1), date(2026, 3, 1), date(2026, 4, 1)]
+        )
+        self.assertTrue(all(run.status == 'SUCCESS' for run in runs))
+        self.assertEqual(len({run.document.number for run in runs}), 3)
+        self.assertEqual(
+            [run.document.issue_date for run in runs],
+            [date(2026, 2, 1), date(2026, 3, 1), date(2026, 4, 1)]
+        )
+        self.assertEqual(ContractRun.objects.filter(contract=contract).count(), 4)
+        
+        contract.refresh_from_db()
+        self.assertEqual(contract.last_run_date, date(2026, 4, 1))
+        self.assertEqual(contract.next_run_date, date(2026, 5, 1))
+    
+    def test_catch_up_respects_end_date_and_loads_lines_once(self):
+        """Catch-up stops at the end date and reads the contract lines once"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        contract = self._create_contract("Ending", next_run_date=date(2026, 1, 1))
+        
+        with CaptureQueriesContext(connection) as ctx:
+            runs = ContractBillingService.generate_due(today=date(2026, 6, 1), catch_up=True)
+        self.assertEqual(len(runs), 6)
+        
+        line_queries = [
+            q for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "auftragsverwaltung_contractline"' in q['sql']
+        ]
+        self.assertEqual(len(line_queries), 1)
+        
+        # Periods after the end date are not billed
+        contract.start_date = date(2098, 11, 1)
+        contract.next_run_date = date(2098, 11, 1)
+        contract.end_date = date(2099, 1, 15)
+        contract.save()
+        runs = ContractBillingService.generate_due(today=date(2099, 6, 1), catch_up=True)
+        self.assertEqual(
+            [run.run_date for run in runs],
+            [date(2098, 11, 1), date(2098, 12, 1), date(2099, 1, 1)]
+        )
+    
+    def test_catch_up_stops_at_failed_period(self):
+        """A failed period stops the catch-up of that contract"""
+        contract = self._create_contract("Failing", next_run_date=date(2026, 1, 1))
+        ContractRun.objects.create(contract=contract, run_date=date(2026, 2, 1), status='SUCCESS')
+        
+        runs = ContractBillingService.generate_due(today=date(2026, 4, 1), catch_up=True)
+        
+        # January is billed, February was already billed -> stop without advancing
+        self.assertEqual([run.run_date for run in runs], [date(2026, 1, 1), date(2026, 2, 1)])
+        contract.refresh_from_db()
+        self.assertEqual(contract.next_run_date, date(2026, 2, 1))
+    
+    def test_numbers_reserved_as_block(self):
+        """A billing run locks the number range once, failed invoices leave no gap"""
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        for name in ("A", "B", "C", "D", "E"):
+            self._create_contract(name)
+        
+        generate_invoice = ContractBillingService._generate_invoice
+        
+        def fail_for_c(contract, *args, **kwargs):
+            document, run = generate_invoice(contract, *args, **kwargs)
+            if contract.name == "C":
+                raise ValueError("Simulierter Fehler")
+            return document, run
+        
+        with mock.patch.object(ContractBillingService, '_generate_invoice', side_effect=fail_for_c):
+            with CaptureQueriesContext(connection) as ctx:
+                runs = ContractBillingService.generate_due(today=date(2026, 1, 1))
+        
+        range_reads = [
+            q for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "auftragsverwaltung_numberrange"' in q['sql']
+        ]
+        self.assertEqual(len(range_reads), 1)
+        self.assertEqual([run.status for run in runs], ['SUCCESS', 'SUCCESS', 'FAILED', 'SUCCESS', 'SUCCESS'])
+        self.assertEqual(
+            [run.document.number for run in runs if run.document],
+            ['R26-00001', 'R26-00002', 'R26-00003', 'R26-00004']
+        )
+        # The unused fifth number was given back
+        number_range = NumberRange.objects.get(company=self.company, target='DOCUMENT', document_type=self.doc_type)
+        self.assertEqual(number_range.current_seq, 4)
+    
+    def test_number_gaps_recorded_on_batch(self):
+        """Reserved numbers that cannot be given back are reported and stored on the batch"""
+        from unittest import mock
+        
+        for name in ("A", "B", "C"):
+            self._create_contract(name)
+        
+        generate_invoice = ContractBillingService._generate_invoice
+        
+        def manual_invoice_then_fail_for_c(contract, *args, **kwargs):
+            if contract.name == "B":
+                # A document numbered outside the run, after the run's block
+                get_next_number(self.company, self.doc_type, date(2026, 1, 1))
+            if contract.name == "C":
+                raise ValueError("Simulierter Fehler")
+            return generate_invoice(contract, *args, **kwargs)
+        
+        with mock.patch.object(ContractBillingService, '_generate_invoice', side_effect=manual_invoice_then_fail_for_c):
+            report = ContractBillingService.run(today=date(2026, 1, 1))
+        
+        self.assertEqual(report.number_gaps, ['R26-00003'])
+        self.assertEqual(report.batch.number_gaps, ['R26-00003'])
+        
+        out = StringIO()
+        with mock.patch.object(ContractBillingService, 'run', return_value=report):
+            call_command('generate_contract_invoices', '--date', '2026-01-01', stdout=out)
+        self.assertIn('1 reserved number(s) could not be given back and remain as gap: R26-00003', out.getvalue())
+    
+    def test_expected_invoices_per_number_block(self):
+        """Number blocks are sized from the invoices per company, document type and year"""
+        a = self._create_contract("A", next_run_date=date(2025, 11, 1))
+        self._create_contract("B")
+        contracts = list(Contract.objects.order_by('pk'))
+        key_25 = DocumentNumberAllocator.key(self.company.pk, self.doc_type.pk, date(2025, 1, 1))
+        key_26 = DocumentNumberAllocator.key(self.company.pk, self.doc_type.pk, date(2026, 1, 1))
+        
+        self.assertEqual(
+            ContractBillingService._expected_invoices(contracts, date(2026, 2, 1), catch_up=False),
+            {key_25: 1, key_26: 1}
+        )
+        self.assertEqual(
+            ContractBillingService._expected_invoices(contracts, date(2026, 2, 1), catch_up=True),
+            {key_25: 2, key_26: 4}
+        )
+        self.assertEqual(contracts[0].next_run_date, a.next_run_date)
+    
+    def test_partition_by_company_keeps_order(self):
+        """One chunk per company, contract order kept, largest chunk first"""
+        other = Mandant.objects.create(name="Other Company", adresse="Street 2", plz="12345", ort="City")
+        NumberRange.objects.create(company=other, target='CONTRACT', reset_policy='YEARLY', format='V{yy}-{seq:05d}')
+        a = self._create_contract("A")
+        x = self._create_contract("X", company=other)
+        b = self._create_contract("B")
+        y = self._create_contract("Y", company=other)
+        z = self._create_contract("Z", company=other)
+        
+        due = ContractBillingService.due_contracts(date(2026, 1, 1))
+        chunks = ContractBillingService.partition_by_company(due)
+        
+        self.assertEqual(
+            [[c.pk for c in chunk] for chunk in chunks],
+            [[x.pk, y.pk, z.pk], [a.pk, b.pk]]
+        )
+    
+    def test_run_single_company_is_sequential(self):
+        """A single company is billed in-process in order, numbers follow the contract order"""
+        contracts = [self._create_contract(name) for name in ("A", "B", "C")]
+        
+        report = ContractBillingService.run(today=date(2026, 1, 1), workers=4)
+        
+        self.assertEqual(report.workers, 1)
+        self.assertEqual(report.errors, [])
+        self.assertEqual([run.contract_id for run in report.runs], [c.pk for c in contracts])
+        self.assertEqual(report.success_count, 3)
+        self.assertEqual(report.failed_count, 0)
+        self.assertEqual(report.skipped_count, 0)
+        numbers = [run.document.number for run in report.runs]
+        self.assertEqual(numbers, sorted(numbers))
+    
+    def test_run_on_sqlite_is_sequential(self):
+        """SQLite has a single writer, so several companies are billed in-process too"""
+        from django.db import connection
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        other = Mandant.objects.create(name="Other Company", adresse="Street 2", plz="12345", ort="City")
+        NumberRange.objects.create(company=other, target='CONTRACT', reset_policy='YEARLY', format='V{yy}-{seq:05d}')
+        self._create_contract("A")
+        self._create_contract("X", company=other)
+        
+        report = ContractBillingService.run(today=date(2026, 1, 1), workers=2)
+        
+        self.assertEqual(report.workers, 1)
+        self.assertEqual(report.success_count, 2)
+    
+    def test_run_parallel_collects_chunk_results(self):
+        """The process pool path bills one chunk per company and reports failed chunks"""
+        from concurrent.futures import Future
+        from unittest import mock
+        
+        class InProcessExecutor:
+            """Runs the submitted tasks immediately in the test's transaction."""
+            
+            def __init__(self, max_workers, initializer=None):
+                self.max_workers = max_workers
+                initializer()
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc_info):
+                return False
+            
+            def submit(self, fn, *args):
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as e:
+                    future.set_exception(e)
+                return future
+        
+        other = Mandant.objects.create(name="Other Company", adresse="Street 2", plz="12345", ort="City")
+        NumberRange.objects.create(company=other, target='CONTRACT', reset_policy='YEARLY', format='V{yy}-{seq:05d}')
+        third = Mandant.objects.create(name="Third Company", adresse="Street 3", plz="12345", ort="City")
+        NumberRange.objects.create(company=third, target='CONTRACT', reset_policy='YEARLY', format='V{yy}-{seq:05d}')
+        a = self._create_contract("A")
+        b = self._create_contract("B")
+        x = self._create_contract("X", company=other)
+        self._create_contract("T", company=third)
+        process_contracts = ContractBillingService.process_contracts
+        
+        def fail_for_third(contract_ids, *args, **kwargs):
+            if Contract.objects.filter(pk__in=contract_ids, company=third).exists():
+                raise RuntimeError("Worker abgestürzt")
+            return process_contracts(contract_ids, *args, **kwargs)
+        
+        with mock.patch('auftragsverwaltung.services.contract_billing.ProcessPoolExecutor', InProcessExecutor), \
+                mock.patch('auftragsverwaltung.services.contract_billing.connection', mock.Mock(vendor='postgresql')), \
+                mock.patch('auftragsverwaltung.services.contract_billing.connections'), \
+                mock.patch.object(ContractBillingService, 'process_contracts', side_effect=fail_for_third):
+            report = ContractBillingService.run(today=date(2026, 1, 1), workers=4)
+        
+        self.assertEqual(report.workers, 3)
+        self.assertEqual(sorted(run.contract_id for run in report.runs), sorted([a.pk, b.pk, x.pk]))
+        self.assertEqual(report.success_count, 3)
+        self.assertEqual(report.errors, ['Third Company: Worker abgestürzt'])
+        numbers = [run.document.number for run in report.runs if run.contract.company_id == self.company.pk]
+        self.assertEqual(numbers, sorted(numbers))
+    
+    def test_run_rejects_invalid_worker_count(self):
+        """workers must be positive"""
+        with self.assertRaises(ValueError):
+            ContractBillingService.run(today=date(2026, 1, 1), workers=0)
+    
+    def test_command_workers_option(self):
+        """The command reports the aggregated results and validates --workers"""
+        self._create_contract("A")
+        self._create_contract("B", next_run_date=date(2026, 2, 1))
+        
+        out, err = StringIO(), StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-15', '--workers', '0', stdout=out, stderr=err)
+        self.assertIn('--workers must be at least 1', err.getvalue())
+        self.assertFalse(ContractRun.objects.exists())
+        
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-15', '--workers', '2', stdout=out)
+        self.assertIn('with up to 2 workers', out.getvalue())
+        self.assertIn('Processed 1 contract(s)', out.getvalue())
+        self.assertIn('Success: 1', out.getvalue())
+        
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-03-15', '--catch-up', stdout=out)
+        self.assertIn('Processed 4 period(s) of 2 contract(s)', out.getvalue())
+    
+    def test_run_records_billing_batch(self):
+        """A run is recorded as a completed BillingBatch with its runs, progress and timings"""
+        contracts = [self._create_contract(name) for name in ("A", "B")]
+        self._create_contract("Later", next_run_date=date(2026, 2, 1))
+        
+        report = ContractBillingService.run(today=date(2026, 1, 1))
+        
+        batch = report.batch
+        self.assertEqual(batch.status, 'COMPLETED')
+        self.assertEqual(batch.reference_date, date(2026, 1, 1))
+        self.assertEqual(batch.contract_ids, [c.pk for c in contracts])
+        self.assertEqual((batch.contract_count, batch.processed_count, batch.success_count), (2, 2, 2))
+        self.assertEqual(set(batch.runs.all()), set(report.runs))
+        self.assertIsNotNone(batch.finished_at)
+        self.assertGreater(batch.duration_seconds, 0)
+        self.assertGreater(batch.contracts_per_second, 0)
+        self.assertAlmostEqual(batch.avg_ms_per_invoice, batch.duration_seconds * 500)
+    
+    def test_resume_interrupted_batch_from_checkpoint(self):
+        """An interrupted batch continues with the contracts that have no run in it"""
+        from unittest import mock
+        
+        contracts = [self._create_contract(name) for name in ("A", "B", "C", "D")]
+        process_contract = ContractBillingService._process_contract
+        
+        def crash_at_c(contract, *args, **kwargs):
+            if contract.name == "C":
+                raise RuntimeError("Prozess abgebrochen")
+            return process_contract(contract, *args, **kwargs)
+        
+        with mock.patch.object(ContractBillingService, 'CHECKPOINT_INTERVAL', 1), \
+                mock.patch.object(ContractBillingService, '_process_contract', side_effect=crash_at_c):
+            with self.assertRaises(RuntimeError):
+                ContractBillingService.run(today=date(2026, 1, 1))
+        
+        batch = ContractBillingService.unfinished_batch()
+        self.assertEqual(batch.status, 'FAILED')
+        self.assertEqual((batch.processed_count, batch.success_count), (2, 2))
+        
+        # Contracts that became due later are not part of the batch
+        self._create_contract("New")
+        with mock.patch.object(ContractBillingService, 'due_contracts') as due_contracts:
+            report = ContractBillingService.resume(batch)
+        due_contracts.assert_not_called()
+        
+        self.assertEqual([run.contract_id for run in report.runs], [c.pk for c in contracts])
+        self.assertEqual(report.success_count, 4)
+        self.assertEqual(ContractRun.objects.count(), 4)
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'COMPLETED')
+        self.assertEqual((batch.processed_count, batch.success_count), (4, 4))
+        self.assertIsNone(ContractBillingService.unfinished_batch())
+    
+    def test_command_resumes_interrupted_batch(self):
+        """The command resumes an interrupted batch of the same reference date"""
+        from auftragsverwaltung.models import BillingBatch
+        
+        a = self._create_contract("A")
+        b = self._create_contract("B")
+        batch = BillingBatch.objects.create(
+            reference_date=date(2026, 1, 1), contract_ids=[a.pk, b.pk], contract_count=2, status='FAILED'
+        )
+        ContractBillingService.process_contracts([a.pk], date(2026, 1, 1), batch_id=batch.pk)
+        
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-01', stdout=out)
+        self.assertIn(f'Resuming billing batch #{batch.pk}: 1 of 2 contract(s) already processed', out.getvalue())
+        self.assertIn('Success: 2', out.getvalue())
+        self.assertIn(f'Batch #{batch.pk} (Abgeschlossen)', out.getvalue())
+        self.assertEqual(batch.runs.count(), 2)
+        
+        # A batch of another reference date is not resumed, the warning is shown
+        # until a newer batch supersedes it
+        other = BillingBatch.objects.create(reference_date=date(2026, 3, 1), status='FAILED')
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-01', stdout=out)
+        self.assertIn(f'Billing batch #{other.pk} (2026-03-01) was interrupted', out.getvalue())
+        self.assertIn('No contracts due for billing', out.getvalue())
+        
+        out = StringIO()
+        call_command('generate_contract_invoices', '--date', '2026-01-01', stdout=out)
+        self.assertNotIn('was interrupted', out.getvalue())
+    
+    def test_running_batch_is_claimed_once(self):
+        """A RUNNING batch is only resumed once it is stale, and only by one process"""
+        from django.utils import timezone
+        from auftragsverwaltung.models import BillingBatch
+        
+        a = self._create_contract("A")
+        batch = BillingBatch.objects.create(reference_date=date(2026, 1, 1), contract_ids=[a.pk], contract_count=1)
+        self.assertIsNone(ContractBillingService.unfinished_batch())
+        with self.assertRaises(ValueError):
+            ContractBillingService.resume(batch)
+        
+        BillingBatch.objects.filter(pk=batch.pk).update(
+            updated_at=timezone.now() - ContractBillingService.STALE_BATCH_AFTER - timedelta(minutes=1)
+        )
+        self.assertEqual(ContractBillingService.unfinished_batch(), batch)
+        self.assertTrue(ContractBillingService.claim(batch))
+        self.assertFalse(ContractBillingService.claim(batch))
+        self.assertIsNone(ContractBillingService.unfinished_batch())
+        
+        BillingBatch.objects.filter(pk=batch.pk).update(status='FAILED')
+        report = ContractBillingService.resume(batch)
+        self.assertEqual(report.success_count, 1)
+        self.assertEqual(report.batch.status, 'COMPLETED')
+        with self.assertRaises(ValueError):
+            ContractBillingService.resume(batch)
+    
+    def test_resume_catch_up_batch_bills_outstanding_periods(self):
+        """A resumed catch-up batch re-enters contracts with outstanding periods, not failed ones"""
+        from unittest import mock
+        
+        contracts = [self._create_contract(name, next_run_date=date(2026, 1, 1)) for name in ("A", "B", "C")]
+        process_contract = ContractBillingService._process_contract
+        generate_invoice = ContractBillingService._generate_invoice
+        
+        def crash_at_second_period_of_b(contract, *args, **kwargs):
+            if contract.name == "B" and contract.next_run_date == date(2026, 2, 1):
+                raise RuntimeError("Prozess abgebrochen")
+            return process_contract(contract, *args, **kwargs)
+        
+        def fail_third_period_of_a(contract, *args, **kwargs):
+            if contract.name == "A" and contract.next_run_date == date(2026, 3, 1):
+                raise ValueError("Simulierter Fehler")
+            return generate_invoice(contract, *args, **kwargs)
+        
+        with mock.patch.object(ContractBillingService, '_process_contract', side_effect=crash_at_second_period_of_b), \
+                mock.patch.object(ContractBillingService, '_generate_invoice', side_effect=fail_third_period_of_a):
+            with self.assertRaises(RuntimeError):
+                ContractBillingService.run(today=date(2026, 3, 1), catch_up=True)
+        
+        batch = ContractBillingService.unfinished_batch()
+        self.assertEqual(batch.runs.filter(contract=contracts[1]).count(), 1)
+        
+        report = ContractBillingService.resume(batch)
+        
+        # A's last period failed: it is not billed again
+        self.assertEqual(
+            [(run.contract.name, run.run_date, run.status) for run in report.runs],
+            [
+                ("A", date(2026, 1, 1), 'SUCCESS'), ("A", date(2026, 2, 1), 'SUCCESS'), ("A", date(2026, 3, 1), 'FAILED'),
+                ("B", date(2026, 1, 1), 'SUCCESS'), ("B", date(2026, 2, 1), 'SUCCESS'), ("B", date(2026, 3, 1), 'SUCCESS'),
+                ("C", date(2026, 1, 1), 'SUCCESS'), ("C", date(2026, 2, 1), 'SUCCESS'), ("C", date(2026, 3, 1), 'SUCCESS'),
+            ]
+        )
+        self.assertEqual(ContractRun.objects.filter(contract=contracts[0]).count(), 3)
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'COMPLETED')
+        self.assertEqual((batch.processed_count, batch.contract_count), (3, 3))
+
+
 class ContractLineTextUnificationTestCase(TestCase):
     """
     Regression tests for unifying ContractLine and SalesDocumentLine text
@@ -172,3 +172,123 @@ class DashboardTestCase(TestCase):
         # Should display messages for empty lists
         self.assertContains(response, 'Keine offenen Dokumente vorhanden')
         self.assertContains(response, 'Keine Dokumente vorhanden')
+
+
+class DashboardKpiTestCase(TestCase):
+    """Test case for the aggregated and cached dashboard KPIs."""
+
+    setUp = DashboardTestCase.setUp
+
+    def _create_document(self, number, document_type, status, total_gross, issue_date=None, **kwargs):
+        return SalesDocument.objects.create(
+            company=self.company,
+            document_type=document_type,
+            number=number,
+            status=status,
+            issue_date=issue_date or date.today(),
+            total_gross=Decimal(total_gross),
+            **kwargs
+        )
+
+    def _create_documents(self):
+        self._create_document("R26-00001", self.doctype_invoice, "SENT", '119.00')
+        self._create_document("R26-00002", self.doctype_invoice, "OVERDUE", '238.00')
+        self._create_document("R26-00003", self.doctype_invoice, "PAID", '50.00')
+        self._create_document("R26-00004", self.doctype_invoice, "CANCELLED", '75.00')
+        self._create_document("A26-00001", self.doctype_quote, "DRAFT", '595.00')
+        self._create_document("A26-00002", self.doctype_quote, "SENT", '10.00', issue_date=date(2020, 1, 1))
+
+    def _legacy_kpis(self):
+        """The previous separate count/sum queries of auftragsverwaltung_home."""
+        from datetime import timedelta
+        from django.db.models import Sum
+        unpaid = SalesDocument.objects.filter(
+            document_type__is_invoice=True,
+            paid_at__isnull=True,
+            status__in=['SENT', 'APPROVED', 'OVERDUE']
+        ).exclude(status='CANCELLED')
+        return (
+            SalesDocument.objects.filter(status__in=['DRAFT', 'SENT', 'APPROVED']).count(),
+            unpaid.count(),
+            SalesDocument.objects.filter(issue_date__gte=date.today() - timedelta(days=30)).count(),
+            unpaid.aggregate(total=Sum('total_gross'))['total'] or Decimal('0.00'),
+        )
+
+    def test_single_query_matches_previous_queries(self):
+        """One conditional-aggregation query replaces four separate queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from auftragsverwaltung.services import SalesDocumentKpiService
+
+        self._create_documents()
+
+        with CaptureQueriesContext(connection) as before:
+            legacy = self._legacy_kpis()
+        with CaptureQueriesContext(connection) as after:
+            kpis = SalesDocumentKpiService.calculate()
+
+        self.assertEqual(len(before), 4)
+        self.assertEqual(len(after), 1)
+        self.assertEqual(
+            (kpis.open_documents, kpis.unpaid_invoices, kpis.new_documents_30d, kpis.open_amount),
+            legacy
+        )
+        self.assertEqual(kpis.open_documents, 3)
+        self.assertEqual(kpis.unpaid_invoices, 2)
+        self.assertEqual(kpis.new_documents_30d, 5)
+        self.assertEqual(kpis.open_amount, Decimal('357.00'))
+
+    def test_kpis_cached_and_invalidated_on_changes(self):
+        """Cached KPIs are refreshed when status, payment or totals change."""
+        from django.utils import timezone
+        from auftragsverwaltung.services import SalesDocumentKpiService
+
+        self._create_documents()
+        invoice = SalesDocument.objects.get(number="R26-00001")
+
+        # A cache hit is a single read of the shared (database) cache
+        kpis = SalesDocumentKpiService.get(self.company)
+        with self.assertNumQueries(1):
+            self.assertEqual(SalesDocumentKpiService.get(self.company), kpis)
+
+        # Saves of unrelated fields keep the cache
+        invoice.subject = "Geänderter Betreff"
+        invoice.save(update_fields=['subject'])
+        with self.assertNumQueries(1):
+            SalesDocumentKpiService.get(self.company)
+
+        invoice.paid_at = timezone.now()
+        invoice.save(update_fields=['paid_at'])
+        kpis = SalesDocumentKpiService.get(self.company)
+        self.assertEqual(kpis.unpaid_invoices, 1)
+        self.assertEqual(kpis.open_amount, Decimal('238.00'))
+
+        SalesDocument.objects.get(number="R26-00002").delete()
+        self.assertEqual(SalesDocumentKpiService.get(self.company).open_amount, Decimal('0.00'))
+
+    def test_kpis_cached_before_commit_are_dropped_on_commit(self):
+        """KPIs cached between a change and its commit are invalidated again on commit."""
+        from django.core.cache import cache
+        from django.utils import timezone
+        from auftragsverwaltung.services import SalesDocumentKpiService
+
+        self._create_documents()
+        invoice = SalesDocument.objects.get(number="R26-00001")
+        key = SalesDocumentKpiService._cache_key(self.company.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.paid_at = timezone.now()
+            invoice.save(update_fields=['paid_at'])
+            # Another request caches the KPIs before the change is committed
+            SalesDocumentKpiService.get(self.company)
+            self.assertIsNotNone(cache.get(key))
+
+        self.assertIsNone(cache.get(key))
+
+    def test_dashboard_shows_kpis(self):
+        """The dashboard context contains the aggregated KPIs."""
+        self._create_documents()
+        response = self.client.get(reverse('auftragsverwaltung:home'))
+        self.assertEqual(response.context['kpi_open_documents'], 3)
+        self.assertEqual(response.context['kpi_unpaid_invoices'], 2)
+        self.assertEqual(response.context['kpi_open_amount'], Decimal('357.00'))
@@ -158,10 +158,11 @@ class DocumentBulkPrintTestCase(TestCase):
         self.assertIn('Sammeldruck', response['Content-Disposition'])
 
         # Verify PDF content exists
-        self.assertGreater(len(response.content), 0)
+        content = b''.join(response.streaming_content)
+        self.assertGreater(len(content), 0)
 
         # Verify it's a valid PDF (starts with PDF header)
-        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertTrue(content.startswith(b'%PDF'))
 
     def test_bulk_print_multiple_documents(self):
         """Test bulk print with multiple documents"""
@@ -175,10 +176,11 @@ class DocumentBulkPrintTestCase(TestCase):
         self.assertIn('2_Dokumente', response['Content-Disposition'])
 
         # Verify PDF content exists and is larger than single document
-        self.assertGreater(len(response.content), 1000)  # Should be substantial
+        content = b''.join(response.streaming_content)
+        self.assertGreater(len(content), 1000)  # Should be substantial
 
         # Verify it's a valid PDF
-        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertTrue(content.startswith(b'%PDF'))
 
     def test_bulk_print_filename_format(self):
         """Test that bulk print generates correct filename"""
@@ -301,7 +303,7 @@ class DocumentBulkPrintTestCase(TestCase):
         # Should successfully generate PDF with documents from both companies
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['Content-Type'], 'application/pdf')
-        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
 
     def test_bulk_print_partial_failure(self):
         """Test bulk print continues with valid documents if some fail"""
@@ -312,3 +314,245 @@ class DocumentBulkPrintTestCase(TestCase):
         # Should succeed with valid documents
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['Content-Type'], 'application/pdf')
+
+
+def _fake_pdf(width):
+    """One-page PDF whose page width identifies the document."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=width, height=100)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class BulkPrintJobTestCase(TestCase):
+    """Test bulk print of large selections as background job"""
+
+    setUp = DocumentBulkPrintTestCase.setUp
+
+    def _create_quotes(self, count):
+        return [
+            SalesDocument.objects.create(
+                company=self.company,
+                customer=self.customer,
+                document_type=self.doc_type_quote,
+                number=f'AN-2025-{index:03d}',
+                status='DRAFT',
+                issue_date=timezone.now().date(),
+                subject=f'Quote {index}',
+                total_gross=Decimal('100.00')
+            )
+            for index in range(1, count + 1)
+        ]
+
+    def _render(self, template_name, context, base_url, filename):
+        """Fake PdfRenderService.render: AN-2025-007 fails, the page width is the number."""
+        from unittest.mock import MagicMock
+
+        if filename == 'AN-2025-007.pdf':
+            raise RuntimeError('Rendering failed')
+        return MagicMock(pdf_bytes=_fake_pdf(int(filename[8:11]) * 10))
+
+    def test_small_selection_streams_merged_pdf(self):
+        """Small selections are merged into a spooled file and streamed in print order"""
+        from unittest.mock import patch
+        from pypdf import PdfReader
+        from auftragsverwaltung.services import BulkPrintService
+
+        quotes = self._create_quotes(3)
+        url = reverse('auftragsverwaltung:documents_bulk_print', kwargs={'doc_key': 'quote'})
+
+        # A tiny spool size moves the merged PDF to disk
+        with patch('auftragsverwaltung.services.bulk_print.PdfRenderService') as mock_pdf_service, \
+                patch.object(BulkPrintService, 'SPOOL_MAX_MEMORY', 1):
+            mock_pdf_service.return_value.render.side_effect = self._render
+            response = self.client.post(url, {'document_ids[]': [quote.pk for quote in reversed(quotes)]})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            self.assertIn('inline', response['Content-Disposition'])
+            self.assertIn('Angebot_Sammeldruck_3_Dokumente.pdf', response['Content-Disposition'])
+            content = b''.join(response.streaming_content)
+            self.assertEqual(int(response['Content-Length']), len(content))
+            pages = PdfReader(BytesIO(content)).pages
+            self.assertEqual([int(page.mediabox.width) for page in pages], [10, 20, 30])
+
+    def test_large_selection_runs_as_job_in_order(self):
+        """Documents are merged in print order, failures are skipped and counted"""
+        import tempfile
+        from unittest.mock import patch
+        from django.test import override_settings
+        from pypdf import PdfReader
+        from auftragsverwaltung.models import BulkPrintJob
+        from auftragsverwaltung.services import BulkPrintService
+
+        quotes = self._create_quotes(12)
+        url = reverse('auftragsverwaltung:documents_bulk_print', kwargs={'doc_key': 'quote'})
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                patch('auftragsverwaltung.services.bulk_print.PdfRenderService') as mock_pdf_service, \
+                patch.object(BulkPrintService, '_launch') as mock_launch:
+            mock_pdf_service.return_value.render.side_effect = self._render
+            mock_launch.side_effect = lambda job: BulkPrintService.run_job(job.pk, workers=1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url, {'document_ids[]': [quote.pk for quote in reversed(quotes)]})
+            self.assertEqual(response.status_code, 202)
+
+            job = BulkPrintJob.objects.get(pk=response.json()['job_id'])
+            self.assertEqual(job.document_ids, [quote.pk for quote in quotes])
+            self.assertEqual(
+                (job.status, job.processed_count, job.failed_count, job.page_count), ('COMPLETED', 12, 1, 11)
+            )
+
+            status = self.client.get(response.json()['status_url']).json()
+            self.assertEqual((status['status'], status['progress']), ('COMPLETED', 100))
+
+            download = self.client.get(status['download_url'])
+            self.assertEqual(download['Content-Type'], 'application/pdf')
+            self.assertIn('Angebot_Sammeldruck_12_Dokumente.pdf', download['Content-Disposition'])
+            pages = PdfReader(BytesIO(b''.join(download.streaming_content))).pages
+            self.assertEqual(
+                [int(page.mediabox.width) for page in pages],
+                [number * 10 for number in range(1, 13) if number != 7]
+            )
+
+            # Only the creator can poll and download the job
+            User.objects.create_user(username='other', password='testpass123')
+            self.client.login(username='other', password='testpass123')
+            self.assertEqual(self.client.get(status['download_url']).status_code, 404)
+
+    def test_render_iter_holds_one_document_per_worker(self):
+        """Documents are submitted in a window of the pool size and yielded in print order"""
+        from concurrent.futures import Future
+        from unittest.mock import patch
+        from auftragsverwaltung.services import BulkPrintService
+
+        submitted = []
+
+        class InProcessExecutor:
+            def __init__(self, max_workers, mp_context=None, initializer=None):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def submit(self, fn, document_id):
+                submitted.append(document_id)
+                future = Future()
+                if document_id == 3:
+                    future.set_exception(RuntimeError('Rendering failed'))
+                else:
+                    future.set_result(_fake_pdf(document_id * 10))
+                return future
+
+        with patch('auftragsverwaltung.services.bulk_print.ProcessPoolExecutor', InProcessExecutor), \
+                patch('auftragsverwaltung.services.bulk_print.connections'):
+            results = []
+            for pdf_bytes in BulkPrintService.render_iter(list(range(1, 9)), workers=3):
+                # Besides the yielded document, at most one document per worker is in flight
+                self.assertLessEqual(len(submitted) - len(results) - 1, 3)
+                results.append(pdf_bytes)
+
+        self.assertEqual(submitted, list(range(1, 9)))
+        self.assertEqual([pdf is None for pdf in results], [index == 3 for index in range(1, 9)])
+        self.assertEqual(results[0], _fake_pdf(10))
+
+    def test_failed_job_and_cleanup(self):
+        """A job without any rendered page fails; old finished jobs are deleted"""
+        from datetime import timedelta
+        from unittest.mock import patch
+        from auftragsverwaltung.models import BulkPrintJob
+        from auftragsverwaltung.services import BulkPrintService
+
+        quote = self._create_quotes(7)[-1]
+        job = BulkPrintJob.objects.create(
+            document_type=self.doc_type_quote, document_ids=[quote.pk], document_count=1, created_by=self.user
+        )
+        with patch('auftragsverwaltung.services.bulk_print.PdfRenderService') as mock_pdf_service:
+            mock_pdf_service.return_value.render.side_effect = self._render
+            job = BulkPrintService.run_job(job.pk)
+
+        self.assertEqual((job.status, job.failed_count, job.page_count), ('FAILED', 1, 0))
+        status_url = reverse(
+            'auftragsverwaltung:documents_bulk_print_status', kwargs={'doc_key': 'quote', 'job_id': job.pk}
+        )
+        self.assertEqual(
+            self.client.get(status_url).json()['error'], 'Fehler beim Erstellen der PDFs.'
+        )
+
+        self.assertEqual(BulkPrintService.cleanup(now=timezone.now()), 0)
+        self.assertEqual(BulkPrintService.cleanup(now=timezone.now() + timedelta(days=2)), 1)
+        self.assertFalse(BulkPrintJob.objects.exists())
+
+    def test_stale_job_is_marked_failed(self):
+        """A queued or running job whose thread was lost fails on polling and cleanup"""
+        from datetime import timedelta
+        from auftragsverwaltung.models import BulkPrintJob
+        from auftragsverwaltung.services import BulkPrintService
+
+        queued = BulkPrintJob.objects.create(
+            document_type=self.doc_type_quote, document_ids=[], document_count=0, created_by=self.user
+        )
+        running = BulkPrintJob.objects.create(
+            document_type=self.doc_type_quote, document_ids=[], document_count=0, created_by=self.user,
+            status='RUNNING'
+        )
+        status_url = reverse(
+            'auftragsverwaltung:documents_bulk_print_status', kwargs={'doc_key': 'quote', 'job_id': queued.pk}
+        )
+        self.assertEqual(self.client.get(status_url).json()['status'], 'QUEUED')
+
+        # Age alone does not count: only the time since the last progress
+        stale = timezone.now() - BulkPrintService.STALE_AFTER - timedelta(minutes=1)
+        BulkPrintJob.objects.update(created_at=stale)
+        self.assertEqual(self.client.get(status_url).json()['status'], 'QUEUED')
+
+        BulkPrintJob.objects.update(updated_at=stale)
+        status = self.client.get(status_url).json()
+        self.assertEqual((status['success'], status['status']), (False, 'FAILED'))
+        self.assertIn('nicht abgeschlossen', status['error'])
+        running.refresh_from_db()
+        self.assertEqual(running.status, 'RUNNING')
+
+        self.assertEqual(BulkPrintService.cleanup(), 0)
+        running.refresh_from_db()
+        self.assertEqual(running.status, 'FAILED')
+        self.assertIsNotNone(running.finished_at)
+
+    def test_run_job_keeps_stale_failure(self):
+        """A job failed as stale stays failed when its render finishes after all"""
+        import tempfile
+        from unittest.mock import patch
+        from auftragsverwaltung.models import BulkPrintJob
+        from auftragsverwaltung.services import BulkPrintService
+
+        quote = self._create_quotes(7)[-1]
+        job = BulkPrintJob.objects.create(
+            document_type=self.doc_type_quote, document_ids=[quote.pk], document_count=1, created_by=self.user
+        )
+
+        def merge_documents(document_ids, workers=None, on_progress=None):
+            # fail_stale() of another process runs while the documents are rendered
+            BulkPrintService.fail_stale(now=timezone.now() + BulkPrintService.STALE_AFTER * 2)
+            target = tempfile.TemporaryFile()
+            target.write(_fake_pdf(10))
+            target.seek(0)
+            return target, 1
+
+        with patch.object(BulkPrintService, 'merge_documents', side_effect=merge_documents):
+            job = BulkPrintService.run_job(job.pk)
+
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIn('nicht abgeschlossen', job.error_message)
+        self.assertFalse(job.pdf_file)
+
+        # A failed job is not started again
+        with patch.object(BulkPrintService, 'merge_documents') as mock_merge:
+            self.assertEqual(BulkPrintService.run_job(job.pk).status, 'FAILED')
+        mock_merge.assert_not_called()
@@ -381,3 +381,105 @@ class DocumentCalculationServiceTestCase(TestCase):
         self.assertEqual(result.total_net, Decimal('100.00'))
         self.assertEqual(result.total_tax, Decimal('19.00'))
         self.assertEqual(result.total_gross, Decimal('119.00'))
+
+
+class RecalculateManyTestCase(TestCase):
+    """Test DocumentCalculationService.recalculate_many"""
+    
+    setUp = DocumentCalculationServiceTestCase.setUp
+    
+    def _create_documents(self, count):
+        documents = [self.document]
+        for index in range(2, count + 1):
+            documents.append(SalesDocument.objects.create(
+                company=self.company,
+                document_type=self.doc_type,
+                number=f"INV-{index:03d}",
+                status="DRAFT",
+                issue_date=date(2026, 1, 15)
+            ))
+        # Prices with half-cent results, mixed line types and tax rates
+        for index, document in enumerate(documents):
+            for position, (line_type, is_selected, tax_rate) in enumerate([
+                ('NORMAL', False, self.tax_rate_19),
+                ('OPTIONAL', False, self.tax_rate_7),
+                ('ALTERNATIVE', True, self.tax_rate_7),
+            ], start=1):
+                SalesDocumentLine.objects.create(
+                    document=document,
+                    position_no=position,
+                    line_type=line_type,
+                    is_selected=is_selected,
+                    description=f"Item {position}",
+                    quantity=Decimal('1.5000') + index,
+                    unit_price_net=Decimal('10.05') + position,
+                    tax_rate=tax_rate
+                )
+        return documents
+    
+    def test_same_results_as_single_document_path(self):
+        """Line and document totals equal recalculate() for every document"""
+        documents = self._create_documents(5)
+        # An empty document gets zero totals
+        SalesDocument.objects.filter(pk=documents[4].pk).update(total_net=Decimal('9.99'))
+        documents[4].lines.all().delete()
+        
+        result = DocumentCalculationService.recalculate_many(
+            SalesDocument.objects.filter(pk__in=[d.pk for d in documents]), chunk_size=2
+        )
+        self.assertEqual(result.documents, 5)
+        
+        for document in documents:
+            document.refresh_from_db()
+            stored_lines = [
+                (line.line_net, line.line_tax, line.line_gross) for line in document.lines.order_by('position_no')
+            ]
+            expected = DocumentCalculationService.recalculate(document, persist=False)
+            self.assertEqual(
+                (document.total_net, document.total_tax, document.total_gross),
+                (expected.total_net, expected.total_tax, expected.total_gross)
+            )
+            self.assertEqual(
+                stored_lines,
+                [(line.line_net, line.line_tax, line.line_gross) for line in document.lines.order_by('position_no')]
+            )
+        self.assertEqual(documents[4].total_net, Decimal('0.00'))
+    
+    def test_writes_only_changed_rows_in_batches(self):
+        """Unchanged data is not written, queries depend on the number of chunks only"""
+        documents = self._create_documents(4)
+        DocumentCalculationService.recalculate_many(SalesDocument.objects.all())
+        
+        # Nothing changed: one documents and one lines query per chunk (and the last, empty page)
+        with self.assertNumQueries(5):
+            result = DocumentCalculationService.recalculate_many(SalesDocument.objects.all(), chunk_size=2)
+        self.assertEqual((result.documents, result.documents_changed, result.lines_changed), (4, 0, 0))
+        
+        # A tax rate change updates the lines and documents that use it
+        self.tax_rate_7.rate = Decimal('0.05')
+        self.tax_rate_7.save()
+        result = DocumentCalculationService.recalculate_many(SalesDocument.objects.all())
+        self.assertEqual((result.documents_changed, result.lines_changed), (4, 8))
+        documents[0].refresh_from_db()
+        self.assertEqual(
+            documents[0].total_tax, DocumentCalculationService.recalculate(documents[0]).total_tax
+        )
+    
+    def test_command_filters_by_tax_rate(self):
+        """The command recalculates the documents with lines of the given tax rate"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        self._create_documents(2)
+        other = SalesDocument.objects.create(
+            company=self.company, document_type=self.doc_type, number="INV-099",
+            status="DRAFT", issue_date=date(2026, 1, 15)
+        )
+        SalesDocumentLine.objects.create(
+            document=other, position_no=1, line_type='NORMAL', is_selected=True, description="Item",
+            quantity=Decimal('1.0000'), unit_price_net=Decimal('10.00'), tax_rate=self.tax_rate_19
+        )
+        
+        out = StringIO()
+        call_command('recalculate_document_totals', '--tax-rate', 'VAT_7', stdout=out)
+        self.assertIn('Recalculated 2 document(s)', out.getvalue())
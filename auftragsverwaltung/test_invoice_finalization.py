@@ -7,10 +7,11 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
 from decimal import Decimal
+from datetime import timedelta
 
 from core.models import Mandant, Adresse, MailTemplate, SmtpSettings
 from auftragsverwaltung.models import SalesDocument, DocumentType, SalesDocumentLine
-from auftragsverwaltung.services.invoice_finalization import finalize_invoice
+from auftragsverwaltung.services.invoice_finalization import finalize_invoice, finalize_invoices
 from auftragsverwaltung.services.invoice_email import send_invoice_email, InvoiceEmailError
 
 
@@ -117,6 +118,47 @@ class InvoiceFinalizationTestCase(TestCase):
 
         self.assertIn('not an invoice', str(cm.exception))
 
+    def test_finalize_invoices_batch(self):
+        """Batch finalization assigns missing numbers per number range and keeps existing numbers"""
+        other_company = Mandant.objects.create(name="Other Company", adresse="Street 2", plz="12345", ort="City")
+        other = SalesDocument.objects.create(
+            company=other_company, document_type=self.doc_type_invoice, customer=self.customer,
+            status='DRAFT', issue_date=timezone.now().date() - timedelta(days=1)
+        )
+        numbered = SalesDocument.objects.create(
+            company=self.company, document_type=self.doc_type_invoice, customer=self.customer,
+            number='R-MANUAL', status='SENT', issue_date=timezone.now().date()
+        )
+
+        results = finalize_invoices([self.invoice, other, numbered])
+
+        # Issue date order, unchanged invoices are reported as not modified
+        self.assertEqual([invoice.pk for invoice, _ in results], [other.pk, self.invoice.pk, numbered.pk])
+        self.assertEqual([modified for _, modified in results], [True, True, False])
+        for invoice in (self.invoice, other):
+            invoice.refresh_from_db()
+            self.assertEqual(invoice.number, f"R{invoice.issue_date.year % 100:02d}-00001")
+            self.assertEqual(invoice.status, 'SENT')
+        numbered.refresh_from_db()
+        self.assertEqual(numbered.number, 'R-MANUAL')
+
+    def test_finalize_invoices_is_all_or_nothing(self):
+        """A non-invoice in the batch finalizes nothing and consumes no numbers"""
+        quote = SalesDocument.objects.create(
+            company=self.company,
+            document_type=DocumentType.objects.get(key="quote"),
+            customer=self.customer,
+            status='DRAFT',
+            issue_date=timezone.now().date()
+        )
+
+        with self.assertRaises(ValueError):
+            finalize_invoices([self.invoice, quote])
+
+        self.invoice.refresh_from_db()
+        self.assertFalse(self.invoice.number)
+        self.assertEqual(self.invoice.status, 'DRAFT')
+
 
 class InvoiceEmailServiceTestCase(TestCase):
     """Test invoice email sending service"""
@@ -629,3 +671,72 @@ class InvoiceViewsTestCase(TestCase):
 
         self.assertTrue(data['success'])
         self.assertIn('customer@example.com', data['recipients'])
+
+
+class InvoiceArchiveTestCase(TestCase):
+    """Test archiving of final invoice PDFs"""
+
+    def setUp(self):
+        InvoiceViewsTestCase.setUp(self)
+        import tempfile
+        from django.test import override_settings
+
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        patcher = patch('auftragsverwaltung.services.invoice_archive.PdfRenderService')
+        self.mock_pdf_service = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('auftragsverwaltung.views.PdfRenderService', self.mock_pdf_service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_pdf_service.return_value.render.side_effect = lambda filename, **kwargs: MagicMock(
+            pdf_bytes=b'%PDF-archived', filename=filename
+        )
+
+    def test_finalize_archives_pdf_once(self):
+        """Finalization stores the PDF with its hash; later accesses reuse it"""
+        import hashlib
+        from auftragsverwaltung.services import InvoiceArchiveService
+
+        invoice, _ = finalize_invoice(self.invoice)
+
+        report = InvoiceArchiveService.get(invoice)
+        self.assertIsNotNone(report)
+        self.assertEqual(report.sha256, hashlib.sha256(b'%PDF-archived').hexdigest())
+        self.assertEqual(report.metadata['number'], invoice.number)
+        self.assertEqual(report.context_json['doc']['number'], invoice.number)
+        self.assertTrue(InvoiceArchiveService.verify(report))
+
+        self.assertEqual(InvoiceArchiveService.get_or_archive(invoice).pk, report.pk)
+        self.assertEqual(self.mock_pdf_service.return_value.render.call_count, 1)
+
+        # Drafts are not archived
+        draft = SalesDocument.objects.create(
+            company=self.company, document_type=self.doc_type_invoice, customer=self.customer,
+            status='DRAFT', issue_date=timezone.now().date()
+        )
+        self.assertIsNone(InvoiceArchiveService.get_or_archive(draft))
+
+    def test_pdf_view_streams_archived_file(self):
+        """The PDF download of a final invoice is the archived file, not a new rendering"""
+        from auftragsverwaltung.services import InvoiceArchiveService
+
+        finalize_invoices([self.invoice])
+        self.assertIsNone(InvoiceArchiveService.get(self.invoice))
+
+        url = reverse('auftragsverwaltung:document_pdf', kwargs={'pk': self.invoice.pk})
+        with patch('auftragsverwaltung.views.SalesDocumentInvoiceContextBuilder') as view_context_builder:
+            for _ in range(2):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.streaming)
+                self.assertEqual(b''.join(response.streaming_content), b'%PDF-archived')
+
+        # The view builds no render context for an archived invoice
+        view_context_builder.assert_not_called()
+        self.assertEqual(self.mock_pdf_service.return_value.render.call_count, 1)
+        self.assertEqual(InvoiceArchiveService.get(self.invoice).created_by, self.user)
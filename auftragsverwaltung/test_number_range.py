@@ -7,7 +7,12 @@ from datetime import date
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from core.models import Mandant
 from auftragsverwaltung.models import DocumentType, NumberRange
-from auftragsverwaltung.services.number_range import get_next_number
+from auftragsverwaltung.services.number_range import (
+    DocumentNumberAllocator,
+    get_next_number,
+    release_numbers,
+    reserve_numbers,
+)
 import unittest
 
 
@@ -267,6 +272,92 @@ class NumberRangeServiceTestCase(TestCase):
         self.assertEqual(number, expected_prefix)
 
 
+
+class NumberBlockTestCase(TestCase):
+    """Test block reservation of document numbers"""
+    
+    setUp = NumberRangeServiceTestCase.setUp
+    
+    def _current_seq(self):
+        return NumberRange.objects.get(company=self.company1, document_type=self.doc_type_invoice).current_seq
+    
+    def test_reserve_numbers_single_lock(self):
+        """A block of numbers is reserved with one locked round-trip"""
+        get_next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15))
+        
+        with self.assertNumQueries(4):  # savepoint, SELECT ... FOR UPDATE, UPDATE, release
+            block = reserve_numbers(self.company1, self.doc_type_invoice, 3, date(2026, 1, 15))
+        
+        self.assertEqual([block.take(), block.take(), block.take()], ['R26-00002', 'R26-00003', 'R26-00004'])
+        self.assertEqual(block.remaining, 0)
+        with self.assertRaises(ValueError):
+            block.take()
+        self.assertEqual(get_next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00005')
+    
+    def test_release_returns_unused_tail(self):
+        """Unused numbers are handed back if nothing was reserved after the block"""
+        block = reserve_numbers(self.company1, self.doc_type_invoice, 5, date(2026, 1, 15))
+        block.take()
+        block.take()
+        
+        self.assertEqual(release_numbers(block), [])
+        self.assertEqual(self._current_seq(), 2)
+        self.assertEqual(get_next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00003')
+    
+    def test_release_reports_gap(self):
+        """Unused numbers remain as gap if numbers were reserved after the block"""
+        block = reserve_numbers(self.company1, self.doc_type_invoice, 3, date(2026, 1, 15))
+        block.take()
+        get_next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15))
+        
+        self.assertEqual(release_numbers(block), ['R26-00002', 'R26-00003'])
+        self.assertEqual(self._current_seq(), 4)
+    
+    def test_allocator_reserves_blocks_and_rewinds(self):
+        """The allocator refills blocks, hands rolled-back numbers out again and releases the rest"""
+        numbers = DocumentNumberAllocator(block_size=2)
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00001')
+        
+        mark = numbers.mark()
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00002')
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00003')
+        numbers.rewind(mark)
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00003')
+        
+        # Separate blocks per document type
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_quote, date(2026, 1, 15)), 'AN26-00001')
+        
+        self.assertEqual(numbers.release(), [])
+        self.assertEqual(get_next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00004')
+        self.assertEqual(get_next_number(self.company1, self.doc_type_quote, date(2026, 1, 15)), 'AN26-00002')
+    
+    def test_allocator_year_change_leaves_reported_gap(self):
+        """A block of the previous year cannot be given back once the range moved to a new year"""
+        numbers = DocumentNumberAllocator(block_size=3)
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 12, 15)), 'R26-00001')
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2027, 1, 15)), 'R27-00001')
+        
+        self.assertEqual(numbers.release(), ['R26-00002', 'R26-00003'])
+        self.assertEqual(get_next_number(self.company1, self.doc_type_invoice, date(2027, 1, 15)), 'R27-00002')
+    
+    def test_allocator_sizes_blocks_from_expected_documents(self):
+        """Blocks are not larger than the documents still expected for their key"""
+        expected = {
+            DocumentNumberAllocator.key(self.company1.pk, self.doc_type_invoice.pk, date(2026, 1, 15)): 2,
+        }
+        numbers = DocumentNumberAllocator(block_size=100, expected=expected)
+        numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15))
+        self.assertEqual(self._current_seq(), 2)
+        
+        # More documents than expected: the next block has one number
+        numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15))
+        self.assertEqual(numbers.next_number(self.company1, self.doc_type_invoice, date(2026, 1, 15)), 'R26-00003')
+        self.assertEqual(self._current_seq(), 3)
+        
+        # Keys without an expected count use the full block size
+        numbers.next_number(self.company1, self.doc_type_quote, date(2026, 1, 15))
+        self.assertEqual(numbers.release(), [])
+
 @unittest.skipIf(
     connection.settings_dict['ENGINE'] == 'django.db.backends.sqlite3',
     "Concurrency tests are skipped on SQLite due to locking limitations"
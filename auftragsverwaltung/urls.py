@@ -25,6 +25,8 @@ urlpatterns = [
 
     # Bulk actions for documents
     path('documents/<str:doc_key>/bulk-print/', views.documents_bulk_print, name='documents_bulk_print'),
+    path('documents/<str:doc_key>/bulk-print/<int:job_id>/', views.documents_bulk_print_status, name='documents_bulk_print_status'),
+    path('documents/<str:doc_key>/bulk-print/<int:job_id>/download/', views.documents_bulk_print_download, name='documents_bulk_print_download'),
 
     # Document detail, create, update views
     path('documents/<str:doc_key>/create/', views.document_create, name='document_create'),
@@ -51,6 +53,7 @@ urlpatterns = [
     path('ajax/documents/<str:doc_key>/<int:pk>/lines/add/', views.ajax_add_line, name='ajax_add_line'),
     path('ajax/documents/<str:doc_key>/<int:pk>/lines/<int:line_id>/update/', views.ajax_update_line, name='ajax_update_line'),
     path('ajax/documents/<str:doc_key>/<int:pk>/lines/<int:line_id>/delete/', views.ajax_delete_line, name='ajax_delete_line'),
+    path('ajax/documents/<str:doc_key>/<int:pk>/lines/batch/', views.ajax_batch_lines, name='ajax_batch_lines'),
     
     # Convenience URLs for specific document types
     path('angebote/', views.document_list, {'doc_key': 'quote'}, name='quotes'),
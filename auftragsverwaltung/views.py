@@ -2,11 +2,11 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.db.models import Q, Sum, Max
-from django.http import Http404, JsonResponse, HttpResponse
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse
 from django.views.decorators.http import require_http_methods, require_POST
 from django.conf import settings
 from django.urls import reverse
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
 from decimal import Decimal
 from django_tables2 import RequestConfig
 import json
@@ -14,7 +14,7 @@ import logging
 from django.utils import timezone
 from django.utils.html import strip_tags
 
-from .models import SalesDocument, DocumentType, SalesDocumentLine, Contract, ContractLine, ContractRun, TextTemplate, TimeEntry
+from .models import SalesDocument, DocumentType, SalesDocumentLine, Contract, ContractLine, ContractRun, TextTemplate, TimeEntry, BulkPrintJob
 from .tables import SalesDocumentTable, ContractTable, TextTemplateTable, OutgoingInvoiceJournalTable, TimeEntryTable
 from .filters import SalesDocumentFilter, ContractFilter, TextTemplateFilter, OutgoingInvoiceJournalFilter, TimeEntryFilter
 from .services import (
@@ -23,12 +23,15 @@ from .services import (
     PaymentTermTextService,
     get_next_number,
     ContractBillingService,
+    SalesDocumentKpiService,
+    BulkPrintService,
+    InvoiceArchiveService,
 )
 from .utils import sanitize_html
 from .printing import SalesDocumentInvoiceContextBuilder
 from core.models import Mandant, Adresse, Item, PaymentTerm, TaxRate, Kostenart, Unit
 from core.services.activity_stream import ActivityStreamService
-from core.printing import PdfRenderService, get_static_base_url
+from core.printing import PdfCache, PdfRenderService, get_static_base_url
 from finanzen.models import OutgoingInvoiceJournalEntry
 
 # Initialize logger
@@ -148,32 +151,9 @@ def auftragsverwaltung_home(request):
     
     All metrics and data are shown across ALL companies.
     """
-    # KPI 1: Count of open documents (DRAFT, SENT, APPROVED) - across all companies
-    kpi_open_documents = SalesDocument.objects.filter(
-        status__in=['DRAFT', 'SENT', 'APPROVED']
-    ).count()
-    
-    # KPI 2: Count of unpaid invoices (documents marked as invoice, not paid, not cancelled)
-    kpi_unpaid_invoices = SalesDocument.objects.filter(
-        document_type__is_invoice=True,
-        paid_at__isnull=True,
-        status__in=['SENT', 'APPROVED', 'OVERDUE']
-    ).exclude(status='CANCELLED').count()
-    
-    # KPI 3: New documents in the last 30 days
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    kpi_new_documents_30d = SalesDocument.objects.filter(
-        issue_date__gte=thirty_days_ago.date()
-    ).count()
-    
-    # KPI 4: Total open amount (sum of unpaid invoices)
-    open_amount_aggregate = SalesDocument.objects.filter(
-        document_type__is_invoice=True,
-        paid_at__isnull=True,
-        status__in=['SENT', 'APPROVED', 'OVERDUE']
-    ).exclude(status='CANCELLED').aggregate(total=Sum('total_gross'))
-    
-    kpi_open_amount = open_amount_aggregate['total'] or Decimal('0.00')
+    # KPIs (open documents, unpaid invoices, new documents, open amount) - across all companies
+    # One conditional-aggregation query, cached and invalidated on SalesDocument changes
+    kpis = SalesDocumentKpiService.get()
     
     # Get open sales documents (DRAFT, SENT, APPROVED) - across all companies
     open_sales_documents = SalesDocument.objects.filter(
@@ -198,10 +178,10 @@ def auftragsverwaltung_home(request):
     activities = ActivityStreamService.latest(n=25)
     
     context = {
-        'kpi_open_documents': kpi_open_documents,
-        'kpi_unpaid_invoices': kpi_unpaid_invoices,
-        'kpi_new_documents_30d': kpi_new_documents_30d,
-        'kpi_open_amount': kpi_open_amount,
+        'kpi_open_documents': kpis.open_documents,
+        'kpi_unpaid_invoices': kpis.unpaid_invoices,
+        'kpi_new_documents_30d': kpis.new_documents_30d,
+        'kpi_open_amount': kpis.open_amount,
         'open_sales_documents': open_sales_documents,
         'latest_documents': latest_documents,
         'due_contracts': due_contracts,
@@ -903,12 +883,16 @@ def ajax_add_line(request, doc_key, pk):
             return JsonResponse({'success': False, 'error': 'Ungültiger Rabatt.'}, status=400)
 
         with transaction.atomic():
+            # Lock the document before its lines (same order as every line write),
+            # apply_line_delta() then re-acquires the lock for the totals
+            SalesDocument.objects.select_for_update().get(pk=pk)
+
             # Get next position number
             max_position = document.lines.aggregate(max_pos=Max('position_no'))['max_pos'] or 0
             position_no = max_position + 1
 
             # Create line
-            line = SalesDocumentLine.objects.create(
+            line = SalesDocumentLine(
                 document=document,
                 item=item,
                 tax_rate=tax_rate,
@@ -930,9 +914,14 @@ def ajax_add_line(request, doc_key, pk):
                 kostenart1_id=normalize_foreign_key_id(kostenart1_id),
                 kostenart2_id=normalize_foreign_key_id(kostenart2_id),
             )
+            DocumentCalculationService.normalize_line_amounts(line)
+            line.line_net, line.line_tax, line.line_gross = DocumentCalculationService.calculate_line_totals(line)
+            line.save()
 
-            # Recalculate document totals
-            DocumentCalculationService.recalculate(document, persist=True)
+            # Add the new line to the stored document totals (incremental)
+            DocumentCalculationService.apply_line_delta(
+                document, after=DocumentCalculationService.line_contribution(line)
+            )
     except Http404:
         raise
     except Exception as e:
@@ -1023,6 +1012,10 @@ def ajax_update_line(request, doc_key, pk, line_id):
 
     try:
         with transaction.atomic():
+            # Lock the document before its lines (same order as every line write),
+            # apply_line_delta() then re-acquires the lock for the totals
+            SalesDocument.objects.select_for_update().get(pk=pk)
+
             # Lock the row for the duration of the read-modify-write so that
             # overlapping edits of the same line are serialized instead of
             # racing on a full-row save() (last-writer-wins over stale fields).
@@ -1030,6 +1023,7 @@ def ajax_update_line(request, doc_key, pk, line_id):
                 SalesDocumentLine.objects.select_for_update(),
                 pk=line_id, document=document
             )
+            before = DocumentCalculationService.line_contribution(line)
 
             provided_short_text_1 = 'short_text_1' in data
             provided_short_text_2 = 'short_text_2' in data
@@ -1176,6 +1170,7 @@ def ajax_update_line(request, doc_key, pk, line_id):
                     touched_fields.add('kostenart2')
 
             # Recalculate line totals using the service before saving
+            DocumentCalculationService.normalize_line_amounts(line)
             line_net, line_tax, line_gross = DocumentCalculationService.calculate_line_totals(line)
             line.line_net = line_net
             line.line_tax = line_tax
@@ -1186,8 +1181,10 @@ def ajax_update_line(request, doc_key, pk, line_id):
             # save of a different field on the same line can never clobber it.
             line.save(update_fields=sorted(touched_fields))
 
-            # Recalculate and persist document totals
-            DocumentCalculationService.recalculate(document, persist=True)
+            # Apply the change of this line to the stored document totals (incremental)
+            DocumentCalculationService.apply_line_delta(
+                document, before=before, after=DocumentCalculationService.line_contribution(line)
+            )
     except Http404:
         raise
     except ValueError as e:
@@ -1238,12 +1235,20 @@ def ajax_delete_line(request, doc_key, pk, line_id):
     """
     try:
         document = get_object_or_404(SalesDocument, pk=pk)
-        line = get_object_or_404(SalesDocumentLine, pk=line_id, document=document)
         
-        line.delete()
-        
-        # Recalculate document totals
-        DocumentCalculationService.recalculate(document, persist=True)
+        with transaction.atomic():
+            # Lock the document before its lines (same order as every line write),
+            # apply_line_delta() then re-acquires the lock for the totals
+            SalesDocument.objects.select_for_update().get(pk=pk)
+
+            line = get_object_or_404(
+                SalesDocumentLine.objects.select_for_update(), pk=line_id, document=document
+            )
+            before = DocumentCalculationService.line_contribution(line)
+            line.delete()
+            
+            # Remove the line from the stored document totals (incremental)
+            DocumentCalculationService.apply_line_delta(document, before=before)
         
         return JsonResponse({
             'success': True,
@@ -1257,6 +1262,353 @@ def ajax_delete_line(request, doc_key, pk, line_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+# Maximum number of changes accepted by one ajax_batch_lines request
+LINE_BATCH_MAX_CHANGES = 1000
+
+# Keys of a batch change that map to line fields (see _set_batch_line_fields)
+LINE_BATCH_FIELDS = {
+    'position_no', 'line_type', 'is_selected', 'short_text_1', 'short_text_2', 'long_text',
+    'description', 'quantity', 'unit_id', 'unit_price_net', 'discount', 'is_discountable',
+    'tax_rate_id', 'kostenart1_id', 'kostenart2_id',
+}
+
+
+def _parse_batch_id(value, label):
+    """Parse a line/item/tax rate ID of a batch change; raises ValueError."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Ungültige {label}: {value!r}.')
+
+
+def _set_batch_line_fields(line, change, tax_rates):
+    """
+    Apply the line fields of a batch change to a line (in memory)
+
+    Args:
+        line: SalesDocumentLine instance
+        change: Change dict (only keys in LINE_BATCH_FIELDS are applied)
+        tax_rates: Dict of the referenced TaxRate instances by ID
+
+    Returns:
+        set: Names of the model fields that were set
+
+    Raises:
+        ValueError: If a value is invalid
+    """
+    touched = set()
+    if 'position_no' in change:
+        position_no = _parse_batch_id(change['position_no'], 'Positionsnummer')
+        if position_no < 1:
+            raise ValueError('Die Positionsnummer muss größer als 0 sein.')
+        line.position_no = position_no
+        touched.add('position_no')
+    if 'line_type' in change:
+        if change['line_type'] not in dict(SalesDocumentLine.LINE_TYPE_CHOICES):
+            raise ValueError(f"Ungültiger Positionstyp: {change['line_type']!r}.")
+        line.line_type = change['line_type']
+        touched.add('line_type')
+    for name in ('is_selected', 'is_discountable'):
+        if name in change:
+            setattr(line, name, bool(change[name]))
+            touched.add(name)
+    for name in ('short_text_1', 'short_text_2', 'description'):
+        if name in change:
+            setattr(line, name, change[name] or '')
+            touched.add(name)
+    if 'long_text' in change:
+        # long_text is rendered with the `|safe` filter in PDF templates, so it must be sanitized
+        line.long_text = sanitize_html(change['long_text']) if change['long_text'] else ''
+        touched.add('long_text')
+    for name, error in (('quantity', 'Ungültige Menge.'), ('unit_price_net', 'Ungültiger Netto-Stückpreis.')):
+        if name in change:
+            try:
+                setattr(line, name, normalize_decimal_input(change[name]))
+            except (ValueError, TypeError):
+                raise ValueError(error)
+            touched.add(name)
+    if 'discount' in change:
+        try:
+            line.discount = (
+                normalize_decimal_input(change['discount'])
+                if change['discount'] not in (None, '') else Decimal('0.00')
+            )
+        except (ValueError, TypeError):
+            raise ValueError('Ungültiger Rabatt.')
+        touched.add('discount')
+    if 'tax_rate_id' in change:
+        tax_rate = tax_rates.get(_parse_batch_id(change['tax_rate_id'], 'Steuersatz-ID'))
+        if tax_rate is None:
+            raise ValueError(f"Ungültiger Steuersatz: Kein Steuersatz mit ID {change['tax_rate_id']} gefunden.")
+        line.tax_rate = tax_rate
+        touched.add('tax_rate')
+    for key, name in (('unit_id', 'unit'), ('kostenart1_id', 'kostenart1'), ('kostenart2_id', 'kostenart2')):
+        if key in change:
+            setattr(line, f'{name}_id', normalize_foreign_key_id(change[key]))
+            touched.add(name)
+    return touched
+
+
+def _build_batch_line(document, change, tax_rates, items):
+    """
+    Build a new (unsaved) line from a create change, with the same defaults as ajax_add_line
+
+    Raises:
+        ValueError: If a value is invalid or a required field is missing
+    """
+    line = SalesDocumentLine(
+        document=document,
+        line_type='NORMAL',
+        quantity=Decimal('1.0'),
+        unit_price_net=Decimal('0.00'),
+        discount=Decimal('0.00'),
+    )
+    item = None
+    if normalize_foreign_key_id(change.get('item_id')) is not None:
+        item = items.get(_parse_batch_id(change['item_id'], 'Artikel-ID'))
+        if item is None:
+            raise ValueError(f"Ungültiger Artikel: Kein Artikel mit ID {change['item_id']} gefunden.")
+        line.item = item
+        line.short_text_1 = item.short_text_1
+        line.short_text_2 = item.short_text_2
+        line.long_text = item.long_text or ''
+        line.unit_price_net = item.net_price
+        line.is_discountable = item.is_discountable
+        line.kostenart1_id = item.cost_type_1_id
+        line.kostenart2_id = item.cost_type_2_id
+        line.tax_rate = TaxDeterminationService.determine_tax_rate(
+            customer=document.customer,
+            item_tax_rate=item.tax_rate
+        )
+    elif normalize_foreign_key_id(change.get('tax_rate_id')) is None:
+        raise ValueError('Steuersatz ist für manuelle Positionen erforderlich.')
+
+    touched = _set_batch_line_fields(line, change, tax_rates)
+    if item is not None and 'long_text' not in touched and line.long_text:
+        line.long_text = sanitize_html(line.long_text)
+    if 'description' not in touched:
+        line.description = _build_contract_line_description(
+            line.short_text_1, line.short_text_2, line.long_text
+        )
+    if line.line_type == 'NORMAL' or 'is_selected' not in touched:
+        line.is_selected = line.line_type == 'NORMAL'
+    return line
+
+
+def _apply_line_batch(document, changes):
+    """
+    Apply a list of line changes to a (locked) document with bulk operations
+
+    All lines of the document are read once; referenced tax rates and items
+    with one query each. Deletions, updates and new lines are then written
+    with one delete, bulk_update and bulk_create each (plus one bulk_update
+    moving reordered lines out of the way of the unique position numbers).
+    Only changed and new lines are recalculated; the document totals are
+    summed from all lines and saved once.
+
+    Args:
+        document: SalesDocument instance (locked with select_for_update)
+        changes: List of change dicts (see ajax_batch_lines)
+
+    Returns:
+        tuple: (lines ordered by position_no, new lines in request order)
+
+    Raises:
+        ValueError: If a change is invalid (nothing has been written then)
+    """
+    lines = {
+        line.pk: line
+        for line in document.lines.select_for_update(of=('self',)).select_related('tax_rate')
+    }
+    original_positions = {pk: line.position_no for pk, line in lines.items()}
+
+    tax_rate_ids = set()
+    item_ids = set()
+    for index, change in enumerate(changes, start=1):
+        if not isinstance(change, dict):
+            raise ValueError(f'Änderung {index}: Ungültiges Format.')
+        if normalize_foreign_key_id(change.get('tax_rate_id')) is not None:
+            tax_rate_ids.add(change['tax_rate_id'])
+        if change.get('action') == 'create' and normalize_foreign_key_id(change.get('item_id')) is not None:
+            item_ids.add(change['item_id'])
+    try:
+        tax_rates = TaxRate.objects.in_bulk({int(pk) for pk in tax_rate_ids}) if tax_rate_ids else {}
+        items = Item.objects.select_related('tax_rate').in_bulk({int(pk) for pk in item_ids}) if item_ids else {}
+    except (TypeError, ValueError):
+        raise ValueError('Ungültige Steuersatz- oder Artikel-ID.')
+
+    deleted = set()
+    updated = {}
+    created = []
+    for index, change in enumerate(changes, start=1):
+        action = change.get('action')
+        try:
+            if action == 'create':
+                unknown = change.keys() - LINE_BATCH_FIELDS - {'action', 'item_id'}
+            elif action in ('update', 'delete'):
+                unknown = change.keys() - LINE_BATCH_FIELDS - {'action', 'id'}
+            else:
+                raise ValueError(f'Unbekannte Aktion: {action!r}.')
+            if unknown:
+                raise ValueError(f"Unbekannte Felder: {', '.join(sorted(unknown))}.")
+
+            if action == 'create':
+                created.append(_build_batch_line(document, change, tax_rates, items))
+                continue
+
+            line = lines.get(_parse_batch_id(change.get('id'), 'Positions-ID'))
+            if line is None or line.pk in deleted:
+                raise ValueError(f"Position {change.get('id')} nicht gefunden oder bereits gelöscht.")
+            if action == 'delete':
+                deleted.add(line.pk)
+                updated.pop(line.pk, None)
+                continue
+
+            touched = _set_batch_line_fields(line, change, tax_rates)
+            if not touched:
+                raise ValueError('Keine Felder zum Aktualisieren übermittelt.')
+            updated.setdefault(line.pk, set()).update(touched)
+        except ValueError as e:
+            raise ValueError(f'Änderung {index}: {e}')
+
+    # Recalculate only the lines whose amounts may have changed
+    for line in [lines[pk] for pk in updated] + created:
+        DocumentCalculationService.normalize_line_amounts(line)
+        line.line_net, line.line_tax, line.line_gross = DocumentCalculationService.calculate_line_totals(line)
+
+    remaining = [line for pk, line in lines.items() if pk not in deleted]
+
+    # New lines without a position number are appended in request order
+    next_position = max(
+        [line.position_no for line in remaining]
+        + [line.position_no for line in created if line.position_no is not None],
+        default=0
+    )
+    for line in created:
+        if line.position_no is None:
+            next_position += 1
+            line.position_no = next_position
+
+    positions = set()
+    for line in remaining + created:
+        if line.position_no in positions:
+            raise ValueError(f'Positionsnummer {line.position_no} ist mehrfach vergeben.')
+        positions.add(line.position_no)
+
+    if deleted:
+        SalesDocumentLine.objects.filter(pk__in=deleted).delete()
+
+    if updated:
+        changed = [lines[pk] for pk in updated]
+        moved = [line for line in changed if line.position_no != original_positions[line.pk]]
+        if moved:
+            # Park reordered lines above every used position first, so no
+            # intermediate state violates unique_position_no_per_document
+            final_positions = [line.position_no for line in moved]
+            offset = max(max(original_positions.values()), max(positions))
+            for number, line in enumerate(moved, start=offset + 1):
+                line.position_no = number
+            SalesDocumentLine.objects.bulk_update(moved, ['position_no'])
+            for line, position_no in zip(moved, final_positions):
+                line.position_no = position_no
+
+        fields = set().union(*updated.values()) | set(DocumentCalculationService.LINE_TOTAL_FIELDS)
+        SalesDocumentLine.objects.bulk_update(changed, sorted(fields))
+
+    if created:
+        SalesDocumentLine.objects.bulk_create(created)
+
+    # Document totals from all lines (stored line totals for untouched lines), saved once
+    totals = [DocumentCalculationService.line_contribution(line) for line in remaining + created]
+    document.total_net = sum((t.total_net for t in totals), Decimal('0.00'))
+    document.total_tax = sum((t.total_tax for t in totals), Decimal('0.00'))
+    document.total_gross = sum((t.total_gross for t in totals), Decimal('0.00'))
+    document.save(update_fields=DocumentCalculationService.DOCUMENT_TOTAL_FIELDS)
+
+    return sorted(remaining + created, key=lambda line: line.position_no), created
+
+
+@login_required
+@require_http_methods(["POST"])
+def ajax_batch_lines(request, doc_key, pk):
+    """
+    AJAX endpoint to apply many line changes in one request
+
+    Creating, updating, deleting and reordering (position_no) lines of a
+    document happens in one transaction with bulk operations; the new totals
+    are calculated and returned once. Reordering a long offer is therefore a
+    single round-trip instead of one request per line.
+
+    POST body (JSON):
+        {"changes": [
+            {"action": "create", "item_id": 1, "quantity": "2", ...},
+            {"action": "update", "id": 17, "position_no": 1, "quantity": "3,5", ...},
+            {"action": "delete", "id": 18}
+        ]}
+
+        Changes are applied in order. create accepts the fields of ajax_add_line
+        (item_id, line_type, is_selected, short_text_1, short_text_2, long_text,
+        description, quantity, unit_id, unit_price_net, discount, is_discountable,
+        tax_rate_id, kostenart1_id, kostenart2_id) plus position_no (default:
+        appended); update accepts the same fields except item_id. Position numbers
+        must be unique after all changes.
+
+    Returns:
+        JSON: {success, created_ids, lines, totals} on success; lines holds
+        id, position_no and the line totals of every line of the document.
+        Invalid changes return HTTP 400 with {'success': False, 'error': ...}
+        and nothing is written.
+    """
+    try:
+        data = json.loads(request.body) if request.body else {}
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Ungültiger JSON-Body.'}, status=400)
+
+    changes = data.get('changes') if isinstance(data, dict) else None
+    if not isinstance(changes, list) or not changes:
+        return JsonResponse({'success': False, 'error': 'Keine Änderungen übermittelt.'}, status=400)
+    if len(changes) > LINE_BATCH_MAX_CHANGES:
+        return JsonResponse(
+            {'success': False, 'error': f'Höchstens {LINE_BATCH_MAX_CHANGES} Änderungen pro Anfrage möglich.'},
+            status=400
+        )
+
+    try:
+        with transaction.atomic():
+            document = get_object_or_404(
+                SalesDocument.objects.select_for_update(of=('self',)).select_related('customer'), pk=pk
+            )
+            lines, created = _apply_line_batch(document, changes)
+    except Http404:
+        raise
+    except ValueError as e:
+        logger.warning(f"Validation error in line batch for document {pk}: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception(f"Error applying line batch to document {pk}: {e}")
+        return JsonResponse({'success': False, 'error': 'An internal error has occurred.'}, status=500)
+
+    return JsonResponse({
+        'success': True,
+        'created_ids': [line.pk for line in created],
+        'lines': [
+            {
+                'id': line.pk,
+                'position_no': line.position_no,
+                'line_net': str(line.line_net),
+                'line_tax': str(line.line_tax),
+                'line_gross': str(line.line_gross),
+            }
+            for line in lines
+        ],
+        'totals': {
+            'total_net': str(document.total_net),
+            'total_tax': str(document.total_tax),
+            'total_gross': str(document.total_gross),
+        }
+    })
+
+
 @login_required
 @require_http_methods(["GET"])
 def ajax_get_kostenart2_options(request):
@@ -2287,6 +2639,26 @@ def journal_detail(request, pk):
     return render(request, 'auftragsverwaltung/journal/detail.html', context)
 
 
+def _archived_pdf_response(report, filename, as_attachment=False):
+    """
+    Stream the archived PDF of a finalized invoice (see InvoiceArchiveService).
+
+    Args:
+        report: ReportDocument with the archived PDF
+        filename: Download filename
+        as_attachment: Download instead of inline display
+
+    Returns:
+        FileResponse streaming the stored file
+    """
+    return FileResponse(
+        report.pdf_file.open('rb'),
+        content_type='application/pdf',
+        as_attachment=as_attachment,
+        filename=filename,
+    )
+
+
 @login_required
 @require_http_methods(["GET"])
 def document_pdf(request, pk):
@@ -2294,7 +2666,8 @@ def document_pdf(request, pk):
     Generate and download PDF for a SalesDocument.
     
     Generates a PDF invoice using the Core Printing Framework and returns it
-    as a downloadable file.
+    as a downloadable file. Finalized invoices are served from their archived
+    PDF (rendered once, see InvoiceArchiveService).
     
     Args:
         request: HTTP request
@@ -2318,6 +2691,17 @@ def document_pdf(request, pk):
     # For now, we rely on @login_required decorator which is consistent
     # with other views in this module.
     
+    # Generate PDF
+    pdf_service = PdfRenderService(cache=PdfCache())
+    
+    # Sanitize document number for filename (remove/replace unsafe characters)
+    safe_number = ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in document.number)
+    
+    # Finalized invoices are served from the archive, before any context is built
+    report = InvoiceArchiveService.get_or_archive(document, pdf_service=pdf_service, created_by=request.user)
+    if report is not None:
+        return _archived_pdf_response(report, f'Rechnung_{safe_number}.pdf')
+    
     # Build context using context builder
     context_builder = SalesDocumentInvoiceContextBuilder()
     context = context_builder.build_context(document)
@@ -2327,12 +2711,6 @@ def document_pdf(request, pk):
     # This handles both development (with app-specific static dirs) and production (with STATIC_ROOT)
     base_url = get_static_base_url()
     
-    # Generate PDF
-    pdf_service = PdfRenderService()
-    
-    # Sanitize document number for filename (remove/replace unsafe characters)
-    safe_number = ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in document.number)
-    
     result = pdf_service.render(
         template_name=template_name,
         context=context,
@@ -2355,16 +2733,18 @@ def documents_bulk_print(request, doc_key):
     """
     Generate a merged PDF for multiple selected documents.
 
+    Up to BulkPrintService.SYNC_LIMIT documents are rendered within the request
+    and returned as PDF. Larger selections are rendered in a background job
+    (process pool); the response then is HTTP 202 with the URL to poll
+    (documents_bulk_print_status) for the progress and the download URL.
+
     Args:
         request: HTTP request with POST data containing 'document_ids[]'
         doc_key: The document type key (e.g., 'quote', 'order', 'invoice')
 
     Returns:
-        HttpResponse with merged PDF content or error message
+        FileResponse with the merged PDF, JSON with the job or error message
     """
-    from pypdf import PdfWriter, PdfReader
-    from io import BytesIO
-
     # Get document IDs from POST data
     document_ids = request.POST.getlist('document_ids[]')
 
@@ -2386,77 +2766,108 @@ def documents_bulk_print(request, doc_key):
     # Get the document type
     document_type = get_object_or_404(DocumentType, key=doc_key, is_active=True)
 
-    # Get all selected documents with validation
-    documents = SalesDocument.objects.select_related(
-        'company', 'customer', 'document_type'
-    ).filter(
+    # Get all selected documents (print order) with validation
+    ordered_ids = list(SalesDocument.objects.filter(
         pk__in=document_ids,
         document_type=document_type
-    ).order_by('issue_date', 'number')
+    ).order_by('issue_date', 'number').values_list('pk', flat=True))
 
-    if not documents.exists():
+    if not ordered_ids:
         return JsonResponse({
             'success': False,
             'error': 'Keine gültigen Dokumente gefunden.'
         }, status=404)
 
-    # Initialize context builder and PDF service
-    context_builder = SalesDocumentInvoiceContextBuilder()
-    pdf_service = PdfRenderService()
-    base_url = get_static_base_url()
-
-    # Create PDF merger
-    pdf_writer = PdfWriter()
-
-    # Generate and merge PDFs for each document
-    for document in documents:
-        try:
-            # Build context and get template
-            context = context_builder.build_context(document)
-            template_name = context_builder.get_template_name(document)
-
-            # Generate PDF for this document
-            result = pdf_service.render(
-                template_name=template_name,
-                context=context,
-                base_url=base_url,
-                filename=f'{document.number}.pdf'
-            )
-
-            # Add to merger
-            pdf_reader = PdfReader(BytesIO(result.pdf_bytes))
-            for page in pdf_reader.pages:
-                pdf_writer.add_page(page)
+    if len(ordered_ids) > BulkPrintService.SYNC_LIMIT:
+        job = BulkPrintService.start_job(document_type, ordered_ids, user=request.user)
+        return JsonResponse({
+            'success': True,
+            'job_id': job.pk,
+            'status_url': reverse(
+                'auftragsverwaltung:documents_bulk_print_status',
+                kwargs={'doc_key': doc_key, 'job_id': job.pk}
+            ),
+        }, status=202)
 
-        except Exception as e:
-            logger.error(f"Error generating PDF for document {document.number}: {e}")
-            # Continue with other documents
-            continue
+    # Generate the PDFs (failed documents are logged and skipped) and merge them
+    # into a spooled temporary file
+    merged_file, page_count = BulkPrintService.merge_documents(ordered_ids, workers=1)
 
     # Check if we have any pages
-    if len(pdf_writer.pages) == 0:
+    if page_count == 0:
+        merged_file.close()
         return JsonResponse({
             'success': False,
             'error': 'Fehler beim Erstellen der PDFs.'
         }, status=500)
 
-    # Write merged PDF to bytes
-    output_buffer = BytesIO()
-    pdf_writer.write(output_buffer)
-    merged_pdf_bytes = output_buffer.getvalue()
-
     # Generate filename
-    filename = f'{document_type.name}_Sammeldruck_{len(documents)}_Dokumente.pdf'
+    filename = f'{document_type.name}_Sammeldruck_{len(ordered_ids)}_Dokumente.pdf'
 
-    # Return merged PDF
-    response = HttpResponse(merged_pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    # Stream the merged PDF (the file is closed by the response)
+    response = FileResponse(merged_file, content_type='application/pdf', filename=filename)
 
-    logger.info(f"Generated merged PDF for {len(documents)} documents ({len(merged_pdf_bytes)} bytes)")
+    logger.info(f"Generated merged PDF for {len(ordered_ids)} documents ({page_count} pages)")
 
     return response
 
 
+@login_required
+@require_http_methods(["GET"])
+def documents_bulk_print_status(request, doc_key, job_id):
+    """
+    Progress of a bulk print job (polled by the document list).
+
+    Returns:
+        JSON: {success, status, status_display, document_count, processed_count,
+        failed_count, progress, download_url (when completed), error (when failed)}
+    """
+    # A job whose thread was lost (e.g. server restart) would otherwise be polled forever
+    BulkPrintService.fail_stale(BulkPrintJob.objects.filter(pk=job_id))
+    job = get_object_or_404(
+        BulkPrintJob, pk=job_id, document_type__key=doc_key, created_by=request.user
+    )
+    data = {
+        'success': job.status != 'FAILED',
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'document_count': job.document_count,
+        'processed_count': job.processed_count,
+        'failed_count': job.failed_count,
+        'progress': job.progress_percent,
+    }
+    if job.status == 'COMPLETED':
+        data['download_url'] = reverse(
+            'auftragsverwaltung:documents_bulk_print_download',
+            kwargs={'doc_key': doc_key, 'job_id': job.pk}
+        )
+    if job.status == 'FAILED':
+        data['error'] = job.error_message or 'Fehler beim Erstellen der PDFs.'
+    return JsonResponse(data)
+
+
+@login_required
+@require_http_methods(["GET"])
+def documents_bulk_print_download(request, doc_key, job_id):
+    """
+    Download the merged PDF of a completed bulk print job.
+
+    Returns:
+        FileResponse with the PDF (streamed from the stored file)
+    """
+    job = get_object_or_404(
+        BulkPrintJob.objects.select_related('document_type'),
+        pk=job_id, document_type__key=doc_key, created_by=request.user, status='COMPLETED'
+    )
+    if not job.pdf_file:
+        raise Http404('Der Sammeldruck ist nicht mehr verfügbar.')
+    return FileResponse(
+        job.pdf_file.open('rb'),
+        content_type='application/pdf',
+        filename=job.filename,
+    )
+
+
 @login_required
 @require_POST
 def invoice_finalize(request, pk):
@@ -2495,8 +2906,8 @@ def invoice_finalize(request, pk):
         }, status=400)
 
     try:
-        # Finalize invoice
-        document, was_modified = finalize_invoice(document)
+        # Finalize invoice (the PDF is archived below)
+        document, was_modified = finalize_invoice(document, archive=False)
 
         # Log activity
         if was_modified:
@@ -2512,25 +2923,12 @@ def invoice_finalize(request, pk):
             )
             logger.info(f"Invoice {document.number} finalized by {request.user.username}")
 
-        # Generate PDF for download
-        context_builder = SalesDocumentInvoiceContextBuilder()
-        context = context_builder.build_context(document)
-        template_name = context_builder.get_template_name(document)
-        base_url = get_static_base_url()
-
-        pdf_service = PdfRenderService()
+        # Archive the PDF once and return the archived file
         safe_number = ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in (document.number or 'Entwurf'))
-
-        result = pdf_service.render(
-            template_name=template_name,
-            context=context,
-            base_url=base_url,
-            filename=f'Rechnung_{safe_number}.pdf'
+        report = InvoiceArchiveService.archive(
+            document, pdf_service=PdfRenderService(cache=PdfCache()), created_by=request.user
         )
-
-        # Return PDF as downloadable file
-        response = HttpResponse(result.pdf_bytes, content_type=result.content_type)
-        response['Content-Disposition'] = f'inline; filename="{result.filename}"'
+        response = _archived_pdf_response(report, f'Rechnung_{safe_number}.pdf')
 
         logger.info(f"Invoice {document.number} finalized and PDF generated by {request.user.username}")
 
@@ -2679,21 +3077,18 @@ def invoice_print_internal(request, pk):
             # Log but don't fail the print operation
             logger.warning(f"Internal email failed for invoice {document.number}: {str(e)}")
 
-        # Generate PDF for download
-        context_builder = SalesDocumentInvoiceContextBuilder()
-        context = context_builder.build_context(document)
-        template_name = context_builder.get_template_name(document)
-        base_url = get_static_base_url()
-
-        pdf_service = PdfRenderService()
+        # Generate PDF for download (finalized invoices: the archived PDF)
+        pdf_service = PdfRenderService(cache=PdfCache())
         safe_number = ''.join(c if c.isalnum() or c in ('-', '_') else '_' for c in (document.number or 'Entwurf'))
-
-        result = pdf_service.render(
-            template_name=template_name,
-            context=context,
-            base_url=base_url,
-            filename=f'Rechnung_{safe_number}.pdf'
-        )
+        report = InvoiceArchiveService.get_or_archive(document, pdf_service=pdf_service, created_by=request.user)
+        if report is None:
+            context_builder = SalesDocumentInvoiceContextBuilder()
+            result = pdf_service.render(
+                template_name=context_builder.get_template_name(document),
+                context=context_builder.build_context(document),
+                base_url=get_static_base_url(),
+                filename=f'Rechnung_{safe_number}.pdf'
+            )
 
         # Log activity
         ActivityStreamService.add(
@@ -2708,8 +3103,11 @@ def invoice_print_internal(request, pk):
         )
 
         # Return PDF as downloadable file
-        response = HttpResponse(result.pdf_bytes, content_type=result.content_type)
-        response['Content-Disposition'] = f'attachment; filename="{result.filename}"'
+        if report is not None:
+            response = _archived_pdf_response(report, f'Rechnung_{safe_number}.pdf', as_attachment=True)
+        else:
+            response = HttpResponse(result.pdf_bytes, content_type=result.content_type)
+            response['Content-Disposition'] = f'attachment; filename="{result.filename}"'
 
         logger.info(f"Invoice {document.number or 'draft'} printed by {request.user.username}")
 
@@ -7,6 +7,7 @@ Provides modular, extensible PDF generation from HTML templates using WeasyPrint
 from .interfaces import IPdfRenderer, IContextBuilder
 from .dto import PdfResult
 from .service import PdfRenderService
+from .cache import PdfCache
 from .sanitizer import sanitize_html
 from .utils import get_static_base_url
 
@@ -15,6 +16,7 @@ __all__ = [
     'IContextBuilder',
     'PdfResult',
     'PdfRenderService',
+    'PdfCache',
     'sanitize_html',
     'get_static_base_url',
 ]
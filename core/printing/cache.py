@@ -0,0 +1,267 @@
+"""
+PDF Cache
+
+Content-addressed disk cache for rendered PDFs.
+
+The cache key is a SHA-256 hash of everything the PDF is rendered from: the
+template name, the version of the template source (and of the templates it
+extends or includes), the render context, the version of the shared print
+stylesheet (printing/print.css) and the version of local files referenced in
+the context (file:// URLs, e.g. the company logo). An unchanged document is
+therefore served from the cache, any change of its data or its templates
+renders a new PDF.
+
+Files are stored under MEDIA_ROOT/pdf_cache/ (PDF_CACHE_DIR). Every hit
+refreshes the file's modification time; when the cache grows beyond
+PDF_CACHE_MAX_BYTES the least recently used files are deleted. The size of
+the cache is tracked per process from the stored PDFs, so the directory is
+only scanned once that estimate exceeds the limit; eviction then frees room
+down to EVICT_TO of the limit, so the next scan is many puts away.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import find as find_static
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+logger = logging.getLogger(__name__)
+
+
+# Stylesheet shared by all print templates
+PRINT_STYLESHEET = 'printing/print.css'
+
+
+def _file_version(path) -> str:
+    """Version of a local file (modification time and size), '' if missing."""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return ''
+    return f'{stat.st_mtime_ns}-{stat.st_size}'
+
+
+def get_stylesheet_version() -> str:
+    """Version of printing/print.css (changes whenever the file changes)."""
+    static_root = getattr(settings, 'STATIC_ROOT', None)
+    if static_root and (Path(static_root) / PRINT_STYLESHEET).exists():
+        return _file_version(Path(static_root) / PRINT_STYLESHEET)
+    return _file_version(find_static(PRINT_STYLESHEET))
+
+
+def get_template_versions(template_name: str) -> dict:
+    """
+    Version of a template's source file and of the templates it extends or includes.
+
+    Only constant template names ({% extends "x.html" %}, {% include "y.html" %})
+    can be followed; templates chosen by a variable are covered by the context.
+
+    Args:
+        template_name: Django template path
+
+    Returns:
+        dict: Template name -> version ('' for templates without a file);
+        empty if the template does not exist
+    """
+    versions = {}
+    pending = [template_name]
+    while pending:
+        name = pending.pop()
+        if name in versions:
+            continue
+        try:
+            template = get_template(name)
+        except TemplateDoesNotExist:
+            versions[name] = ''
+            continue
+        versions[name] = _file_version(template.origin.name)
+        nodelist = getattr(getattr(template, 'template', None), 'nodelist', None)
+        if nodelist is None:
+            continue
+        for node in nodelist.get_nodes_by_type(ExtendsNode):
+            pending.append(node.parent_name.var)
+        for node in nodelist.get_nodes_by_type(IncludeNode):
+            pending.append(node.template.var)
+        pending = [item for item in pending if isinstance(item, str)]
+    return versions
+
+
+class PdfCache:
+    """
+    Content-addressed disk cache for rendered PDFs with LRU eviction.
+
+    Usage:
+        cache = PdfCache()
+        key = cache.make_key(template_name, context)
+        pdf_bytes = cache.get(key)
+        if pdf_bytes is None:
+            pdf_bytes = render(...)
+            cache.put(key, pdf_bytes)
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    # Eviction frees room down to this fraction of max_bytes
+    EVICT_TO = 0.9
+
+    # Estimated size per cache directory (this process); None until the first scan
+    _sizes = {}
+    _sizes_lock = threading.Lock()
+
+    def __init__(self, root=None, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Cache directory (default: settings.PDF_CACHE_DIR or MEDIA_ROOT/pdf_cache)
+            max_bytes: Size limit of the cache (default: settings.PDF_CACHE_MAX_BYTES or 256 MB)
+        """
+        if root is None:
+            root = getattr(settings, 'PDF_CACHE_DIR', None) or Path(settings.MEDIA_ROOT) / 'pdf_cache'
+        if max_bytes is None:
+            max_bytes = getattr(settings, 'PDF_CACHE_MAX_BYTES', self.DEFAULT_MAX_BYTES)
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def make_key(self, template_name: str, context: dict, **options) -> str:
+        """
+        Build the cache key of a PDF.
+
+        Args:
+            template_name: Django template path
+            context: Template context (JSON-serializable with str() fallback)
+            **options: Further render options that change the PDF (e.g. base_url)
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        files = {}
+        self._collect_files(context, files)
+        payload = json.dumps(
+            {
+                'template': template_name,
+                'templates': get_template_versions(template_name),
+                'context': context,
+                'options': options,
+                'stylesheet': get_stylesheet_version(),
+                'files': files,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _collect_files(cls, value, files: dict) -> None:
+        """Record the version of every local file referenced by a file:// URL."""
+        if isinstance(value, dict):
+            for item in value.values():
+                cls._collect_files(item, files)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                cls._collect_files(item, files)
+        elif isinstance(value, str) and value.startswith('file://'):
+            files[value] = _file_version(value[len('file://'):])
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.pdf'
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached PDF (and mark it as recently used).
+
+        Returns:
+            PDF bytes or None if not cached
+        """
+        path = self._path(key)
+        try:
+            pdf_bytes = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return pdf_bytes or None
+
+    def put(self, key: str, pdf_bytes: bytes) -> None:
+        """
+        Store a PDF and evict the least recently used files above the size limit.
+
+        The file is written to a temporary file and renamed, so concurrent
+        readers never see a partial PDF. Errors are logged, not raised.
+        """
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as tmp_file:
+                    tmp_file.write(pdf_bytes)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not store PDF in cache {self.root}: {e}")
+            return
+
+        with self._sizes_lock:
+            size = self._sizes.get(self.root)
+            if size is not None:
+                # Overwritten files are counted twice: the estimate errs on the high side
+                size += len(pdf_bytes)
+                self._sizes[self.root] = size
+        if size is None or size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used PDFs if the cache exceeds max_bytes.
+
+        Scans the cache directory, frees room down to EVICT_TO of max_bytes
+        and resets the size estimate used by put().
+
+        Returns:
+            int: Number of deleted files
+        """
+        entries = []
+        total = 0
+        for path in self.root.glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        deleted = 0
+        if total > self.max_bytes:
+            limit = self.max_bytes * self.EVICT_TO
+            for _mtime, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= limit:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                deleted += 1
+        with self._sizes_lock:
+            self._sizes[self.root] = total
+        return deleted
+
+    def clear(self) -> None:
+        """Delete all cached PDFs."""
+        for path in self.root.glob('*/*.pdf'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._sizes_lock:
+            self._sizes.pop(self.root, None)
@@ -0,0 +1,177 @@
+"""
+Streaming PDF Merge
+
+Concatenates PDFs page by page into a binary file object without holding the
+merged document in memory. pypdf's PdfWriter keeps every added page until the
+document is written; StreamingPdfMerger writes the objects of a source PDF as
+soon as it is added, so only the current source PDF is held in memory. The
+cross-reference entries and the page list of the merged document are spooled
+to temporary files, so memory use is bounded by the largest source PDF, not
+by the number of merged pages.
+
+Only the pages (with everything they reference: content, resources, fonts,
+annotations) are copied; document-level structures of the sources (outlines,
+forms, metadata) are not.
+"""
+
+import tempfile
+from io import BytesIO
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject
+
+
+class StreamingPdfMerger:
+    """
+    Appends the pages of PDFs to a binary file object, one source at a time.
+
+    Usage:
+        merger = StreamingPdfMerger(target)
+        for pdf_bytes in pdfs:
+            merger.add(pdf_bytes)
+        page_count = merger.close()
+    """
+
+    # Object numbers of the catalog and the page tree root (written by close())
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, target):
+        """
+        Initialize the merger.
+
+        Args:
+            target: Writable binary file object (nothing is written before the first page)
+        """
+        self.target = target
+        self.page_count = 0
+        self._start = None
+        self._next_number = self.PAGES + 1
+        # Fixed-width xref entries of the objects 3..n and the page references, in order
+        self._xref = tempfile.TemporaryFile()
+        self._kids = tempfile.TemporaryFile()
+
+    def add(self, pdf_bytes: bytes) -> int:
+        """
+        Append the pages of a PDF.
+
+        Args:
+            pdf_bytes: PDF content
+
+        Returns:
+            int: Number of pages appended
+        """
+        reader = PdfReader(BytesIO(pdf_bytes))
+        try:
+            return self._add_pages(reader)
+        finally:
+            # Parsed objects point back to the reader (reference cycles): drop them now
+            # instead of leaving every source PDF to the cyclic garbage collector
+            reader.resolved_objects.clear()
+            reader.flattened_pages = None
+
+    def _add_pages(self, reader: PdfReader) -> int:
+        pages = {}
+        for page in reader.pages:
+            # The flattened page (inherited MediaBox/Resources resolved) replaces the stored one
+            pages[(page.indirect_reference.idnum, page.indirect_reference.generation)] = page
+        if not pages:
+            return 0
+        if self._start is None:
+            self._start = self.target.tell()
+            self.target.write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+
+        # Objects are numbered in the order they are found and written first in, first out,
+        # so the xref entries can be spooled in object number order
+        numbers = {}
+        queue = []
+
+        def ref(indirect: IndirectObject) -> IndirectObject:
+            key = (indirect.idnum, indirect.generation)
+            if key not in numbers:
+                numbers[key] = self._next_number
+                self._next_number += 1
+                queue.append(key)
+            return IndirectObject(numbers[key], 0, None)
+
+        def copy(value):
+            if isinstance(value, IndirectObject):
+                return ref(value)
+            if isinstance(value, DictionaryObject):
+                result = DictionaryObject()
+                for name, item in dict.items(value):
+                    result[NameObject(name)] = copy(item)
+                return result
+            if isinstance(value, ArrayObject):
+                return ArrayObject(copy(item) for item in list.__iter__(value))
+            return value
+
+        for key, page in pages.items():
+            ref(page.indirect_reference)
+            self._kids.write(b'%d 0 R ' % numbers[key])
+
+        position = 0
+        while position < len(queue):
+            key = queue[position]
+            position += 1
+            obj = pages[key] if key in pages else reader.get_object(IndirectObject(key[0], key[1], reader))
+            self._xref.write(b'%010d 00000 n \n' % (self.target.tell() - self._start))
+            self.target.write(b'%d 0 obj\n' % numbers[key])
+            if obj is None:
+                self.target.write(b'null')
+            elif isinstance(obj, StreamObject):
+                # The raw (still encoded) stream data is copied as is, with its filters
+                data = obj._data
+                header = copy(DictionaryObject({name: item for name, item in dict.items(obj) if name != '/Length'}))
+                header[NameObject('/Length')] = NumberObject(len(data))
+                header.write_to_stream(self.target)
+                self.target.write(b'\nstream\n')
+                self.target.write(data)
+                self.target.write(b'\nendstream')
+            else:
+                obj = copy(obj)
+                if key in pages:
+                    obj[NameObject('/Parent')] = IndirectObject(self.PAGES, 0, None)
+                obj.write_to_stream(self.target)
+            self.target.write(b'\nendobj\n')
+
+        self.page_count += len(pages)
+        return len(pages)
+
+    def close(self) -> int:
+        """
+        Write the page tree, the catalog and the cross-reference table.
+
+        Returns:
+            int: Number of pages written (nothing is written for 0 pages)
+        """
+        try:
+            if not self.page_count:
+                return 0
+            catalog_offset = self.target.tell() - self._start
+            self.target.write(b'%d 0 obj\n<< /Type /Catalog /Pages %d 0 R >>\nendobj\n' % (self.CATALOG, self.PAGES))
+            pages_offset = self.target.tell() - self._start
+            self.target.write(b'%d 0 obj\n<< /Type /Pages /Count %d /Kids [ ' % (self.PAGES, self.page_count))
+            self._copy_spool(self._kids)
+            self.target.write(b'] >>\nendobj\n')
+
+            xref_offset = self.target.tell() - self._start
+            self.target.write(b'xref\n0 %d\n0000000000 65535 f \n' % self._next_number)
+            self.target.write(b'%010d 00000 n \n%010d 00000 n \n' % (catalog_offset, pages_offset))
+            self._copy_spool(self._xref)
+            self.target.write(
+                b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                % (self._next_number, self.CATALOG, xref_offset)
+            )
+            return self.page_count
+        finally:
+            self._xref.close()
+            self._kids.close()
+
+    def _copy_spool(self, spool) -> None:
+        spool.seek(0)
+        while True:
+            chunk = spool.read(1024 * 1024)
+            if not chunk:
+                break
+            self.target.write(chunk)
@@ -13,7 +13,8 @@ from django.conf import settings
 
 from .interfaces import IPdfRenderer
 from .dto import PdfResult
-from .weasyprint_renderer import WeasyPrintRenderer
+from .cache import PdfCache
+from .weasyprint_renderer import get_renderer_pool
 from .sanitizer import sanitize_html
 
 logger = logging.getLogger(__name__)
@@ -47,20 +48,23 @@ class PdfRenderService:
     Note: No document-type specific logic - that belongs in calling modules.
     """
     
-    def __init__(self, renderer: Optional[IPdfRenderer] = None):
+    def __init__(self, renderer: Optional[IPdfRenderer] = None, cache: Optional[PdfCache] = None):
         """
         Initialize PDF render service.
         
         Args:
-            renderer: PDF renderer implementation. If None, uses default WeasyPrint renderer.
+            renderer: PDF renderer implementation. If None, uses the process-wide
+                WeasyPrint renderer pool.
+            cache: PdfCache for rendered PDFs. If None, every call renders.
         """
         self._renderer = renderer or self._get_default_renderer()
+        self._cache = cache
     
     def _get_default_renderer(self) -> IPdfRenderer:
         """Get default PDF renderer based on settings."""
         # For now, always use WeasyPrint
         # In the future, this could read from settings.PDF_RENDERER
-        return WeasyPrintRenderer()
+        return get_renderer_pool()
     
     def render(
         self,
@@ -88,6 +92,14 @@ class PdfRenderService:
             TemplateNotFoundError: If template doesn't exist
             RenderError: If rendering fails
         """
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache.make_key(template_name, context, base_url=base_url, sanitize=sanitize)
+            pdf_bytes = self._cache.get(cache_key)
+            if pdf_bytes is not None:
+                logger.debug(f"PDF cache hit: {filename or 'unnamed'}")
+                return PdfResult(pdf_bytes=pdf_bytes, filename=filename)
+        
         try:
             # 1. Render HTML via Django template
             logger.debug(f"Rendering template: {template_name}")
@@ -102,6 +114,9 @@ class PdfRenderService:
             logger.debug(f"Rendering PDF with base_url: {base_url}")
             pdf_bytes = self._renderer.render_html_to_pdf(html, base_url)
             
+            if cache_key is not None:
+                self._cache.put(cache_key, pdf_bytes)
+            
             # 4. Create result
             result = PdfResult(
                 pdf_bytes=pdf_bytes,
@@ -2,21 +2,33 @@
 WeasyPrint PDF Renderer
 
 Infrastructure adapter for WeasyPrint rendering engine.
+
+Setting up a renderer (font configuration, parsed stylesheets) is expensive,
+so PdfRenderService renders with a process-wide pool of renderers
+(get_renderer_pool()) instead of a new renderer per document. Each renderer
+keeps local resources such as printing/print.css and the company logo in
+memory, together with the decoded images.
 """
 
 from typing import Optional
+from urllib.parse import unquote, urlsplit
 import logging
+import mimetypes
+import os
+import threading
 
 try:
-    from weasyprint import HTML, CSS
+    from weasyprint import HTML, CSS, default_url_fetcher
     from weasyprint.text.fonts import FontConfiguration
 except ImportError:
     # Allow imports to succeed even if WeasyPrint is not installed
     # This allows the module to be imported during migrations, etc.
     HTML = None
     CSS = None
+    default_url_fetcher = None
     FontConfiguration = None
 
+from .cache import _file_version
 from .interfaces import IPdfRenderer
 
 logger = logging.getLogger(__name__)
@@ -48,6 +60,20 @@ class WeasyPrintRenderer(IPdfRenderer):
         
         self.additional_css = additional_css
         self._font_config = FontConfiguration()
+        
+        # Parsed once, reused for every document
+        self._stylesheets = []
+        if additional_css:
+            self._stylesheets.append(CSS(
+                string=additional_css,
+                font_config=self._font_config
+            ))
+        
+        self._resources = PrintResourceCache()
+    
+    def _url_fetcher(self, url: str, *args, **kwargs) -> dict:
+        """Serve local resources from memory, fetch everything else as usual."""
+        return self._resources.fetch(url) or default_url_fetcher(url, *args, **kwargs)
     
     def render_html_to_pdf(self, html: str, base_url: str) -> bytes:
         """
@@ -65,20 +91,13 @@ class WeasyPrintRenderer(IPdfRenderer):
         """
         try:
             # Create HTML document
-            html_doc = HTML(string=html, base_url=base_url)
-            
-            # Prepare stylesheets
-            stylesheets = []
-            if self.additional_css:
-                stylesheets.append(CSS(
-                    string=self.additional_css,
-                    font_config=self._font_config
-                ))
+            html_doc = HTML(string=html, base_url=base_url, url_fetcher=self._url_fetcher)
             
             # Render to PDF
             pdf_bytes = html_doc.write_pdf(
-                stylesheets=stylesheets,
-                font_config=self._font_config
+                stylesheets=self._stylesheets,
+                font_config=self._font_config,
+                cache=self._resources.image_cache
             )
             
             logger.info(
@@ -91,3 +110,126 @@ class WeasyPrintRenderer(IPdfRenderer):
         except Exception as e:
             logger.error(f"Failed to render PDF: {e}", exc_info=True)
             raise RuntimeError(f"PDF rendering failed: {e}") from e
+
+
+class PrintResourceCache:
+    """
+    In-memory cache for local resources (file:// URLs) of printed documents.
+    
+    Stylesheets and images such as printing/print.css and the company logo are
+    read from disk once. A changed file (modification time or size) is read
+    again and the decoded images (image_cache, WeasyPrint's image cache) are
+    dropped.
+    """
+    
+    def __init__(self):
+        """Initialize an empty cache."""
+        self.image_cache = {}
+        self._files = {}
+    
+    def fetch(self, url: str) -> Optional[dict]:
+        """
+        Get a local resource in the format of a WeasyPrint URL fetcher.
+        
+        Args:
+            url: Resource URL
+            
+        Returns:
+            dict with the file content, or None if url is not a file:// URL
+            
+        Raises:
+            OSError: If the file cannot be read
+        """
+        if not url.startswith('file://'):
+            return None
+        
+        path = unquote(urlsplit(url).path)
+        version = _file_version(path)
+        cached = self._files.get(url)
+        if cached is None or cached[0] != version:
+            if cached is not None:
+                self.image_cache.clear()
+            with open(path, 'rb') as resource_file:
+                cached = (version, resource_file.read())
+            self._files[url] = cached
+        
+        return {
+            'string': cached[1],
+            'mime_type': mimetypes.guess_type(path)[0],
+            'redirected_url': url,
+            'filename': os.path.basename(path),
+        }
+
+
+class WeasyPrintRendererPool(IPdfRenderer):
+    """
+    Pool of WeasyPrint renderers, shared by all PdfRenderServices of a process.
+    
+    A renderer must not be used by two threads at once, so every document is
+    rendered with an idle renderer of the pool; a new one is only created when
+    all renderers are busy. Up to max_idle renderers are kept warm.
+    """
+    
+    MAX_IDLE = 4
+    
+    def __init__(self, factory=WeasyPrintRenderer, max_idle: Optional[int] = None):
+        """
+        Initialize the pool.
+        
+        Args:
+            factory: Callable creating a renderer (default: WeasyPrintRenderer)
+            max_idle: Number of renderers kept (default: MAX_IDLE)
+        """
+        self._factory = factory
+        self.max_idle = self.MAX_IDLE if max_idle is None else max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> IPdfRenderer:
+        """Take an idle renderer (or a new one) out of the pool."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._factory()
+    
+    def release(self, renderer: IPdfRenderer) -> None:
+        """Return a renderer to the pool."""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(renderer)
+    
+    def render_html_to_pdf(self, html: str, base_url: str) -> bytes:
+        """Render HTML to PDF with a renderer of the pool."""
+        renderer = self.acquire()
+        try:
+            return renderer.render_html_to_pdf(html, base_url)
+        finally:
+            self.release(renderer)
+
+
+_renderer_pool = None
+_renderer_pool_lock = threading.Lock()
+
+
+def get_renderer_pool() -> WeasyPrintRendererPool:
+    """
+    Get the process-wide WeasyPrint renderer pool.
+    
+    Returns:
+        WeasyPrintRendererPool
+        
+    Raises:
+        ImportError: If WeasyPrint is not installed
+    """
+    global _renderer_pool
+    
+    if HTML is None:
+        raise ImportError(
+            "WeasyPrint is not installed. "
+            "Install it with: pip install weasyprint"
+        )
+    
+    with _renderer_pool_lock:
+        if _renderer_pool is None:
+            _renderer_pool = WeasyPrintRendererPool()
+        return _renderer_pool
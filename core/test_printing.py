@@ -288,3 +288,217 @@ class UtilsTest(TestCase):
         # In CI without collectstatic, this might not be true, so we don't fail
         if css_path.exists():
             self.assertTrue(css_path.is_file())
+
+
+class PdfCacheTest(TestCase):
+    """Test the content-addressed PDF cache."""
+    
+    def setUp(self):
+        """Set up a cache in a temporary directory."""
+        import tempfile
+        from core.printing import PdfCache
+        
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = PdfCache(root=self.tmp_dir.name, max_bytes=250)
+    
+    def test_key_depends_on_template_context_and_files(self):
+        """The key changes with the template, the context and referenced files."""
+        from unittest.mock import patch
+        
+        logo = Path(self.tmp_dir.name) / 'logo.png'
+        logo.write_bytes(b'logo')
+        context = {'doc': {'number': 'R-1', 'total': 1}, 'company': {'logo_url': f'file://{logo}'}}
+        key = self.cache.make_key('printing/base.html', context)
+        
+        self.assertEqual(key, self.cache.make_key('printing/base.html', {**context}))
+        self.assertNotEqual(key, self.cache.make_key('printing/other.html', context))
+        self.assertNotEqual(key, self.cache.make_key(
+            'printing/base.html', {**context, 'doc': {'number': 'R-1', 'total': 2}}
+        ))
+        with patch('core.printing.cache.get_stylesheet_version', return_value='changed'):
+            self.assertNotEqual(key, self.cache.make_key('printing/base.html', context))
+        logo.write_bytes(b'new logo')
+        self.assertNotEqual(key, self.cache.make_key('printing/base.html', context))
+    
+    def test_key_depends_on_template_sources(self):
+        """The key changes with the template file and the templates it extends or includes."""
+        import os
+        from django.test import override_settings
+        
+        template_dir = Path(self.tmp_dir.name) / 'templates'
+        template_dir.mkdir()
+        (template_dir / 'base.html').write_text('<html>{% block content %}{% endblock %}</html>')
+        (template_dir / 'part.html').write_text('<p>{{ doc.number }}</p>')
+        (template_dir / 'page.html').write_text(
+            '{% extends "base.html" %}{% block content %}{% include "part.html" %}{% endblock %}'
+        )
+        templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [str(template_dir)]}]
+        context = {'doc': {'number': 'R-1'}}
+        
+        with override_settings(TEMPLATES=templates):
+            key = self.cache.make_key('page.html', context)
+            for name in ('page.html', 'base.html', 'part.html'):
+                path = template_dir / name
+                path.write_text(path.read_text() + ' ')
+                changed = self.cache.make_key('page.html', context)
+                self.assertNotEqual(key, changed, name)
+                key = changed
+            os.utime(template_dir / 'part.html', ns=(0, 0))
+            self.assertNotEqual(key, self.cache.make_key('page.html', context))
+    
+    def test_lru_eviction(self):
+        """Above the size limit the least recently used PDFs are deleted."""
+        import os
+        
+        for index, key in enumerate(['aa1', 'bb2', 'cc3']):
+            self.cache.put(key, b'x' * 100)
+            path = Path(self.tmp_dir.name) / key[:2] / f'{key}.pdf'
+            if path.exists():
+                os.utime(path, ns=(index * 10**9, index * 10**9))
+            if key == 'bb2':
+                # Reading aa1 makes bb2 the least recently used file
+                self.assertEqual(self.cache.get('aa1'), b'x' * 100)
+        
+        self.assertEqual(self.cache.get('aa1'), b'x' * 100)
+        self.assertIsNone(self.cache.get('bb2'))
+        self.assertEqual(self.cache.get('cc3'), b'x' * 100)
+    
+    def test_put_scans_only_above_size_estimate(self):
+        """The cache directory is scanned on the first put and when the size estimate exceeds the limit."""
+        from unittest.mock import patch
+        from core.printing import PdfCache
+        
+        with patch.object(PdfCache, 'evict', autospec=True, side_effect=PdfCache.evict) as mock_evict:
+            self.cache.put('aa1', b'x' * 100)
+            self.assertEqual(mock_evict.call_count, 1)
+            self.cache.put('bb2', b'x' * 50)
+            # A new instance (one per request) shares the estimate of the directory
+            PdfCache(root=self.tmp_dir.name, max_bytes=250).put('aa1', b'x' * 50)
+            self.assertEqual(mock_evict.call_count, 1)
+            self.cache.put('cc3', b'x' * 100)
+            self.assertEqual(mock_evict.call_count, 2)
+        
+        # The overwritten aa1 was counted twice: the scan finds 200 bytes, nothing is deleted
+        self.assertEqual(len(list(Path(self.tmp_dir.name).glob('*/*.pdf'))), 3)
+    
+    def test_render_service_serves_cached_pdf(self):
+        """A cached PDF is returned without rendering again."""
+        from unittest.mock import patch
+        
+        service = PdfRenderService(renderer=MockRenderer(), cache=self.cache)
+        context = {'title': 'Cached'}
+        with patch.object(MockRenderer, 'render_html_to_pdf', return_value=b'%PDF-1.4 cached') as mock_render:
+            first = service.render('printing/base.html', context, base_url='file:///tmp/', filename='a.pdf')
+            second = service.render('printing/base.html', context, base_url='file:///tmp/', filename='b.pdf')
+            service.render('printing/base.html', {'title': 'Other'}, base_url='file:///tmp/')
+        
+        self.assertEqual(mock_render.call_count, 2)
+        self.assertEqual(second.pdf_bytes, first.pdf_bytes)
+        self.assertEqual(second.filename, 'b.pdf')
+
+
+class StreamingPdfMergerTest(TestCase):
+    """Tests for the streaming PDF merge."""
+    
+    @staticmethod
+    def _pdf(*widths):
+        """PDF with one page per width, each drawing a line (compressed content stream)."""
+        from io import BytesIO
+        from pypdf import PdfWriter
+        from pypdf.generic import ContentStream
+        
+        writer = PdfWriter()
+        for width in widths:
+            page = writer.add_blank_page(width=width, height=100)
+            content = ContentStream(None, writer)
+            content.set_data(b'0 0 m %d 100 l S' % width)
+            page.replace_contents(content)
+            page.compress_content_streams()
+        buffer = BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+    
+    def test_merges_pages_in_order(self):
+        """Pages of all sources are written in order with their content and a new page tree."""
+        from io import BytesIO
+        from pypdf import PdfReader
+        from core.printing.merge import StreamingPdfMerger
+        
+        target = BytesIO()
+        merger = StreamingPdfMerger(target)
+        self.assertEqual(merger.add(self._pdf(10, 20)), 2)
+        self.assertEqual(merger.add(self._pdf(30)), 1)
+        self.assertEqual(merger.close(), 3)
+        
+        reader = PdfReader(BytesIO(target.getvalue()), strict=True)
+        self.assertEqual([int(page.mediabox.width) for page in reader.pages], [10, 20, 30])
+        self.assertEqual(reader.pages[2]['/Parent'].get_object()['/Count'], 3)
+        self.assertEqual(reader.pages[1].get_contents().get_data(), b'0 0 m 20 100 l S')
+    
+    def test_nothing_written_without_pages(self):
+        """Without pages the target stays empty."""
+        from io import BytesIO
+        from core.printing.merge import StreamingPdfMerger
+        
+        target = BytesIO()
+        self.assertEqual(StreamingPdfMerger(target).close(), 0)
+        self.assertEqual(target.getvalue(), b'')
+
+
+class RendererPoolTest(TestCase):
+    """Test the WeasyPrint renderer pool and the print resource cache."""
+    
+    def test_pool_reuses_idle_renderers(self):
+        """Renderers are reused; a new one is only created while all are busy."""
+        from unittest.mock import MagicMock
+        from core.printing.weasyprint_renderer import WeasyPrintRendererPool
+        
+        factory = MagicMock(side_effect=MockRenderer)
+        pool = WeasyPrintRendererPool(factory=factory, max_idle=1)
+        
+        self.assertTrue(pool.render_html_to_pdf('<p>1</p>', 'file:///tmp/').startswith(b'%PDF'))
+        pool.render_html_to_pdf('<p>2</p>', 'file:///tmp/')
+        self.assertEqual(factory.call_count, 1)
+        
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertIsNot(first, second)
+        self.assertEqual(factory.call_count, 2)
+        
+        # Only max_idle renderers are kept
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(), first)
+        pool.acquire()
+        self.assertEqual(factory.call_count, 3)
+    
+    def test_resource_cache_reads_changed_files_again(self):
+        """Local files are read once and again after a change; decoded images are dropped."""
+        import os
+        import tempfile
+        from core.printing.weasyprint_renderer import PrintResourceCache
+        
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        logo = Path(tmp_dir.name) / 'logo.png'
+        logo.write_bytes(b'logo')
+        url = f'file://{logo}'
+        resources = PrintResourceCache()
+        
+        resource = resources.fetch(url)
+        self.assertEqual(resource['string'], b'logo')
+        self.assertEqual(resource['mime_type'], 'image/png')
+        self.assertIsNone(resources.fetch('https://example.com/logo.png'))
+        
+        # Unchanged version: served from memory
+        stat = logo.stat()
+        logo.write_bytes(b'LOGO')
+        os.utime(logo, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        resources.image_cache[url] = 'decoded'
+        self.assertEqual(resources.fetch(url)['string'], b'logo')
+        self.assertEqual(resources.image_cache, {url: 'decoded'})
+        
+        logo.write_bytes(b'new logo')
+        self.assertEqual(resources.fetch(url)['string'], b'new logo')
+        self.assertEqual(resources.image_cache, {})
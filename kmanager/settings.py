@@ -169,6 +169,11 @@ MEDIA_URL = '/data/'
 VERMIETUNG_DOCUMENTS_ROOT = MEDIA_ROOT / 'vermietung'
 PROJECT_DOCUMENTS_ROOT = MEDIA_ROOT / 'project'
 
+# Cache of rendered PDFs (core.printing.PdfCache), least recently used files are
+# deleted above the size limit
+PDF_CACHE_DIR = MEDIA_ROOT / 'pdf_cache'
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
 # File upload limits
 # Allow up to 50 MB per file; spill to disk above 5 MB to reduce memory pressure.
 DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024   # 50 MB (non-file form fields)
@@ -197,6 +202,25 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@ebner-vermietung.de')
 DEFAULT_FROM_NAME = os.getenv('DEFAULT_FROM_NAME', 'Domus Notification Manager')
 
+# Cache shared by all worker processes (database table, no external service
+# required), so an invalidation in one worker is seen by all others.
+# The table is created by the core migration 0033 (or: manage.py createcachetable)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'kmanager_cache'),
+    }
+}
+
+# TTL in seconds of the cached Vermietung dashboard KPIs
+VERMIETUNG_DASHBOARD_CACHE_TIMEOUT = int(os.getenv('VERMIETUNG_DASHBOARD_CACHE_TIMEOUT', '60'))
+
+# TTL in seconds of the cached Auftragsverwaltung dashboard KPIs
+AUFTRAGSVERWALTUNG_KPI_CACHE_TIMEOUT = int(os.getenv('AUFTRAGSVERWALTUNG_KPI_CACHE_TIMEOUT', '300'))
+
+# Load the Vermietung dashboard widgets lazily via HTMX
+VERMIETUNG_DASHBOARD_LAZY = os.getenv('VERMIETUNG_DASHBOARD_LAZY', 'False') == 'True'
+
 # Agira Customer Support Portal configuration
 AGIRA_TOKEN = os.getenv('AGIRA_TOKEN', '')
 
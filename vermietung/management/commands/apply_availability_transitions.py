@@ -0,0 +1,59 @@
+"""
+Management command to apply due availability transitions.
+
+Contracts that start or end on a future date are recorded as pending
+VerfuegbarkeitsWechsel when they are saved. This command processes all
+transitions that have become due since the last run and updates the
+`verfuegbar` field of only the affected MietObjekte and their ancestors.
+
+The command is idempotent and should be run periodically (e.g., daily via cron).
+"""
+
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from vermietung.services import AvailabilityScheduler
+
+
+class Command(BaseCommand):
+    help = 'Apply due contract start/end transitions to MietObjekt availability'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Reference date (YYYY-MM-DD), defaults to today',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many transitions are due without updating anything',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options.get('date'):
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date format: {options['date']}. Use YYYY-MM-DD.")
+
+        dry_run = options.get('dry_run', False)
+        result = AvailabilityScheduler.process_due(today=today, dry_run=dry_run)
+
+        if result.transitions == 0:
+            self.stdout.write(self.style.SUCCESS('No due availability transitions.'))
+            return
+
+        if dry_run:
+            self.stdout.write(
+                f'{result.transitions} transition(s) due, affecting {result.mietobjekte} MietObjekt '
+                '(dry run, nothing updated).'
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Done! {result.transitions} transition(s) applied, '
+                f'{result.mietobjekte} MietObjekt checked, {result.changed} updated.'
+            )
+        )
@@ -0,0 +1,75 @@
+"""
+Management command to verify the denormalized occupancy counters.
+
+MietObjekt.active_units / available_units are maintained on the Vertrag,
+VertragsObjekt and MietObjekt write paths. This command compares the stored
+values with the canonical calculation (OccupancyService, which mirrors
+MietObjekt._calculate_own_active_units()) and reports any drift.
+Use --fix to repair drifted rows.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from vermietung.models import MietObjekt
+from vermietung.services import OccupancyService, DashboardKpiService
+
+
+class Command(BaseCommand):
+    help = 'Check (and optionally repair) the occupancy counters of all MietObjekt'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Repair drifted counters',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of MietObjekt read and written per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        fix = options.get('fix', False)
+        chunk_size = max(1, options.get('chunk_size') or 500)
+
+        occupancy = OccupancyService.calculate()
+        fields = ['active_units', 'available_units']
+
+        drifted = []
+        mietobjekte = MietObjekt.objects.only('pk', 'name', *fields).order_by('pk')
+        for mietobjekt in mietobjekte.iterator(chunk_size=chunk_size):
+            expected = occupancy[mietobjekt.pk]
+            stored = (mietobjekt.active_units, mietobjekt.available_units)
+            if not OccupancyService.apply(mietobjekt, expected, update_verfuegbar=False):
+                continue
+
+            drifted.append(mietobjekt)
+            self.stdout.write(
+                self.style.WARNING(
+                    f'  {mietobjekt.name} (ID {mietobjekt.pk}): '
+                    f'gespeichert {stored[0]} gebucht/{stored[1]} frei, '
+                    f'erwartet {expected.active_units} gebucht/{expected.available_units} frei'
+                )
+            )
+
+        total = len(occupancy)
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f'All {total} MietObjekt counters are consistent.'))
+            return
+
+        if not fix:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{len(drifted)} of {total} MietObjekt counters drifted. Run with --fix to repair.'
+                )
+            )
+            return
+
+        with transaction.atomic():
+            MietObjekt.objects.bulk_update(drifted, fields=fields, batch_size=chunk_size)
+            DashboardKpiService.invalidate()
+        self.stdout.write(
+            self.style.SUCCESS(f'Repaired {len(drifted)} of {total} MietObjekt counters.')
+        )
@@ -1,13 +1,21 @@
 """
 Management command to recalculate availability for all MietObjekt.
 
-This command updates the `verfuegbar` field for all MietObjekt based on
-their currently active contracts.
+This command updates the `verfuegbar` field and the occupancy counters
+(active_units/available_units) for all MietObjekt based on their currently
+active contracts.
+
+The full run computes all unit counts set-based in one pass and writes only
+changed objects with bulk_update. Use --dry-run to list the changes without
+saving them.
 """
 
+import time
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from vermietung.models import MietObjekt, Vertrag
+from vermietung.services import OccupancyService, DashboardKpiService
 
 
 class Command(BaseCommand):
@@ -19,6 +27,17 @@ class Command(BaseCommand):
             type=int,
             help='Recalculate availability for a specific MietObjekt ID',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of MietObjekt read and written per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show which MietObjekt would change, without saving',
+        )
 
     def handle(self, *args, **options):
         mietobjekt_id = options.get('mietobjekt_id')
@@ -35,7 +54,10 @@ class Command(BaseCommand):
                 return
         else:
             # Recalculate for all MietObjekt
-            self._recalculate_all()
+            self._recalculate_all(
+                chunk_size=max(1, options.get('chunk_size') or 500),
+                dry_run=options.get('dry_run', False)
+            )
 
     def _recalculate_single(self, mietobjekt):
         """Recalculate availability for a single MietObjekt."""
@@ -54,27 +76,59 @@ class Command(BaseCommand):
                 f'{mietobjekt.name}: {new_status} (unverändert)'
             )
 
-    def _recalculate_all(self):
-        """Recalculate availability for all MietObjekt."""
-        mietobjekte = MietObjekt.objects.all()
-        total = mietobjekte.count()
-        updated = 0
+    def _recalculate_all(self, chunk_size=500, dry_run=False):
+        """
+        Recalculate availability for all MietObjekt in one pass.
+        
+        Unit counts are computed set-based for the whole hierarchy, only changed
+        objects are written (bulk_update in chunks of `chunk_size`).
+        With dry_run=True the changes are only listed.
+        """
+        started = time.monotonic()
+        
+        # Unit counts for all objects in a fixed number of aggregate queries
+        occupancy = OccupancyService.calculate()
+        total = len(occupancy)
         
         self.stdout.write(f'Recalculating availability for {total} MietObjekt...')
         
-        for mietobjekt in mietobjekte:
+        changed = []
+        fields = ['verfuegbar', 'active_units', 'available_units']
+        mietobjekte = MietObjekt.objects.only('pk', 'name', *fields).order_by('pk')
+        for mietobjekt in mietobjekte.iterator(chunk_size=chunk_size):
             old_verfuegbar = mietobjekt.verfuegbar
-            mietobjekt.update_availability()
+            if not OccupancyService.apply(mietobjekt, occupancy[mietobjekt.pk]):
+                continue
             
+            changed.append(mietobjekt)
             if old_verfuegbar != mietobjekt.verfuegbar:
-                updated += 1
-                status = 'verfügbar' if mietobjekt.verfuegbar else 'nicht verfügbar'
+                old_status = 'verfügbar' if old_verfuegbar else 'nicht verfügbar'
+                new_status = 'verfügbar' if mietobjekt.verfuegbar else 'nicht verfügbar'
                 self.stdout.write(
-                    self.style.SUCCESS(f'  {mietobjekt.name}: → {status}')
+                    self.style.SUCCESS(f'  {mietobjekt.name}: {old_status} → {new_status}')
                 )
+            else:
+                self.stdout.write(
+                    f'  {mietobjekt.name}: Einheiten {mietobjekt.active_units} gebucht, '
+                    f'{mietobjekt.available_units} frei'
+                )
+        
+        if not dry_run and changed:
+            with transaction.atomic():
+                MietObjekt.objects.bulk_update(changed, fields=fields, batch_size=chunk_size)
+                DashboardKpiService.invalidate()
         
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'\nDone! {updated} of {total} MietObjekt updated.'
+        duration = time.monotonic() - started
+        updated = len(changed)
+        if dry_run:
+            self.stdout.write(
+                f'\nDry run: {updated} of {total} MietObjekt would be updated, '
+                f'{total - updated} unchanged ({duration:.2f}s).'
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'\nDone! {updated} of {total} MietObjekt updated, '
+                    f'{total - updated} unchanged ({duration:.2f}s).'
+                )
             )
-        )
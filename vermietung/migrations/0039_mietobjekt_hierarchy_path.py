@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-16 13:39
+
+from django.db import migrations, models
+
+
+def populate_hierarchy_paths(apps, schema_editor):
+    """
+    Compute hierarchy_path, hierarchy_depth and hierarchy_root_id for all
+    existing MietObjekte (breadth-first from the roots).
+    """
+    MietObjekt = apps.get_model('vermietung', 'MietObjekt')
+
+    children = {}
+    roots = []
+    for pk, parent_id in MietObjekt.objects.values_list('pk', 'parent_id'):
+        if parent_id is None:
+            roots.append(pk)
+        else:
+            children.setdefault(parent_id, []).append(pk)
+
+    to_update = []
+    queue = [(pk, f"/{pk}/", 0, pk) for pk in roots]
+    while queue:
+        pk, path, depth, root_id = queue.pop()
+        to_update.append(MietObjekt(
+            pk=pk, hierarchy_path=path, hierarchy_depth=depth, hierarchy_root_id=root_id
+        ))
+        for child_pk in children.get(pk, []):
+            queue.append((child_pk, f"{path}{child_pk}/", depth + 1, root_id))
+
+    MietObjekt.objects.bulk_update(
+        to_update,
+        fields=['hierarchy_path', 'hierarchy_depth', 'hierarchy_root_id'],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vermietung', '0038_migrate_dokument_references'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mietobjekt',
+            name='hierarchy_depth',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Hierarchieebene'),
+        ),
+        migrations.AddField(
+            model_name='mietobjekt',
+            name='hierarchy_path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255, verbose_name='Hierarchiepfad'),
+        ),
+        migrations.AddField(
+            model_name='mietobjekt',
+            name='hierarchy_root_id',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='Wurzelobjekt-ID'),
+        ),
+        migrations.RunPython(populate_hierarchy_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-16 14:25
+
+import django.db.models.deletion
+from datetime import date
+
+from django.db import migrations, models
+
+
+def seed_pending_transitions(apps, schema_editor):
+    """
+    Record the future start/ende dates of existing active contracts.
+    """
+    Vertrag = apps.get_model('vermietung', 'Vertrag')
+    VerfuegbarkeitsWechsel = apps.get_model('vermietung', 'VerfuegbarkeitsWechsel')
+
+    today = date.today()
+    transitions = []
+    for vertrag_id, start, ende in Vertrag.objects.filter(status='active').values_list('pk', 'start', 'ende'):
+        if start and start > today:
+            transitions.append(VerfuegbarkeitsWechsel(vertrag_id=vertrag_id, stichtag=start, art='START'))
+        if ende and ende > today:
+            transitions.append(VerfuegbarkeitsWechsel(vertrag_id=vertrag_id, stichtag=ende, art='ENDE'))
+
+    VerfuegbarkeitsWechsel.objects.bulk_create(transitions, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vermietung', '0039_mietobjekt_hierarchy_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerfuegbarkeitsWechsel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stichtag', models.DateField(help_text='Datum, an dem sich die Belegung ändert', verbose_name='Stichtag')),
+                ('art', models.CharField(choices=[('START', 'Vertragsbeginn'), ('ENDE', 'Vertragsende')], max_length=10, verbose_name='Art')),
+                ('verarbeitet_am', models.DateTimeField(blank=True, help_text='Zeitpunkt der Verarbeitung (leer = ausstehend)', null=True, verbose_name='Verarbeitet am')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Erstellt am')),
+                ('vertrag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verfuegbarkeitswechsel', to='vermietung.vertrag', verbose_name='Vertrag')),
+            ],
+            options={
+                'verbose_name': 'Verfügbarkeitswechsel',
+                'verbose_name_plural': 'Verfügbarkeitswechsel',
+                'ordering': ['stichtag', 'id'],
+                'indexes': [models.Index(fields=['verarbeitet_am', 'stichtag'], name='vermietung__verarbe_cf9206_idx')],
+            },
+        ),
+        migrations.RunPython(seed_pending_transitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:10
+
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def populate_occupancy_counters(apps, schema_editor):
+    """
+    Compute active_units/available_units for all existing MietObjekte.
+
+    Leaves count their own active units, parents aggregate their children.
+    """
+    MietObjekt = apps.get_model('vermietung', 'MietObjekt')
+    Vertrag = apps.get_model('vermietung', 'Vertrag')
+    VertragsObjekt = apps.get_model('vermietung', 'VertragsObjekt')
+
+    today = date.today()
+    active = Q(status='active', start__lte=today) & (Q(ende__isnull=True) | Q(ende__gt=today))
+    active_vertrag_ids = Vertrag.objects.filter(active).values('pk')
+
+    own_active = {
+        row['mietobjekt_id']: row['total'] or 0
+        for row in VertragsObjekt.objects.filter(vertrag_id__in=active_vertrag_ids)
+        .order_by().values('mietobjekt_id').annotate(total=Sum('anzahl'))
+    }
+    vertragsobjekt_pairs = set(VertragsObjekt.objects.values_list('vertrag_id', 'mietobjekt_id'))
+    for vertrag_id, mietobjekt_id in Vertrag.objects.filter(active, mietobjekt_id__isnull=False).values_list('pk', 'mietobjekt_id'):
+        if (vertrag_id, mietobjekt_id) not in vertragsobjekt_pairs:
+            own_active[mietobjekt_id] = own_active.get(mietobjekt_id, 0) + 1
+
+    # Deepest objects first, so children are computed before their parents
+    mietobjekte = list(MietObjekt.objects.order_by('-hierarchy_depth', 'pk'))
+    counters = {}
+    children = {}
+    for obj in mietobjekte:
+        if obj.parent_id:
+            children.setdefault(obj.parent_id, []).append(obj.pk)
+    for obj in mietobjekte:
+        child_ids = [c for c in children.get(obj.pk, ()) if c in counters]
+        if child_ids:
+            obj.active_units = sum(counters[c][0] for c in child_ids)
+            obj.available_units = sum(counters[c][1] for c in child_ids)
+        else:
+            obj.active_units = own_active.get(obj.pk, 0)
+            obj.available_units = max(0, obj.verfuegbare_einheiten - obj.active_units)
+        counters[obj.pk] = (obj.active_units, obj.available_units)
+
+    MietObjekt.objects.bulk_update(mietobjekte, ['active_units', 'available_units'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vermietung', '0040_verfuegbarkeitswechsel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mietobjekt',
+            name='active_units',
+            field=models.IntegerField(db_index=True, default=0, editable=False, verbose_name='Gebuchte Einheiten'),
+        ),
+        migrations.AddField(
+            model_name='mietobjekt',
+            name='available_units',
+            field=models.IntegerField(db_index=True, default=1, editable=False, verbose_name='Freie Einheiten'),
+        ),
+        migrations.RunPython(populate_occupancy_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_add_debitor_number_unique_constraint'),
+        ('vermietung', '0041_mietobjekt_occupancy_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vertrag',
+            index=models.Index(fields=['status', 'start', 'ende'], name='vermietung__status_4fdf16_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vertragsobjekt',
+            index=models.Index(fields=['mietobjekt', 'zugang', 'abgang'], name='vermietung__mietobj_f2fcad_idx'),
+        ),
+    ]
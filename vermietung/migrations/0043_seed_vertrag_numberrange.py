@@ -0,0 +1,55 @@
+# Generated migration for seeding the RENTAL NumberRange from existing contracts
+
+import re
+
+from django.db import migrations
+
+
+VERTRAGSNUMMER_PATTERN = re.compile(r'^V-(\d+)$')
+
+
+def seed_rental_numberrange(apps, schema_editor):
+    """
+    Create the RENTAL NumberRange and continue after the highest existing V-00000 number.
+    """
+    Vertrag = apps.get_model('vermietung', 'Vertrag')
+    NumberRange = apps.get_model('auftragsverwaltung', 'NumberRange')
+
+    highest = 0
+    for vertragsnummer in Vertrag.objects.filter(
+        vertragsnummer__startswith='V-'
+    ).values_list('vertragsnummer', flat=True).iterator():
+        match = VERTRAGSNUMMER_PATTERN.match(vertragsnummer)
+        if match:
+            highest = max(highest, int(match.group(1)))
+
+    number_range, created = NumberRange.objects.get_or_create(
+        target='RENTAL',
+        defaults={
+            'format': 'V-{seq:05d}',
+            'reset_policy': 'NEVER',
+            'current_year': 0,
+            'current_seq': highest,
+        }
+    )
+    if not created and number_range.current_seq < highest:
+        number_range.current_seq = highest
+        number_range.save(update_fields=['current_seq'])
+
+
+def reverse_seed_rental_numberrange(apps, schema_editor):
+    """Remove the RENTAL NumberRange (reverse migration)."""
+    NumberRange = apps.get_model('auftragsverwaltung', 'NumberRange')
+    NumberRange.objects.filter(target='RENTAL').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vermietung', '0042_interval_indexes'),
+        ('auftragsverwaltung', '0024_add_rental_numberrange_target'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_rental_numberrange, reverse_seed_rental_numberrange),
+    ]
@@ -1,6 +1,7 @@
 
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, F, Value, OuterRef, Subquery, ExpressionWrapper
+from django.db.models.functions import Concat, Substr, Coalesce, Cast
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import transaction
@@ -62,6 +63,58 @@ class VertragQuerySet(models.QuerySet):
             models.Q(ende__isnull=True) | models.Q(ende__gt=today)
         )
 
+    def with_totals(self):
+        """
+        Annotate the contract totals computed in SQL.
+
+        Mirrors berechne_gesamtmiete(), effective_net_total,
+        berechne_umsatzsteuer() and berechne_bruttobetrag(), which use the
+        annotated values when present instead of iterating vertragsobjekte:
+        - annotated_positions_total: Sum(anzahl * preis) of the VertragsObjekte
+        - annotated_net_total: manual_net_total (if auto_total is disabled and set)
+          or the positions total, plus stellplatzbetrag
+        - annotated_tax / annotated_gross: VAT and gross before rounding
+          (exact to 4 decimal places, rounded HALF_UP by the model methods)
+
+        Returns:
+            QuerySet: Contracts with annotated totals
+        """
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        # net (2 decimals) * integer rate / 100 is exact with 4 decimals
+        exact = models.DecimalField(max_digits=14, decimal_places=4)
+
+        positions_total = VertragsObjekt.objects.filter(
+            vertrag=OuterRef('pk')
+        ).order_by().values('vertrag').annotate(
+            total=models.Sum(F('anzahl') * F('preis'), output_field=money)
+        ).values('total')
+
+        annotated = self.annotate(
+            annotated_positions_total=Coalesce(
+                Subquery(positions_total, output_field=money), Value(Decimal('0.00')), output_field=money
+            ),
+        ).annotate(
+            annotated_net_total=ExpressionWrapper(
+                models.Case(
+                    models.When(auto_total=False, manual_net_total__isnull=False, then=F('manual_net_total')),
+                    default=F('annotated_positions_total'),
+                    output_field=money,
+                ) + Coalesce(F('stellplatzbetrag'), Value(Decimal('0.00')), output_field=money),
+                output_field=money
+            ),
+        )
+        return annotated.annotate(
+            annotated_tax=ExpressionWrapper(
+                F('annotated_net_total') * Cast('umsatzsteuer_satz', models.IntegerField()) / Value(Decimal('100')),
+                output_field=exact
+            ),
+        ).annotate(
+            annotated_gross=ExpressionWrapper(
+                F('annotated_net_total') + F('annotated_tax'),
+                output_field=exact
+            ),
+        )
+
     def active_in_month(self, month_start):
         """
         Filter contracts that are active at any point within the given month.
@@ -133,6 +186,21 @@ class MietObjekt(models.Model):
         help_text="Volumen in m³ (wird aus H×B×T berechnet, kann überschrieben werden)"
     )
     verfuegbar = models.BooleanField(default=True)
+    # Denormalized occupancy counters (aggregated over the children for parents).
+    # Maintained by OccupancyService.refresh_availability() on the Vertrag/
+    # VertragsObjekt/MietObjekt write paths, verified by check_occupancy_counters.
+    active_units = models.IntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name="Gebuchte Einheiten"
+    )
+    available_units = models.IntegerField(
+        default=1,
+        editable=False,
+        db_index=True,
+        verbose_name="Freie Einheiten"
+    )
     is_mietobjekt = models.BooleanField(
         default=True,
         verbose_name="Mietobjekt",
@@ -155,6 +223,28 @@ class MietObjekt(models.Model):
         verbose_name="Übergeordnetes Mietobjekt",
         help_text="Übergeordnetes Mietobjekt (z.B. Gebäude für eine Wohnung)"
     )
+    # Materialized hierarchy path, maintained in save()/delete().
+    # Format: "/<root_pk>/.../<own_pk>/" so that a subtree is a prefix match.
+    hierarchy_path = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        editable=False,
+        db_index=True,
+        verbose_name="Hierarchiepfad"
+    )
+    hierarchy_depth = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Hierarchieebene"
+    )
+    hierarchy_root_id = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name="Wurzelobjekt-ID"
+    )
 
     def __str__(self):
         return self.name
@@ -169,6 +259,9 @@ class MietObjekt(models.Model):
         Returns:
             int: Total available units (either from field or aggregated from children)
         """
+        occupancy = getattr(self, '_occupancy', None)
+        if occupancy is not None:
+            return occupancy.total_units
         if self.has_children():
             return self.get_aggregated_verfuegbare_einheiten()
         return self.verfuegbare_einheiten
@@ -217,8 +310,10 @@ class MietObjekt(models.Model):
     
     def get_all_children(self, include_self=False):
         """
-        Get all child MietObjekte recursively using an iterative approach
-        to avoid N+1 queries.
+        Get all child MietObjekte recursively.
+        
+        Uses the materialized hierarchy path, so the subtree is a single
+        indexed prefix query regardless of the tree depth.
         
         Args:
             include_self: If True, includes this object in the result
@@ -226,33 +321,15 @@ class MietObjekt(models.Model):
         Returns:
             QuerySet of all descendant MietObjekt objects
         """
-        descendants_set = set()
+        if not self.pk:
+            return MietObjekt.objects.none()
         
-        if include_self:
-            descendants_set.add(self.pk)
-        
-        # Use iterative approach with a queue to avoid recursion and N+1 queries
-        to_process = list(self.children.values_list('pk', flat=True))
-        descendants_set.update(to_process)
-        
-        while to_process:
-            # Get all children of all items in current batch in one query
-            current_batch = to_process
-            to_process = []
-            
-            # Single query to get all children of current batch
-            new_children = list(
-                MietObjekt.objects.filter(parent_id__in=current_batch)
-                .values_list('pk', flat=True)
-            )
-            
-            # Add new children to process and to descendants
-            for child_pk in new_children:
-                if child_pk not in descendants_set:
-                    descendants_set.add(child_pk)
-                    to_process.append(child_pk)
-        
-        return MietObjekt.objects.filter(pk__in=descendants_set)
+        descendants = MietObjekt.objects.filter(
+            hierarchy_path__startswith=self._get_hierarchy_path()
+        )
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
     
     def get_hierarchy_level(self):
         """
@@ -261,6 +338,10 @@ class MietObjekt(models.Model):
         Returns:
             int: Hierarchy level
         """
+        if self.hierarchy_path:
+            return self.hierarchy_depth
+        
+        # Fallback for unsaved objects: walk up the parent chain
         level = 0
         current = self.parent
         while current:
@@ -275,14 +356,81 @@ class MietObjekt(models.Model):
         Returns:
             MietObjekt: The root parent or self if this is already a root
         """
-        if not self.parent:
+        if not self.parent_id:
             return self
         
+        if self.hierarchy_root_id:
+            return MietObjekt.objects.get(pk=self.hierarchy_root_id)
+        
+        # Fallback for unsaved objects: walk up the parent chain
         current = self.parent
         while current.parent:
             current = current.parent
         return current
     
+    def _get_hierarchy_path(self):
+        """
+        Return the persisted hierarchy path, falling back to the database value
+        (or the root path) for instances that have not been refreshed.
+        """
+        if self.hierarchy_path:
+            return self.hierarchy_path
+        stored = MietObjekt.objects.filter(pk=self.pk).values_list('hierarchy_path', flat=True).first()
+        return stored or f"/{self.pk}/"
+    
+    def _update_hierarchy_path(self):
+        """
+        Recompute hierarchy_path/depth/root for this object and move its subtree.
+        
+        The subtree is rewritten with a single UPDATE by replacing the old path
+        prefix, so reparenting costs a constant number of queries.
+        """
+        if self.parent_id:
+            parent_path = MietObjekt.objects.filter(
+                pk=self.parent_id
+            ).values_list('hierarchy_path', flat=True).first() or f"/{self.parent_id}/"
+        else:
+            parent_path = '/'
+        
+        if f"/{self.pk}/" in parent_path:
+            raise ValidationError({
+                'parent': 'Zirkuläre Referenz erkannt. Das gewählte übergeordnete Objekt würde eine Schleife erstellen.'
+            })
+        
+        new_path = f"{parent_path}{self.pk}/"
+        old_path = MietObjekt.objects.filter(pk=self.pk).values_list('hierarchy_path', flat=True).first()
+        new_depth = new_path.count('/') - 2
+        new_root_id = int(new_path.split('/')[1])
+        
+        if old_path == new_path:
+            self.hierarchy_path = new_path
+            self.hierarchy_depth = new_depth
+            self.hierarchy_root_id = new_root_id
+            return
+        
+        if old_path:
+            # Move the subtree (including self) to the new prefix
+            old_depth = old_path.count('/') - 2
+            MietObjekt.objects.filter(hierarchy_path__startswith=old_path).update(
+                hierarchy_path=Concat(
+                    Value(new_path),
+                    Substr('hierarchy_path', len(old_path) + 1),
+                    output_field=models.CharField()
+                ),
+                hierarchy_depth=F('hierarchy_depth') + (new_depth - old_depth),
+                hierarchy_root_id=new_root_id,
+            )
+        else:
+            MietObjekt.objects.filter(pk=self.pk).update(
+                hierarchy_path=new_path,
+                hierarchy_depth=new_depth,
+                hierarchy_root_id=new_root_id,
+            )
+        
+        self.hierarchy_path = new_path
+        self.hierarchy_depth = new_depth
+        self.hierarchy_root_id = new_root_id
+    
     def get_all_vertraege(self):
         """
         Get all contracts (Vertrag) associated with this MietObjekt.
@@ -365,9 +513,15 @@ class MietObjekt(models.Model):
         
         Works with both new VertragsObjekt relationship and legacy mietobjekt field.
         
+        Uses precomputed values from OccupancyService.annotate() when present.
+        
         Returns:
             int: Total number of units in active contracts
         """
+        occupancy = getattr(self, '_occupancy', None)
+        if occupancy is not None:
+            return occupancy.active_units
+        
         # If this object has children, aggregate from children
         if self.has_children():
             total = 0
@@ -387,9 +541,15 @@ class MietObjekt(models.Model):
         For objects with children: Returns sum of available units from all direct children.
         For objects without children: Returns verfuegbare_einheiten - active units.
         
+        Uses precomputed values from OccupancyService.annotate() when present.
+        
         Returns:
             int: Number of units available
         """
+        occupancy = getattr(self, '_occupancy', None)
+        if occupancy is not None:
+            return occupancy.available_units
+        
         # If this object has children, aggregate from children
         if self.has_children():
             total = 0
@@ -439,7 +599,16 @@ class MietObjekt(models.Model):
                     'parent': 'Ein Mietobjekt kann nicht sein eigenes übergeordnetes Objekt sein.'
                 })
             
-            # Check for circular reference by traversing up the parent chain
+            # Check for circular reference via the parent's materialized path:
+            # the parent must not be located inside this object's subtree
+            if self.parent.hierarchy_path:
+                if self.pk and f"/{self.pk}/" in self.parent.hierarchy_path:
+                    raise ValidationError({
+                        'parent': 'Zirkuläre Referenz erkannt. Das gewählte übergeordnete Objekt würde eine Schleife erstellen.'
+                    })
+                return
+            
+            # Fallback for parents without a path: traverse up the parent chain
             visited = set()
             if self.pk:
                 visited.add(self.pk)
@@ -463,6 +632,9 @@ class MietObjekt(models.Model):
         Returns:
             bool: True if this object has at least one direct child, False otherwise
         """
+        occupancy = getattr(self, '_occupancy', None)
+        if occupancy is not None:
+            return occupancy.has_children
         return self.children.exists()
     
     def get_aggregated_verfuegbare_einheiten(self):
@@ -504,20 +676,65 @@ class MietObjekt(models.Model):
         """
         Override save to set kaution default value for new objects.
         For new MietObjekt instances, kaution is pre-filled with 3 × mietpreis.
+        Also maintains hierarchy_path/depth/root for the object and its subtree.
         """
         # Only set default kaution if this is a new object (no pk yet) and kaution is not already set
         if not self.pk and self.kaution is None and self.mietpreis is not None:
             self.kaution = self.mietpreis * 3
-        super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        hierarchy_changed = update_fields is None or 'parent' in update_fields
+        units_changed = hierarchy_changed or 'verfuegbare_einheiten' in update_fields
+        
+        old_parent_id = None
+        if self.pk and hierarchy_changed:
+            old_parent_id = MietObjekt.objects.filter(pk=self.pk).values_list('parent_id', flat=True).first()
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Maintain the materialized hierarchy path on create/reparent
+            if hierarchy_changed:
+                self._update_hierarchy_path()
+            # Keep the occupancy counters of this object and its (old and new) ancestors current
+            if units_changed:
+                from vermietung.services import OccupancyService
+                refresh_ids = {self.pk}
+                if old_parent_id:
+                    refresh_ids.add(old_parent_id)
+                OccupancyService.refresh_availability(refresh_ids, update_verfuegbar=False)
+                self.refresh_from_db(fields=['active_units', 'available_units'])
+    
+    def delete(self, *args, **kwargs):
+        """
+        Override delete to detach the subtree paths of direct children.
+        Children are set to parent=NULL by the database (on_delete=SET_NULL)
+        and become roots of their own subtrees.
+        """
+        parent_id = self.parent_id
+        with transaction.atomic():
+            child_ids = list(self.children.values_list('pk', flat=True))
+            result = super().delete(*args, **kwargs)
+            for child in MietObjekt.objects.filter(pk__in=child_ids):
+                child._update_hierarchy_path()
+            if parent_id:
+                from vermietung.services import OccupancyService
+                OccupancyService.refresh_availability([parent_id], update_verfuegbar=False)
+        return result
     
     def update_availability(self):
         """
         Update the availability based on currently active contracts.
         MietObjekt is available if there are no currently active contracts containing it.
         Works with both legacy vertraege and new vertragsobjekte relationships.
+        Also refreshes the occupancy counters (active_units/available_units).
         """
-        self.verfuegbar = not self.has_active_contracts()
-        self.save(update_fields=['verfuegbar'])
+        from vermietung.services import OccupancyService
+        
+        occupancy = OccupancyService.calculate([self.pk])[self.pk]
+        self.verfuegbar = not occupancy.is_fully_booked
+        self.active_units = occupancy.active_units
+        self.available_units = occupancy.available_units
+        self.save(update_fields=['verfuegbar', 'active_units', 'available_units'])
 
 
 class Vertrag(models.Model):
@@ -631,6 +848,10 @@ class Vertrag(models.Model):
         verbose_name = "Vertrag"
         verbose_name_plural = "Verträge"
         ordering = ['-start']
+        indexes = [
+            # Interval index for occupancy range queries
+            models.Index(fields=['status', 'start', 'ende']),
+        ]
     
     def __str__(self):
         """
@@ -706,8 +927,13 @@ class Vertrag(models.Model):
         """
         Calculate total rent from all VertragsObjekt items.
         Returns sum of (anzahl * preis) for all contract objects.
+        Uses the value annotated by VertragQuerySet.with_totals() when present.
         Returns Decimal with 2 decimal places.
         """
+        annotated = getattr(self, 'annotated_positions_total', None)
+        if annotated is not None:
+            return Decimal(annotated).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
         total = Decimal('0.00')
         for vo in self.vertragsobjekte.all():
             total += vo.gesamtpreis
@@ -720,8 +946,13 @@ class Vertrag(models.Model):
         Returns the manual_net_total if auto_total is False and manual_net_total is set,
         otherwise returns the calculated total from VertragsObjekt items.
         Includes stellplatzbetrag in both cases.
+        Uses the value annotated by VertragQuerySet.with_totals() when present.
         Returns Decimal with 2 decimal places.
         """
+        annotated = getattr(self, 'annotated_net_total', None)
+        if annotated is not None:
+            return Decimal(annotated).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
         # Get base total (manual or calculated)
         if not self.auto_total and self.manual_net_total is not None:
             base_total = self.manual_net_total
@@ -737,8 +968,13 @@ class Vertrag(models.Model):
     def berechne_umsatzsteuer(self):
         """
         Calculate VAT amount based on effective net total and VAT rate.
+        Uses the value annotated by VertragQuerySet.with_totals() when present.
         Returns Decimal with 2 decimal places.
         """
+        annotated = getattr(self, 'annotated_tax', None)
+        if annotated is not None:
+            return Decimal(annotated).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
         nettobetrag = self.effective_net_total
         umsatzsteuer_prozent = Decimal(self.umsatzsteuer_satz)
         umsatzsteuer_betrag = (nettobetrag * umsatzsteuer_prozent / Decimal('100'))
@@ -747,8 +983,13 @@ class Vertrag(models.Model):
     def berechne_bruttobetrag(self):
         """
         Calculate gross amount (effective net total + VAT).
+        Uses the value annotated by VertragQuerySet.with_totals() when present.
         Returns Decimal with 2 decimal places.
         """
+        annotated = getattr(self, 'annotated_gross', None)
+        if annotated is not None:
+            return Decimal(annotated).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        
         nettobetrag = self.effective_net_total
         umsatzsteuer = self.berechne_umsatzsteuer()
         bruttobetrag = nettobetrag + umsatzsteuer
@@ -863,33 +1104,41 @@ class Vertrag(models.Model):
         is_new = self.pk is None
         had_legacy_mietobjekt = self.mietobjekt_id
         
-        super().save(*args, **kwargs)
-        
-        # Backwards compatibility: If legacy mietobjekt field is used,
-        # automatically create/update VertragsObjekt entry
-        if had_legacy_mietobjekt:
-            # Check if VertragsObjekt already exists for this combination
-            existing = VertragsObjekt.objects.filter(
-                vertrag=self,
-                mietobjekt_id=had_legacy_mietobjekt
-            ).exists()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
             
-            if not existing:
-                # Create VertragsObjekt entry
-                VertragsObjekt.objects.create(
+            # Record upcoming start/ende transitions for the availability scheduler
+            from vermietung.services import AvailabilityScheduler
+            AvailabilityScheduler.schedule_vertrag(self)
+            
+            # Backwards compatibility: If legacy mietobjekt field is used,
+            # automatically create/update VertragsObjekt entry
+            if had_legacy_mietobjekt:
+                # Check if VertragsObjekt already exists for this combination
+                existing = VertragsObjekt.objects.filter(
                     vertrag=self,
                     mietobjekt_id=had_legacy_mietobjekt
-                )
+                ).exists()
+                
+                if not existing:
+                    # Create VertragsObjekt entry
+                    VertragsObjekt.objects.create(
+                        vertrag=self,
+                        mietobjekt_id=had_legacy_mietobjekt
+                    )
             
-            # Update availability
-            self.update_mietobjekte_availability()
+            # Update availability and occupancy counters (status/start/ende may have changed)
+            if had_legacy_mietobjekt or not is_new:
+                self.update_mietobjekte_availability()
     
     def update_mietobjekte_availability(self):
         """
-        Update the availability of all associated MietObjekte.
-        MietObjekt is available if there are no currently active contracts containing it.
+        Update the availability of all associated MietObjekte and their ancestors.
+        MietObjekt is available if not all of its units are in currently active contracts.
         Public method that can be called from admin actions.
         """
+        from vermietung.services import OccupancyService
+        
         # Get all mietobjekte for this contract (both legacy and new)
         mietobjekt_ids = set()
         
@@ -902,47 +1151,23 @@ class Vertrag(models.Model):
             self.vertragsobjekte.values_list('mietobjekt_id', flat=True)
         )
         
-        # Update availability for each mietobjekt
-        for mietobjekt_id in mietobjekt_ids:
-            # Check if there are any currently active contracts containing this MietObjekt
-            has_active_contract = VertragsObjekt.objects.filter(
-                mietobjekt_id=mietobjekt_id,
-                vertrag__status='active'
-            ).select_related('vertrag').filter(
-                vertrag__start__lte=timezone.now().date()
-            ).filter(
-                Q(vertrag__ende__isnull=True) | Q(vertrag__ende__gt=timezone.now().date())
-            ).exists()
-            
-            # Update the MietObjekt directly without triggering save
-            MietObjekt.objects.filter(pk=mietobjekt_id).update(
-                verfuegbar=not has_active_contract
-            )
+        OccupancyService.refresh_availability(mietobjekt_ids)
     
     def _generate_vertragsnummer(self):
         """
         Generate next contract number in format V-00000.
-        Uses SELECT FOR UPDATE to prevent race conditions.
+
+        The number is drawn from the global RENTAL NumberRange (one locked row),
+        so the Vertrag table is neither locked nor scanned. Numbers that were
+        already assigned manually are skipped.
         """
+        from auftragsverwaltung.services.number_range import get_next_rental_contract_number
+
         with transaction.atomic():
-            # Get the last contract number using database locking
-            # Order by ID to ensure we get the most recently created contract
-            # (since vertragsnummer is a CharField, lexicographic ordering won't work correctly)
-            last_contract = Vertrag.objects.select_for_update().order_by('-id').first()
-            
-            if last_contract and last_contract.vertragsnummer:
-                try:
-                    # Extract number from V-00000 format
-                    last_number = int(last_contract.vertragsnummer.split('-')[1])
-                    next_number = last_number + 1
-                except (ValueError, IndexError):
-                    # If parsing fails, fall back to counting all contracts + 1
-                    next_number = Vertrag.objects.count() + 1
-            else:
-                next_number = 1
-            
-            # Format as V-00000
-            return f"V-{next_number:05d}"
+            vertragsnummer = get_next_rental_contract_number()
+            while Vertrag.objects.filter(vertragsnummer=vertragsnummer).exists():
+                vertragsnummer = get_next_rental_contract_number()
+            return vertragsnummer
 
 
 VERTRAGSOBJEKT_STATUS = [
@@ -1012,6 +1237,10 @@ class VertragsObjekt(models.Model):
         # Ensure a mietobjekt can only be added once to a contract
         unique_together = [['vertrag', 'mietobjekt']]
         ordering = ['created_at']
+        indexes = [
+            # Interval index for occupancy range queries
+            models.Index(fields=['mietobjekt', 'zugang', 'abgang']),
+        ]
     
     def __str__(self):
         return f"{self.vertrag.vertragsnummer} - {self.mietobjekt.name}"
@@ -1035,7 +1264,8 @@ class VertragsObjekt(models.Model):
         1. Price must be positive
         2. Quantity must be positive
         3. If abgang is set, it must be after zugang
-        4. Check if there are enough available units for this mietobjekt (only for active contracts)
+        4. Check if there are enough available units for this mietobjekt over the
+           whole contract period (only for active contracts)
         """
         super().clean()
         
@@ -1061,31 +1291,29 @@ class VertragsObjekt(models.Model):
         if not self.vertrag_id or self.vertrag.status != 'active':
             return
         
-        # Check if there are enough available units for this mietobjekt
-        # A contract is currently active if status='active' and start <= today and (ende is NULL or ende > today)
-        if not self.mietobjekt_id:
+        # Check if there are enough available units for this mietobjekt over the
+        # whole occupancy period [max(start, zugang), min(ende, abgang))
+        if not self.mietobjekt_id or not self.vertrag.start:
             return
         
-        today = timezone.now().date()
-        
         # Get the MietObjekt to check available units
         try:
             mietobjekt = MietObjekt.objects.get(pk=self.mietobjekt_id)
         except MietObjekt.DoesNotExist:
             return
         
-        # Count units already in other active contracts
-        active_units = VertragsObjekt.objects.filter(
-            mietobjekt=self.mietobjekt,
-            vertrag__status='active',
-            vertrag__start__lte=today
-        ).filter(
-            Q(vertrag__ende__isnull=True) | Q(vertrag__ende__gt=today)
-        ).exclude(
-            pk=self.pk if self.pk else None
-        ).aggregate(
-            total=models.Sum('anzahl')
-        )['total'] or 0
+        from vermietung.services import OccupancyTimelineService
+        
+        von = max(d for d in (self.vertrag.start, self.zugang) if d)
+        ends = [d for d in (self.vertrag.ende, self.abgang) if d]
+        bis = min(ends) if ends else None
+        if bis is not None and bis <= von:
+            return
+        
+        # Highest number of units booked by other contracts on any day of the period
+        active_units = OccupancyTimelineService.peak_booked_units(
+            self.mietobjekt_id, von, bis, exclude_pk=self.pk
+        )
         
         # Check if adding this contract would exceed available units
         requested_units = self.anzahl or 1
@@ -1104,10 +1332,9 @@ class VertragsObjekt(models.Model):
         Also runs validation and updates MietObjekt availability.
         
         Note: We update availability immediately after save to ensure the
-        MietObjekt.verfuegbar field is always current. This is acceptable
-        since VertragsObjekt instances are typically created/updated one
-        at a time through the UI. For bulk operations, consider using
-        MietObjekt.update_availability() separately after the bulk operation.
+        MietObjekt.verfuegbar field is always current. Only the MietObjekt
+        and its ancestors are recalculated. For bulk operations, consider using
+        OccupancyService.refresh_availability() separately after the bulk operation.
         """
         # Set default price from mietobjekt if not provided
         if self.preis is None and self.mietobjekt_id:
@@ -1118,16 +1345,79 @@ class VertragsObjekt(models.Model):
                 pass
         
         self.full_clean()
-        super().save(*args, **kwargs)
-        
-        # Update MietObjekt availability after saving
-        # This ensures the verfuegbar field is always current
-        if self.mietobjekt_id:
-            try:
-                mietobjekt = MietObjekt.objects.get(pk=self.mietobjekt_id)
-                mietobjekt.update_availability()
-            except MietObjekt.DoesNotExist:
-                pass
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            # Update availability and occupancy counters of the MietObjekt and
+            # its ancestors in the same transaction
+            if self.mietobjekt_id:
+                from vermietung.services import OccupancyService
+                OccupancyService.refresh_availability([self.mietobjekt_id])
+    
+    def delete(self, *args, **kwargs):
+        """
+        Override delete to release the units of the MietObjekt.
+        """
+        mietobjekt_id = self.mietobjekt_id
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if mietobjekt_id:
+                from vermietung.services import OccupancyService
+                OccupancyService.refresh_availability([mietobjekt_id])
+        return result
+
+
+VERFUEGBARKEITSWECHSEL_ART = [
+    ('START', 'Vertragsbeginn'),
+    ('ENDE', 'Vertragsende'),
+]
+
+
+class VerfuegbarkeitsWechsel(models.Model):
+    """
+    Scheduled availability transition of a contract (Vertragsbeginn/-ende).
+    
+    Contracts that start or end on a future date change the occupancy of their
+    MietObjekte only on that date. Vertrag.save() records these dates here and the
+    apply_availability_transitions command updates just the affected MietObjekte
+    (and their ancestors) once a transition is due.
+    """
+    vertrag = models.ForeignKey(
+        Vertrag,
+        on_delete=models.CASCADE,
+        related_name='verfuegbarkeitswechsel',
+        verbose_name="Vertrag"
+    )
+    stichtag = models.DateField(
+        verbose_name="Stichtag",
+        help_text="Datum, an dem sich die Belegung ändert"
+    )
+    art = models.CharField(
+        max_length=10,
+        choices=VERFUEGBARKEITSWECHSEL_ART,
+        verbose_name="Art"
+    )
+    verarbeitet_am = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Verarbeitet am",
+        help_text="Zeitpunkt der Verarbeitung (leer = ausstehend)"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Erstellt am"
+    )
+    
+    class Meta:
+        verbose_name = "Verfügbarkeitswechsel"
+        verbose_name_plural = "Verfügbarkeitswechsel"
+        ordering = ['stichtag', 'id']
+        indexes = [
+            models.Index(fields=['verarbeitet_am', 'stichtag']),
+        ]
+    
+    def __str__(self):
+        return f"{self.vertrag.vertragsnummer} - {self.get_art_display()} am {self.stichtag}"
 
 
 UEBERGABE_TYP = [
@@ -0,0 +1,18 @@
+from .occupancy import OccupancyService, UnitOccupancy
+from .availability_scheduler import AvailabilityScheduler, SchedulerResult
+from .occupancy_timeline import OccupancyTimelineService, OccupancyPeriod
+from .dashboard import DashboardKpiService
+from .rent_roll import RentRollService, RentRoll, RentRollRow
+
+__all__ = [
+    'OccupancyService',
+    'UnitOccupancy',
+    'AvailabilityScheduler',
+    'SchedulerResult',
+    'OccupancyTimelineService',
+    'OccupancyPeriod',
+    'DashboardKpiService',
+    'RentRollService',
+    'RentRoll',
+    'RentRollRow',
+]
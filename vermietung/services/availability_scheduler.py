@@ -0,0 +1,146 @@
+"""
+Availability Scheduler
+
+Event-driven maintenance of MietObjekt.verfuegbar for contracts that start or
+end on a future date.
+
+- Vertrag.save() records the upcoming start/ende dates as pending
+  VerfuegbarkeitsWechsel rows (schedule_vertrag)
+- The apply_availability_transitions command processes all pending transitions
+  that are due (stichtag <= today) and recalculates only the MietObjekte of the
+  affected contracts and their ancestors (process_due)
+
+Processing is idempotent: processed transitions are marked with verarbeitet_am
+and never picked up again, and recalculating an object twice yields the same result.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .occupancy import OccupancyService
+
+
+@dataclass
+class SchedulerResult:
+    """
+    Result of a scheduler run
+
+    Attributes:
+        transitions: Number of processed transitions
+        mietobjekte: Number of MietObjekte of the affected contracts
+        changed: Number of MietObjekte whose verfuegbar flag changed
+    """
+    transitions: int
+    mietobjekte: int
+    changed: int
+
+
+class AvailabilityScheduler:
+    """
+    Records and applies contract start/ende transitions.
+    """
+
+    @staticmethod
+    def schedule_vertrag(vertrag, today: Optional[date] = None):
+        """
+        (Re)build the pending transitions of a contract.
+
+        Pending transitions are replaced, so changing start/ende/status of a
+        contract always leaves exactly the currently relevant future dates.
+        Only active contracts with dates after today get transitions; dates in
+        the past are already reflected by the immediate update on save.
+
+        Args:
+            vertrag: Vertrag instance (must be saved)
+            today: Reference date (defaults to today)
+        """
+        from vermietung.models import VerfuegbarkeitsWechsel
+
+        if today is None:
+            today = timezone.now().date()
+
+        VerfuegbarkeitsWechsel.objects.filter(
+            vertrag=vertrag,
+            verarbeitet_am__isnull=True
+        ).delete()
+
+        if vertrag.status != 'active':
+            return
+
+        transitions = []
+        if vertrag.start and vertrag.start > today:
+            transitions.append(
+                VerfuegbarkeitsWechsel(vertrag=vertrag, stichtag=vertrag.start, art='START')
+            )
+        if vertrag.ende and vertrag.ende > today:
+            transitions.append(
+                VerfuegbarkeitsWechsel(vertrag=vertrag, stichtag=vertrag.ende, art='ENDE')
+            )
+        if transitions:
+            VerfuegbarkeitsWechsel.objects.bulk_create(transitions)
+
+    @staticmethod
+    def process_due(today: Optional[date] = None, dry_run: bool = False) -> SchedulerResult:
+        """
+        Apply all pending transitions that are due.
+
+        Args:
+            today: Reference date (defaults to today)
+            dry_run: If True, only count the due transitions without writing
+
+        Returns:
+            SchedulerResult with the number of processed transitions and objects
+        """
+        from vermietung.models import VerfuegbarkeitsWechsel, VertragsObjekt, Vertrag
+
+        if today is None:
+            today = timezone.now().date()
+
+        with transaction.atomic():
+            due = VerfuegbarkeitsWechsel.objects.select_for_update().filter(
+                verarbeitet_am__isnull=True,
+                stichtag__lte=today
+            )
+            transition_ids = []
+            vertrag_ids = set()
+            for pk, vertrag_id in due.values_list('pk', 'vertrag_id'):
+                transition_ids.append(pk)
+                vertrag_ids.add(vertrag_id)
+
+            if not transition_ids:
+                return SchedulerResult(transitions=0, mietobjekte=0, changed=0)
+
+            # MietObjekte of the affected contracts (new and legacy relationship)
+            mietobjekt_ids = set(
+                VertragsObjekt.objects.filter(
+                    vertrag_id__in=vertrag_ids
+                ).values_list('mietobjekt_id', flat=True)
+            )
+            mietobjekt_ids.update(
+                Vertrag.objects.filter(
+                    pk__in=vertrag_ids,
+                    mietobjekt_id__isnull=False
+                ).values_list('mietobjekt_id', flat=True)
+            )
+
+            if dry_run:
+                return SchedulerResult(
+                    transitions=len(transition_ids),
+                    mietobjekte=len(mietobjekt_ids),
+                    changed=0
+                )
+
+            changed = OccupancyService.refresh_availability(mietobjekt_ids, today=today)
+
+            VerfuegbarkeitsWechsel.objects.filter(pk__in=transition_ids).update(
+                verarbeitet_am=timezone.now()
+            )
+
+        return SchedulerResult(
+            transitions=len(transition_ids),
+            mietobjekte=len(mietobjekt_ids),
+            changed=changed
+        )
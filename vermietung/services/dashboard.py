@@ -0,0 +1,169 @@
+"""
+Dashboard KPI Service
+
+Cached snapshots of the Vermietung dashboard widgets.
+
+Each widget (kennzahlen, einheiten, vertraege, aktivitaeten) is computed on
+first access and stored in Django's cache framework for a short TTL
+(setting VERMIETUNG_DASHBOARD_CACHE_TIMEOUT, default 60 seconds).
+Writes to Vertrag, VertragsObjekt, MietObjekt, Aktivitaet, Adresse and the
+activity stream invalidate all snapshots (see vermietung.signals) by switching
+to a new cache generation, so stale snapshots simply expire.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+
+class DashboardKpiService:
+    """
+    Service for the cached Vermietung dashboard widgets.
+    """
+
+    WIDGETS = ('kennzahlen', 'einheiten', 'vertraege', 'aktivitaeten')
+    GENERATION_KEY = 'vermietung:dashboard:generation'
+
+    @classmethod
+    def get(cls, widget: str, company=None) -> dict:
+        """
+        Return the context of a dashboard widget (from cache if possible).
+
+        Args:
+            widget: One of WIDGETS
+            company: Mandant for the activity stream (only used by 'aktivitaeten')
+
+        Returns:
+            dict: Template context of the widget
+
+        Raises:
+            ValueError: If the widget is unknown
+        """
+        if widget not in cls.WIDGETS:
+            raise ValueError(f'Unbekanntes Dashboard-Widget: {widget}')
+
+        key = cls._cache_key(widget, company)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = getattr(cls, f'_compute_{widget}')(company)
+            cache.set(key, snapshot, cls.timeout())
+        return snapshot
+
+    @classmethod
+    def get_all(cls, company=None) -> dict:
+        """
+        Return the merged context of all dashboard widgets.
+
+        Args:
+            company: Mandant for the activity stream
+
+        Returns:
+            dict: Template context of the complete dashboard
+        """
+        context = {}
+        for widget in cls.WIDGETS:
+            context.update(cls.get(widget, company))
+        return context
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Invalidate all dashboard snapshots.
+
+        Invalidates immediately and again after the surrounding transaction
+        commits, so a snapshot computed from uncommitted data is not kept.
+        """
+        cls._new_generation()
+        transaction.on_commit(cls._new_generation)
+
+    @staticmethod
+    def timeout() -> int:
+        """Cache TTL of the snapshots in seconds."""
+        return getattr(settings, 'VERMIETUNG_DASHBOARD_CACHE_TIMEOUT', 60)
+
+    @classmethod
+    def _new_generation(cls):
+        cache.set(cls.GENERATION_KEY, uuid.uuid4().hex, None)
+
+    @classmethod
+    def _cache_key(cls, widget, company):
+        generation = cache.get(cls.GENERATION_KEY)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            # add() keeps a generation set concurrently by another process
+            if not cache.add(cls.GENERATION_KEY, generation, None):
+                generation = cache.get(cls.GENERATION_KEY, generation)
+        # The date is part of the key because "active" and "expiring" depend on today
+        today = timezone.now().date().isoformat()
+        company_id = company.pk if company else 0
+        return f'vermietung:dashboard:{generation}:{widget}:{company_id}:{today}'
+
+    @staticmethod
+    def _compute_kennzahlen(company):
+        from core.models import Adresse
+        from vermietung.models import Aktivitaet, MietObjekt, Vertrag
+
+        return {
+            'total_mietobjekte': MietObjekt.objects.count(),
+            'verfuegbare_einheiten_gesamt': MietObjekt.objects.aggregate(
+                total=Sum('available_units')
+            )['total'] or 0,
+            'active_vertraege': Vertrag.objects.currently_active().count(),
+            # Count all activities that are NOT 'ABGEBROCHEN' or 'ERLEDIGT' (i.e., OFFEN and IN_BEARBEITUNG)
+            'offene_aktivitaeten': Aktivitaet.objects.exclude(
+                status__in=['ABGEBROCHEN', 'ERLEDIGT']
+            ).count(),
+            'total_kunden': Adresse.objects.filter(adressen_type='KUNDE').count(),
+        }
+
+    @staticmethod
+    def _compute_einheiten(company):
+        from vermietung.models import MietObjekt
+
+        # Breakdown from the denormalized occupancy counters,
+        # sorted by available units (descending), then by name on indexed columns
+        mietobjekte = MietObjekt.objects.select_related('standort').order_by('-available_units', 'name')
+        return {
+            'mietobjekte_mit_einheiten': [
+                {
+                    'objekt': obj,
+                    'verfuegbare_einheiten': obj.available_units,
+                    'gebuchte_einheiten': obj.active_units,
+                    'gesamt_einheiten': obj.verfuegbare_einheiten,
+                }
+                for obj in mietobjekte
+            ],
+        }
+
+    @staticmethod
+    def _compute_vertraege(company):
+        from vermietung.models import Vertrag
+
+        # Contracts expiring within the next 60 days (excluding those without end date)
+        today = timezone.now().date()
+        return {
+            'recent_vertraege': list(
+                Vertrag.objects.select_related('mietobjekt', 'mieter').order_by('-id')[:10]
+            ),
+            'expiring_vertraege': list(
+                Vertrag.objects.select_related('mietobjekt', 'mieter').filter(
+                    status='active',
+                    ende__isnull=False,
+                    ende__gte=today,
+                    ende__lte=today + timedelta(days=60)
+                ).order_by('ende')[:10]
+            ),
+        }
+
+    @staticmethod
+    def _compute_aktivitaeten(company):
+        from core.services.activity_stream import ActivityStreamService
+
+        # Activities from ALL domains of the company
+        if not company:
+            return {'activities': []}
+        return {'activities': list(ActivityStreamService.latest(n=25, company=company))}
@@ -0,0 +1,361 @@
+"""
+Occupancy Service
+
+Computes active/available units for MietObjekte with a fixed number of
+aggregate queries, independent of the number of objects and the depth
+of the parent/child hierarchy.
+
+Business Rules (identical to MietObjekt.get_active_units_count /
+get_available_units_count):
+- A contract is currently active if status='active', start <= today and
+  (ende is NULL or ende > today)
+- Own active units = Sum(anzahl) of active VertragsObjekte plus the number of
+  active legacy contracts (Vertrag.mietobjekt) without a VertragsObjekt for
+  the same MietObjekt
+- Leaf objects: available = max(0, verfuegbare_einheiten - own active units)
+- Objects with children: active/available are the sums of their direct
+  children (own contracts of a parent are not counted)
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+
+@dataclass
+class UnitOccupancy:
+    """
+    Occupancy figures for a single MietObjekt
+
+    Attributes:
+        active_units: Units in currently active contracts (aggregated for parents)
+        available_units: Units still available for booking (aggregated for parents)
+        total_units: verfuegbare_einheiten, or the sum of the direct children's
+            verfuegbare_einheiten for parents
+        verfuegbare_einheiten: The object's own verfuegbare_einheiten field
+        has_children: True if the object has at least one direct child
+    """
+    active_units: int
+    available_units: int
+    total_units: int
+    verfuegbare_einheiten: int
+    has_children: bool
+
+    @property
+    def is_fully_booked(self) -> bool:
+        """
+        Same rule as MietObjekt.has_active_contracts(): the object is booked
+        once the (aggregated) active units reach its own verfuegbare_einheiten.
+        """
+        return self.active_units >= self.verfuegbare_einheiten
+
+
+class OccupancyService:
+    """
+    Set-based calculation of MietObjekt unit occupancy.
+
+    All figures are computed with three queries:
+    1. id/parent_id/verfuegbare_einheiten of all MietObjekte (hierarchy)
+    2. Sum(anzahl) of active VertragsObjekte grouped by mietobjekt
+    3. Count of active legacy contracts grouped by mietobjekt
+    The hierarchy roll-up happens in memory.
+    """
+
+    @classmethod
+    def calculate(cls, mietobjekt_ids: Optional[Iterable[int]] = None,
+                  today: Optional[date] = None) -> Dict[int, UnitOccupancy]:
+        """
+        Calculate occupancy for MietObjekte
+
+        Args:
+            mietobjekt_ids: Restrict the result to these MietObjekt IDs
+                (None = all objects). Descendants needed for the roll-up are
+                included automatically.
+            today: Reference date (defaults to today)
+
+        Returns:
+            dict: MietObjekt ID -> UnitOccupancy
+
+        Example:
+            >>> from vermietung.services import OccupancyService
+            >>> occupancy = OccupancyService.calculate()
+            >>> occupancy[mietobjekt.pk].available_units
+            3
+        """
+        from vermietung.models import MietObjekt
+
+        if today is None:
+            today = timezone.now().date()
+
+        # Query 1: the hierarchy (narrow columns only). When restricted, only
+        # the trees containing the requested objects are loaded.
+        hierarchy = MietObjekt.objects.all()
+        if mietobjekt_ids is not None:
+            mietobjekt_ids = list(mietobjekt_ids)
+            hierarchy = hierarchy.filter(
+                Q(pk__in=mietobjekt_ids) |
+                Q(hierarchy_root_id__in=MietObjekt.objects.filter(
+                    pk__in=mietobjekt_ids
+                ).values('hierarchy_root_id'))
+            )
+        units = {}
+        children = {}
+        for pk, parent_id, einheiten in hierarchy.values_list(
+            'pk', 'parent_id', 'verfuegbare_einheiten'
+        ):
+            units[pk] = einheiten
+            if parent_id is not None:
+                children.setdefault(parent_id, []).append(pk)
+
+        if mietobjekt_ids is None:
+            requested = list(units)
+            relevant = None
+        else:
+            requested = [pk for pk in mietobjekt_ids if pk in units]
+            relevant = cls._collect_subtree(requested, children)
+
+        own_active = cls._calculate_own_active_units(today, relevant)
+
+        result = {}
+        for pk in requested:
+            cls._roll_up(pk, units, children, own_active, result)
+
+        if relevant is None:
+            return result
+        return {pk: result[pk] for pk in requested}
+
+    @classmethod
+    def annotate(cls, mietobjekte, today: Optional[date] = None):
+        """
+        Attach occupancy figures to MietObjekt instances.
+
+        The instances use the precomputed values in get_active_units_count(),
+        get_available_units_count(), has_children() and
+        get_verfuegbare_einheiten_display(), so templates rendering many
+        objects do not issue per-row queries.
+
+        Args:
+            mietobjekte: Iterable of MietObjekt instances (e.g. a page of a queryset)
+            today: Reference date (defaults to today)
+
+        Returns:
+            list: The given MietObjekt instances
+        """
+        mietobjekte = list(mietobjekte)
+        occupancy = cls.calculate([obj.pk for obj in mietobjekte], today=today)
+        for obj in mietobjekte:
+            obj._occupancy = occupancy.get(obj.pk)
+        return mietobjekte
+
+    @staticmethod
+    def with_counters(queryset):
+        """
+        Annotate the sum of the direct children's verfuegbare_einheiten.
+
+        Together with the stored counters (active_units/available_units) this
+        is all from_counters() needs, so lists can filter and sort on the
+        indexed counter columns without calculating the occupancy.
+
+        Args:
+            queryset: MietObjekt queryset
+
+        Returns:
+            QuerySet annotated with children_einheiten (None without children)
+        """
+        from vermietung.models import MietObjekt
+
+        children_einheiten = MietObjekt.objects.filter(
+            parent_id=OuterRef('pk')
+        ).order_by().values('parent_id').annotate(total=Sum('verfuegbare_einheiten')).values('total')
+        return queryset.annotate(children_einheiten=Subquery(children_einheiten))
+
+    @staticmethod
+    def from_counters(mietobjekte):
+        """
+        Attach occupancy figures taken from the stored counters.
+
+        Like annotate(), but without any query: the instances must come from
+        a queryset prepared with with_counters().
+
+        Args:
+            mietobjekte: Iterable of MietObjekt instances annotated by with_counters()
+
+        Returns:
+            list: The given MietObjekt instances
+        """
+        mietobjekte = list(mietobjekte)
+        for obj in mietobjekte:
+            has_children = obj.children_einheiten is not None
+            obj._occupancy = UnitOccupancy(
+                active_units=obj.active_units,
+                available_units=obj.available_units,
+                total_units=obj.children_einheiten if has_children else obj.verfuegbare_einheiten,
+                verfuegbare_einheiten=obj.verfuegbare_einheiten,
+                has_children=has_children,
+            )
+        return mietobjekte
+
+    @classmethod
+    def refresh_availability(cls, mietobjekt_ids: Iterable[int],
+                             today: Optional[date] = None,
+                             update_verfuegbar: bool = True) -> int:
+        """
+        Update the occupancy of the given objects and all of their ancestors.
+
+        Writes the denormalized counters (active_units/available_units) and,
+        unless update_verfuegbar=False, the verfuegbar flag. Only these objects
+        are recalculated (no full recalculation) and only changed rows are written.
+        Runs inside the caller's transaction when there is one.
+
+        Args:
+            mietobjekt_ids: IDs of the MietObjekte whose contracts or units changed
+            today: Reference date (defaults to today)
+            update_verfuegbar: Also update the verfuegbar flag
+
+        Returns:
+            int: Number of MietObjekte that were changed
+        """
+        from vermietung.models import MietObjekt
+
+        affected = set()
+        for pk, path in MietObjekt.objects.filter(
+            pk__in=set(mietobjekt_ids)
+        ).values_list('pk', 'hierarchy_path'):
+            affected.add(pk)
+            affected.update(int(part) for part in path.split('/') if part)
+        if not affected:
+            return 0
+
+        fields = ['active_units', 'available_units']
+        if update_verfuegbar:
+            fields.append('verfuegbar')
+
+        occupancy = cls.calculate(affected, today=today)
+        changed = []
+        for mietobjekt in MietObjekt.objects.filter(pk__in=affected).only('pk', *fields):
+            if cls.apply(mietobjekt, occupancy[mietobjekt.pk], update_verfuegbar=update_verfuegbar):
+                changed.append(mietobjekt)
+
+        if changed:
+            MietObjekt.objects.bulk_update(changed, fields=fields)
+            # bulk_update sends no signals, the dashboard snapshots depend on the counters
+            from .dashboard import DashboardKpiService
+            DashboardKpiService.invalidate()
+        return len(changed)
+
+    @staticmethod
+    def apply(mietobjekt, occupancy: UnitOccupancy, update_verfuegbar: bool = True) -> bool:
+        """
+        Copy occupancy figures onto a MietObjekt instance (in memory).
+
+        Args:
+            mietobjekt: MietObjekt instance
+            occupancy: UnitOccupancy computed for this object
+            update_verfuegbar: Also set the verfuegbar flag
+
+        Returns:
+            bool: True if any of the fields changed
+        """
+        changed = (
+            mietobjekt.active_units != occupancy.active_units or
+            mietobjekt.available_units != occupancy.available_units
+        )
+        mietobjekt.active_units = occupancy.active_units
+        mietobjekt.available_units = occupancy.available_units
+        if update_verfuegbar:
+            verfuegbar = not occupancy.is_fully_booked
+            changed = changed or mietobjekt.verfuegbar != verfuegbar
+            mietobjekt.verfuegbar = verfuegbar
+        return changed
+
+    @staticmethod
+    def _collect_subtree(root_ids, children):
+        """Collect root_ids and all of their descendants from the in-memory hierarchy."""
+        collected = set()
+        stack = list(root_ids)
+        while stack:
+            pk = stack.pop()
+            if pk in collected:
+                continue
+            collected.add(pk)
+            stack.extend(children.get(pk, ()))
+        return collected
+
+    @staticmethod
+    def _calculate_own_active_units(today, mietobjekt_ids=None):
+        """
+        Own active units per MietObjekt (children not considered).
+
+        Mirrors MietObjekt._calculate_own_active_units() for all objects at once.
+        """
+        from vermietung.models import Vertrag, VertragsObjekt
+
+        active_vertrag = Q(vertrag__status='active', vertrag__start__lte=today) & (
+            Q(vertrag__ende__isnull=True) | Q(vertrag__ende__gt=today)
+        )
+
+        # Query 2: units via VertragsObjekt
+        vo_qs = VertragsObjekt.objects.filter(active_vertrag)
+        if mietobjekt_ids is not None:
+            vo_qs = vo_qs.filter(mietobjekt_id__in=mietobjekt_ids)
+        own_active = {
+            row['mietobjekt_id']: row['total'] or 0
+            for row in vo_qs.order_by().values('mietobjekt_id').annotate(total=Sum('anzahl'))
+        }
+
+        # Query 3: legacy contracts without a VertragsObjekt for the same object
+        legacy_qs = Vertrag.objects.filter(
+            Q(status='active', start__lte=today) & (Q(ende__isnull=True) | Q(ende__gt=today)),
+            mietobjekt_id__isnull=False,
+        ).exclude(
+            Exists(VertragsObjekt.objects.filter(
+                vertrag_id=OuterRef('pk'),
+                mietobjekt_id=OuterRef('mietobjekt_id'),
+            ))
+        )
+        if mietobjekt_ids is not None:
+            legacy_qs = legacy_qs.filter(mietobjekt_id__in=mietobjekt_ids)
+        for row in legacy_qs.order_by().values('mietobjekt_id').annotate(total=Count('id')):
+            own_active[row['mietobjekt_id']] = own_active.get(row['mietobjekt_id'], 0) + row['total']
+
+        return own_active
+
+    @staticmethod
+    def _roll_up(root_id, units, children, own_active, result):
+        """
+        Compute UnitOccupancy for root_id and its subtree (iterative post-order).
+
+        Results are memoized in `result`, so shared subtrees are computed once.
+        Cycles (which clean() prevents) are broken by treating a revisited
+        node as a leaf.
+        """
+        stack = [(root_id, False)]
+        in_progress = set()
+        while stack:
+            pk, children_done = stack.pop()
+            if pk in result:
+                continue
+            child_ids = [c for c in children.get(pk, ()) if c not in in_progress]
+            if children_done or not child_ids:
+                in_progress.discard(pk)
+                if child_ids:
+                    active = sum(result[c].active_units for c in child_ids)
+                    available = sum(result[c].available_units for c in child_ids)
+                    total = sum(units[c] for c in child_ids)
+                else:
+                    active = own_active.get(pk, 0)
+                    available = max(0, units[pk] - active)
+                    total = units[pk]
+                result[pk] = UnitOccupancy(
+                    active_units=active,
+                    available_units=available,
+                    total_units=total,
+                    verfuegbare_einheiten=units[pk],
+                    has_children=bool(children.get(pk)),
+                )
+                continue
+            in_progress.add(pk)
+            stack.append((pk, True))
+            stack.extend((c, False) for c in child_ids if c not in result)
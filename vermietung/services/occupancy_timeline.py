@@ -0,0 +1,214 @@
+"""
+Occupancy Timeline Service
+
+Booked and free units of MietObjekte over a date range (availability calendar).
+
+A VertragsObjekt occupies its units for the interval
+[max(Vertrag.start, zugang), min(Vertrag.ende, abgang)) of an active contract.
+Vertrag.ende and abgang are exclusive, matching the "currently active"
+definition (ende > today). All intervals overlapping the requested range are
+loaded with one range query (backed by the interval indexes on Vertrag and
+VertragsObjekt) and swept per day in Python.
+
+Parents aggregate the figures of their leaf descendants, like OccupancyService.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import Q, Subquery
+
+
+@dataclass
+class OccupancyPeriod:
+    """
+    Occupancy of a MietObjekt in one bucket (day or month) of a timeline
+
+    Attributes:
+        von: First day of the bucket
+        bis: Last day of the bucket (inclusive)
+        booked_units: Highest number of booked units on any day of the bucket
+        free_units: Lowest number of free units on any day of the bucket
+    """
+    von: date
+    bis: date
+    booked_units: int
+    free_units: int
+
+
+class OccupancyTimelineService:
+    """
+    Service for occupancy over time (availability calendar and booking validation).
+    """
+
+    GRANULARITY_DAY = 'day'
+    GRANULARITY_MONTH = 'month'
+
+    @staticmethod
+    def overlapping(von: date, bis: Optional[date]) -> Q:
+        """
+        Filter for VertragsObjekte of active contracts overlapping [von, bis).
+
+        Args:
+            von: First day of the period
+            bis: End of the period (exclusive), None for open-ended
+
+        Returns:
+            Q object for VertragsObjekt querysets
+        """
+        q = Q(vertrag__status='active')
+        q &= Q(vertrag__ende__isnull=True) | Q(vertrag__ende__gt=von)
+        q &= Q(abgang__isnull=True) | Q(abgang__gt=von)
+        if bis is not None:
+            q &= Q(vertrag__start__lt=bis)
+            q &= Q(zugang__isnull=True) | Q(zugang__lt=bis)
+        return q
+
+    @classmethod
+    def peak_booked_units(cls, mietobjekt_id: int, von: date, bis: Optional[date] = None,
+                          exclude_pk: Optional[int] = None) -> int:
+        """
+        Highest number of units of a MietObjekt booked on any day in [von, bis).
+
+        Uses a single range query.
+
+        Args:
+            mietobjekt_id: ID of the MietObjekt
+            von: First day of the period
+            bis: End of the period (exclusive), None for open-ended
+            exclude_pk: VertragsObjekt to ignore (the one being validated)
+
+        Returns:
+            int: Peak number of booked units in the period
+        """
+        from vermietung.models import VertragsObjekt
+
+        qs = VertragsObjekt.objects.filter(cls.overlapping(von, bis), mietobjekt_id=mietobjekt_id)
+        if exclude_pk:
+            qs = qs.exclude(pk=exclude_pk)
+
+        # Sweep over start/end events; ends sort before starts on the same day
+        events = []
+        for row in qs.values('anzahl', 'zugang', 'abgang', 'vertrag__start', 'vertrag__ende'):
+            start, end = cls._interval(row)
+            events.append((max(start, von), 1, row['anzahl']))
+            if end is not None:
+                events.append((end, 0, -row['anzahl']))
+        events.sort()
+
+        current = peak = 0
+        for _, _, delta in events:
+            current += delta
+            peak = max(peak, current)
+        return peak
+
+    @classmethod
+    def timeline(cls, mietobjekt_ids: Iterable[int], von: date, bis: date,
+                 granularity: str = GRANULARITY_DAY) -> Dict[int, List[OccupancyPeriod]]:
+        """
+        Booked and free units per day or month for the given MietObjekte.
+
+        Args:
+            mietobjekt_ids: IDs of the MietObjekte
+            von: First day of the range
+            bis: Last day of the range (inclusive)
+            granularity: 'day' or 'month'
+
+        Returns:
+            Dict mapping MietObjekt ID to its list of OccupancyPeriod
+        """
+        from vermietung.models import MietObjekt, VertragsObjekt
+
+        if granularity not in (cls.GRANULARITY_DAY, cls.GRANULARITY_MONTH):
+            raise ValueError(f'Unbekannte Granularität: {granularity}')
+        if bis < von:
+            raise ValueError('Das Enddatum muss nach dem Startdatum liegen.')
+
+        ids = set(mietobjekt_ids)
+        days = (bis - von).days + 1
+
+        # Query 1: the trees of the requested objects
+        roots = MietObjekt.objects.filter(pk__in=ids).values('hierarchy_root_id')
+        rows = list(
+            MietObjekt.objects.filter(Q(pk__in=ids) | Q(hierarchy_root_id__in=Subquery(roots)))
+            .values_list('pk', 'parent_id', 'verfuegbare_einheiten')
+        )
+        units = {pk: einheiten for pk, _, einheiten in rows}
+        children = defaultdict(list)
+        for pk, parent_id, _ in rows:
+            if parent_id in units:
+                children[parent_id].append(pk)
+
+        leaves_of = {pk: cls._leaves(pk, children) for pk in ids if pk in units}
+        leaf_ids = set().union(*leaves_of.values()) if leaves_of else set()
+
+        # Query 2: all intervals of the leaves overlapping the range (difference arrays)
+        booked_delta = {pk: [0] * (days + 1) for pk in leaf_ids}
+        qs = VertragsObjekt.objects.filter(
+            cls.overlapping(von, bis + timedelta(days=1)),
+            mietobjekt_id__in=leaf_ids
+        )
+        for row in qs.values('mietobjekt_id', 'anzahl', 'zugang', 'abgang', 'vertrag__start', 'vertrag__ende'):
+            start, end = cls._interval(row)
+            first = max((start - von).days, 0)
+            last = days if end is None else min((end - von).days, days)
+            if first < last:
+                booked_delta[row['mietobjekt_id']][first] += row['anzahl']
+                booked_delta[row['mietobjekt_id']][last] -= row['anzahl']
+
+        booked_per_day = {}
+        free_per_day = {}
+        for pk in leaf_ids:
+            booked, current = [], 0
+            for delta in booked_delta[pk][:days]:
+                current += delta
+                booked.append(current)
+            booked_per_day[pk] = booked
+            free_per_day[pk] = [max(0, units[pk] - b) for b in booked]
+
+        result = {}
+        for pk, leaves in leaves_of.items():
+            booked = [sum(booked_per_day[leaf][d] for leaf in leaves) for d in range(days)]
+            free = [sum(free_per_day[leaf][d] for leaf in leaves) for d in range(days)]
+            result[pk] = cls._buckets(von, booked, free, granularity)
+        return result
+
+    @staticmethod
+    def _interval(row):
+        """Effective [start, end) of a VertragsObjekt row (end None = open-ended)."""
+        start = row['vertrag__start']
+        if row['zugang'] and row['zugang'] > start:
+            start = row['zugang']
+        ends = [d for d in (row['vertrag__ende'], row['abgang']) if d]
+        return start, min(ends) if ends else None
+
+    @staticmethod
+    def _leaves(root_id, children):
+        """Leaf descendants of root_id (root_id itself if it has no children)."""
+        leaves, stack, seen = [], [root_id], set()
+        while stack:
+            pk = stack.pop()
+            if pk in seen:
+                continue
+            seen.add(pk)
+            if children.get(pk):
+                stack.extend(children[pk])
+            else:
+                leaves.append(pk)
+        return leaves
+
+    @classmethod
+    def _buckets(cls, von, booked, free, granularity):
+        """Group per-day values into day or month buckets."""
+        periods = []
+        for offset in range(len(booked)):
+            day = von + timedelta(days=offset)
+            if granularity == cls.GRANULARITY_MONTH and periods and periods[-1].von.month == day.month:
+                period = periods[-1]
+                period.bis = day
+                period.booked_units = max(period.booked_units, booked[offset])
+                period.free_units = min(period.free_units, free[offset])
+                continue
+            periods.append(OccupancyPeriod(von=day, bis=day, booked_units=booked[offset], free_units=free[offset]))
+        return periods
@@ -0,0 +1,229 @@
+"""
+Rent Roll Service
+
+Soll rent income (net) of contracts for an arbitrary range of months.
+
+The net total of each contract is computed in the database
+(VertragQuerySet.with_totals(), the SQL counterpart of Vertrag.effective_net_total).
+
+A contract contributes its net total to every month it is active in
+(same rule as VertragQuerySet.active_in_month). All months are computed in
+one pass over a single contract query plus one query for the object names.
+"""
+import csv
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterator, List
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Q
+
+
+@dataclass
+class RentRollRow:
+    """
+    One contract of the rent roll
+
+    Attributes:
+        vertrag: Vertrag instance (with mieter and mandant loaded)
+        objekt_display: Object name(s) of the contract
+        betraege: Net amount per month (aligned with RentRoll.months)
+    """
+    vertrag: object
+    objekt_display: str
+    betraege: List[Decimal] = field(default_factory=list)
+
+    @property
+    def kunde(self):
+        return self.vertrag.mieter
+
+    @property
+    def summe(self) -> Decimal:
+        return sum(self.betraege, Decimal('0.00'))
+
+
+@dataclass
+class RentRoll:
+    """
+    Month x contract matrix of the Soll rent income
+
+    Attributes:
+        months: First day of each month in the range
+        rows: One row per contract active in at least one month
+    """
+    months: List[date]
+    rows: List[RentRollRow]
+
+    @property
+    def month_totals(self) -> List[Decimal]:
+        return [
+            sum((row.betraege[i] for row in self.rows), Decimal('0.00'))
+            for i in range(len(self.months))
+        ]
+
+    @property
+    def total(self) -> Decimal:
+        return sum(self.month_totals, Decimal('0.00'))
+
+
+class RentRollService:
+    """
+    Service for the rent roll (Mieteinnahmen Soll) over a range of months.
+    """
+
+    MAX_MONTHS = 120
+
+    @staticmethod
+    def months(von: date, bis: date) -> List[date]:
+        """
+        First days of all months from von to bis (inclusive).
+
+        Raises:
+            ValueError: If bis is before von or the range exceeds MAX_MONTHS
+        """
+        von = von.replace(day=1)
+        bis = bis.replace(day=1)
+        if bis < von:
+            raise ValueError('Der Endmonat darf nicht vor dem Startmonat liegen.')
+
+        result = []
+        month = von
+        while month <= bis:
+            result.append(month)
+            month += relativedelta(months=1)
+        if len(result) > RentRollService.MAX_MONTHS:
+            raise ValueError(f'Es können höchstens {RentRollService.MAX_MONTHS} Monate ausgewertet werden.')
+        return result
+
+    @classmethod
+    def build(cls, von: date, bis: date, mandant=None) -> RentRoll:
+        """
+        Build the rent roll for the months von..bis.
+
+        Args:
+            von: Any day of the first month
+            bis: Any day of the last month
+            mandant: Restrict to this Mandant (None = all Mandanten)
+
+        Returns:
+            RentRoll with one row per contract
+        """
+        from vermietung.models import Vertrag, VertragsObjekt
+
+        months = cls.months(von, bis)
+        range_start = months[0]
+        range_end = months[-1] + relativedelta(months=1) - timedelta(days=1)
+
+        contracts = Vertrag.objects.filter(
+            status='active',
+            start__lte=range_end
+        ).filter(
+            Q(ende__isnull=True) | Q(ende__gte=range_start)
+        ).select_related('mieter', 'mandant', 'mietobjekt').with_totals().order_by('pk')
+        if mandant is not None:
+            contracts = contracts.filter(mandant=mandant)
+        contracts = list(contracts)
+
+        # Object names per contract (in the order they were added)
+        names = {}
+        for vertrag_id, name in VertragsObjekt.objects.filter(
+            vertrag_id__in=[v.pk for v in contracts]
+        ).order_by('created_at', 'pk').values_list('vertrag_id', 'mietobjekt__name'):
+            names.setdefault(vertrag_id, []).append(name)
+
+        rows = []
+        for vertrag in contracts:
+            net = vertrag.effective_net_total
+            betraege = []
+            for month in months:
+                month_end = month + relativedelta(months=1) - timedelta(days=1)
+                active = vertrag.start <= month_end and (vertrag.ende is None or vertrag.ende >= month)
+                betraege.append(net if active else Decimal('0.00'))
+
+            # Prefer new VertragsObjekt relationship, fall back to legacy mietobjekt field
+            objekt_names = names.get(vertrag.pk) or ([vertrag.mietobjekt.name] if vertrag.mietobjekt_id else [])
+            rows.append(RentRollRow(
+                vertrag=vertrag,
+                objekt_display=cls._objekt_display(objekt_names),
+                betraege=betraege,
+            ))
+
+        # Sort rows by customer name for consistent presentation
+        rows.sort(key=lambda row: (row.kunde.full_name() if row.kunde else '', row.vertrag.pk))
+        return RentRoll(months=months, rows=rows)
+
+    @staticmethod
+    def _objekt_display(names):
+        if not names:
+            return '—'
+        if len(names) > 1:
+            return f"{names[0]} (+{len(names) - 1} weitere)"
+        return names[0]
+
+    @staticmethod
+    def header(rent_roll: RentRoll) -> List[str]:
+        """Column headers for exports."""
+        return (
+            ['Vertragsnummer', 'Kunde', 'Objekt', 'Mandant']
+            + [month.strftime('%Y-%m') for month in rent_roll.months]
+            + ['Summe']
+        )
+
+    @classmethod
+    def iter_table(cls, rent_roll: RentRoll) -> Iterator[list]:
+        """
+        Rows of the export table (header, one row per contract, totals row).
+        """
+        yield cls.header(rent_roll)
+        for row in rent_roll.rows:
+            vertrag = row.vertrag
+            yield (
+                [
+                    vertrag.vertragsnummer,
+                    row.kunde.full_name() if row.kunde else '',
+                    row.objekt_display,
+                    vertrag.mandant.name if vertrag.mandant else '',
+                ]
+                + row.betraege
+                + [row.summe]
+            )
+        yield ['Summe', '', '', ''] + rent_roll.month_totals + [rent_roll.total]
+
+    @classmethod
+    def iter_csv(cls, rent_roll: RentRoll) -> Iterator[str]:
+        """
+        Stream the rent roll as CSV lines (semicolon separated, decimal comma).
+        """
+        class _Echo:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(_Echo(), delimiter=';')
+        for values in cls.iter_table(rent_roll):
+            yield writer.writerow([
+                f'{value:.2f}'.replace('.', ',') if isinstance(value, Decimal) else value
+                for value in values
+            ])
+
+    @classmethod
+    def write_xlsx(cls, rent_roll: RentRoll, target) -> None:
+        """
+        Write the rent roll as XLSX workbook to a binary file object.
+
+        Raises:
+            ImportError: If openpyxl is not installed
+        """
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError(
+                "openpyxl is not installed. Install it with: pip install openpyxl"
+            )
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Mieteinnahmen')
+        for values in cls.iter_table(rent_roll):
+            sheet.append(values)
+        workbook.save(target)
+
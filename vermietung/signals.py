@@ -1,12 +1,15 @@
 """
-Signal handlers for Aktivitaet model to send email notifications.
+Signal handlers for Aktivitaet model to send email notifications
+and to invalidate the cached dashboard KPIs.
 """
 from django.db import models
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.urls import reverse
 from core.mailing.service import send_mail, MailServiceError
-from .models import Aktivitaet
+from core.models import Activity, Adresse
+from .models import Aktivitaet, MietObjekt, Vertrag, VertragsObjekt
+from .services import DashboardKpiService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -283,3 +286,21 @@ def handle_cc_users_changed(sender, instance, action, pk_set, **kwargs):
             logger.warning(f"Failed to send CC notification for activity #{instance.pk}: {str(e)}")
         except Exception as e:
             logger.error(f"Unexpected error sending CC notification for activity #{instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Vertrag)
+@receiver(post_delete, sender=Vertrag)
+@receiver(post_save, sender=VertragsObjekt)
+@receiver(post_delete, sender=VertragsObjekt)
+@receiver(post_save, sender=MietObjekt)
+@receiver(post_delete, sender=MietObjekt)
+@receiver(post_save, sender=Aktivitaet)
+@receiver(post_delete, sender=Aktivitaet)
+@receiver(post_save, sender=Adresse)
+@receiver(post_delete, sender=Adresse)
+@receiver(post_save, sender=Activity)
+def invalidate_dashboard_kpis(sender, **kwargs):
+    """
+    Invalidate the cached dashboard KPI snapshots when dashboard data changes.
+    """
+    DashboardKpiService.invalidate()
@@ -0,0 +1,140 @@
+"""
+Tests for the event-driven availability scheduler and the
+apply_availability_transitions management command.
+"""
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from core.models import Adresse
+from vermietung.models import MietObjekt, Vertrag, VertragsObjekt, VerfuegbarkeitsWechsel
+
+
+class AvailabilitySchedulerTest(TestCase):
+    """Tests for scheduling and applying contract start/ende transitions."""
+
+    def setUp(self):
+        """Set up a parent with one child MietObjekt."""
+        self.today = timezone.now().date()
+        self.kunde = Adresse.objects.create(
+            adressen_type='KUNDE',
+            name='Max Mustermann',
+            strasse='Musterstrasse 1',
+            plz='12345',
+            ort='Musterstadt',
+            land='Deutschland'
+        )
+        self.standort = Adresse.objects.create(
+            adressen_type='STANDORT',
+            name='Standort',
+            strasse='Standortstrasse 3',
+            plz='11111',
+            ort='Standortstadt',
+            land='Deutschland'
+        )
+        self.building = MietObjekt.objects.create(
+            name='Gebäude',
+            type='GEBAEUDE',
+            beschreibung='Gebäude',
+            standort=self.standort,
+            mietpreis=Decimal('500.00'),
+        )
+        self.garage = MietObjekt.objects.create(
+            name='Garage',
+            type='STELLPLATZ',
+            beschreibung='Garage',
+            standort=self.standort,
+            mietpreis=Decimal('100.00'),
+            parent=self.building,
+        )
+
+    def _create_vertrag(self, start, ende=None):
+        vertrag = Vertrag.objects.create(
+            mieter=self.kunde,
+            start=start,
+            ende=ende,
+            miete=Decimal('100.00'),
+            kaution=Decimal('300.00'),
+            status='active'
+        )
+        VertragsObjekt.objects.create(vertrag=vertrag, mietobjekt=self.garage, preis=Decimal('100.00'))
+        return vertrag
+
+    def _run_command(self, day):
+        out = StringIO()
+        call_command('apply_availability_transitions', date=day.isoformat(), stdout=out)
+        return out.getvalue()
+
+    def test_save_records_future_transitions(self):
+        """Only future start/ende dates of active contracts are recorded."""
+        vertrag = self._create_vertrag(self.today + timedelta(days=5), self.today + timedelta(days=30))
+        self.assertEqual(
+            list(vertrag.verfuegbarkeitswechsel.values_list('art', 'stichtag')),
+            [('START', self.today + timedelta(days=5)), ('ENDE', self.today + timedelta(days=30))]
+        )
+
+        # Changing the end date replaces the pending transitions
+        vertrag.ende = self.today + timedelta(days=60)
+        vertrag.save()
+        self.assertEqual(
+            list(vertrag.verfuegbarkeitswechsel.filter(art='ENDE').values_list('stichtag', flat=True)),
+            [self.today + timedelta(days=60)]
+        )
+
+        # Cancelled contracts have no pending transitions
+        vertrag.status = 'cancelled'
+        vertrag.save()
+        self.assertFalse(vertrag.verfuegbarkeitswechsel.exists())
+
+    def test_command_applies_due_start_and_end(self):
+        """The command updates the object and its ancestors on the transition dates."""
+        start = self.today + timedelta(days=5)
+        ende = self.today + timedelta(days=30)
+        self._create_vertrag(start, ende)
+
+        self.garage.refresh_from_db()
+        self.assertTrue(self.garage.verfuegbar)
+
+        # Nothing is due before the start date
+        output = self._run_command(start - timedelta(days=1))
+        self.assertIn('No due availability transitions', output)
+
+        self._run_command(start)
+        self.garage.refresh_from_db()
+        self.building.refresh_from_db()
+        self.assertFalse(self.garage.verfuegbar)
+        self.assertFalse(self.building.verfuegbar)
+
+        self._run_command(ende)
+        self.garage.refresh_from_db()
+        self.building.refresh_from_db()
+        self.assertTrue(self.garage.verfuegbar)
+        self.assertTrue(self.building.verfuegbar)
+        self.assertFalse(VerfuegbarkeitsWechsel.objects.filter(verarbeitet_am__isnull=True).exists())
+
+    def test_command_is_idempotent(self):
+        """A second run does not process the same transitions again."""
+        start = self.today + timedelta(days=5)
+        self._create_vertrag(start)
+
+        output = self._run_command(start)
+        self.assertIn('1 transition(s) applied', output)
+
+        output = self._run_command(start)
+        self.assertIn('No due availability transitions', output)
+
+    def test_dry_run_does_not_update(self):
+        """Dry run reports due transitions without processing them."""
+        start = self.today + timedelta(days=5)
+        self._create_vertrag(start)
+
+        out = StringIO()
+        call_command('apply_availability_transitions', date=start.isoformat(), dry_run=True, stdout=out)
+        self.assertIn('dry run', out.getvalue())
+
+        self.garage.refresh_from_db()
+        self.assertTrue(self.garage.verfuegbar)
+        self.assertTrue(VerfuegbarkeitsWechsel.objects.filter(verarbeitet_am__isnull=True).exists())
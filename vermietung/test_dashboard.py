@@ -462,3 +462,69 @@ class DashboardTestCase(TestCase):
         # First object should have the most available units
         self.assertEqual(mietobjekte_list[0]['objekt'].id, obj_with_5_available.id)
         self.assertEqual(mietobjekte_list[0]['verfuegbare_einheiten'], 5)
+
+
+class DashboardKpiCacheTestCase(TestCase):
+    """Test case for the cached dashboard KPI snapshots and lazy widgets."""
+    
+    setUp = DashboardTestCase.setUp
+    
+    def test_dashboard_kpis_are_cached(self):
+        """A second page load serves the KPIs from the cache."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        url = reverse('vermietung:home')
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(url)
+        
+        self.assertLess(len(second), len(first))
+        self.assertEqual(response.context['total_mietobjekte'], 3)
+    
+    def test_writes_invalidate_snapshot(self):
+        """Creating a MietObjekt, Vertrag or Aktivitaet refreshes the KPIs."""
+        url = reverse('vermietung:home')
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_mietobjekte'], 3)
+        self.assertEqual(response.context['active_vertraege'], 0)
+        
+        MietObjekt.objects.create(
+            name='Büro 2',
+            type='RAUM',
+            beschreibung='Büroraum im OG',
+            standort=self.standort,
+            mietpreis=Decimal('400.00')
+        )
+        vertrag = Vertrag.objects.create(
+            mietobjekt=self.mietobjekt1,
+            mieter=self.kunde1,
+            start=timezone.now().date() - timedelta(days=1),
+            miete=Decimal('500.00'),
+            kaution=Decimal('1500.00'),
+            status='active'
+        )
+        Aktivitaet.objects.create(titel='Neue Aktivität', status='OFFEN', vertrag=vertrag)
+        
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_mietobjekte'], 4)
+        self.assertEqual(response.context['active_vertraege'], 1)
+        self.assertEqual(response.context['offene_aktivitaeten'], 1)
+        self.assertEqual(response.context['recent_vertraege'][0].pk, vertrag.pk)
+    
+    def test_lazy_mode_renders_shell_and_widgets(self):
+        """In lazy mode the page contains HTMX placeholders for each widget."""
+        response = self.client.get(reverse('vermietung:home'), {'lazy': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('total_mietobjekte', response.context)
+        for widget in ('kennzahlen', 'einheiten', 'vertraege', 'aktivitaeten'):
+            self.assertContains(response, reverse('vermietung:home_widget', args=[widget]))
+        
+        response = self.client.get(reverse('vermietung:home_widget', args=['kennzahlen']))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Gesamt Objekte')
+        self.assertEqual(response.context['total_mietobjekte'], 3)
+        
+        response = self.client.get(reverse('vermietung:home_widget', args=['unbekannt']))
+        self.assertEqual(response.status_code, 404)
@@ -173,3 +173,37 @@ class RecalcAvailabilityCommandTest(TestCase):
         # Check that one was updated
         output = out.getvalue()
         self.assertIn('1 of 2', output)
+    
+    def test_recalc_all_dry_run_does_not_save(self):
+        """Test that --dry-run lists the changes without saving them."""
+        MietObjekt.objects.filter(pk=self.mietobjekt1.pk).update(verfuegbar=False)
+        
+        out = StringIO()
+        call_command('recalc_availability', dry_run=True, stdout=out)
+        
+        # Still in the inconsistent state
+        self.mietobjekt1.refresh_from_db()
+        self.assertFalse(self.mietobjekt1.verfuegbar)
+        
+        output = out.getvalue()
+        self.assertIn('Garage 1: nicht verfügbar → verfügbar', output)
+        self.assertIn('Dry run: 1 of 2 MietObjekt would be updated, 1 unchanged', output)
+    
+    def test_recalc_all_uses_constant_queries(self):
+        """Test that the bulk run does not issue per-object queries."""
+        for i in range(10):
+            MietObjekt.objects.create(
+                name=f'Box {i}',
+                type='CONTAINER',
+                beschreibung='Box',
+                standort=self.standort,
+                mietpreis=50.00,
+                verfuegbar=False
+            )
+        
+        out = StringIO()
+        # 3 occupancy queries + 1 read + 1 bulk update (+ savepoint handling)
+        with self.assertNumQueries(7):
+            call_command('recalc_availability', stdout=out)
+        
+        self.assertIn('10 of 12 MietObjekt updated, 2 unchanged', out.getvalue())
@@ -175,3 +175,85 @@ class MonthlyRentIncomeViewTests(TestCase):
         self.assertContains(response, 'Objekt A (+1 weitere)')
         # Sum from VertragsObjekte: 2*500 + 1*200 = 1200.00
         self.assertContains(response, '1200,00 €')
+
+
+class RentRollTests(TestCase):
+    """Tests for the rent roll over a range of months and its exports."""
+
+    setUp = MonthlyRentIncomeViewTests.setUp
+
+    def _create_contract(self, kunde, start, ende=None, positions=(), **kwargs):
+        vertrag = Vertrag.objects.create(
+            mietobjekt=None,
+            mieter=kunde,
+            start=start,
+            ende=ende,
+            miete=Decimal('0.00'),
+            kaution=Decimal('0.00'),
+            status='active',
+            **kwargs
+        )
+        for mietobjekt, preis, anzahl in positions:
+            VertragsObjekt.objects.create(vertrag=vertrag, mietobjekt=mietobjekt, preis=preis, anzahl=anzahl)
+        return vertrag
+
+    def test_rent_roll_matches_effective_net_total(self):
+        """Amounts equal effective_net_total, per month the contract is active."""
+        from vermietung.services import RentRollService
+
+        auto = self._create_contract(
+            self.kunde_active, date(2024, 2, 15), date(2024, 3, 31),
+            positions=[(self.objekt_a, Decimal('500.00'), 2), (self.objekt_b, Decimal('200.00'), 1)],
+            stellplatzbetrag=Decimal('25.50')
+        )
+        manual = self._create_contract(
+            self.kunde_inactive, date(2024, 1, 1),
+            positions=[(self.objekt_b, Decimal('200.00'), 1)],
+            auto_total=False, manual_net_total=Decimal('999.99')
+        )
+
+        with self.assertNumQueries(2):
+            rent_roll = RentRollService.build(date(2024, 1, 1), date(2024, 4, 30))
+
+        self.assertEqual(len(rent_roll.months), 4)
+        rows = {row.vertrag.pk: row for row in rent_roll.rows}
+        self.assertEqual(rows[auto.pk].betraege, [
+            Decimal('0.00'), auto.effective_net_total, auto.effective_net_total, Decimal('0.00')
+        ])
+        self.assertEqual(auto.effective_net_total, Decimal('1225.50'))
+        self.assertEqual(rows[manual.pk].betraege, [manual.effective_net_total] * 4)
+        self.assertEqual(rows[auto.pk].objekt_display, 'Objekt A (+1 weitere)')
+        self.assertEqual(rent_roll.month_totals[1], Decimal('2225.49'))
+        self.assertEqual(rent_roll.total, Decimal('1225.50') * 2 + Decimal('999.99') * 4)
+
+    def test_range_view_and_exports(self):
+        """The view renders the matrix and exports CSV/XLSX."""
+        self._create_contract(
+            self.kunde_active, date(2024, 1, 1),
+            positions=[(self.objekt_a, Decimal('500.00'), 1)]
+        )
+        url = reverse('vermietung:mieteinnahmen_monatlich')
+
+        response = self.client.get(url, {'monat': '2024-01', 'bis': '2024-12'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_range'])
+        self.assertContains(response, '6000,00 €')
+
+        response = self.client.get(url, {'monat': '2024-01', 'bis': '2024-03', 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'Vertragsnummer;Kunde;Objekt;Mandant;2024-01;2024-02;2024-03;Summe')
+        self.assertIn('Aktiver Kunde;Objekt A;;500,00;500,00;500,00;1500,00', lines[1])
+        self.assertEqual(lines[-1], 'Summe;;;;500,00;500,00;500,00;1500,00')
+
+        try:
+            import openpyxl
+        except ImportError:
+            return
+        from io import BytesIO
+        response = self.client.get(url, {'monat': '2024-01', 'bis': '2024-03', 'format': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+        workbook = openpyxl.load_workbook(BytesIO(b''.join(response.streaming_content)))
+        sheet = workbook.active
+        self.assertEqual(sheet.cell(row=1, column=5).value, '2024-01')
+        self.assertEqual(sheet.cell(row=2, column=8).value, 1500)
@@ -124,12 +124,37 @@ class MietObjektCRUDTestCase(TestCase):
         self.assertNotContains(response, 'Lager 1')
     
     def test_mietobjekt_list_verfuegbar_filter(self):
-        """Test that availability filter works correctly."""
+        """Test that availability filter works correctly (occupancy counters)."""
+        from datetime import date
+        # Book the only unit of Lager 1
+        Vertrag.objects.create(
+            mietobjekt=self.objekt2,
+            mieter=self.kunde,
+            start=date(2024, 1, 1),
+            miete=Decimal('500.00'),
+            kaution=Decimal('1500.00'),
+            status='active'
+        )
         self.client.login(username='testuser', password='testpass123')
         response = self.client.get(reverse('vermietung:mietobjekt_list'), {'verfuegbar': 'true'})
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Büro 1')
         self.assertNotContains(response, 'Lager 1')
+        
+        response = self.client.get(reverse('vermietung:mietobjekt_list'), {'verfuegbar': 'false'})
+        self.assertNotContains(response, 'Büro 1')
+        self.assertContains(response, 'Lager 1')
+    
+    def test_mietobjekt_list_sorted_by_counters(self):
+        """The list sorts by the stored counters without per-row queries."""
+        MietObjekt.objects.filter(pk=self.objekt2.pk).update(available_units=5)
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('vermietung:mietobjekt_list'), {'sort': 'frei'})
+        self.assertEqual(
+            [objekt.name for objekt in response.context['page_obj']],
+            ['Lager 1', 'Büro 1']
+        )
+        self.assertEqual(response.context['page_obj'][0].get_available_units_count(), 5)
     
     def test_mietobjekt_list_standort_filter(self):
         """Test that location filter works correctly."""
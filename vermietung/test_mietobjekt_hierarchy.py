@@ -340,6 +340,68 @@ class MietObjektHierarchyTestCase(TestCase):
         self.apartment1.refresh_from_db()
         self.assertIsNone(self.apartment1.parent)
         self.assertNotIn(self.apartment1, self.building.children.all())
+    
+    def test_hierarchy_path_maintained_on_create(self):
+        """Test that path, depth and root are persisted on create."""
+        self.assertEqual(self.building.hierarchy_path, f'/{self.building.pk}/')
+        self.assertEqual(self.apartment1.hierarchy_path, f'/{self.building.pk}/{self.apartment1.pk}/')
+        self.assertEqual(self.apartment1.hierarchy_depth, 1)
+        self.assertEqual(self.apartment1.hierarchy_root_id, self.building.pk)
+    
+    def test_reparent_moves_subtree_paths(self):
+        """Test that reparenting rewrites the paths of the whole subtree."""
+        room = MietObjekt.objects.create(
+            name='Raum 1.1',
+            type='RAUM',
+            beschreibung='Zimmer in Wohnung 1',
+            standort=self.standort,
+            parent=self.apartment1,
+        )
+        
+        # Move apartment1 (with its room) below apartment2
+        self.apartment1.parent = self.apartment2
+        self.apartment1.save()
+        
+        room.refresh_from_db()
+        self.assertEqual(
+            room.hierarchy_path,
+            f'/{self.building.pk}/{self.apartment2.pk}/{self.apartment1.pk}/{room.pk}/'
+        )
+        self.assertEqual(room.get_hierarchy_level(), 3)
+        self.assertIn(room, self.apartment2.get_all_children())
+        
+        # Detach apartment1 completely: it becomes a new root
+        self.apartment1.parent = None
+        self.apartment1.save()
+        room.refresh_from_db()
+        self.assertEqual(room.hierarchy_depth, 1)
+        self.assertEqual(room.get_root_parent(), self.apartment1)
+        self.assertNotIn(room, self.building.get_all_children())
+    
+    def test_delete_parent_detaches_child_paths(self):
+        """Test that children of a deleted object become roots."""
+        self.building.delete()
+        self.apartment1.refresh_from_db()
+        self.assertIsNone(self.apartment1.parent)
+        self.assertEqual(self.apartment1.hierarchy_path, f'/{self.apartment1.pk}/')
+        self.assertEqual(self.apartment1.hierarchy_root_id, self.apartment1.pk)
+    
+    def test_hierarchy_lookups_use_constant_queries(self):
+        """Test that level, root and subtree lookups do not walk the tree."""
+        room = MietObjekt.objects.create(
+            name='Raum 1.1',
+            type='RAUM',
+            beschreibung='Zimmer in Wohnung 1',
+            standort=self.standort,
+            parent=self.apartment1,
+        )
+        room = MietObjekt.objects.get(pk=room.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(room.get_hierarchy_level(), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(room.get_root_parent(), self.building)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.building.get_all_children()), 3)
 
 
 class MietObjektAggregationTestCase(TestCase):
@@ -572,6 +634,7 @@ class MietObjektAggregationTestCase(TestCase):
         # Check that orphan now has building as parent
         orphan.refresh_from_db()
         self.assertEqual(orphan.parent, self.building)
+        self.assertEqual(orphan.hierarchy_path, f'/{self.building.pk}/{orphan.pk}/')
         
     def test_assign_child_validation(self):
         """Test that assigning a child with a parent fails."""
@@ -0,0 +1,198 @@
+"""
+Tests for the set-based OccupancyService.
+"""
+
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from core.models import Adresse
+from vermietung.models import MietObjekt, Vertrag, VertragsObjekt
+from vermietung.services import OccupancyService
+
+
+class OccupancyFixtureMixin:
+    """Small MietObjekt hierarchy with current, legacy and future contracts."""
+
+    def setUp(self):
+        """Set up a small hierarchy with contracts."""
+        self.kunde = Adresse.objects.create(
+            adressen_type='KUNDE',
+            name='Max Mustermann',
+            strasse='Musterstrasse 1',
+            plz='12345',
+            ort='Musterstadt',
+            land='Deutschland'
+        )
+        self.standort = Adresse.objects.create(
+            adressen_type='STANDORT',
+            name='Standort',
+            strasse='Standortstrasse 3',
+            plz='11111',
+            ort='Standortstadt',
+            land='Deutschland'
+        )
+        self.building = self._create_mietobjekt('Gebäude', einheiten=1)
+        self.floor = self._create_mietobjekt('Etage 1', einheiten=1, parent=self.building)
+        self.room1 = self._create_mietobjekt('Raum 1', einheiten=5, parent=self.floor)
+        self.room2 = self._create_mietobjekt('Raum 2', einheiten=2, parent=self.floor)
+        self.garage = self._create_mietobjekt('Garage', einheiten=1, parent=self.building)
+        self.standalone = self._create_mietobjekt('Container', einheiten=3)
+
+        yesterday = timezone.now().date() - timedelta(days=1)
+        vertrag = Vertrag.objects.create(
+            mieter=self.kunde,
+            start=yesterday,
+            miete=Decimal('100.00'),
+            kaution=Decimal('300.00'),
+            status='active'
+        )
+        VertragsObjekt.objects.create(vertrag=vertrag, mietobjekt=self.room1, preis=Decimal('10.00'), anzahl=3)
+        VertragsObjekt.objects.create(vertrag=vertrag, mietobjekt=self.standalone, preis=Decimal('10.00'), anzahl=1)
+
+        # Legacy contract (creates its own VertragsObjekt automatically)
+        Vertrag.objects.create(
+            mietobjekt=self.garage,
+            mieter=self.kunde,
+            start=yesterday,
+            miete=Decimal('50.00'),
+            kaution=Decimal('150.00'),
+            status='active'
+        )
+
+        # Future contract must not be counted
+        future = Vertrag.objects.create(
+            mieter=self.kunde,
+            start=timezone.now().date() + timedelta(days=10),
+            miete=Decimal('100.00'),
+            kaution=Decimal('300.00'),
+            status='active'
+        )
+        VertragsObjekt.objects.create(vertrag=future, mietobjekt=self.room2, preis=Decimal('10.00'), anzahl=1)
+
+    def _create_mietobjekt(self, name, einheiten, parent=None):
+        return MietObjekt.objects.create(
+            name=name,
+            type='RAUM',
+            beschreibung=name,
+            standort=self.standort,
+            mietpreis=Decimal('100.00'),
+            verfuegbare_einheiten=einheiten,
+            parent=parent
+        )
+
+
+class OccupancyServiceTest(OccupancyFixtureMixin, TestCase):
+    """Tests that OccupancyService matches the per-object unit count methods."""
+
+    def test_matches_per_object_calculation(self):
+        """Service results equal the recursive model methods for every object."""
+        occupancy = OccupancyService.calculate()
+        for obj in MietObjekt.objects.all():
+            self.assertEqual(occupancy[obj.pk].active_units, obj.get_active_units_count(), obj.name)
+            self.assertEqual(occupancy[obj.pk].available_units, obj.get_available_units_count(), obj.name)
+            self.assertEqual(occupancy[obj.pk].total_units, obj.get_verfuegbare_einheiten_display(), obj.name)
+            self.assertEqual(occupancy[obj.pk].is_fully_booked, obj.has_active_contracts(), obj.name)
+
+    def test_hierarchy_roll_up(self):
+        """Parents aggregate the figures of their children."""
+        occupancy = OccupancyService.calculate()
+        self.assertEqual(occupancy[self.floor.pk].active_units, 3)
+        self.assertEqual(occupancy[self.floor.pk].available_units, 4)
+        self.assertEqual(occupancy[self.building.pk].active_units, 4)
+        self.assertEqual(occupancy[self.building.pk].available_units, 4)
+        self.assertEqual(occupancy[self.standalone.pk].available_units, 2)
+
+    def test_query_count_is_independent_of_object_count(self):
+        """The calculation uses a fixed number of queries."""
+        with self.assertNumQueries(3):
+            OccupancyService.calculate()
+        for i in range(10):
+            self._create_mietobjekt(f'Box {i}', einheiten=1, parent=self.room2)
+        with self.assertNumQueries(3):
+            OccupancyService.calculate()
+
+    def test_restricted_calculation(self):
+        """Restricting to some IDs still rolls up over their descendants."""
+        occupancy = OccupancyService.calculate([self.building.pk])
+        self.assertEqual(list(occupancy), [self.building.pk])
+        self.assertEqual(occupancy[self.building.pk].active_units, 4)
+
+    def test_legacy_contracts_use_reference_date(self):
+        """Legacy contracts without VertragsObjekt are counted on the given date."""
+        VertragsObjekt.objects.filter(mietobjekt=self.garage).delete()
+        today = timezone.now().date()
+        self.assertEqual(OccupancyService.calculate([self.garage.pk])[self.garage.pk].active_units, 1)
+        self.assertEqual(
+            OccupancyService.calculate([self.garage.pk], today=today - timedelta(days=2))[self.garage.pk].active_units,
+            0
+        )
+
+    def test_annotate_avoids_per_object_queries(self):
+        """Annotated instances answer unit count methods without queries."""
+        objects = OccupancyService.annotate(MietObjekt.objects.all())
+        with self.assertNumQueries(0):
+            for obj in objects:
+                obj.get_active_units_count()
+                obj.get_available_units_count()
+                obj.get_verfuegbare_einheiten_display()
+
+
+class OccupancyCountersTest(OccupancyFixtureMixin, TestCase):
+    """Tests for the denormalized occupancy counters and check_occupancy_counters."""
+
+    def _assert_counters_consistent(self):
+        occupancy = OccupancyService.calculate()
+        for obj in MietObjekt.objects.all():
+            self.assertEqual(obj.active_units, occupancy[obj.pk].active_units, obj.name)
+            self.assertEqual(obj.available_units, occupancy[obj.pk].available_units, obj.name)
+
+    def test_counters_maintained_on_write_paths(self):
+        """Counters are kept current by contract, unit and hierarchy changes."""
+        self._assert_counters_consistent()
+        self.building.refresh_from_db()
+        self.assertEqual((self.building.active_units, self.building.available_units), (4, 4))
+
+        # Ending a contract releases its units
+        vertrag = self.room1.vertragsobjekte.get().vertrag
+        vertrag.status = 'ended'
+        vertrag.save()
+        self._assert_counters_consistent()
+
+        # Changing the units of a leaf updates its ancestors
+        self.room2.verfuegbare_einheiten = 6
+        self.room2.save()
+        self._assert_counters_consistent()
+
+        # Moving a subtree updates the old and the new parent
+        self.room2.parent = self.standalone
+        self.room2.save()
+        self._assert_counters_consistent()
+
+        # Deleting a contract position releases its units
+        VertragsObjekt.objects.filter(mietobjekt=self.standalone).delete()
+        self.garage.vertragsobjekte.get().delete()
+        self._assert_counters_consistent()
+
+    def test_check_command_detects_and_repairs_drift(self):
+        """check_occupancy_counters reports drift and repairs it with --fix."""
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('check_occupancy_counters', stdout=out)
+        self.assertIn('consistent', out.getvalue())
+
+        MietObjekt.objects.filter(pk__in=[self.room1.pk, self.building.pk]).update(
+            active_units=0, available_units=99
+        )
+        out = StringIO()
+        call_command('check_occupancy_counters', stdout=out)
+        self.assertIn('2 of 6 MietObjekt counters drifted', out.getvalue())
+        self.room1.refresh_from_db()
+        self.assertEqual(self.room1.available_units, 99)
+
+        out = StringIO()
+        call_command('check_occupancy_counters', fix=True, stdout=out)
+        self.assertIn('Repaired 2 of 6', out.getvalue())
+        self._assert_counters_consistent()
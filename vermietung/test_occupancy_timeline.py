@@ -0,0 +1,160 @@
+"""
+Tests for the occupancy timeline (availability calendar) and period-based
+booking validation.
+"""
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import date, timedelta
+from decimal import Decimal
+from core.models import Adresse
+from vermietung.models import MietObjekt, Vertrag, VertragsObjekt
+from vermietung.services import OccupancyTimelineService
+
+
+class OccupancyTimelineTest(TestCase):
+    """Tests for OccupancyTimelineService and the mietobjekt_belegung endpoint."""
+
+    def setUp(self):
+        """Set up a building with two storage rooms."""
+        self.today = timezone.now().date()
+        self.kunde = Adresse.objects.create(
+            adressen_type='KUNDE',
+            name='Max Mustermann',
+            strasse='Musterstrasse 1',
+            plz='12345',
+            ort='Musterstadt',
+            land='Deutschland'
+        )
+        self.standort = Adresse.objects.create(
+            adressen_type='STANDORT',
+            name='Standort',
+            strasse='Standortstrasse 3',
+            plz='11111',
+            ort='Standortstadt',
+            land='Deutschland'
+        )
+        self.building = self._create_mietobjekt('Gebäude', einheiten=1)
+        self.lager1 = self._create_mietobjekt('Lager 1', einheiten=3, parent=self.building)
+        self.lager2 = self._create_mietobjekt('Lager 2', einheiten=2, parent=self.building)
+
+    def _create_mietobjekt(self, name, einheiten, parent=None):
+        return MietObjekt.objects.create(
+            name=name,
+            type='RAUM',
+            beschreibung=name,
+            standort=self.standort,
+            mietpreis=Decimal('100.00'),
+            verfuegbare_einheiten=einheiten,
+            parent=parent
+        )
+
+    def _book(self, mietobjekt, anzahl, start, ende=None, **kwargs):
+        vertrag = Vertrag.objects.create(
+            mieter=self.kunde,
+            start=start,
+            ende=ende,
+            miete=Decimal('100.00'),
+            kaution=Decimal('300.00'),
+            status='active'
+        )
+        return VertragsObjekt.objects.create(
+            vertrag=vertrag, mietobjekt=mietobjekt, preis=Decimal('10.00'), anzahl=anzahl, **kwargs
+        )
+
+    def test_daily_timeline(self):
+        """Booked/free units follow start (inclusive) and ende (exclusive)."""
+        self._book(self.lager1, 2, self.today + timedelta(days=2), self.today + timedelta(days=4))
+        timeline = OccupancyTimelineService.timeline(
+            [self.lager1.pk], self.today, self.today + timedelta(days=5)
+        )[self.lager1.pk]
+        self.assertEqual([p.booked_units for p in timeline], [0, 0, 2, 2, 0, 0])
+        self.assertEqual([p.free_units for p in timeline], [3, 3, 1, 1, 3, 3])
+
+    def test_zugang_abgang_limit_interval(self):
+        """zugang/abgang narrow the occupancy interval of a position."""
+        self._book(
+            self.lager1, 1, self.today,
+            zugang=self.today + timedelta(days=1), abgang=self.today + timedelta(days=2)
+        )
+        timeline = OccupancyTimelineService.timeline(
+            [self.lager1.pk], self.today, self.today + timedelta(days=2)
+        )[self.lager1.pk]
+        self.assertEqual([p.booked_units for p in timeline], [0, 1, 0])
+
+    def test_monthly_timeline_rolls_up_children(self):
+        """Months report the peak booking, parents sum their children."""
+        von = date(2030, 1, 1)
+        self._book(self.lager1, 3, date(2030, 1, 10), date(2030, 1, 20))
+        self._book(self.lager2, 1, date(2030, 2, 1))
+        timeline = OccupancyTimelineService.timeline(
+            [self.building.pk], von, date(2030, 3, 31), granularity='month'
+        )[self.building.pk]
+        self.assertEqual([(p.von, p.bis) for p in timeline], [
+            (date(2030, 1, 1), date(2030, 1, 31)),
+            (date(2030, 2, 1), date(2030, 2, 28)),
+            (date(2030, 3, 1), date(2030, 3, 31)),
+        ])
+        self.assertEqual([p.booked_units for p in timeline], [3, 1, 1])
+        self.assertEqual([p.free_units for p in timeline], [2, 4, 4])
+
+    def test_timeline_uses_two_queries(self):
+        """The timeline needs one hierarchy and one range query."""
+        for i in range(5):
+            self._book(self.lager1, 1, self.today + timedelta(days=i), self.today + timedelta(days=i + 1))
+        with self.assertNumQueries(2):
+            OccupancyTimelineService.timeline(
+                [self.building.pk, self.lager1.pk], self.today, self.today + timedelta(days=60)
+            )
+
+    def test_validation_checks_whole_period(self):
+        """A future overbooking is rejected although the object is free today."""
+        self._book(self.lager1, 2, self.today + timedelta(days=10), self.today + timedelta(days=20))
+
+        with self.assertRaises(ValidationError) as cm:
+            self._book(self.lager1, 2, self.today, self.today + timedelta(days=15))
+        self.assertIn('Nicht genügend Einheiten verfügbar', str(cm.exception))
+
+        # Adjacent periods do not overlap (ende is exclusive)
+        self._book(self.lager1, 2, self.today, self.today + timedelta(days=10))
+        self._book(self.lager1, 3, self.today + timedelta(days=20))
+
+    def test_peak_booked_units_single_query(self):
+        """The peak over a period is computed with one range query."""
+        self._book(self.lager1, 1, self.today, self.today + timedelta(days=5))
+        self._book(self.lager1, 1, self.today + timedelta(days=3), self.today + timedelta(days=8))
+        with self.assertNumQueries(1):
+            peak = OccupancyTimelineService.peak_booked_units(self.lager1.pk, self.today)
+        self.assertEqual(peak, 2)
+        self.assertEqual(
+            OccupancyTimelineService.peak_booked_units(self.lager1.pk, self.today, self.today + timedelta(days=3)),
+            1
+        )
+
+    def test_belegung_endpoint(self):
+        """The endpoint returns the periods as JSON and validates parameters."""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        user.groups.add(Group.objects.create(name='Vermietung'))
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        self._book(self.lager2, 1, date(2030, 1, 15))
+
+        url = reverse('vermietung:mietobjekt_belegung')
+        response = client.get(url, {
+            'ids': f'{self.lager2.pk}', 'von': '2030-01-01', 'bis': '2030-02-28', 'raster': 'monat'
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['objects']), 1)
+        self.assertEqual(data['objects'][0]['perioden'], [
+            {'von': '2030-01-01', 'bis': '2030-01-31', 'gebucht': 1, 'frei': 1},
+            {'von': '2030-02-01', 'bis': '2030-02-28', 'gebucht': 1, 'frei': 1},
+        ])
+
+        response = client.get(url, {'von': '2030-02-01', 'bis': '2030-01-01'})
+        self.assertEqual(response.status_code, 400)
+        response = client.get(url, {'raster': 'jahr'})
+        self.assertEqual(response.status_code, 400)
@@ -254,3 +254,72 @@ class VertragVATTestCase(TestCase):
         
         # Check default value
         self.assertEqual(vertrag.umsatzsteuer_satz, '19')
+
+
+class VertragWithTotalsTestCase(TestCase):
+    """Test case for the SQL-annotated totals of VertragQuerySet.with_totals()."""
+    
+    setUp = VertragVATTestCase.setUp
+    
+    def _create_vertrag(self, positionen, **kwargs):
+        vertrag = Vertrag.objects.create(
+            mieter=self.kunde,
+            start=date(2024, 1, 1),
+            miete=Decimal('0.00'),
+            kaution=Decimal('0.00'),
+            status='active',
+            **kwargs
+        )
+        for preis, anzahl in positionen:
+            mietobjekt = MietObjekt.objects.create(
+                name=f'Lager {MietObjekt.objects.count()}',
+                type='RAUM',
+                beschreibung='Lager',
+                standort=self.standort,
+                mietpreis=Decimal('100.00'),
+                verfuegbare_einheiten=anzahl,
+            )
+            VertragsObjekt.objects.create(
+                vertrag=vertrag, mietobjekt=mietobjekt, preis=Decimal(preis), anzahl=anzahl
+            )
+        return vertrag
+    
+    def _totals(self, vertrag):
+        return (
+            vertrag.berechne_gesamtmiete(),
+            vertrag.effective_net_total,
+            vertrag.berechne_umsatzsteuer(),
+            vertrag.berechne_bruttobetrag(),
+        )
+    
+    def test_annotated_totals_match_python_calculation(self):
+        """Annotated totals equal the per-instance calculation, including rounding."""
+        vertraege = [
+            self._create_vertrag([('1000.00', 1)], umsatzsteuer_satz='19'),
+            # 0.05 * 7% = 0.0035 -> HALF_UP rounding edge cases
+            self._create_vertrag([('0.05', 1)], umsatzsteuer_satz='7'),
+            self._create_vertrag([('10.45', 3), ('0.15', 2)], umsatzsteuer_satz='19'),
+            self._create_vertrag([('99.99', 2)], umsatzsteuer_satz='0', stellplatzbetrag=Decimal('25.50')),
+            self._create_vertrag(
+                [('100.00', 1)], umsatzsteuer_satz='19',
+                auto_total=False, manual_net_total=Decimal('77.77'), stellplatzbetrag=Decimal('10.00')
+            ),
+            self._create_vertrag([], umsatzsteuer_satz='19'),
+        ]
+        
+        annotated = {v.pk: v for v in Vertrag.objects.with_totals()}
+        for vertrag in vertraege:
+            expected = self._totals(Vertrag.objects.get(pk=vertrag.pk))
+            self.assertEqual(self._totals(annotated[vertrag.pk]), expected)
+        
+        self.assertEqual(annotated[vertraege[4].pk].effective_net_total, Decimal('87.77'))
+        self.assertEqual(annotated[vertraege[5].pk].berechne_bruttobetrag(), Decimal('0.00'))
+    
+    def test_annotated_totals_need_no_extra_queries(self):
+        """Listing totals of many contracts runs a single query."""
+        for i in range(5):
+            self._create_vertrag([('100.00', i + 1), ('12.34', 1)], umsatzsteuer_satz='19')
+        
+        with self.assertNumQueries(1):
+            totals = [self._totals(vertrag) for vertrag in Vertrag.objects.with_totals()]
+        self.assertEqual(len(totals), 5)
@@ -4,12 +4,16 @@ Tests that vertragsnummer can be manually set or auto-generated,
 and that uniqueness is enforced globally.
 """
 
+from importlib import import_module
+
+from django.apps import apps as django_apps
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from decimal import Decimal
 from datetime import date
 from core.models import Adresse
+from auftragsverwaltung.models import NumberRange
 from vermietung.models import MietObjekt, Vertrag
 
 
@@ -333,3 +337,55 @@ class VertragsnummerEditableTestCase(TestCase):
         # Verify first and third have auto-generated format
         self.assertTrue(vertrag1.vertragsnummer.startswith('V-'))
         self.assertTrue(vertrag3.vertragsnummer.startswith('V-'))
+
+
+class VertragsnummerSequenceTestCase(TestCase):
+    """Test case for the sequence-backed (NumberRange RENTAL) contract numbers."""
+
+    setUp = VertragsnummerEditableTestCase.setUp
+
+    def _create_vertrag(self, **kwargs):
+        return Vertrag.objects.create(
+            mieter=self.kunde,
+            start=date(2024, 1, 1),
+            miete=Decimal('500.00'),
+            kaution=Decimal('1500.00'),
+            **kwargs
+        )
+
+    def test_numbers_are_sequential(self):
+        """Auto-generated numbers continue the RENTAL number range."""
+        numbers = [self._create_vertrag().vertragsnummer for _ in range(3)]
+        self.assertEqual(numbers, ['V-00001', 'V-00002', 'V-00003'])
+        self.assertEqual(NumberRange.objects.get(target='RENTAL').current_seq, 3)
+
+    def test_generation_does_not_scan_contracts(self):
+        """Generating a number costs the same queries regardless of the number of contracts."""
+        self._create_vertrag()
+        vertrag = Vertrag(mieter=self.kunde, start=date(2024, 1, 1), miete=Decimal('1.00'), kaution=Decimal('0'))
+        # 2 savepoints + releases, locked range row, update, existence check
+        with self.assertNumQueries(7):
+            self.assertEqual(vertrag._generate_vertragsnummer(), 'V-00002')
+
+    def test_skips_manually_assigned_numbers(self):
+        """A number already entered manually is not assigned a second time."""
+        self._create_vertrag(vertragsnummer='V-00002')
+        self.assertEqual(self._create_vertrag().vertragsnummer, 'V-00001')
+        self.assertEqual(self._create_vertrag().vertragsnummer, 'V-00003')
+
+    def test_seed_migration_continues_after_highest_number(self):
+        """The seed migration sets the sequence to the highest existing V-number."""
+        seed_migration = import_module('vermietung.migrations.0043_seed_vertrag_numberrange')
+        Vertrag.objects.bulk_create([
+            Vertrag(vertragsnummer=number, mieter=self.kunde, start=date(2024, 1, 1),
+                    miete=Decimal('1.00'), kaution=Decimal('0'))
+            for number in ['V-00007', 'V-00012', '2026-0001', 'V-ABC']
+        ])
+        NumberRange.objects.filter(target='RENTAL').delete()
+
+        seed_migration.seed_rental_numberrange(django_apps, None)
+
+        number_range = NumberRange.objects.get(target='RENTAL')
+        self.assertEqual(number_range.current_seq, 12)
+        self.assertEqual(number_range.reset_policy, 'NEVER')
+        self.assertEqual(self._create_vertrag().vertragsnummer, 'V-00013')
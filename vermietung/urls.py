@@ -22,6 +22,7 @@ urlpatterns = [
     path('aktivitaeten/anhaenge/<int:attachment_id>/loeschen/', views.aktivitaet_attachment_delete, name='aktivitaet_attachment_delete'),
     
     path('', views.vermietung_home, name='home'),
+    path('dashboard/widget/<str:widget>/', views.vermietung_home_widget, name='home_widget'),
     path('components/', views.vermietung_components, name='components'),
     
     # Customer (Kunde) URLs
@@ -64,6 +65,7 @@ urlpatterns = [
     path('mietobjekte/<int:pk>/bearbeiten/', views.mietobjekt_edit, name='mietobjekt_edit'),
     path('mietobjekte/<int:pk>/loeschen/', views.mietobjekt_delete, name='mietobjekt_delete'),
     # Hierarchy management URLs
+    path('mietobjekte/belegung/', views.mietobjekt_belegung, name='mietobjekt_belegung'),
     path('mietobjekte/<int:parent_pk>/verfuegbar-fuer-zuweisung/', views.mietobjekt_available_for_assignment, name='mietobjekt_available_for_assignment'),
     path('mietobjekte/<int:parent_pk>/kind-zuweisen/', views.mietobjekt_assign_child, name='mietobjekt_assign_child'),
     
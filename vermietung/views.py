@@ -1,6 +1,6 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
-from django.http import JsonResponse, Http404, FileResponse, HttpResponse
+from django.http import JsonResponse, Http404, FileResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
@@ -8,8 +8,10 @@ from django.core.paginator import Paginator
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.utils import timezone
 from django.contrib import messages
+from django.conf import settings
 from django.db.models import Q
 from datetime import timedelta, datetime, date
+from dateutil.relativedelta import relativedelta
 from decimal import Decimal
 import tempfile
 import os
@@ -37,6 +39,7 @@ from .tables import EingangsrechnungTable
 from .filters import EingangsrechnungFilter
 from core.printing import PdfRenderService, get_static_base_url
 from .printing.context import UebergabeprotokollContextBuilder
+from .services import OccupancyService, OccupancyTimelineService, DashboardKpiService, RentRollService
 
 
 logger = logging.getLogger(__name__)
@@ -570,80 +573,40 @@ def download_dokument(request, dokument_id):
 
 @vermietung_required
 def vermietung_home(request):
-    """Vermietung dashboard/home page - requires Vermietung access."""
-    # Calculate KPIs
-    total_mietobjekte = MietObjekt.objects.count()
-    
-    # Get all rental objects with prefetched related data to avoid N+1 queries
-    all_mietobjekte = MietObjekt.objects.select_related('standort').all()
-    
-    # Calculate total available units and create breakdown list
-    # We iterate once through all objects to avoid multiple queries
-    verfuegbare_einheiten_gesamt = 0
-    mietobjekte_mit_einheiten = []
-    
-    for obj in all_mietobjekte:
-        verfuegbare = obj.get_available_units_count()
-        gebuchte = obj.get_active_units_count()
-        
-        # Add to total
-        verfuegbare_einheiten_gesamt += verfuegbare
-        
-        # Add to breakdown list
-        mietobjekte_mit_einheiten.append({
-            'objekt': obj,
-            'verfuegbare_einheiten': verfuegbare,
-            'gebuchte_einheiten': gebuchte,
-            'gesamt_einheiten': obj.verfuegbare_einheiten,
-        })
+    """
+    Vermietung dashboard/home page - requires Vermietung access.
     
-    # Sort by available units (descending), then by name
-    mietobjekte_mit_einheiten.sort(
-        key=lambda x: (-x['verfuegbare_einheiten'], x['objekt'].name)
-    )
+    KPIs and widgets come from cached snapshots (DashboardKpiService).
+    In lazy mode (setting VERMIETUNG_DASHBOARD_LAZY or ?lazy=1) only the page
+    shell is rendered and each widget is loaded via HTMX (vermietung_home_widget).
+    """
+    lazy = request.GET.get('lazy', '1' if getattr(settings, 'VERMIETUNG_DASHBOARD_LAZY', False) else '0') == '1'
     
-    active_vertraege = Vertrag.objects.currently_active().count()
-    # Count all activities that are NOT 'ABGEBROCHEN' or 'ERLEDIGT' (i.e., OFFEN and IN_BEARBEITUNG)
-    offene_aktivitaeten = Aktivitaet.objects.exclude(
-        status__in=['ABGEBROCHEN', 'ERLEDIGT']
-    ).count()
-    total_kunden = Adresse.objects.filter(adressen_type='KUNDE').count()
+    context = {'lazy': lazy, 'widgets': DashboardKpiService.WIDGETS}
+    if not lazy:
+        # Get the default company (Mandant) - in a multi-tenant setup, this would be based on the user's company
+        context.update(DashboardKpiService.get_all(company=Mandant.objects.first()))
     
-    # Get recently created contracts (last 10)
-    recent_vertraege = Vertrag.objects.select_related('mietobjekt', 'mieter').order_by('-id')[:10]
+    return render(request, 'vermietung/home.html', context)
+
+
+@vermietung_required
+def vermietung_home_widget(request, widget):
+    """
+    HTMX endpoint rendering a single dashboard widget from its cached snapshot.
     
-    # Get contracts expiring soon (within next 60 days, excluding those without end date)
-    today = timezone.now().date()
-    expiring_soon_date = today + timedelta(days=60)
-    expiring_vertraege = Vertrag.objects.select_related('mietobjekt', 'mieter').filter(
-        status='active',
-        ende__isnull=False,
-        ende__gte=today,
-        ende__lte=expiring_soon_date
-    ).order_by('ende')[:10]
-    
-    # Get activity stream (last 25 activities from ALL domains)
-    # Get the default company (Mandant) - in a multi-tenant setup, this would be based on the user's company
-    company = Mandant.objects.first()
-    if company:
-        # Fetch all activities without domain filter to show activities from all areas
-        activities = ActivityStreamService.latest(n=25, company=company)
-    else:
-        activities = []
+    Args:
+        request: HTTP request
+        widget: Name of the widget (see DashboardKpiService.WIDGETS)
     
-    context = {
-        'total_mietobjekte': total_mietobjekte,
-        'verfuegbare_einheiten_gesamt': verfuegbare_einheiten_gesamt,
-        'active_vertraege': active_vertraege,
-        'offene_aktivitaeten': offene_aktivitaeten,
-        'total_kunden': total_kunden,
-        'recent_vertraege': recent_vertraege,
-        'expiring_vertraege': expiring_vertraege,
-        'mietobjekte_mit_einheiten': mietobjekte_mit_einheiten,
-        'activities': activities,
-    }
+    Returns:
+        Rendered widget partial
+    """
+    if widget not in DashboardKpiService.WIDGETS:
+        raise Http404("Unbekanntes Dashboard-Widget")
     
-    return render(request, 'vermietung/home.html', context)
+    context = DashboardKpiService.get(widget, company=Mandant.objects.first())
+    return render(request, f'vermietung/dashboard/_{widget}.html', context)
 
 
 @vermietung_required
@@ -1280,11 +1243,20 @@ def adresse_delete(request, pk):
 
 # MietObjekt (Rental Object) CRUD Views
 
+# Sort options of the MietObjekt list: key -> (label, ordering)
+MIETOBJEKT_LIST_SORTS = {
+    '': ('Name', ('name',)),
+    'frei': ('Freie Einheiten', ('-available_units', 'name')),
+    'gebucht': ('Gebuchte Einheiten', ('-active_units', 'name')),
+}
+
 @vermietung_required
 def mietobjekt_list(request):
     """
     List all MietObjekt with search, filtering and pagination.
     Supports filtering by type, availability, location, and mandant.
+    Availability filter, sorting and the unit figures use the stored
+    occupancy counters (active_units/available_units).
     """
     # Get filter parameters
     search_query = request.GET.get('q', '').strip()
@@ -1292,9 +1264,12 @@ def mietobjekt_list(request):
     verfuegbar_filter = request.GET.get('verfuegbar', '')
     standort_filter = request.GET.get('standort', '')
     mandant_filter = request.GET.get('mandant', '')
+    sort = request.GET.get('sort', '')
     
     # Base queryset with related data
-    mietobjekte = MietObjekt.objects.select_related('standort', 'mandant').all()
+    mietobjekte = OccupancyService.with_counters(
+        MietObjekt.objects.select_related('standort', 'mandant')
+    )
     
     # Apply search filter
     if search_query:
@@ -1309,12 +1284,12 @@ def mietobjekt_list(request):
     if type_filter:
         mietobjekte = mietobjekte.filter(type=type_filter)
     
-    # Apply availability filter
+    # Apply availability filter (free units left)
     if verfuegbar_filter:
         if verfuegbar_filter == 'true':
-            mietobjekte = mietobjekte.filter(verfuegbar=True)
+            mietobjekte = mietobjekte.filter(available_units__gt=0)
         elif verfuegbar_filter == 'false':
-            mietobjekte = mietobjekte.filter(verfuegbar=False)
+            mietobjekte = mietobjekte.filter(available_units=0)
     
     # Apply location filter
     if standort_filter:
@@ -1324,14 +1299,19 @@ def mietobjekt_list(request):
     if mandant_filter:
         mietobjekte = mietobjekte.filter(mandant_id=mandant_filter)
     
-    # Order by name
-    mietobjekte = mietobjekte.order_by('name')
+    # Order by name or by the occupancy counters
+    if sort not in MIETOBJEKT_LIST_SORTS:
+        sort = ''
+    mietobjekte = mietobjekte.order_by(*MIETOBJEKT_LIST_SORTS[sort][1])
     
     # Pagination
     paginator = Paginator(mietobjekte, 20)  # Show 20 items per page
     page_number = request.GET.get('page', 1)
     page_obj = paginator.get_page(page_number)
     
+    # Unit counts from the stored counters (no per-row queries in the template)
+    OccupancyService.from_counters(page_obj.object_list)
+    
     # Get all standorte for filter dropdown only if needed
     # Always fetch for display consistency
     standorte = Adresse.objects.filter(adressen_type='STANDORT').order_by('name')
@@ -1346,6 +1326,8 @@ def mietobjekt_list(request):
         'verfuegbar_filter': verfuegbar_filter,
         'standort_filter': standort_filter,
         'mandant_filter': mandant_filter,
+        'sort': sort,
+        'sort_options': [(key, label) for key, (label, _ordering) in MIETOBJEKT_LIST_SORTS.items()],
         'standorte': standorte,
         'mandanten': mandanten,
         'objekt_types': OBJEKT_TYPE,
@@ -1403,8 +1385,9 @@ def mietobjekt_detail(request, pk):
     eingangsrechnungen_page = request.GET.get('eingangsrechnungen_page', 1)
     eingangsrechnungen_page_obj = eingangsrechnungen_paginator.get_page(eingangsrechnungen_page)
     
-    # Get direct children for hierarchy display
-    children = mietobjekt.children.select_related('standort').all()
+    # Get direct children for hierarchy display (with precomputed unit counts)
+    children = OccupancyService.annotate(mietobjekt.children.select_related('standort').all())
+    OccupancyService.annotate([mietobjekt])
     
     # Calculate aggregated values for parents with children
     has_children = mietobjekt.has_children()
@@ -1571,57 +1554,85 @@ def vertrag_list(request):
 @vermietung_required
 def mieteinnahmen_monatlich(request):
     """
-    Monthly rent income overview (Soll) for active contracts.
-    Supports selecting a month (default: current month).
+    Rent income overview (Soll) for active contracts.
+    Supports selecting a month (default: current month) or a range of months
+    (monat..bis), filtering by Mandant and exporting the month x contract
+    matrix as CSV or XLSX (format=csv|xlsx).
     """
-    month_param = request.GET.get('monat')
     today = timezone.now().date()
 
-    if month_param:
-        try:
-            selected_month = datetime.strptime(f"{month_param}-01", "%Y-%m-%d").date()
-        except ValueError:
-            selected_month = today.replace(day=1)
-    else:
-        selected_month = today.replace(day=1)
-
-    # Fetch active contracts for the selected month with related data
-    contracts = Vertrag.objects.select_related('mieter').prefetch_related(
-        'vertragsobjekte__mietobjekt'
-    ).active_in_month(selected_month)
-
-    entries = []
-    for vertrag in contracts:
-        # Prefer new VertragsObjekt relationship
-        mietobjekte = [vo.mietobjekt for vo in vertrag.vertragsobjekte.all()]
-
-        # Fallback to legacy mietobjekt field
-        if not mietobjekte and vertrag.mietobjekt_id:
-            mietobjekte = [vertrag.mietobjekt]
-
-        if mietobjekte:
-            first_obj = mietobjekte[0]
-            if len(mietobjekte) > 1:
-                objekt_display = f"{first_obj.name} (+{len(mietobjekte)-1} weitere)"
-            else:
-                objekt_display = first_obj.name
-        else:
-            objekt_display = '—'
+    def parse_month(value, default):
+        if value:
+            try:
+                return datetime.strptime(f"{value}-01", "%Y-%m-%d").date()
+            except ValueError:
+                pass
+        return default
 
-        entries.append({
-            'vertrag': vertrag,
-            'kunde': vertrag.mieter,
-            'objekt_display': objekt_display,
-            'betrag': vertrag.effective_net_total,
-        })
+    selected_month = parse_month(request.GET.get('monat'), today.replace(day=1))
+    end_month = parse_month(request.GET.get('bis'), selected_month)
+    if end_month < selected_month:
+        end_month = selected_month
 
-    # Sort entries by customer name for consistent presentation
-    entries.sort(key=lambda entry: (entry['kunde'].full_name() if entry['kunde'] else ''))
+    mandant_filter = request.GET.get('mandant', '')
+    mandant = None
+    if mandant_filter:
+        mandant = Mandant.objects.filter(pk=mandant_filter).first() if mandant_filter.isdigit() else None
+
+    try:
+        rent_roll = RentRollService.build(selected_month, end_month, mandant=mandant)
+    except ValueError as e:
+        messages.error(request, str(e))
+        end_month = selected_month
+        rent_roll = RentRollService.build(selected_month, end_month, mandant=mandant)
+
+    export_format = request.GET.get('format', '')
+    filename = f"mieteinnahmen_{selected_month:%Y-%m}_{end_month:%Y-%m}"
+    if export_format == 'csv':
+        response = StreamingHttpResponse(
+            RentRollService.iter_csv(rent_roll),
+            content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+    if export_format == 'xlsx':
+        buffer = tempfile.SpooledTemporaryFile(max_size=5 * 1024 * 1024)
+        try:
+            RentRollService.write_xlsx(rent_roll, buffer)
+        except ImportError as e:
+            buffer.close()
+            messages.error(request, str(e))
+            return redirect(f"{reverse('vermietung:mieteinnahmen_monatlich')}?monat={selected_month:%Y-%m}&bis={end_month:%Y-%m}")
+        buffer.seek(0)
+        return FileResponse(
+            buffer,
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+
+    # One entry per contract (betrag = first month, betraege = all months)
+    entries = [
+        {
+            'vertrag': row.vertrag,
+            'kunde': row.kunde,
+            'objekt_display': row.objekt_display,
+            'betrag': row.betraege[0],
+            'betraege': row.betraege,
+            'summe': row.summe,
+        }
+        for row in rent_roll.rows
+    ]
 
     context = {
         'entries': entries,
+        'rent_roll': rent_roll,
+        'is_range': len(rent_roll.months) > 1,
         'selected_month': selected_month,
         'month_value': selected_month.strftime('%Y-%m'),
+        'end_month_value': end_month.strftime('%Y-%m'),
+        'mandant_filter': mandant_filter,
+        'mandanten': Mandant.objects.all().order_by('name'),
     }
 
     return render(request, 'vermietung/vertraege/mieteinnahmen_monatlich.html', context)
@@ -1632,8 +1643,9 @@ def vertrag_detail(request, pk):
     """
     Show details of a specific contract.
     """
+    # Totals are annotated in SQL (the template shows them several times)
     vertrag = get_object_or_404(
-        Vertrag.objects.select_related('mietobjekt', 'mieter'),
+        Vertrag.objects.select_related('mietobjekt', 'mieter').with_totals(),
         pk=pk
     )
     
@@ -2782,6 +2794,84 @@ def mietobjekt_available_for_assignment(request, parent_pk):
     return JsonResponse({'objects': data})
 
 
+@vermietung_required
+def mietobjekt_belegung(request):
+    """
+    AJAX endpoint for the availability calendar of MietObjekte.
+    Returns booked and free units per day or month for a date range.
+    
+    Query parameters:
+        ids: Comma-separated MietObjekt IDs (default: all)
+        von: First day (YYYY-MM-DD, default: today)
+        bis: Last day, inclusive (YYYY-MM-DD, default: 30 days / 12 months after von)
+        raster: 'tag' or 'monat' (default: 'tag')
+    
+    Returns:
+        JSON response with the occupancy periods per object
+    """
+    raster = request.GET.get('raster', 'tag')
+    granularity = {
+        'tag': OccupancyTimelineService.GRANULARITY_DAY,
+        'monat': OccupancyTimelineService.GRANULARITY_MONTH,
+    }.get(raster)
+    if granularity is None:
+        return JsonResponse({'error': 'Ungültiges Raster (erlaubt: tag, monat)'}, status=400)
+    
+    try:
+        von = date.fromisoformat(request.GET['von']) if request.GET.get('von') else timezone.now().date()
+        if request.GET.get('bis'):
+            bis = date.fromisoformat(request.GET['bis'])
+        elif granularity == OccupancyTimelineService.GRANULARITY_DAY:
+            bis = von + timedelta(days=30)
+        else:
+            bis = von + relativedelta(months=12) - timedelta(days=1)
+    except ValueError:
+        return JsonResponse({'error': 'Ungültiges Datum (Format: JJJJ-MM-TT)'}, status=400)
+    
+    if bis < von:
+        return JsonResponse({'error': 'Das Enddatum muss nach dem Startdatum liegen'}, status=400)
+    max_days = 366 if granularity == OccupancyTimelineService.GRANULARITY_DAY else 3660
+    if (bis - von).days >= max_days:
+        return JsonResponse({'error': f'Der Zeitraum darf höchstens {max_days} Tage umfassen'}, status=400)
+    
+    mietobjekte = MietObjekt.objects.order_by('name')
+    if request.GET.get('ids'):
+        try:
+            ids = [int(pk) for pk in request.GET['ids'].split(',') if pk.strip()]
+        except ValueError:
+            return JsonResponse({'error': 'Ungültige Mietobjekt-IDs'}, status=400)
+        mietobjekte = mietobjekte.filter(pk__in=ids)
+    mietobjekte = list(mietobjekte.only('pk', 'name', 'verfuegbare_einheiten'))
+    
+    timeline = OccupancyTimelineService.timeline(
+        [obj.pk for obj in mietobjekte], von, bis, granularity=granularity
+    )
+    
+    data = []
+    for obj in mietobjekte:
+        data.append({
+            'id': obj.pk,
+            'name': obj.name,
+            'verfuegbare_einheiten': obj.verfuegbare_einheiten,
+            'perioden': [
+                {
+                    'von': period.von.isoformat(),
+                    'bis': period.bis.isoformat(),
+                    'gebucht': period.booked_units,
+                    'frei': period.free_units,
+                }
+                for period in timeline[obj.pk]
+            ],
+        })
+    
+    return JsonResponse({
+        'von': von.isoformat(),
+        'bis': bis.isoformat(),
+        'raster': raster,
+        'objects': data,
+    })
+
+
 @vermietung_required
 @require_POST
 def mietobjekt_assign_child(request, parent_pk):